@@ -22,6 +22,15 @@ extra_reqs = {
     "benchmark": [
         "pytest-benchmark",
     ],
+    "geoparquet": [
+        "pyarrow>=14",
+    ],
+    "brotli": [
+        "brotli>=1.2",
+    ],
+    "zstd": [
+        "zstandard",
+    ],
     "docs": ["mkdocs", "mkdocs-material", "pdocs"],
 }
 
@@ -4,9 +4,10 @@ from typing import Any, Dict, List, Optional, Tuple, Type, Union
 
 import attr
 from brotli_asgi import BrotliMiddleware
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, FastAPI, Request
 from fastapi.openapi.utils import get_openapi
 from fastapi.params import Depends
+from fastapi.routing import APIRoute
 from stac_pydantic import api
 from stac_pydantic.api.collections import Collections
 from stac_pydantic.api.version import STAC_API_VERSION
@@ -14,23 +15,58 @@ from stac_pydantic.shared import MimeTypes
 from starlette.middleware import Middleware
 from starlette.responses import JSONResponse, Response
 
+from stac_fastapi.api.cache import ResponseCache
+from stac_fastapi.api.coalescing import RequestCoalescer
+from stac_fastapi.api.encoding import ChunkedEncoder
 from stac_fastapi.api.errors import DEFAULT_STATUS_CODES, add_exception_handlers
-from stac_fastapi.api.middleware import CORSMiddleware, ProxyHeaderMiddleware
+from stac_fastapi.api.executor import ClientExecutor, create_client_executors
+from stac_fastapi.api.middleware import (
+    CORSMiddleware,
+    ProxyHeaderMiddleware,
+)
 from stac_fastapi.api.models import (
     APIRequest,
     CollectionUri,
     EmptyRequest,
     GeoJSONResponse,
+    GeoJSONSeqResponse,
     ItemCollectionUri,
     ItemUri,
+    NDJSONResponse,
 )
 from stac_fastapi.api.openapi import update_openapi
-from stac_fastapi.api.routes import Scope, add_route_dependencies, create_async_endpoint
+from stac_fastapi.api.routes import (
+    Scope,
+    add_route_dependencies,
+    create_async_endpoint,
+    create_output_format_dependency,
+)
+from stac_fastapi.api.validation import ResponseValidator, add_response_validator
 from stac_fastapi.types.config import ApiSettings, Settings
 from stac_fastapi.types.core import AsyncBaseCoreClient, BaseCoreClient
 from stac_fastapi.types.extension import ApiExtension
 from stac_fastapi.types.search import BaseSearchGetRequest, BaseSearchPostRequest
 
+try:
+    from stac_fastapi.api.geoparquet import ArrowStreamResponse, GeoParquetResponse
+except ImportError:  # pragma: nocover
+    ArrowStreamResponse = GeoParquetResponse = None
+
+
+def default_item_collection_formats() -> Dict[str, Type[Response]]:
+    """ItemCollection output formats, including the GeoParquet and Arrow formats
+    when the `geoparquet` extra is installed."""
+    formats = {
+        "geojson": GeoJSONResponse,
+        "geojsonseq": GeoJSONSeqResponse,
+        "ndjson": NDJSONResponse,
+    }
+    if GeoParquetResponse is not None:
+        formats["parquet"] = GeoParquetResponse
+        formats["arrow"] = ArrowStreamResponse
+
+    return formats
+
 
 @attr.s
 class StacApi:
@@ -62,6 +98,40 @@ class StacApi:
             specified routes. This is useful
             for applying custom auth requirements to routes defined elsewhere in
             the application.
+        item_collection_formats:
+            Mapping of format names (used with the `f` query parameter) to the
+            response classes available for the `/search` and
+            `/collections/{collection_id}/items` endpoints. The format can also
+            be selected with the `Accept` header. The first format is the
+            default.
+        search_cache:
+            Cache of the `/search` and `/collections/{collection_id}/items`
+            responses, defaults to the one configured with the `search_cache_*`
+            settings (disabled by default). Cached responses are evicted when a
+            collection is modified through the API (e.g. with the Transaction
+            extensions).
+        landing_page_cache:
+            Cache of the landing page (`/`) and `/conformance` responses, enabled
+            with the `landing_page_cache_ttl` setting. Cached responses are evicted
+            when a collection is created, updated or deleted through the API.
+        search_coalescer:
+            Coalescer sharing a single client call between identical concurrent
+            `/search` and `/collections/{collection_id}/items` requests, enabled
+            with the `enable_search_coalescing` setting.
+        client_executors:
+            Dedicated thread capacity of the synchronous clients, by client method
+            name (e.g. `post_search`), client class name or `*` (see
+            `stac_fastapi.api.executor.get_client_executor`). Defaults to the
+            executors configured with the `client_max_threads*` settings; the
+            clients share Starlette's threadpool when empty.
+        response_encoder:
+            Encoder of the large FeatureCollection responses, which encodes their
+            features in chunks outside of the event loop. Defaults to the one
+            configured with the `chunked_encoding_*` settings (disabled by
+            default).
+        response_validators:
+            Validators of the routes response models, by route (e.g. `GET /search`),
+            when the `enable_response_models` setting is set.
     """
 
     settings: ApiSettings = attr.ib()
@@ -119,6 +189,44 @@ class StacApi:
         )
     )
     route_dependencies: List[Tuple[List[Scope], List[Depends]]] = attr.ib(default=[])
+    response_validators: Dict[str, ResponseValidator] = attr.ib(init=False, factory=dict)
+    item_collection_formats: Dict[str, Type[Response]] = attr.ib(
+        default=attr.Factory(default_item_collection_formats)
+    )
+    search_cache: Optional[ResponseCache] = attr.ib(
+        default=attr.Factory(
+            lambda self: ResponseCache.from_settings(self.settings), takes_self=True
+        )
+    )
+    landing_page_cache: Optional[ResponseCache] = attr.ib(
+        default=attr.Factory(
+            lambda self: ResponseCache(
+                ttl=self.settings.landing_page_cache_ttl,
+                vary_headers=self.settings.search_vary_headers,
+            )
+            if self.settings.landing_page_cache_ttl
+            else None,
+            takes_self=True,
+        )
+    )
+    search_coalescer: Optional[RequestCoalescer] = attr.ib(
+        default=attr.Factory(
+            lambda self: RequestCoalescer(vary_headers=self.settings.search_vary_headers)
+            if self.settings.enable_search_coalescing
+            else None,
+            takes_self=True,
+        )
+    )
+    client_executors: Dict[str, ClientExecutor] = attr.ib(
+        default=attr.Factory(
+            lambda self: create_client_executors(self.settings), takes_self=True
+        )
+    )
+    response_encoder: Optional[ChunkedEncoder] = attr.ib(
+        default=attr.Factory(
+            lambda self: ChunkedEncoder.from_settings(self.settings), takes_self=True
+        )
+    )
 
     def get_extension(self, extension: Type[ApiExtension]) -> Optional[ApiExtension]:
         """Get an extension.
@@ -129,10 +237,7 @@ class StacApi:
         Returns:
             The extension instance, if it exists.
         """
-        for ext in self.extensions:
-            if isinstance(ext, extension):
-                return ext
-        return None
+        return self.client.get_extension_registry().get(extension)
 
     def register_landing_page(self):
         """Register landing page (GET /).
@@ -158,7 +263,9 @@ class StacApi:
             response_model_exclude_unset=False,
             response_model_exclude_none=True,
             methods=["GET"],
-            endpoint=create_async_endpoint(self.client.landing_page, EmptyRequest),
+            endpoint=create_async_endpoint(
+                self.client.landing_page, EmptyRequest, cache=self.landing_page_cache
+            ),
         )
 
     def register_conformance_classes(self):
@@ -185,7 +292,9 @@ class StacApi:
             response_model_exclude_unset=True,
             response_model_exclude_none=True,
             methods=["GET"],
-            endpoint=create_async_endpoint(self.client.conformance, EmptyRequest),
+            endpoint=create_async_endpoint(
+                self.client.conformance, EmptyRequest, cache=self.landing_page_cache
+            ),
         )
 
     def register_get_item(self):
@@ -230,7 +339,8 @@ class StacApi:
             responses={
                 200: {
                     "content": {
-                        MimeTypes.geojson.value: {},
+                        response_class.media_type: {}
+                        for response_class in self.item_collection_formats.values()
                     },
                     "model": api.ItemCollection,
                 },
@@ -238,9 +348,15 @@ class StacApi:
             response_class=GeoJSONResponse,
             response_model_exclude_unset=True,
             response_model_exclude_none=True,
+            dependencies=[
+                Depends(create_output_format_dependency(self.item_collection_formats))
+            ],
             methods=["POST"],
             endpoint=create_async_endpoint(
-                self.client.post_search, self.search_post_request_model
+                self.client.post_search,
+                self.search_post_request_model,
+                cache=self.search_cache,
+                coalescer=self.search_coalescer,
             ),
         )
 
@@ -259,7 +375,8 @@ class StacApi:
             responses={
                 200: {
                     "content": {
-                        MimeTypes.geojson.value: {},
+                        response_class.media_type: {}
+                        for response_class in self.item_collection_formats.values()
                     },
                     "model": api.ItemCollection,
                 },
@@ -267,9 +384,15 @@ class StacApi:
             response_class=GeoJSONResponse,
             response_model_exclude_unset=True,
             response_model_exclude_none=True,
+            dependencies=[
+                Depends(create_output_format_dependency(self.item_collection_formats))
+            ],
             methods=["GET"],
             endpoint=create_async_endpoint(
-                self.client.get_search, self.search_get_request_model
+                self.client.get_search,
+                self.search_get_request_model,
+                cache=self.search_cache,
+                coalescer=self.search_coalescer,
             ),
         )
 
@@ -346,7 +469,8 @@ class StacApi:
             responses={
                 200: {
                     "content": {
-                        MimeTypes.geojson.value: {},
+                        response_class.media_type: {}
+                        for response_class in self.item_collection_formats.values()
                     },
                     "model": api.ItemCollection,
                 },
@@ -354,9 +478,15 @@ class StacApi:
             response_class=GeoJSONResponse,
             response_model_exclude_unset=True,
             response_model_exclude_none=True,
+            dependencies=[
+                Depends(create_output_format_dependency(self.item_collection_formats))
+            ],
             methods=["GET"],
             endpoint=create_async_endpoint(
-                self.client.item_collection, self.items_get_request_model
+                self.client.item_collection,
+                self.items_get_request_model,
+                cache=self.search_cache,
+                coalescer=self.search_coalescer,
             ),
         )
 
@@ -413,6 +543,82 @@ class StacApi:
 
         self.app.include_router(mgmt_router, tags=["Liveliness/Readiness"])
 
+    def add_cache_invalidation(self):
+        """Evict the cached responses when a collection is modified.
+
+        Adds a dependency to the write (POST/PUT/PATCH/DELETE) routes under
+        `/collections`, e.g. the Transaction and Bulk Transaction extensions
+        endpoints. The search responses depending on the collection are evicted
+        by all these routes, the landing page responses only by the collection
+        routes (`/collections` and `/collections/{collection_id}`).
+
+        Returns:
+            None
+        """
+        search_cache = self.search_cache
+        landing_page_cache = self.landing_page_cache
+        collections_path = f"{self.router.prefix}/collections"
+        collection_paths = {collections_path, f"{collections_path}/{{collection_id}}"}
+
+        def invalidation_dependency(landing_page: bool):
+            async def invalidate_caches(request: Request):
+                try:
+                    yield
+                finally:
+                    if search_cache is not None:
+                        search_cache.invalidate(request.path_params.get("collection_id"))
+                    if landing_page and landing_page_cache is not None:
+                        landing_page_cache.clear()
+
+            return Depends(invalidate_caches)
+
+        dependencies = {
+            landing_page: invalidation_dependency(landing_page)
+            for landing_page in (True, False)
+        }
+
+        for route in self.app.router.routes:
+            if not isinstance(route, APIRoute) or not route.path.startswith(
+                collections_path
+            ):
+                continue
+
+            methods = route.methods & {"POST", "PUT", "PATCH", "DELETE"}
+            add_route_dependencies(
+                [route],
+                [{"path": route.path, "method": method} for method in methods],
+                [dependencies[route.path in collection_paths]],
+            )
+
+    def configure_response_validation(self):
+        """Add a response validator to the routes with a response model.
+
+        In the `sample` and `shadow` modes of the `response_validation_mode`
+        setting, it replaces the response model validation; in the `enforce` mode,
+        it validates the streamed and `Response` results of the clients, the other
+        results being validated when serialized by their response model (see
+        `stac_fastapi.api.validation.ResponseValidator`).
+
+        Returns:
+            None
+        """
+        if not self.settings.enable_response_models:
+            return
+
+        mode = self.settings.response_validation_mode
+        for route in self.app.router.routes:
+            if not isinstance(route, APIRoute):
+                continue
+
+            validator = add_response_validator(
+                route,
+                sample_rate=self.settings.response_validation_sample_rate,
+                shadow=mode == "shadow",
+                enforce=mode == "enforce",
+            )
+            if validator is not None:
+                self.response_validators[validator.name] = validator
+
     def add_route_dependencies(
         self, scopes: List[Scope], dependencies=List[Depends]
     ) -> None:
@@ -444,8 +650,13 @@ class StacApi:
         self.client.title = self.title
         self.client.description = self.description
 
+        # freeze the extensions registry (reset when `extensions` was assigned)
+        self.client.get_extension_registry()
+
         Settings.set(self.settings)
         self.app.state.settings = self.settings
+        self.app.state.client_executors = self.client_executors
+        self.app.state.response_encoder = self.response_encoder
 
         # Register core STAC endpoints
         self.register_core()
@@ -462,6 +673,13 @@ class StacApi:
         # add health check
         self.add_health_check()
 
+        # response model validation of the streamed and sampled responses
+        self.configure_response_validation()
+
+        # evict the cached responses on collection updates
+        if self.search_cache is not None or self.landing_page_cache is not None:
+            self.add_cache_invalidation()
+
         # register exception handlers
         add_exception_handlers(self.app, status_codes=self.exceptions)
 
@@ -0,0 +1,255 @@
+"""In-process cache of the ItemCollection (search) responses."""
+
+import hashlib
+import json
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import attr
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from stac_fastapi.api.models import APIRequest, GeoJSONResponse
+from stac_fastapi.types.config import ApiSettings
+from stac_fastapi.types.requests import get_base_url
+
+
+def canonical_request_data(request_data: Any) -> Dict[str, Any]:
+    """Return the parameters of a request model as a dictionary.
+
+    Unset (None) parameters are dropped so that equivalent requests (e.g. GET with
+    or without `?limit=`, POST with or without `"limit": null`) give the same
+    dictionary.
+    """
+    if isinstance(request_data, APIRequest):
+        data = request_data.kwargs()
+    elif isinstance(request_data, BaseModel):
+        data = request_data.model_dump(mode="json", exclude_none=True)
+    else:
+        data = dict(request_data or {})
+
+    return {key: value for key, value in data.items() if value is not None}
+
+
+def request_collections(data: Dict[str, Any]) -> Optional[FrozenSet[str]]:
+    """Return the collections a request is restricted to (None for all)."""
+    if collection_id := data.get("collection_id"):
+        return frozenset([collection_id])
+
+    collections = data.get("collections")
+    if isinstance(collections, str):
+        collections = collections.split(",")
+
+    return frozenset(collections) if collections else None
+
+
+def make_request_key(
+    request: Request,
+    name: str,
+    data: Dict[str, Any],
+    vary_headers: Sequence[str] = ("authorization", "cookie"),
+) -> str:
+    """Create a key identifying equivalent requests.
+
+    Args:
+        request: the incoming request.
+        name: name of the endpoint (e.g. `post_search`).
+        data: canonical request parameters (see `canonical_request_data`).
+        vary_headers: (lowercase) request headers the response depends on.
+
+    Returns:
+        str: the request key.
+    """
+    response_class = getattr(request.state, "response_class", None)
+    partition = hashlib.blake2b(digest_size=16)
+    for header in vary_headers:
+        for value in request.headers.getlist(header):
+            partition.update(f"{header}:{value}\n".encode())
+
+    key = json.dumps(
+        [
+            name,
+            get_base_url(request),
+            getattr(response_class, "__name__", None),
+            partition.hexdigest(),
+            data,
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.blake2b(key.encode(), digest_size=32).hexdigest()
+
+
+@attr.s(slots=True)
+class _CacheEntry:
+    body: bytes = attr.ib()
+    status_code: int = attr.ib()
+    headers: List[Tuple[bytes, bytes]] = attr.ib()
+    expires: float = attr.ib()
+    collections: Optional[FrozenSet[str]] = attr.ib()
+
+
+@attr.s
+class ResponseCache:
+    """LRU cache of serialized responses, with time-to-live.
+
+    Responses are keyed on the endpoint, the canonical form of the request
+    parameters, the base URL, the output format and a hash of the request
+    `vary_headers` (so that responses are never shared between users with different
+    credentials). The cache lookup happens in the endpoint, so the route
+    dependencies (e.g. authentication added with `route_dependencies`) are always
+    evaluated.
+
+    Only `200` responses which are not streamed are stored.
+
+    Attributes:
+        ttl: number of seconds a response is cached for.
+        max_entries: maximum number of cached responses.
+        max_bytes: maximum size of the cached responses (bodies are counted after
+            compression).
+        compress: compress the stored bodies (with zlib).
+        vary_headers: request headers the responses depend on.
+    """
+
+    ttl: float = attr.ib(default=60.0)
+    max_entries: int = attr.ib(default=1000)
+    max_bytes: int = attr.ib(default=64 * 1024 * 1024)
+    compress: bool = attr.ib(default=False)
+    vary_headers: Sequence[str] = attr.ib(
+        default=("authorization", "cookie"),
+        converter=lambda headers: tuple(header.lower() for header in headers),
+    )
+    _entries: "OrderedDict[str, _CacheEntry]" = attr.ib(init=False, factory=OrderedDict)
+    _size: int = attr.ib(init=False, default=0)
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    @classmethod
+    def from_settings(cls, settings: ApiSettings) -> Optional["ResponseCache"]:
+        """Create the cache from the `search_cache_*` and `search_vary_headers`
+        settings, if enabled."""
+        if not settings.search_cache_ttl:
+            return None
+
+        return cls(
+            ttl=settings.search_cache_ttl,
+            max_entries=settings.search_cache_max_entries,
+            max_bytes=settings.search_cache_max_bytes,
+            compress=settings.search_cache_compress,
+            vary_headers=settings.search_vary_headers,
+        )
+
+    def __len__(self) -> int:
+        """Return the number of cached responses."""
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Return the size (in bytes) of the cached responses."""
+        return self._size
+
+    def make_key(self, request: Request, name: str, data: Dict[str, Any]) -> str:
+        """Create the cache key of a request (see `make_request_key`)."""
+        return make_request_key(request, name, data, self.vary_headers)
+
+    def get(self, key: str) -> Optional[Response]:
+        """Return the cached response, if any."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if entry.expires <= time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+
+        body = zlib.decompress(entry.body) if self.compress else entry.body
+        response = Response(body, status_code=entry.status_code)
+        response.raw_headers = list(entry.headers)
+        return response
+
+    def set(
+        self,
+        key: str,
+        content: Any,
+        collections: Optional[FrozenSet[str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Any:
+        """Store a response.
+
+        Args:
+            key: the cache key (see `make_key`).
+            content: the endpoint result, either an ItemCollection (serialized with
+                `GeoJSONResponse`) or a Response.
+            collections: the collections the response depends on (None for all).
+            headers: additional headers of the response.
+
+        Returns:
+            The response to send.
+        """
+        if isinstance(content, dict):
+            content = GeoJSONResponse(content, headers=headers)
+
+        if (
+            not isinstance(content, Response)
+            or isinstance(content, StreamingResponse)
+            or content.status_code != 200
+            or content.background is not None
+        ):
+            return content
+
+        body = zlib.compress(content.body, 1) if self.compress else content.body
+        if len(body) > self.max_bytes:
+            return content
+
+        entry = _CacheEntry(
+            body=body,
+            status_code=content.status_code,
+            headers=list(content.raw_headers),
+            expires=time.monotonic() + self.ttl,
+            collections=collections,
+        )
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = entry
+            self._size += len(body)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+        return content
+
+    def invalidate(self, collection_id: Optional[str] = None) -> None:
+        """Evict the responses which may depend on a collection.
+
+        Args:
+            collection_id: the modified collection. If None, all the responses are
+                evicted.
+        """
+        with self._lock:
+            if collection_id is None:
+                self._entries.clear()
+                self._size = 0
+                return
+
+            for key in [
+                key
+                for key, entry in self._entries.items()
+                if entry.collections is None or collection_id in entry.collections
+            ]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        """Evict all the responses."""
+        self.invalidate()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._size -= len(entry.body)
@@ -0,0 +1,302 @@
+"""Coalescing of concurrent requests (identical reads, item creations)."""
+
+import asyncio
+import collections
+import functools
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+)
+
+import attr
+from starlette.requests import Request
+
+from stac_fastapi.api.cache import make_request_key
+
+# Marker telling the waiting requests to run their own call
+_NOT_SHARED = object()
+
+
+@attr.s
+class RequestCoalescer:
+    """Share the result of a client call between identical concurrent requests.
+
+    While a call is in flight, the equivalent requests (same endpoint, canonical
+    parameters, base URL, output format and credential headers, see
+    `stac_fastapi.api.cache.make_request_key`) wait for its result instead of
+    calling the client again. Nothing is stored once the call is done.
+
+    Only dictionaries (e.g. ItemCollections) are shared: when the call returns
+    anything else (e.g. a stream, which can only be consumed once) or is
+    cancelled, the waiting requests call the client themselves. Errors are raised
+    for all the requests.
+
+    Attributes:
+        vary_headers: request headers the responses depend on.
+        executions: number of client calls.
+        coalesced: number of requests which got the result of another request's
+            call.
+    """
+
+    vary_headers: Sequence[str] = attr.ib(
+        default=("authorization", "cookie"),
+        converter=lambda headers: tuple(header.lower() for header in headers),
+    )
+    executions: int = attr.ib(init=False, default=0)
+    coalesced: int = attr.ib(init=False, default=0)
+    _in_flight: Dict[str, "asyncio.Future[Any]"] = attr.ib(init=False, factory=dict)
+
+    def make_key(self, request: Request, name: str, data: Dict[str, Any]) -> str:
+        """Create the key of a request (see `make_request_key`)."""
+        return make_request_key(request, name, data, self.vary_headers)
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of calls in flight."""
+        return len(self._in_flight)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the coalescing metrics."""
+        return {
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": self.in_flight,
+        }
+
+    async def run(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Call `call`, or wait for the result of an identical call in flight.
+
+        Args:
+            key: the request key (see `make_key`).
+            call: the client call.
+
+        Returns:
+            The result of the call.
+        """
+        future = self._in_flight.get(key)
+        if future is not None:
+            # don't cancel the shared call when this request is cancelled
+            result = await asyncio.shield(future)
+            if result is not _NOT_SHARED:
+                self.coalesced += 1
+                return result
+
+            return await call()
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.executions += 1
+        try:
+            result = await call()
+
+        except Exception as e:
+            future.set_exception(e)
+            # mark the exception as retrieved, in case nobody is waiting
+            future.exception()
+            raise
+
+        except BaseException:
+            future.set_result(_NOT_SHARED)
+            raise
+
+        else:
+            future.set_result(result if isinstance(result, dict) else _NOT_SHARED)
+            return result
+
+        finally:
+            del self._in_flight[key]
+
+
+@attr.s
+class _PendingItems:
+    items: List[Any] = attr.ib()
+    requests: List[Request] = attr.ib()
+    creates: List[Callable[[], Awaitable[Any]]] = attr.ib()
+    futures: Dict[str, "asyncio.Future[Any]"] = attr.ib()
+    create_items: Callable[[List[Any], List[Request]], Awaitable[List[Any]]] = attr.ib()
+
+
+@attr.s
+class ItemWriteCoalescer:
+    """Coalesce concurrent single item creations into bulk writes.
+
+    An item is created right away when no other write is in progress for its
+    collection. Otherwise it is queued, and created once the writes in progress
+    are done with the items queued meanwhile (up to `max_items` items), with a
+    single `create_items` call of the transactions client (see
+    `stac_fastapi.types.core.BaseTransactionsClient.create_items`), which returns
+    the created item or the error of each item. A single queued item is created
+    with its own `create_item` call. The writes of a collection run one at a time.
+
+    Items are only coalesced with the items of the same collection sent with the
+    same `vary_headers` (e.g. credentials) and arguments (see `make_key`). The
+    `create_items` call gets the request of each item (`requests`), rather than
+    the request of one of them.
+
+    Attributes:
+        max_items: maximum number of items of a bulk write.
+        vary_headers: request headers the writes depend on.
+        flushes: number of bulk writes.
+        coalesced: number of items created by bulk writes.
+    """
+
+    max_items: int = attr.ib(default=100, validator=attr.validators.ge(1))
+    vary_headers: Sequence[str] = attr.ib(
+        default=("authorization", "cookie"),
+        converter=lambda headers: tuple(header.lower() for header in headers),
+    )
+    flushes: int = attr.ib(init=False, default=0)
+    coalesced: int = attr.ib(init=False, default=0)
+    _writing: Set[str] = attr.ib(init=False, factory=set)
+    _pending: Dict[str, Deque[_PendingItems]] = attr.ib(init=False, factory=dict)
+    _tasks: Set["asyncio.Task[None]"] = attr.ib(init=False, factory=set)
+
+    def make_key(
+        self,
+        request: Request,
+        collection_id: str,
+        kwargs: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Create the key of the item creations which may be coalesced.
+
+        Args:
+            request: the request.
+            collection_id: the id of the collection.
+            kwargs: the other arguments of the `create_items` call (but the
+                request), shared by the coalesced items.
+        """
+        return make_request_key(
+            request,
+            "create_item",
+            {"collection_id": collection_id, **(kwargs or {})},
+            self.vary_headers,
+        )
+
+    def stats(self) -> Dict[str, int]:
+        """Return the coalescing metrics."""
+        return {
+            "flushes": self.flushes,
+            "coalesced": self.coalesced,
+            "pending": sum(
+                len(batch.items)
+                for batches in self._pending.values()
+                for batch in batches
+            ),
+        }
+
+    async def _write(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        # the key is added to `_writing` by the caller, before any await
+        try:
+            return await call()
+        finally:
+            self._writing.discard(key)
+            # the items queued meanwhile are written next
+            self._flush_next(key)
+
+    def _flush_next(self, key: str) -> None:
+        batches = self._pending.get(key)
+        if not batches:
+            return
+
+        batch = batches.popleft()
+        if not batches:
+            del self._pending[key]
+
+        self._writing.add(key)
+        task = asyncio.ensure_future(self._flush(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, key: str, batch: _PendingItems) -> None:
+        results: List[Any]
+        try:
+            if len(batch.items) == 1:
+                results = [await self._write(key, batch.creates[0])]
+            else:
+                results = await self._write(
+                    key,
+                    functools.partial(batch.create_items, batch.items, batch.requests),
+                )
+                if len(results) != len(batch.items):
+                    raise RuntimeError("create_items must return one result per item")
+
+                self.flushes += 1
+                self.coalesced += len(batch.items)
+
+        except Exception as e:
+            results = [e] * len(batch.items)
+
+        for future, result in zip(batch.futures.values(), results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+                # mark the exception as retrieved, in case nobody is waiting
+                future.exception()
+            else:
+                future.set_result(result)
+
+    def _queue(
+        self,
+        key: str,
+        item_id: str,
+        create_items: Callable[[List[Any], List[Request]], Awaitable[List[Any]]],
+    ) -> _PendingItems:
+        batches = self._pending.setdefault(key, collections.deque())
+        batch = batches[-1] if batches else None
+        # a full batch, or one with the same item (created again, after the queued
+        # one), is followed by a new batch
+        if (
+            batch is None
+            or len(batch.items) >= self.max_items
+            or item_id in batch.futures
+        ):
+            batch = _PendingItems(
+                items=[], requests=[], creates=[], futures={}, create_items=create_items
+            )
+            batches.append(batch)
+
+        return batch
+
+    async def create_item(
+        self,
+        key: str,
+        item_id: str,
+        item: Any,
+        request: Request,
+        create: Callable[[], Awaitable[Any]],
+        create_items: Callable[[List[Any], List[Request]], Awaitable[List[Any]]],
+    ) -> Any:
+        """Create an item, possibly with the items of concurrent requests.
+
+        Args:
+            key: the key of the request (see `make_key`).
+            item_id: the id of the item.
+            item: the item.
+            request: the request.
+            create: creation of the item on its own (`create_item` call).
+            create_items: creation of a list of items, given the request of each
+                item (`create_items` call), used if the item is the first of a bulk
+                write.
+
+        Returns:
+            The result of the item creation.
+        """
+        if key not in self._writing:
+            self._writing.add(key)
+            return await self._write(key, create)
+
+        batch = self._queue(key, item_id, create_items)
+        future = asyncio.get_running_loop().create_future()
+        batch.items.append(item)
+        batch.requests.append(request)
+        batch.creates.append(create)
+        batch.futures[item_id] = future
+
+        # don't cancel the bulk write when this request is cancelled
+        return await asyncio.shield(future)
@@ -0,0 +1,94 @@
+"""Off-loop encoding of large FeatureCollections."""
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, List, Optional
+
+import anyio.to_thread
+import attr
+
+from stac_fastapi.api.models import json_dumps
+from stac_fastapi.types.config import ApiSettings
+
+
+def encode_features(features: List[Any]) -> bytes:
+    """Encode a list of features as comma separated JSON objects."""
+    return b",".join(json_dumps(feature) for feature in features)
+
+
+@attr.s
+class ChunkedEncoder:
+    """Encode the features of large FeatureCollections outside of the event loop.
+
+    Encoding a page of thousands of (complex) features takes long enough to stall
+    every other request of the worker. Pages of at least `min_features` features
+    are split in chunks of `chunk_size` features, encoded one after the other in a
+    worker thread (or concurrently in `executor`, e.g. a `ProcessPoolExecutor`),
+    and the encoded chunks are joined in the response body. The event loop is
+    only blocked while joining, and while pickling the chunks when using a
+    process pool.
+
+    Attributes:
+        min_features: minimum number of features of the encoded pages.
+        chunk_size: number of features encoded at once.
+        executor: executor the chunks are submitted to. When None, they are
+            encoded in anyio's worker threads.
+    """
+
+    min_features: int = attr.ib(default=1000)
+    chunk_size: int = attr.ib(default=500)
+    executor: Optional[Executor] = attr.ib(default=None)
+
+    @classmethod
+    def from_settings(cls, settings: ApiSettings) -> Optional["ChunkedEncoder"]:
+        """Create the encoder from the `chunked_encoding_*` settings, if enabled."""
+        if not settings.chunked_encoding_min_features:
+            return None
+
+        return cls(
+            min_features=settings.chunked_encoding_min_features,
+            chunk_size=settings.chunked_encoding_chunk_size,
+        )
+
+    def applies(self, content: Any) -> bool:
+        """Return True if the content should be encoded in chunks."""
+        return (
+            isinstance(content, dict)
+            and content.get("type") == "FeatureCollection"
+            and isinstance(content.get("features"), list)
+            and len(content["features"]) >= self.min_features
+        )
+
+    async def _encode_chunks(self, features: List[Any]) -> List[bytes]:
+        chunks = [
+            features[start : start + self.chunk_size]
+            for start in range(0, len(features), self.chunk_size)
+        ]
+        if self.executor is not None:
+            loop = asyncio.get_running_loop()
+            return await asyncio.gather(
+                *[
+                    loop.run_in_executor(self.executor, encode_features, chunk)
+                    for chunk in chunks
+                ]
+            )
+
+        return [
+            await anyio.to_thread.run_sync(encode_features, chunk) for chunk in chunks
+        ]
+
+    async def encode(self, content: Any) -> bytes:
+        """Encode a FeatureCollection, its features being encoded in chunks.
+
+        The keys are kept in the order of the content.
+        """
+        parts = []
+        for key, value in content.items():
+            if key == "features":
+                encoded = b"[" + b",".join(await self._encode_chunks(value)) + b"]"
+            else:
+                encoded = json_dumps(value)
+
+            parts.append(json_dumps(key) + b":" + encoded)
+
+        return b"{" + b",".join(parts) + b"}"
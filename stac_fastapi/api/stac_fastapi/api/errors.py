@@ -13,8 +13,10 @@ from stac_fastapi.types.errors import (
     ConflictError,
     DatabaseError,
     ForeignKeyError,
+    InvalidItemError,
     InvalidQueryParameter,
     NotFoundError,
+    PayloadTooLargeError,
 )
 
 logger = logging.getLogger(__name__)
@@ -27,6 +29,8 @@ DEFAULT_STATUS_CODES = {
     DatabaseError: status.HTTP_424_FAILED_DEPENDENCY,
     Exception: status.HTTP_500_INTERNAL_SERVER_ERROR,
     InvalidQueryParameter: status.HTTP_400_BAD_REQUEST,
+    InvalidItemError: status.HTTP_400_BAD_REQUEST,
+    PayloadTooLargeError: status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
     ResponseValidationError: status.HTTP_500_INTERNAL_SERVER_ERROR,
 }
 
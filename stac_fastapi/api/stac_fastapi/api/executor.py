@@ -0,0 +1,158 @@
+"""Dedicated thread capacity for the synchronous clients."""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional, Union
+
+import anyio
+import anyio.to_thread
+import attr
+from starlette.requests import Request
+
+from stac_fastapi.types.config import ApiSettings
+
+
+@attr.s(slots=True)
+class _Call:
+    submitted: float = attr.ib()
+    started: bool = attr.ib(default=False)
+
+
+@attr.s
+class ClientExecutor:
+    """Run the synchronous client calls with a dedicated thread capacity.
+
+    By default, the synchronous clients are called in Starlette's threadpool,
+    whose 40 threads are shared with everything else in the process (e.g. the
+    synchronous dependencies and the `UploadFile` I/O). A `ClientExecutor` limits
+    the number of concurrent calls with its own capacity limiter, or runs them in
+    a `concurrent.futures` executor.
+
+    Attributes:
+        max_threads: maximum number of concurrent calls (ignored when `executor`
+            is set).
+        executor: executor the calls are submitted to (e.g. a
+            `ThreadPoolExecutor`), instead of anyio's worker threads.
+        name: name of the executor, used in the metrics.
+        calls: number of completed calls.
+        wait_time: total time (in seconds) the calls waited for a thread.
+        max_wait_time: longest time (in seconds) a call waited for a thread.
+    """
+
+    max_threads: int = attr.ib(default=40)
+    executor: Optional[Executor] = attr.ib(default=None)
+    name: str = attr.ib(default="*")
+    calls: int = attr.ib(init=False, default=0)
+    wait_time: float = attr.ib(init=False, default=0.0)
+    max_wait_time: float = attr.ib(init=False, default=0.0)
+    _waiting: int = attr.ib(init=False, default=0)
+    _active: int = attr.ib(init=False, default=0)
+    _limiter: Optional[anyio.CapacityLimiter] = attr.ib(init=False, default=None)
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    @property
+    def waiting(self) -> int:
+        """Return the number of calls waiting for a thread (queue depth)."""
+        return self._waiting
+
+    @property
+    def active(self) -> int:
+        """Return the number of calls running in a thread."""
+        return self._active
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Return the saturation metrics."""
+        return {
+            "max_threads": self.max_threads,
+            "waiting": self._waiting,
+            "active": self._active,
+            "calls": self.calls,
+            "wait_time": self.wait_time,
+            "max_wait_time": self.max_wait_time,
+        }
+
+    def _start(self, call: _Call) -> None:
+        wait_time = time.monotonic() - call.submitted
+        with self._lock:
+            call.started = True
+            self._waiting -= 1
+            self._active += 1
+            self.wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def _run(self, call: _Call, func: Callable[..., Any]) -> Any:
+        self._start(call)
+        try:
+            return func()
+        finally:
+            with self._lock:
+                self._active -= 1
+                self.calls += 1
+
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call a synchronous function in a thread."""
+        call = _Call(submitted=time.monotonic())
+        with self._lock:
+            self._waiting += 1
+
+        target = functools.partial(
+            self._run, call, functools.partial(func, *args, **kwargs)
+        )
+        try:
+            if self.executor is not None:
+                context = contextvars.copy_context()
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.executor, context.run, target
+                )
+
+            if self._limiter is None:
+                self._limiter = anyio.CapacityLimiter(self.max_threads)
+
+            return await anyio.to_thread.run_sync(target, limiter=self._limiter)
+
+        finally:
+            # cancelled before getting a thread
+            with self._lock:
+                if not call.started:
+                    call.started = True
+                    self._waiting -= 1
+
+
+def create_client_executors(settings: ApiSettings) -> Dict[str, ClientExecutor]:
+    """Create the client executors from the `client_max_threads*` settings."""
+    executors = {
+        name: ClientExecutor(max_threads=max_threads, name=name)
+        for name, max_threads in settings.client_max_threads_by_name.items()
+    }
+    if settings.client_max_threads:
+        executors["*"] = ClientExecutor(max_threads=settings.client_max_threads)
+
+    return executors
+
+
+def get_client_executor(
+    request: Optional[Request], func: Callable[..., Any]
+) -> Optional[ClientExecutor]:
+    """Return the executor of a client method, if any.
+
+    The executors are looked up in the `client_executors` of the application
+    state, by method name (e.g. `post_search`), then by client class name (e.g.
+    `TransactionsClient`), then `*`.
+    """
+    if request is None:
+        return None
+
+    executors = getattr(request.app.state, "client_executors", None)
+    if not executors:
+        return None
+
+    client = getattr(func, "__self__", None)
+    return (
+        executors.get(getattr(func, "__name__", ""))
+        or (client is not None and executors.get(type(client).__name__))
+        or executors.get("*")
+    )
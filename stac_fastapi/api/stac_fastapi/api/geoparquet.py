@@ -0,0 +1,462 @@
+"""GeoParquet and Arrow IPC output formats.
+
+Requires the `geoparquet` extra (`pip install stac-fastapi.api[geoparquet]`).
+
+Items are converted to stac-geoparquet style rows: `properties` are flattened to
+top-level columns, datetimes are stored as timestamps, the `bbox` as a struct and the
+`geometry` as ISO WKB. `row_to_item` converts such rows back to items.
+"""
+
+import json
+import struct
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple, Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+from starlette.types import Send
+
+from stac_fastapi.api.models import iterate_features, link_header
+from stac_fastapi.types.geometry import first_position
+from stac_fastapi.types.rfc3339 import datetime_to_str, rfc3339_str_to_datetime
+from stac_fastapi.types.stac import Item, ItemCollection, ItemCollectionStream
+
+DATETIME_PROPERTIES = ["datetime", "start_datetime", "end_datetime", "created", "updated"]
+
+WKB_GEOMETRY_TYPES = {
+    "Point": 1,
+    "LineString": 2,
+    "Polygon": 3,
+    "MultiPoint": 4,
+    "MultiLineString": 5,
+    "MultiPolygon": 6,
+    "GeometryCollection": 7,
+}
+
+WKB_GEOMETRY_NAMES = {code: name for name, code in WKB_GEOMETRY_TYPES.items()}
+
+# top-level members of the items, the other columns being properties
+ITEM_MEMBERS = [
+    "type",
+    "stac_version",
+    "stac_extensions",
+    "id",
+    "geometry",
+    "bbox",
+    "links",
+    "assets",
+    "collection",
+]
+
+GEO_METADATA = {
+    "version": "1.1.0",
+    "primary_column": "geometry",
+    "columns": {
+        "geometry": {
+            "encoding": "WKB",
+            "geometry_types": [],
+        },
+    },
+}
+
+
+def _geometry_dimensions(geometry: Dict[str, Any]) -> int:
+    if geometry["type"] == "GeometryCollection":
+        for member in geometry.get("geometries", []):
+            return _geometry_dimensions(member)
+        return 2
+
+    position = first_position(geometry.get("coordinates"))
+    return 3 if position is not None and len(position) > 2 else 2
+
+
+def _write_positions(buffer: bytearray, positions: List[List[float]], dims: int):
+    buffer += struct.pack("<I", len(positions))
+    for position in positions:
+        buffer += struct.pack(f"<{dims}d", *position[:dims])
+
+
+def _write_geometry(buffer: bytearray, geometry: Dict[str, Any], dims: int):
+    geometry_type = geometry["type"]
+    code = WKB_GEOMETRY_TYPES[geometry_type] + (1000 if dims == 3 else 0)
+    buffer += struct.pack("<BI", 1, code)
+
+    coordinates = geometry.get("coordinates")
+    if geometry_type == "Point":
+        position = coordinates or [float("nan")] * dims
+        buffer += struct.pack(f"<{dims}d", *position[:dims])
+
+    elif geometry_type == "LineString":
+        _write_positions(buffer, coordinates, dims)
+
+    elif geometry_type == "Polygon":
+        buffer += struct.pack("<I", len(coordinates))
+        for ring in coordinates:
+            _write_positions(buffer, ring, dims)
+
+    elif geometry_type == "GeometryCollection":
+        members = geometry.get("geometries", [])
+        buffer += struct.pack("<I", len(members))
+        for member in members:
+            _write_geometry(buffer, member, dims)
+
+    else:
+        member_type = geometry_type[len("Multi") :]
+        buffer += struct.pack("<I", len(coordinates))
+        for member in coordinates:
+            _write_geometry(buffer, {"type": member_type, "coordinates": member}, dims)
+
+
+def geometry_to_wkb(geometry: Dict[str, Any]) -> bytes:
+    """Encode a GeoJSON geometry as ISO WKB (little endian)."""
+    buffer = bytearray()
+    _write_geometry(buffer, geometry, _geometry_dimensions(geometry))
+    return bytes(buffer)
+
+
+def item_to_row(item: Item) -> Dict[str, Any]:
+    """Convert a STAC Item to a stac-geoparquet style row."""
+    # NOTE: empty objects (e.g. `"assets": {}`) are stored as nulls because struct
+    # columns without any child field can not be written to Parquet
+    row = {
+        key: value
+        for key, value in item.items()
+        if key not in ["properties", "geometry", "bbox"] and value != {}
+    }
+
+    for key, value in (item.get("properties") or {}).items():
+        if key in DATETIME_PROPERTIES and isinstance(value, str):
+            value = rfc3339_str_to_datetime(value)
+        if value != {}:
+            row.setdefault(key, value)
+
+    geometry = item.get("geometry")
+    row["geometry"] = geometry_to_wkb(geometry) if geometry else None
+
+    if bbox := item.get("bbox"):
+        if len(bbox) == 6:
+            keys = ["xmin", "ymin", "zmin", "xmax", "ymax", "zmax"]
+        else:
+            keys = ["xmin", "ymin", "xmax", "ymax"]
+        row["bbox"] = dict(zip(keys, bbox))
+
+    return row
+
+
+def _read_positions(
+    data: bytes, offset: int, endian: str, dims: int, keep: int
+) -> Tuple[List[List[float]], int]:
+    (count,) = struct.unpack_from(f"{endian}I", data, offset)
+    offset += 4
+    values = struct.unpack_from(f"{endian}{count * dims}d", data, offset)
+    positions = [list(values[i : i + keep]) for i in range(0, len(values), dims)]
+    return positions, offset + 8 * dims * count
+
+
+def _read_geometry(data: bytes, offset: int) -> Tuple[Dict[str, Any], int]:
+    endian = "<" if data[offset] == 1 else ">"
+    (code,) = struct.unpack_from(f"{endian}I", data, offset + 1)
+    offset += 5
+
+    # ISO codes: 1000 (Z), 2000 (M), 3000 (ZM), M values are dropped
+    geometry_type = WKB_GEOMETRY_NAMES[code % 1000]
+    dims = (2, 3, 3, 4)[code // 1000]
+    keep = 3 if code // 1000 in (1, 3) else 2
+
+    if geometry_type == "Point":
+        values = struct.unpack_from(f"{endian}{dims}d", data, offset)
+        coordinates = [] if all(v != v for v in values) else list(values[:keep])
+        return {"type": geometry_type, "coordinates": coordinates}, offset + 8 * dims
+
+    if geometry_type == "LineString":
+        coordinates, offset = _read_positions(data, offset, endian, dims, keep)
+        return {"type": geometry_type, "coordinates": coordinates}, offset
+
+    (count,) = struct.unpack_from(f"{endian}I", data, offset)
+    offset += 4
+    members = []
+    for _ in range(count):
+        if geometry_type == "Polygon":
+            member, offset = _read_positions(data, offset, endian, dims, keep)
+        else:
+            member, offset = _read_geometry(data, offset)
+        members.append(member)
+
+    if geometry_type == "Polygon":
+        return {"type": geometry_type, "coordinates": members}, offset
+
+    if geometry_type == "GeometryCollection":
+        return {"type": geometry_type, "geometries": members}, offset
+
+    coordinates = [member["coordinates"] for member in members]
+    return {"type": geometry_type, "coordinates": coordinates}, offset
+
+
+def wkb_to_geometry(data: bytes) -> Dict[str, Any]:
+    """Decode a (ISO) WKB geometry to a GeoJSON geometry."""
+    try:
+        geometry, _ = _read_geometry(data, 0)
+    except (IndexError, KeyError, struct.error) as e:
+        raise ValueError(f"Invalid WKB geometry ({e!r})") from e
+
+    return geometry
+
+
+def _drop_nulls(value: Any) -> Any:
+    # struct columns have all the fields of all the rows, missing ones being null
+    if isinstance(value, dict):
+        return {k: _drop_nulls(v) for k, v in value.items() if v is not None}
+
+    if isinstance(value, list):
+        return [_drop_nulls(v) for v in value]
+
+    return value
+
+
+def row_to_item(row: Mapping[str, Any]) -> Item:
+    """Convert a stac-geoparquet style row (see `item_to_row`) to a STAC Item."""
+    item = {
+        key: _drop_nulls(row[key])
+        for key in ITEM_MEMBERS
+        if row.get(key) is not None and key not in ["geometry", "bbox"]
+    }
+    item.setdefault("type", "Feature")
+    item.setdefault("links", [])
+    item.setdefault("assets", {})
+
+    geometry = row.get("geometry")
+    item["geometry"] = wkb_to_geometry(geometry) if geometry is not None else None
+
+    if bbox := row.get("bbox"):
+        keys = ["xmin", "ymin", "zmin", "xmax", "ymax", "zmax"]
+        if bbox.get("zmin") is None or bbox.get("zmax") is None:
+            keys = ["xmin", "ymin", "xmax", "ymax"]
+        item["bbox"] = [bbox[key] for key in keys]
+
+    properties = {}
+    for key, value in row.items():
+        if key in ITEM_MEMBERS or value is None:
+            continue
+        if isinstance(value, datetime):
+            value = datetime_to_str(value)
+        properties[key] = _drop_nulls(value)
+
+    if "datetime" in row:
+        properties.setdefault("datetime", None)
+
+    item["properties"] = properties
+    return item
+
+
+def _to_table(rows: List[Dict[str, Any]]) -> pa.Table:
+    # the columns (and struct fields) of all the rows, not only the first one
+    columns = dict.fromkeys(key for row in rows for key in row)
+    table = pa.Table.from_pydict(
+        {column: [row.get(column) for row in rows] for column in columns}
+    )
+    fields = []
+    for field in table.schema:
+        if pa.types.is_timestamp(field.type) and field.type.tz is None:
+            field = field.with_type(pa.timestamp("us", tz="UTC"))
+        if field.name == "geometry":
+            field = field.with_metadata({"ARROW:extension:name": "geoarrow.wkb"})
+        fields.append(field)
+
+    schema = pa.schema(fields, metadata={"geo": json.dumps(GEO_METADATA)})
+    return table.cast(schema)
+
+
+def _concat_tables(tables: List[pa.Table]) -> pa.Table:
+    """Concatenate tables, widening the schema to the columns and types of all."""
+    try:
+        table = pa.concat_tables(tables, promote_options="permissive")
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f"Features with incompatible property types ({e})") from e
+
+    return table.replace_schema_metadata({"geo": json.dumps(GEO_METADATA)})
+
+
+def _conform_table(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Convert a table to `schema`, which must have all its columns and types."""
+    conformed = _concat_tables([schema.empty_table(), table])
+    if not conformed.schema.equals(schema):
+        raise ValueError(
+            "Features with properties (or property types) which are not in the "
+            "schema inferred from the first features"
+        )
+
+    return conformed.cast(schema)
+
+
+async def _iterate_row_chunks(
+    content: Union[ItemCollection, ItemCollectionStream], size: int
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    if not isinstance(content, ItemCollectionStream):
+        content = ItemCollectionStream(features=content.get("features", []))
+
+    rows = []
+    async for item in iterate_features(content):
+        rows.append(item_to_row(item))
+        if len(rows) >= size:
+            yield rows
+            rows = []
+
+    if rows:
+        yield rows
+
+
+async def iterate_record_batches(
+    content: Union[ItemCollection, ItemCollectionStream],
+    batch_size: int = 1000,
+    buffer_size: int = 10_000,
+) -> AsyncIterator[pa.RecordBatch]:
+    """Convert the features of an ItemCollection to Arrow record batches.
+
+    All the batches have the same schema, as required by the Arrow IPC and Parquet
+    formats. It is inferred from all the features of an ItemCollection, and from
+    the first `buffer_size` features of an ItemCollectionStream, which are
+    buffered until then. A later feature with a property (or a property type)
+    missing from this schema raises a ValueError.
+    """
+    if not isinstance(content, ItemCollectionStream):
+        buffer_size = len(content.get("features", []))
+
+    schema = None
+    tables = []
+    async for rows in _iterate_row_chunks(content, batch_size):
+        if schema is not None:
+            for batch in _conform_table(_to_table(rows), schema).to_batches():
+                yield batch
+            continue
+
+        tables.append(_to_table(rows))
+        if sum(len(table) for table in tables) >= buffer_size:
+            table = _concat_tables(tables)
+            schema, tables = table.schema, []
+            for batch in table.to_batches(max_chunksize=batch_size):
+                yield batch
+
+    if tables:
+        for batch in _concat_tables(tables).to_batches(max_chunksize=batch_size):
+            yield batch
+
+
+class _ChunkSink:
+    """Write-only file object keeping the bytes written since the last `drain`."""
+
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class ArrowStreamResponse(StreamingResponse):
+    """Stream an ItemCollection as an Arrow IPC stream, one record batch at a time.
+
+    The FeatureCollection links are sent in the `Link` header. The headers are only
+    sent once the schema is inferred (see `iterate_record_batches`), so that
+    conversion errors in the first `buffer_size` features are reported with an
+    error status.
+    """
+
+    media_type = "application/vnd.apache.arrow.stream"
+
+    def __init__(
+        self,
+        content: Union[ItemCollection, ItemCollectionStream],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+        batch_size: int = 1000,
+        buffer_size: int = 10_000,
+    ) -> None:
+        """Create the streaming response."""
+        links = (
+            content.links
+            if isinstance(content, ItemCollectionStream)
+            else content.get("links") or []
+        )
+        headers = dict(headers or {})
+        if value := link_header(links):
+            headers["link"] = value
+
+        self.batch_size = batch_size
+        self.buffer_size = buffer_size
+        super().__init__(
+            self._encode(content),
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            background=background,
+        )
+
+    async def stream_response(self, send: Send) -> None:
+        """Send the response, once its first chunk is encoded."""
+        chunks = self.body_iterator.__aiter__()
+        first = await chunks.__anext__()
+
+        async def body() -> AsyncIterator[bytes]:
+            yield first
+            async for chunk in chunks:
+                yield chunk
+
+        self.body_iterator = body()
+        await super().stream_response(send)
+
+    def _new_writer(self, sink: _ChunkSink, schema: pa.Schema):
+        return pa.ipc.new_stream(sink, schema)
+
+    async def _encode(
+        self, content: Union[ItemCollection, ItemCollectionStream]
+    ) -> AsyncIterator[bytes]:
+        sink = _ChunkSink()
+        writer = None
+        async for batch in iterate_record_batches(
+            content, self.batch_size, self.buffer_size
+        ):
+            if writer is None:
+                writer = self._new_writer(sink, batch.schema)
+            writer.write_batch(batch)
+            yield sink.drain()
+
+        if writer is None:
+            writer = self._new_writer(
+                sink, pa.schema([], metadata={"geo": json.dumps(GEO_METADATA)})
+            )
+        writer.close()
+        yield sink.drain()
+
+
+class GeoParquetResponse(ArrowStreamResponse):
+    """Stream an ItemCollection as a GeoParquet file, one row group per batch."""
+
+    media_type = "application/vnd.apache.parquet"
+
+    def _new_writer(self, sink: _ChunkSink, schema: pa.Schema):
+        return pq.ParquetWriter(sink, schema)
@@ -1,12 +1,46 @@
 """Api middleware."""
 
+import hashlib
 import re
 import typing
+import zlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 from http.client import HTTP_PORT, HTTPS_PORT
-from typing import List, Tuple
+from ipaddress import ip_address, ip_network
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
 
+import brotli
+from fastapi import HTTPException
+from starlette import status
+from starlette.datastructures import Headers, MutableHeaders
 from starlette.middleware.cors import CORSMiddleware as _CORSMiddleware
-from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import zstandard
+except ImportError:  # pragma: nocover
+    zstandard = None
+
+try:
+    # the decompressed output can only be limited since brotli 1.2 (`brotli` extra)
+    brotli.Decompressor().process(b"", output_buffer_limit=0)
+    BROTLI_OUTPUT_LIMIT = True
+except TypeError:  # pragma: nocover
+    BROTLI_OUTPUT_LIMIT = False
+
+# Headers kept in `304 Not Modified` responses
+# ref: https://www.rfc-editor.org/rfc/rfc9110#name-304-not-modified
+NOT_MODIFIED_HEADERS = {
+    "cache-control",
+    "content-location",
+    "date",
+    "etag",
+    "expires",
+    "last-modified",
+    "vary",
+}
 
 
 class CORSMiddleware(_CORSMiddleware):
@@ -44,22 +78,112 @@ class CORSMiddleware(_CORSMiddleware):
         )
 
 
+# Headers used by the ProxyHeaderMiddleware
+PROXY_HEADERS = {
+    b"host",
+    b"forwarded",
+    b"x-forwarded-host",
+    b"x-forwarded-proto",
+    b"x-forwarded-port",
+}
+
+
+def _split_quoted(value: str, delimiter: str) -> List[str]:
+    """Split a header value on a delimiter, ignoring the delimiters in quoted strings."""
+    if '"' not in value:
+        return value.split(delimiter)
+
+    parts = []
+    start = 0
+    quoted = False
+    escaped = False
+    for position, char in enumerate(value):
+        if escaped:
+            escaped = False
+        elif char == "\\" and quoted:
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif char == delimiter and not quoted:
+            parts.append(value[start:position])
+            start = position + 1
+
+    parts.append(value[start:])
+    return parts
+
+
+def parse_forwarded(value: str) -> List[Dict[str, str]]:
+    """Parse a `Forwarded` header value.
+
+    ref: https://www.rfc-editor.org/rfc/rfc7239#section-4
+
+    Args:
+        value: the header value, e.g.
+            `for=192.0.2.43;proto=https, for="[2001:db8::1]";host="example.com"`.
+
+    Returns:
+        list: the forwarded elements (one per proxy, in order), as dictionaries with
+            lowercase parameter names and unquoted values.
+    """
+    elements = []
+    for element in _split_quoted(value, ","):
+        pairs: Dict[str, str] = {}
+        for pair in _split_quoted(element, ";"):
+            name, sep, pair_value = pair.partition("=")
+            if not sep:
+                continue
+
+            pair_value = pair_value.strip()
+            if pair_value[:1] == '"' and pair_value[-1:] == '"' and len(pair_value) > 1:
+                pair_value = re.sub(r"\\(.)", r"\1", pair_value[1:-1])
+
+            pairs.setdefault(name.strip().lower(), pair_value)
+
+        if pairs:
+            elements.append(pairs)
+
+    return elements
+
+
+def _split_host(host: str) -> Tuple[str, Optional[str]]:
+    """Split a `host[:port]` value (the host may be a bracketed IPv6 address)."""
+    if host.startswith("["):
+        domain, _, rest = host.partition("]")
+        port = rest[1:] if rest.startswith(":") else None
+        return f"{domain}]", port or None
+
+    domain, sep, port = host.partition(":")
+    return domain, port if sep else None
+
+
 class ProxyHeaderMiddleware:
     """Account for forwarding headers when deriving base URL.
 
     Prioritise standard Forwarded header, look for non-standard X-Forwarded-* if missing.
     Default to what can be derived from the URL if no headers provided. Middleware updates
-    the host header that is interpreted by starlette when deriving Request.base_url.
+    the host header that is interpreted by starlette when deriving Request.base_url and
+    stores the resolved base URL in `scope["state"]["base_url"]` (see
+    `stac_fastapi.types.requests.get_base_url`).
+
+    The request headers are read in a single pass. When `trusted_proxies` (IP addresses
+    or networks) is set, the forwarding headers are only used for requests coming from
+    those addresses.
     """
 
-    def __init__(self, app: ASGIApp):
+    def __init__(self, app: ASGIApp, trusted_proxies: Optional[Sequence[str]] = None):
         """Create proxy header middleware."""
         self.app = app
+        self.trusted_proxies = (
+            [ip_network(proxy, strict=False) for proxy in trusted_proxies]
+            if trusted_proxies is not None
+            else None
+        )
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         """Call from stac-fastapi framework."""
         if scope["type"] == "http":
-            proto, domain, port = self._get_forwarded_url_parts(scope)
+            headers = self._get_proxy_headers(scope)
+            proto, domain, port = self._get_forwarded_url_parts(scope, headers)
             scope["scheme"] = proto
             if domain is not None:
                 port_suffix = ""
@@ -68,68 +192,653 @@ class ProxyHeaderMiddleware:
                         proto == "https" and port != HTTPS_PORT
                     ):
                         port_suffix = f":{port}"
-                scope["headers"] = self._replace_header_value_by_name(
-                    scope,
-                    "host",
-                    f"{domain}{port_suffix}",
-                )
+
+                host = f"{domain}{port_suffix}"
+                if headers.get("host") != host:
+                    scope["headers"] = [
+                        (name, value)
+                        for name, value in scope["headers"]
+                        if name != b"host"
+                    ] + [(b"host", host.encode("latin-1"))]
+
+                root_path = scope.get("app_root_path", scope.get("root_path", ""))
+                if not root_path.endswith("/"):
+                    root_path += "/"
+
+                scope.setdefault("state", {})["base_url"] = f"{proto}://{host}{root_path}"
+
         await self.app(scope, receive, send)
 
-    def _get_forwarded_url_parts(self, scope: Scope) -> Tuple[str]:
+    def _is_trusted(self, scope: Scope) -> bool:
+        if self.trusted_proxies is None:
+            return True
+
+        client = scope.get("client")
+        if not client:
+            return False
+
+        try:
+            address = ip_address(client[0])
+        except ValueError:
+            return False
+
+        return any(address in network for network in self.trusted_proxies)
+
+    @staticmethod
+    def _get_proxy_headers(scope: Scope) -> Dict[str, str]:
+        """Return the (first) values of the headers used by the middleware."""
+        headers: Dict[str, str] = {}
+        for name, value in scope["headers"]:
+            if name not in PROXY_HEADERS:
+                continue
+
+            key = name.decode("latin-1")
+            if key == "forwarded" and key in headers:
+                # multiple Forwarded headers are a single comma separated list
+                headers[key] += "," + value.decode("latin-1")
+            elif key not in headers:
+                headers[key] = value.decode("latin-1")
+
+        return headers
+
+    def _get_forwarded_url_parts(
+        self, scope: Scope, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, Optional[str], Optional[int]]:
+        if headers is None:
+            headers = self._get_proxy_headers(scope)
+
         proto = scope.get("scheme", "http")
-        header_host = self._get_header_value_by_name(scope, "host")
+        header_host = headers.get("host")
         if header_host is None:
-            domain, port = scope.get("server")
+            domain, port = scope.get("server") or (None, None)
         else:
-            header_host_parts = header_host.split(":")
-            if len(header_host_parts) == 2:
-                domain, port = header_host_parts
-            else:
-                domain = header_host_parts[0]
-                port = None
-        forwarded = self._get_header_value_by_name(scope, "forwarded")
+            domain, port_str = _split_host(header_host)
+            port = _to_port(port_str, None)
+
+        if not self._is_trusted(scope):
+            return (proto, domain, port)
+
+        forwarded = headers.get("forwarded")
         if forwarded is not None:
-            parts = forwarded.split(";")
-            for part in parts:
-                if len(part) > 0 and re.search("=", part):
-                    key, value = part.split("=")
-                    if key == "proto":
-                        proto = value
-                    elif key == "host":
-                        host_parts = value.split(":")
-                        domain = host_parts[0]
-                        try:
-                            port = int(host_parts[1]) if len(host_parts) == 2 else None
-                        except ValueError:
-                            # ignore ports that are not valid integers
-                            pass
+            # the first element describes the request received by the first proxy
+            elements = parse_forwarded(forwarded)
+            element = elements[0] if elements else {}
+            proto = element.get("proto", proto)
+            if "host" in element:
+                domain, port_str = _split_host(element["host"])
+                port = _to_port(port_str, port) if port_str is not None else None
+
         else:
-            domain = self._get_header_value_by_name(scope, "x-forwarded-host", domain)
-            proto = self._get_header_value_by_name(scope, "x-forwarded-proto", proto)
-            port_str = self._get_header_value_by_name(scope, "x-forwarded-port", port)
-            try:
-                port = int(port_str) if port_str is not None else None
-            except ValueError:
-                # ignore ports that are not valid integers
-                pass
+            if forwarded_host := headers.get("x-forwarded-host"):
+                domain, port_str = _split_host(forwarded_host.split(",")[0].strip())
+                port = _to_port(port_str, port)
+
+            if forwarded_proto := headers.get("x-forwarded-proto"):
+                proto = forwarded_proto.split(",")[0].strip()
+
+            port = _to_port(headers.get("x-forwarded-port"), port)
 
         return (proto, domain, port)
 
-    def _get_header_value_by_name(
-        self, scope: Scope, header_name: str, default_value: str = None
-    ) -> str:
-        headers = scope["headers"]
-        candidates = [
-            value.decode() for key, value in headers if key.decode() == header_name
-        ]
-        return candidates[0] if len(candidates) == 1 else default_value
+
+def _to_port(value: Optional[str], default: Optional[int]) -> Optional[int]:
+    """Convert a port to an integer, ignoring the ports which are not valid integers."""
+    if value is None:
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        return default
+
+
+def quote_etag(etag: str) -> str:
+    """Quote an entity tag, if needed."""
+    if etag.startswith('"') or etag.startswith('W/"'):
+        return etag
+
+    return f'"{etag}"'
+
+
+def make_etag(body: bytes) -> str:
+    """Create a weak entity tag from a response body.
+
+    The tag is weak because the same representation can be sent with different
+    content encodings (e.g. by the Brotli middleware).
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def format_http_date(value: datetime) -> str:
+    """Format a datetime as an HTTP date (naive datetimes are considered UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an HTTP date, returning None if it is missing or invalid."""
+    if not value:
+        return None
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return date if date.tzinfo is not None else date.replace(tzinfo=timezone.utc)
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(
+    headers: Mapping[str, str],
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+) -> bool:
+    """Evaluate the `If-None-Match` and `If-Modified-Since` request headers.
+
+    `If-None-Match` takes precedence over `If-Modified-Since` and uses the weak
+    comparison function.
+
+    ref: https://www.rfc-editor.org/rfc/rfc9110#name-evaluation
+
+    Args:
+        headers: the request headers.
+        etag: the (quoted) entity tag of the resource, if known.
+        last_modified: the modification time of the resource, if known.
+
+    Returns:
+        bool: True if the resource was not modified.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+
+        if if_none_match.strip() == "*":
+            return True
+
+        tag = _opaque_tag(etag)
+        return any(
+            _opaque_tag(value.strip()) == tag for value in if_none_match.split(",")
+        )
+
+    if last_modified is not None:
+        since = parse_http_date(headers.get("if-modified-since"))
+        if since is not None:
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            return last_modified.replace(microsecond=0) <= since
+
+    return False
+
+
+class ConditionalRequestMiddleware:
+    """Handle conditional `GET` and `HEAD` requests.
+
+    - adds a weak `ETag` (hash of the body) to `200` responses which do not have one
+      and are not streamed,
+    - replies `304 Not Modified` when `If-None-Match`/`If-Modified-Since` match the
+      response validators,
+    - answers `HEAD` requests with the headers of the `GET` response,
+    - adds the `Cache-Control` header configured for the route.
+
+    Endpoints can also evaluate the preconditions before the response is serialized
+    (see `stac_fastapi.types.requests.set_response_validators`).
+
+    The `Cache-Control` policies map route paths (e.g.
+    `/collections/{collection_id}`, without the router prefix) or `*` (any other
+    route) to header values. They default to the `cache_control` setting of the
+    application (`app.state.settings`).
+    """
+
+    def __init__(self, app: ASGIApp, cache_control: Optional[Dict[str, str]] = None):
+        """Create conditional request middleware."""
+        self.app = app
+        self.cache_control = cache_control
+
+    def _get_cache_control(self, scope: Scope) -> Optional[str]:
+        cache_control = self.cache_control
+        state = getattr(scope.get("app"), "state", None)
+        if cache_control is None:
+            settings = getattr(state, "settings", None)
+            cache_control = getattr(settings, "cache_control", None)
+
+        if not cache_control:
+            return None
+
+        path = getattr(scope.get("route"), "path", None)
+        if path is not None:
+            prefix = getattr(state, "router_prefix", "")
+            if prefix and path.startswith(prefix):
+                path = path[len(prefix) :]
+
+            if path in cache_control:
+                return cache_control[path]
+
+        return cache_control.get("*")
+
+    def _prepare_start(
+        self, scope: Scope, request_headers: Headers, start: Message, body: Message
+    ) -> Tuple[Message, bool]:
+        """Add the validators and Cache-Control headers to the response start message.
+
+        Returns the message to send and whether the response was replaced by a
+        `304 Not Modified`.
+        """
+        headers = MutableHeaders(scope=start)
+
+        if start["status"] in (200, 304) and "cache-control" not in headers:
+            if cache_control := self._get_cache_control(scope):
+                headers["cache-control"] = cache_control
+
+        if start["status"] != 200:
+            return start, False
+
+        if "etag" not in headers and not body.get("more_body", False):
+            headers["etag"] = make_etag(body.get("body", b""))
+
+        if not is_not_modified(
+            request_headers,
+            etag=headers.get("etag"),
+            last_modified=parse_http_date(headers.get("last-modified")),
+        ):
+            return start, False
+
+        not_modified = {
+            "type": "http.response.start",
+            "status": 304,
+            "headers": [
+                (key, value)
+                for key, value in headers.raw
+                if key.decode("latin-1") in NOT_MODIFIED_HEADERS
+            ],
+        }
+        return not_modified, True
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Call from stac-fastapi framework."""
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        is_head = scope["method"] == "HEAD"
+        if is_head:
+            scope = {**scope, "method": "GET"}
+
+        request_headers = Headers(scope=scope)
+        start_message: Optional[Message] = None
+        not_modified = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start_message, not_modified
+
+            if message["type"] == "http.response.start":
+                # wait for the first body message to know if the body is streamed
+                start_message = message
+                return
+
+            if message["type"] == "http.response.body" and start_message is not None:
+                start, start_message = start_message, None
+                start, not_modified = self._prepare_start(
+                    scope, request_headers, start, message
+                )
+                await send(start)
+                if not_modified:
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+
+            if not_modified:
+                # the response has already been sent
+                return
+
+            if is_head and message["type"] == "http.response.body":
+                message = {**message, "body": b""}
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+# maximum size of the decompressed data produced at once
+DECOMPRESSION_CHUNK_SIZE = 64 * 1024
+
+
+class _ZlibDecoder:
+    """gzip (`wbits=31`) or deflate (zlib format, `wbits=15`) decoder."""
+
+    errors = (zlib.error,)
+
+    def __init__(self, wbits: int):
+        self._obj = zlib.decompressobj(wbits)
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        while True:
+            output = self._obj.decompress(data, DECOMPRESSION_CHUNK_SIZE)
+            data = self._obj.unconsumed_tail
+            yield output
+            if not data and len(output) < DECOMPRESSION_CHUNK_SIZE:
+                return
+
+    @property
+    def finished(self) -> bool:
+        return self._obj.eof
+
+
+class _BrotliDecoder:
+    errors = (brotli.error,)
+
+    def __init__(self):
+        self._obj = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        output = self._obj.process(data, output_buffer_limit=DECOMPRESSION_CHUNK_SIZE)
+        yield output
+        # the remaining output is produced by processing empty inputs
+        while output and not self._obj.is_finished():
+            output = self._obj.process(b"", output_buffer_limit=DECOMPRESSION_CHUNK_SIZE)
+            yield output
+
+    @property
+    def finished(self) -> bool:
+        return self._obj.is_finished()
+
+
+class _PendingInput(Exception):
+    """Raised by `_ZstdInput` when all the received data has been read."""
+
+
+class _ZstdInput:
+    """Source of the zstd stream reader, fed with the received body chunks."""
+
+    def __init__(self):
+        self.data = b""
+
+    def read(self, size: int) -> bytes:
+        # an empty read would end the stream, so the reader is interrupted instead
+        if not self.data:
+            raise _PendingInput
+
+        data, self.data = self.data, b""
+        return data
+
+
+# magic number of the zstd frames (RFC 8878)
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# magic numbers of the skippable frames
+ZSTD_SKIPPABLE_MAGICS = {bytes([n, 0x2A, 0x4D, 0x18]) for n in range(0x50, 0x60)}
+
+
+class _ZstdFrames:
+    """Track the frames of a zstd stream (RFC 8878), to detect truncated streams.
+
+    Only the frame and block headers are parsed, the block contents are skipped.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._skip = 0
+        self._in_frame = False
+        self._checksum = False
+        self.frames = 0
+
+    @property
+    def complete(self) -> bool:
+        """Return True if the stream ends after a complete frame."""
+        return (
+            self.frames > 0 and not self._in_frame and not self._skip and not self._buffer
+        )
+
+    def feed(self, data: bytes) -> None:
+        """Parse the next bytes of the stream."""
+        self._buffer += data
+        while True:
+            skipped = min(self._skip, len(self._buffer))
+            del self._buffer[:skipped]
+            self._skip -= skipped
+            if self._skip or not self._parse_header():
+                return
+
+    def _parse_header(self) -> bool:
+        """Parse the next header, returning False until its bytes are received."""
+        buffer = self._buffer
+        if self._in_frame:
+            if len(buffer) < 3:
+                return False
+
+            # last block flag, block type (1 for RLE blocks) and block size
+            header = int.from_bytes(buffer[:3], "little")
+            self._skip = 3 + (1 if header >> 1 & 3 == 1 else header >> 3)
+            if header & 1:
+                self._skip += 4 if self._checksum else 0
+                self._in_frame = False
+                self.frames += 1
+
+            return True
+
+        if len(buffer) >= 5 and buffer[:4] == ZSTD_MAGIC:
+            descriptor = buffer[4]
+            single_segment = descriptor >> 5 & 1
+            self._skip = (
+                5
+                + (0 if single_segment else 1)  # window descriptor
+                + (0, 1, 2, 4)[descriptor & 3]  # dictionary id
+                + (single_segment, 2, 4, 8)[descriptor >> 6]  # frame content size
+            )
+            self._checksum = bool(descriptor >> 2 & 1)
+            self._in_frame = True
+            return True
+
+        if len(buffer) >= 8 and bytes(buffer[:4]) in ZSTD_SKIPPABLE_MAGICS:
+            self._skip = 8 + int.from_bytes(buffer[4:8], "little")
+            return True
+
+        # incomplete header (other data is reported by the decompressor)
+        return False
+
+
+class _ZstdDecoder:
+    """zstd decoder.
+
+    `ZstdDecompressionObj` can not limit its output size, so the body is pulled
+    through a stream reader instead, `DECOMPRESSION_CHUNK_SIZE` bytes at a time.
+    The reader does not report the end of the frames, so their headers are tracked
+    separately (see `_ZstdFrames`).
+    """
+
+    errors = (zstandard.ZstdError,) if zstandard is not None else ()
+
+    def __init__(self):
+        self._input = _ZstdInput()
+        self._reader = zstandard.ZstdDecompressor().stream_reader(self._input)
+        self._frames = _ZstdFrames()
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        self._frames.feed(data)
+        self._input.data = data
+        while True:
+            try:
+                # `read1` only reads more input once it has no output to return
+                output = self._reader.read1(DECOMPRESSION_CHUNK_SIZE)
+            except _PendingInput:
+                return
+
+            if not output:
+                return
+
+            yield output
+
+    @property
+    def finished(self) -> bool:
+        return self._frames.complete
+
+
+def default_decoders() -> Dict[str, Callable]:
+    """Request body decoders by content coding: gzip and deflate, br when the
+    `brotli` extra is installed and zstd when the `zstd` extra is installed."""
+    decoders: Dict[str, Callable] = {
+        "gzip": lambda: _ZlibDecoder(16 + zlib.MAX_WBITS),
+        "x-gzip": lambda: _ZlibDecoder(16 + zlib.MAX_WBITS),
+        "deflate": lambda: _ZlibDecoder(zlib.MAX_WBITS),
+    }
+    if BROTLI_OUTPUT_LIMIT:
+        decoders["br"] = _BrotliDecoder
+
+    if zstandard is not None:
+        decoders["zstd"] = _ZstdDecoder
+
+    return decoders
+
+
+class RequestDecompressionMiddleware:
+    """Decompress request bodies sent with a `Content-Encoding` header.
+
+    The body is decompressed as it is received and passed on in chunks of up to
+    `DECOMPRESSION_CHUNK_SIZE` bytes (one per `receive` call), so that neither
+    streamed uploads (e.g. bulk NDJSON items) nor highly compressed messages are
+    held in memory, and the endpoints read it as if it was sent uncompressed (the
+    `Content-Encoding` and `Content-Length` headers are removed).
+
+    To protect against decompression bombs, requests whose compressed body is larger
+    than `max_compressed_size` or decompressed body is larger than `max_size` bytes
+    are rejected with a `413 Content Too Large` error as soon as the limit is reached.
+    Unknown codings are rejected with a `415 Unsupported Media Type` error and corrupt
+    bodies with a `400 Bad Request` error.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_compressed_size: Optional[int] = 100 * 1024 * 1024,
+        max_size: Optional[int] = 64 * 1024 * 1024,
+        decoders: Optional[Dict[str, Callable]] = None,
+    ):
+        """Create request decompression middleware."""
+        self.app = app
+        self.max_compressed_size = max_compressed_size
+        self.max_size = max_size
+        self.decoders = decoders if decoders is not None else default_decoders()
+
+    def _check_request(self, headers: Headers) -> Optional[HTTPException]:
+        encoding = headers["content-encoding"].strip().lower()
+        if encoding not in self.decoders:
+            return HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Unsupported Content-Encoding: {encoding}",
+                headers={"Accept-Encoding": ", ".join(self.decoders)},
+            )
+
+        content_length = headers.get("content-length", "")
+        if (
+            self.max_compressed_size is not None
+            and content_length.isdigit()
+            and int(content_length) > self.max_compressed_size
+        ):
+            return self._too_large(self.max_compressed_size, "compressed ")
+
+        return None
+
+    def _too_large(self, limit: int, kind: str = "") -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Request body exceeds the {kind}size limit of {limit} bytes",
+        )
+
+    def _check_compressed_size(self, size: int) -> None:
+        if self.max_compressed_size is not None and size > self.max_compressed_size:
+            raise self._too_large(self.max_compressed_size, "compressed ")
 
     @staticmethod
-    def _replace_header_value_by_name(
-        scope: Scope, header_name: str, new_value: str
-    ) -> List[Tuple[str]]:
-        return [
-            (name, value)
-            for name, value in scope["headers"]
-            if name.decode() != header_name
-        ] + [(str.encode(header_name), str.encode(new_value))]
+    def _next_chunk(
+        chunks: Iterator[bytes], errors: Tuple, encoding: str
+    ) -> Optional[bytes]:
+        try:
+            return next(chunks, None)
+        except errors as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid {encoding} request body ({e})",
+            ) from e
+
+    def _wrap_receive(self, receive: Receive, encoding: str) -> Receive:
+        decoder = self.decoders[encoding]()
+        # decompressed chunks of the last received message
+        chunks: Optional[Iterator[bytes]] = None
+        more_body = True
+        compressed_size = 0
+        size = 0
+
+        async def _receive() -> Message:
+            nonlocal chunks, more_body, compressed_size, size
+
+            while True:
+                if chunks is not None:
+                    chunk = self._next_chunk(chunks, decoder.errors, encoding)
+                    if chunk is not None:
+                        size += len(chunk)
+                        if self.max_size is not None and size > self.max_size:
+                            raise self._too_large(self.max_size)
+
+                        if chunk:
+                            body = {"body": chunk, "more_body": True}
+                            return {"type": "http.request", **body}
+
+                        continue
+
+                    chunks = None
+                    if not more_body:
+                        if not decoder.finished:
+                            raise HTTPException(
+                                status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Incomplete {encoding} request body",
+                            )
+
+                        return {"type": "http.request", "body": b"", "more_body": False}
+
+                message = await receive()
+                if message["type"] != "http.request":
+                    return message
+
+                data = message.get("body", b"")
+                compressed_size += len(data)
+                self._check_compressed_size(compressed_size)
+                more_body = message.get("more_body", False)
+                chunks = decoder.decompress(data)
+
+        return _receive
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Call from stac-fastapi framework."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if headers.get("content-encoding", "identity").strip().lower() == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        error = self._check_request(headers)
+        if error is not None:
+            response = JSONResponse(
+                {"detail": error.detail},
+                status_code=error.status_code,
+                headers=error.headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        encoding = headers["content-encoding"].strip().lower()
+        scope = {
+            **scope,
+            "headers": [
+                (key, value)
+                for key, value in scope["headers"]
+                if key not in (b"content-encoding", b"content-length")
+            ],
+        }
+        await self.app(scope, self._wrap_receive(receive, encoding), send)
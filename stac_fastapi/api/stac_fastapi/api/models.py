@@ -1,11 +1,26 @@
 """Api request/response models."""
 
-from typing import List, Optional, Type, Union
+import itertools
+import json
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Type,
+    Union,
+)
 
 import attr
 from fastapi import Path, Query
 from pydantic import BaseModel, create_model
 from stac_pydantic.shared import BBox
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
 from typing_extensions import Annotated
 
 from stac_fastapi.types.extension import ApiExtension
@@ -18,14 +33,40 @@ from stac_fastapi.types.search import (
     _bbox_converter,
     _datetime_converter,
 )
+from stac_fastapi.types.stac import ItemCollection, ItemCollectionStream
 
 try:
-    import orjson  # noqa
+    import orjson
     from fastapi.responses import ORJSONResponse as JSONResponse
 except ImportError:  # pragma: nocover
+    orjson = None
     from starlette.responses import JSONResponse
 
 
+def json_dumps(content: Any) -> bytes:
+    """Encode content to JSON bytes, the same way `JSONResponse` does."""
+    if orjson is not None:
+        return orjson.dumps(
+            content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        )
+
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def json_loads(content: Union[bytes, str]) -> Any:
+    """Decode JSON content (with orjson, if installed)."""
+    if orjson is not None:
+        return orjson.loads(content)
+
+    return json.loads(content)
+
+
 def create_request_model(
     model_name="SearchGetRequest",
     base_model: Union[Type[BaseModel], APIRequest] = BaseSearchGetRequest,
@@ -136,3 +177,195 @@ class JSONSchemaResponse(JSONResponse):
     """JSON with custom, vendor content-type."""
 
     media_type = "application/schema+json"
+
+
+# Number of features pulled at once from synchronous iterators, in a background
+# thread
+FEATURES_BATCH_SIZE = 100
+
+
+def _next_features(features: Iterator[Any]) -> List[Any]:
+    return list(itertools.islice(features, FEATURES_BATCH_SIZE))
+
+
+async def iterate_features(stream: ItemCollectionStream) -> AsyncIterator[Any]:
+    """Iterate over the features of an ItemCollectionStream.
+
+    Synchronous generators (e.g. from sync core clients doing I/O) are consumed in a
+    background thread, `FEATURES_BATCH_SIZE` features at a time, so they do not
+    block the event loop. Lists and tuples are iterated directly.
+    """
+    features = stream.features
+    if hasattr(features, "__aiter__"):
+        async for feature in features:
+            yield feature
+
+    elif isinstance(features, (list, tuple)):
+        for feature in features:
+            yield feature
+
+    else:
+        iterator = iter(features)
+        while True:
+            batch = await run_in_threadpool(_next_features, iterator)
+            for feature in batch:
+                yield feature
+
+            if len(batch) < FEATURES_BATCH_SIZE:
+                break
+
+
+class GeoJSONStreamingResponse(StreamingResponse):
+    """Stream an ItemCollection as a GeoJSON FeatureCollection.
+
+    Features are encoded one at a time and sent in chunks of about `chunk_size`
+    bytes, so only one chunk of the page is ever held in memory.
+    """
+
+    media_type = "application/geo+json"
+
+    def __init__(
+        self,
+        content: Union[ItemCollection, ItemCollectionStream],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        """Create the streaming response."""
+        if not isinstance(content, ItemCollectionStream):
+            content = ItemCollectionStream(
+                features=content.get("features", []),
+                links=content.get("links") or [],
+                extra={
+                    key: value
+                    for key, value in content.items()
+                    if key not in ["type", "features", "links"]
+                },
+            )
+
+        self.chunk_size = chunk_size
+        super().__init__(
+            self._encode(content),
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            background=background,
+        )
+
+    async def _encode(self, stream: ItemCollectionStream) -> AsyncIterator[bytes]:
+        buffer = bytearray(b'{"type":"FeatureCollection","features":[')
+        separator = b""
+        async for feature in iterate_features(stream):
+            buffer += separator
+            buffer += json_dumps(feature)
+            separator = b","
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+
+        buffer += b'],"links":'
+        buffer += json_dumps(stream.links)
+        for key, value in stream.extra.items():
+            buffer += b"," + json_dumps(key) + b":" + json_dumps(value)
+        buffer += b"}"
+        yield bytes(buffer)
+
+
+def link_header(links: List[Dict[str, Any]]) -> str:
+    """Format links as an RFC 8288 `Link` header value.
+
+    Links which can not be followed with a plain GET (e.g. POST `next` links with a
+    body) can not be expressed in the header and are skipped.
+    """
+    values = []
+    for link in links:
+        if link.get("method", "GET") != "GET" or link.get("body"):
+            continue
+
+        value = f'<{link["href"]}>; rel="{link["rel"]}"'
+        if link.get("type"):
+            value += f'; type="{link["type"]}"'
+        values.append(value)
+
+    return ", ".join(values)
+
+
+class GeoJSONSeqResponse(GeoJSONStreamingResponse):
+    """Stream an ItemCollection as GeoJSON Text Sequences (RFC 8142).
+
+    Each item is sent as its own record. The FeatureCollection links and other
+    members (e.g. `numberMatched`) are sent in a last record, a FeatureCollection
+    without features, so that the links added to an ItemCollectionStream while
+    the features are produced (e.g. `next`) and the links with a body (e.g. POST
+    `next` links) are available to the clients. The links known when the response
+    starts are also sent in the `Link` header, when they can be followed with a GET
+    request.
+    """
+
+    media_type = "application/geo+json-seq"
+    record_separator = b"\x1e"
+
+    def __init__(
+        self,
+        content: Union[ItemCollection, ItemCollectionStream],
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+        media_type: Optional[str] = None,
+        background: Optional[BackgroundTask] = None,
+        chunk_size: int = 64 * 1024,
+    ) -> None:
+        """Create the streaming response."""
+        links = (
+            content.links
+            if isinstance(content, ItemCollectionStream)
+            else content.get("links") or []
+        )
+        headers = dict(headers or {})
+        if value := link_header(links):
+            headers["link"] = value
+
+        super().__init__(
+            content,
+            status_code=status_code,
+            headers=headers,
+            media_type=media_type,
+            background=background,
+            chunk_size=chunk_size,
+        )
+
+    async def _encode(self, stream: ItemCollectionStream) -> AsyncIterator[bytes]:
+        buffer = bytearray()
+        async for feature in iterate_features(stream):
+            buffer += self.record_separator
+            buffer += json_dumps(feature)
+            buffer += b"\n"
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+
+        if stream.links or stream.extra:
+            buffer += self.record_separator
+            buffer += json_dumps(
+                {
+                    "type": "FeatureCollection",
+                    "features": [],
+                    "links": stream.links,
+                    **stream.extra,
+                }
+            )
+            buffer += b"\n"
+
+        yield bytes(buffer)
+
+
+class NDJSONResponse(GeoJSONSeqResponse):
+    """Stream an ItemCollection as newline delimited JSON, one item per line.
+
+    As with `GeoJSONSeqResponse`, the last line is a FeatureCollection without
+    features holding the links.
+    """
+
+    media_type = "application/x-ndjson"
+    record_separator = b""
@@ -3,75 +3,425 @@
 import copy
 import functools
 import inspect
-from typing import Any, Callable, Dict, List, Optional, Type, TypedDict, Union
-
-from fastapi import Depends, params
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Literal,
+    Optional,
+    Type,
+    TypedDict,
+    Union,
+)
+
+from fastapi import Depends, Query, params
+from fastapi.datastructures import DefaultPlaceholder
 from fastapi.dependencies.utils import get_parameterless_sub_dependant
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute, serialize_response
 from pydantic import BaseModel
 from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
-from starlette.responses import Response
+from starlette.responses import JSONResponse, Response
 from starlette.routing import BaseRoute, Match
-from starlette.status import HTTP_204_NO_CONTENT
+from starlette.status import HTTP_204_NO_CONTENT, HTTP_304_NOT_MODIFIED
+from typing_extensions import Annotated
+
+from stac_fastapi.api.cache import (
+    ResponseCache,
+    canonical_request_data,
+    request_collections,
+)
+from stac_fastapi.api.coalescing import RequestCoalescer
+from stac_fastapi.api.executor import ClientExecutor, get_client_executor
+from stac_fastapi.api.middleware import (
+    format_http_date,
+    is_not_modified,
+    parse_http_date,
+    quote_etag,
+)
+from stac_fastapi.api.models import APIRequest, GeoJSONStreamingResponse
+from stac_fastapi.api.validation import ResponseValidator
+from stac_fastapi.types.rfc3339 import rfc3339_str_to_datetime
+from stac_fastapi.types.stac import ItemCollectionStream
+
+
+def _get_validators(resp: Any, request: Request) -> Dict[str, str]:
+    """Return the `ETag` and `Last-Modified` headers of a response.
+
+    The validators are either set by the client (with
+    `stac_fastapi.types.requests.set_response_validators`) or, for Items and
+    Collections, derived from their `updated` datetime.
+    """
+    if request.method != "GET":
+        return {}
 
-from stac_fastapi.api.models import APIRequest
+    headers = {}
+    if (etag := getattr(request.state, "etag", None)) is not None:
+        headers["etag"] = quote_etag(etag)
 
+    last_modified = getattr(request.state, "last_modified", None)
+    if last_modified is None and isinstance(resp, dict):
+        if resp.get("type") == "Feature":
+            updated = (resp.get("properties") or {}).get("updated")
+        elif resp.get("type") == "Collection":
+            updated = resp.get("updated")
+        else:
+            updated = None
 
-def _wrap_response(resp: Any) -> Any:
-    if resp is not None:
-        return resp
-    else:  # None is returned as 204 No Content
+        if isinstance(updated, str):
+            try:
+                last_modified = rfc3339_str_to_datetime(updated)
+            except ValueError:
+                pass
+
+    if last_modified is not None:
+        headers["last-modified"] = format_http_date(last_modified)
+
+    return headers
+
+
+def _get_response_validator(request: Request) -> Optional[ResponseValidator]:
+    return getattr(request.scope.get("route"), "response_validator", None)
+
+
+async def _wrap_response(
+    resp: Any, request: Request, response: Optional[Response] = None
+) -> Any:
+    if resp is None:  # None is returned as 204 No Content
         return Response(status_code=HTTP_204_NO_CONTENT)
 
+    validator = _get_response_validator(request)
+    if isinstance(resp, Response):
+        if validator is not None:
+            validator.validate_response(resp)
+
+        return resp
+
+    # Evaluate conditional requests before serializing the response
+    validators = _get_validators(resp, request)
+    if validators and is_not_modified(
+        request.headers,
+        etag=validators.get("etag"),
+        last_modified=parse_http_date(validators.get("last-modified")),
+    ):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=validators)
+
+    if validator is not None and isinstance(resp, ItemCollectionStream):
+        resp = validator.validate_stream(resp)
+
+    # Response class selected by the `output format` dependency (if any)
+    response_class = getattr(request.state, "response_class", None)
+    if response_class is not None:
+        if validator is not None and not isinstance(resp, ItemCollectionStream):
+            validator(resp)
+
+        return response_class(resp, headers=validators)
+
+    elif isinstance(resp, ItemCollectionStream):
+        return GeoJSONStreamingResponse(resp, headers=validators)
+
+    if response is not None:
+        response.headers.update(validators)
+        return await _render_response(resp, request, response)
+
+    return resp
+
 
-def sync_to_async(func):
-    """Run synchronous function asynchronously in a background thread."""
+async def _render_response(content: Any, request: Request, response: Response) -> Any:
+    """Serialize the content of a route into a response.
+
+    Without response model, FastAPI runs the content through `jsonable_encoder`
+    (walking every nested value) before the response class encodes it again. For
+    JSON response classes, the content is instead sent directly to the encoder
+    (orjson handles datetimes, enums, ...), falling back to `jsonable_encoder` for
+    types it does not support.
+
+    With a response model, the content is validated and serialized by the route's
+    response field, as FastAPI does (with the route's `response_model_*` options),
+    so that the responses stored in the search cache are the ones FastAPI would
+    send. Routes with a sampled or shadow response validator (see
+    `stac_fastapi.api.validation.add_response_validator`) use the fast path
+    instead, after calling their validator and applying the same
+    `response_model_*` exclusions.
+
+    Large FeatureCollections are encoded in chunks outside of the event loop when
+    the application has a `response_encoder` (see
+    `stac_fastapi.api.encoding.ChunkedEncoder`).
+    """
+    route = request.scope.get("route")
+    if not isinstance(route, APIRoute):
+        return content
+
+    validator = getattr(route, "response_validator", None)
+    if validator is not None and not validator.enforce:
+        validator(content)
+        content = _exclude_fields(content, route)
+    elif route.response_field is not None:
+        content = await serialize_response(
+            field=route.response_field,
+            response_content=content,
+            include=route.response_model_include,
+            exclude=route.response_model_exclude,
+            by_alias=route.response_model_by_alias,
+            exclude_unset=route.response_model_exclude_unset,
+            exclude_defaults=route.response_model_exclude_defaults,
+            exclude_none=route.response_model_exclude_none,
+        )
+
+    response_class = route.response_class
+    if isinstance(response_class, DefaultPlaceholder):
+        response_class = response_class.value
+
+    if not issubclass(response_class, JSONResponse):
+        return content
+
+    status_code = response.status_code or route.status_code
+    kwargs = {"status_code": status_code} if status_code else {}
+    resp = await _encode_large_response(content, request, response_class, kwargs)
+    if resp is None:
+        try:
+            resp = response_class(content, **kwargs)
+        except TypeError:
+            resp = response_class(jsonable_encoder(content), **kwargs)
+
+    # headers set on the `Response` parameter (e.g. by dependencies)
+    resp.raw_headers.extend(response.headers.raw)
+    return resp
+
+
+def _exclude_fields(content: Any, route: APIRoute) -> Any:
+    """Apply the `response_model_*` options of a route to content which is not
+    serialized by its response field, so that the responses are the same with or
+    without validation.
+
+    Dictionaries are left as is when only `exclude_unset`, `exclude_defaults` or
+    `by_alias` are set, which only apply to models.
+    """
+    if isinstance(content, dict) and not (
+        route.response_model_include
+        or route.response_model_exclude
+        or route.response_model_exclude_none
+    ):
+        return content
+
+    return jsonable_encoder(
+        content,
+        include=route.response_model_include,
+        exclude=route.response_model_exclude,
+        by_alias=route.response_model_by_alias,
+        exclude_unset=route.response_model_exclude_unset,
+        exclude_defaults=route.response_model_exclude_defaults,
+        exclude_none=route.response_model_exclude_none,
+    )
+
+
+async def _encode_large_response(
+    content: Any,
+    request: Request,
+    response_class: Type[JSONResponse],
+    kwargs: Dict[str, Any],
+) -> Optional[Response]:
+    encoder = getattr(request.app.state, "response_encoder", None)
+    if encoder is None or not encoder.applies(content):
+        return None
+
+    try:
+        body = await encoder.encode(content)
+    except TypeError:
+        return None
+
+    return Response(body, media_type=response_class.media_type, **kwargs)
+
+
+def _parse_accept(accept: str) -> List[str]:
+    """Return the media types of an `Accept` header, by decreasing preference."""
+    media_types = []
+    for position, value in enumerate(accept.split(",")):
+        media_type, *params = value.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, val = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(val)
+                except ValueError:
+                    quality = 0.0
+
+        if quality > 0:
+            media_types.append((-quality, position, media_type.strip().lower()))
+
+    return [media_type for _, _, media_type in sorted(media_types)]
+
+
+def create_output_format_dependency(formats: Dict[str, Type[Response]]) -> Callable:
+    """Create a dependency selecting the response class of an ItemCollection endpoint.
+
+    The format is selected with the `f` query parameter or, if missing, with the
+    `Accept` header. The first format is the default one: when it is selected (or
+    when nothing matches) the route's own response class is used.
+
+    Args:
+        formats: mapping of format names to response classes, e.g.
+            `{"geojson": GeoJSONResponse, "ndjson": NDJSONResponse}`.
+
+    Returns:
+        callable: a FastAPI dependency to be added to the route `dependencies`.
+    """
+    default, *_ = formats
+    media_types = {
+        response_class.media_type: name for name, response_class in formats.items()
+    }
+    defaults = {"*/*", "application/*", "application/json"}
+
+    def _output_format(
+        request: Request,
+        f: Annotated[
+            Optional[Literal[tuple(formats)]],  # type: ignore
+            Query(description="Response format."),
+        ] = None,
+    ) -> None:
+        """Select the response format."""
+        if f is None:
+            f = default
+            for media_type in _parse_accept(request.headers.get("accept", "")):
+                if media_type in media_types:
+                    f = media_types[media_type]
+                    break
+                elif media_type in defaults:
+                    break
+
+        if f != default:
+            request.state.response_class = formats[f]
+
+    return _output_format
+
+
+def sync_to_async(func, executor: Optional[ClientExecutor] = None):
+    """Run synchronous function asynchronously in a background thread.
+
+    The thread is provided by `executor` or, if None, by the executor of the
+    request's application for this function (see
+    `stac_fastapi.api.executor.get_client_executor`), falling back to Starlette's
+    threadpool.
+    """
 
     @functools.wraps(func)
     async def run(*args, **kwargs):
+        _executor = executor or get_client_executor(kwargs.get("request"), func)
+        if _executor is not None:
+            return await _executor.run(func, *args, **kwargs)
+
         return await run_in_threadpool(func, *args, **kwargs)
 
     return run
 
 
+async def _handle_request(
+    name: str,
+    cache: Optional[ResponseCache],
+    coalescer: Optional[RequestCoalescer],
+    request: Request,
+    response: Response,
+    request_data: Any,
+    call: Callable[[], Awaitable[Any]],
+) -> Any:
+    """Call the client (through the cache and coalescer, if any)."""
+    if cache is None and coalescer is None:
+        return await _wrap_response(await call(), request, response)
+
+    data = canonical_request_data(request_data)
+    if cache is not None:
+        key = cache.make_key(request, name, data)
+        if (cached := cache.get(key)) is not None:
+            return cached
+
+    if coalescer is not None:
+        resp = await coalescer.run(coalescer.make_key(request, name, data), call)
+    else:
+        resp = await call()
+
+    resp = await _wrap_response(resp, request, response)
+    if cache is None:
+        return resp
+
+    return cache.set(
+        key,
+        resp,
+        collections=request_collections(data),
+        headers=dict(response.headers),
+    )
+
+
 def create_async_endpoint(
     func: Callable,
     request_model: Union[Type[APIRequest], Type[BaseModel], Dict],
+    cache: Optional[ResponseCache] = None,
+    coalescer: Optional[RequestCoalescer] = None,
+    executor: Optional[ClientExecutor] = None,
 ):
     """Wrap a function in a coroutine which may be used to create a FastAPI endpoint.
 
-    Synchronous functions are executed asynchronously using a background thread.
+    Synchronous functions are executed asynchronously using a background thread
+    (see `sync_to_async`), from `executor` if provided.
+
+    If a `cache` is provided, the serialized responses are stored in it and reused
+    for equivalent requests. If a `coalescer` is provided, identical concurrent
+    requests share a single call of the function.
     """
+    name = getattr(func, "__name__", "endpoint")
 
     if not inspect.iscoroutinefunction(func):
-        func = sync_to_async(func)
+        func = sync_to_async(func, executor=executor)
+
+    _handle = functools.partial(_handle_request, name, cache, coalescer)
 
     if issubclass(request_model, APIRequest):
 
         async def _endpoint(
             request: Request,
+            response: Response,
             request_data: request_model = Depends(),  # type:ignore
         ):
             """Endpoint."""
-            return _wrap_response(await func(request=request, **request_data.kwargs()))
+            return await _handle(
+                request,
+                response,
+                request_data,
+                lambda: func(request=request, **request_data.kwargs()),
+            )
 
     elif issubclass(request_model, BaseModel):
 
         async def _endpoint(
             request: Request,
+            response: Response,
             request_data: request_model,  # type:ignore
         ):
             """Endpoint."""
-            return _wrap_response(await func(request_data, request=request))
+            return await _handle(
+                request,
+                response,
+                request_data,
+                lambda: func(request_data, request=request),
+            )
 
     else:
 
         async def _endpoint(
             request: Request,
+            response: Response,
             request_data: Dict[str, Any],  # type:ignore
         ):
             """Endpoint."""
-            return _wrap_response(await func(request_data, request=request))
+            return await _handle(
+                request,
+                response,
+                request_data,
+                lambda: func(request_data, request=request),
+            )
 
     return _endpoint
 
@@ -0,0 +1,279 @@
+"""Sampled and shadow response model validation."""
+
+import copy
+import logging
+import random
+import threading
+import typing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import attr
+from fastapi.exceptions import ResponseValidationError
+from fastapi.routing import APIRoute
+from pydantic import TypeAdapter, ValidationError
+from starlette.responses import Response
+
+from stac_fastapi.types.stac import ItemCollectionStream
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the (shared) background validation worker."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="stac-fastapi-validation"
+            )
+
+    return _executor
+
+
+def _features_adapter(model: Any) -> Optional[TypeAdapter]:
+    """Return a type adapter of the features of a FeatureCollection model."""
+    field = getattr(model, "model_fields", {}).get("features")
+    args = typing.get_args(field.annotation) if field is not None else ()
+    return TypeAdapter(args[0]) if args else None
+
+
+@attr.s
+class ResponseValidator:
+    """Validate the responses of a route against its response model.
+
+    Unlike FastAPI's response model validation, a sample of the responses is
+    validated and invalid responses are still sent: violations are logged
+    (`stac_fastapi.api.validation` logger) and counted. With `enforce`, every
+    response is validated and violations raise a `ResponseValidationError`.
+
+    Besides the content returned by the clients, the validator handles the JSON
+    bodies of the `Response` objects they return (violations are only reported),
+    and item collections streamed with `ItemCollectionStream` (validated feature by
+    feature as they are sent, so never in the background worker).
+
+    Attributes:
+        model: the response model (e.g. `stac_pydantic.api.ItemCollection`).
+        name: name of the validated route, used in the logs.
+        sample_rate: fraction of the responses to validate.
+        shadow: validate in a background worker, off the request path.
+        enforce: validate every response, raising on violations.
+        max_pending: maximum number of responses waiting for the background
+            worker, further responses are not validated.
+        validated: number of validated responses.
+        violations: number of invalid responses.
+        dropped: number of sampled responses not validated because the background
+            worker was busy.
+    """
+
+    model: Any = attr.ib()
+    name: str = attr.ib(default="")
+    sample_rate: float = attr.ib(default=1.0)
+    shadow: bool = attr.ib(default=False)
+    enforce: bool = attr.ib(default=False)
+    max_pending: int = attr.ib(default=100)
+    validated: int = attr.ib(init=False, default=0)
+    violations: int = attr.ib(init=False, default=0)
+    dropped: int = attr.ib(init=False, default=0)
+    _pending: int = attr.ib(init=False, default=0)
+    _adapter: TypeAdapter = attr.ib(init=False)
+    _features: Optional[TypeAdapter] = attr.ib(init=False)
+    _lock: threading.Lock = attr.ib(init=False, factory=threading.Lock)
+
+    def __attrs_post_init__(self):
+        """Create the model type adapters."""
+        self._adapter = TypeAdapter(self.model)
+        self._features = _features_adapter(self.model)
+
+    def _sampled(self) -> bool:
+        return self.enforce or self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def __call__(self, content: Any) -> None:
+        """Validate the content (or JSON body) of a response, if sampled."""
+        if not self._sampled():
+            return
+
+        if self.enforce or not self.shadow:
+            self.validate(content)
+            return
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return
+
+            self._pending += 1
+
+        # the worker gets its own copy, the content being serialized meanwhile
+        if isinstance(content, bytearray):
+            content = bytes(content)
+        elif not isinstance(content, bytes):
+            content = copy.deepcopy(content)
+
+        _get_executor().submit(self._validate_pending, content)
+
+    def _validate_pending(self, content: Any) -> None:
+        try:
+            self.validate(content)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _report(self, error: Optional[ValidationError], enforce: bool) -> bool:
+        with self._lock:
+            self.validated += 1
+            if error is not None:
+                self.violations += 1
+
+        if error is None:
+            return True
+
+        if enforce:
+            raise ResponseValidationError(error.errors()) from error
+
+        logger.warning(
+            "Response of %s does not match its response model (%d errors): %s",
+            self.name,
+            error.error_count(),
+            error,
+        )
+        return False
+
+    def validate(self, content: Any, enforce: Optional[bool] = None) -> bool:
+        """Validate the content (or JSON body) of a response, reporting the violations.
+
+        Args:
+            content: the content of the response.
+            enforce: raise on violations (defaults to the `enforce` attribute).
+
+        Returns:
+            bool: True if the content is valid.
+        """
+        enforce = self.enforce if enforce is None else enforce
+        try:
+            if isinstance(content, (bytes, bytearray)):
+                self._adapter.validate_json(content)
+            else:
+                self._adapter.validate_python(content)
+        except ValidationError as e:
+            return self._report(e, enforce)
+
+        return self._report(None, enforce)
+
+    def validate_response(self, response: Response) -> None:
+        """Validate the body of a JSON response, if sampled (streamed bodies are
+        not validated).
+
+        Clients return a `Response` to opt out of the response model (e.g. for the
+        fields extension), so violations are only reported, even with `enforce`.
+        """
+        media_type = (response.media_type or "").split(";")[0]
+        body = getattr(response, "body", None)
+        if not media_type.endswith("json") or not body:
+            return
+
+        if self.enforce:
+            self.validate(body, enforce=False)
+        else:
+            self(body)
+
+    def validate_stream(self, stream: ItemCollectionStream) -> ItemCollectionStream:
+        """Validate the features of a streamed item collection as they are produced,
+        then its other members, if sampled."""
+        if self._features is None or not self._sampled():
+            return stream
+
+        if isinstance(stream.features, typing.AsyncIterable):
+            stream.features = self._validate_async_features(stream, stream.features)
+        else:
+            stream.features = self._validate_features(stream, stream.features)
+
+        return stream
+
+    def _check_feature(self, feature: Any) -> Optional[ValidationError]:
+        try:
+            self._features.validate_python(feature)
+        except ValidationError as e:
+            if self.enforce:
+                self._report(e, enforce=True)
+
+            return e
+
+        return None
+
+    def _check_collection(
+        self, stream: ItemCollectionStream, error: Optional[ValidationError]
+    ) -> None:
+        collection = {
+            **stream.extra,
+            "type": "FeatureCollection",
+            "features": [],
+            "links": stream.links,
+        }
+        try:
+            self._adapter.validate_python(collection)
+        except ValidationError as e:
+            error = error or e
+
+        self._report(error, self.enforce)
+
+    def _validate_features(
+        self, stream: ItemCollectionStream, features: typing.Iterable
+    ) -> Iterator[Any]:
+        error = None
+        for feature in features:
+            error = error or self._check_feature(feature)
+            yield feature
+
+        self._check_collection(stream, error)
+
+    async def _validate_async_features(
+        self, stream: ItemCollectionStream, features: typing.AsyncIterable
+    ) -> AsyncIterator[Any]:
+        error = None
+        async for feature in features:
+            error = error or self._check_feature(feature)
+            yield feature
+
+        self._check_collection(stream, error)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the validation metrics."""
+        return {
+            "validated": self.validated,
+            "violations": self.violations,
+            "dropped": self.dropped,
+        }
+
+
+def add_response_validator(
+    route: APIRoute,
+    sample_rate: float = 1.0,
+    shadow: bool = False,
+    enforce: bool = False,
+) -> Optional[ResponseValidator]:
+    """Add a `ResponseValidator` of its response model to a route.
+
+    The validator is stored as the `response_validator` attribute of the route and
+    called by the `stac_fastapi.api.routes` endpoints, which then serialize the
+    responses without FastAPI's response model validation (unless `enforce` is
+    set). The routes created otherwise keep FastAPI's validation.
+
+    Returns:
+        The validator, or None if the route has no response model.
+    """
+    if route.response_field is None:
+        return None
+
+    route.response_validator = ResponseValidator(
+        route.response_model,
+        name=f"{','.join(sorted(route.methods))} {route.path}",
+        sample_rate=sample_rate,
+        shadow=shadow,
+        enforce=enforce,
+    )
+    return route.response_validator
@@ -1,14 +1,21 @@
+import copy
 from datetime import datetime
 from typing import List, Optional, Union
 
 import pytest
+from fastapi.encoders import jsonable_encoder
 from stac_pydantic.api.utils import link_factory
 from starlette.testclient import TestClient
 
 from stac_fastapi.api.app import StacApi
+from stac_fastapi.api.middleware import ProxyHeaderMiddleware
+from stac_fastapi.api.models import GeoJSONResponse
+from stac_fastapi.extensions.core.fields import FieldsProjection
 from stac_fastapi.types import stac as stac_types
 from stac_fastapi.types.config import ApiSettings
 from stac_fastapi.types.core import BaseCoreClient, BaseSearchPostRequest, NumType
+from stac_fastapi.types.inmemory import InMemoryCatalog, item_interval, query_interval
+from stac_fastapi.types.links import ItemLinks, PageLinks
 
 collection_links = link_factory.CollectionLinks("/", "test").create_links()
 item_links = link_factory.ItemLinks("/", "test", "test").create_links()
@@ -187,3 +194,174 @@ def test_benchmark_collections(
 
     response = benchmark(f)
     assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        [],
+        [(b"forwarded", b"for=192.0.2.43;proto=https;host=api.example.com:8443")],
+        [
+            (b"x-forwarded-host", b"api.example.com"),
+            (b"x-forwarded-proto", b"https"),
+            (b"x-forwarded-port", b"8443"),
+        ],
+    ],
+    ids=["no-proxy", "forwarded", "x-forwarded"],
+)
+def test_benchmark_proxy_header_middleware(benchmark, headers):
+    """Benchmark the per-request overhead of the proxy header middleware."""
+
+    async def app(scope, receive, send):
+        pass
+
+    middleware = ProxyHeaderMiddleware(app)
+    common_headers = [
+        (b"host", b"testserver"),
+        (b"user-agent", b"python-httpx/0.27.0"),
+        (b"accept", b"application/geo+json"),
+        (b"accept-encoding", b"gzip, deflate, br"),
+        (b"connection", b"keep-alive"),
+    ]
+
+    def f():
+        scope = {
+            "type": "http",
+            "scheme": "http",
+            "server": ("testserver", 80),
+            "root_path": "",
+            "headers": common_headers + headers,
+        }
+        coroutine = middleware(scope, None, None)
+        try:
+            coroutine.send(None)
+        except StopIteration:
+            pass
+
+        return scope
+
+    benchmark.group = "Proxy Header Middleware"
+    scope = benchmark(f)
+    assert scope["state"]["base_url"]
+
+
+@pytest.mark.parametrize("builder", ["ItemLinks", "PageLinks"])
+def test_benchmark_item_links(benchmark, builder):
+    """Benchmark the creation of the inferred links of a 10k items page."""
+    base_url = "http://testserver/api/"
+    features = [
+        {"id": f"test_item_{n}", "collection": "test_collection"} for n in range(10_000)
+    ]
+
+    def f():
+        if builder == "ItemLinks":
+            return [
+                ItemLinks(
+                    collection_id=feature["collection"],
+                    item_id=feature["id"],
+                    base_url=base_url,
+                ).create_links()
+                for feature in features
+            ]
+
+        links = PageLinks(base_url)
+        return [
+            links.item_links(feature["collection"], feature["id"]) for feature in features
+        ]
+
+    benchmark.group = "Item Links"
+    links = benchmark(f)
+    assert len(links) == 10_000
+
+
+@pytest.mark.parametrize("limit", [100, 1000])
+@pytest.mark.parametrize("encoder", ["jsonable_encoder", "direct"])
+def test_benchmark_serialization(benchmark, encoder, limit):
+    """Benchmark the serialization of an ItemCollection without response model.
+
+    `jsonable_encoder` is what FastAPI does for routes without response model,
+    `direct` is the fast path used by `stac_fastapi.api.routes` since.
+    """
+    content = stac_types.ItemCollection(
+        type="FeatureCollection", features=items[0:limit], links=[]
+    )
+
+    def f():
+        if encoder == "jsonable_encoder":
+            return GeoJSONResponse(jsonable_encoder(content))
+        return GeoJSONResponse(content)
+
+    benchmark.group = f"Serialization ({limit})"
+    response = benchmark(f)
+    assert response.body
+
+
+@pytest.mark.parametrize("projection", ["deepcopy", "compiled"])
+def test_benchmark_fields_projection(benchmark, projection):
+    """Benchmark the projection of a page of items.
+
+    `deepcopy` copies each item before removing the excluded fields, `compiled`
+    uses `stac_fastapi.extensions.core.fields.FieldsProjection`.
+    """
+    fields = FieldsProjection(exclude={"geometry", "assets", "properties.datetime"})
+
+    def f():
+        if projection == "compiled":
+            return fields.project_items(items)
+
+        features = []
+        for item in items:
+            feature = copy.deepcopy(item)
+            feature.pop("geometry", None)
+            feature.pop("assets", None)
+            feature["properties"].pop("datetime", None)
+            features.append(feature)
+        return features
+
+    benchmark.group = "Fields projection"
+    features = benchmark(f)
+    assert "geometry" not in features[0]
+
+
+@pytest.mark.parametrize("search", ["scan", "indexed"])
+def test_benchmark_inmemory_search(benchmark, search):
+    """Benchmark a bbox/datetime search over 20,000 items.
+
+    `scan` filters all the items, `indexed` uses
+    `stac_fastapi.types.inmemory.InMemoryCatalog`.
+    """
+    catalog = InMemoryCatalog()
+    catalog.add_collection({"id": "test"})
+    scan_items = []
+    for n in range(0, 20_000):
+        x, y = n % 360 - 180, (n // 360) % 180 - 90
+        item = {
+            "id": f"test_item_{n}",
+            "collection": "test",
+            "bbox": [x, y, x + 0.5, y + 0.5],
+            "properties": {"datetime": f"2000-01-{n % 28 + 1:02}T00:00:00Z"},
+        }
+        catalog.add_item(item)
+        scan_items.append((item, item_interval(item)))
+
+    bbox = (-20.0, -80.0, 20.0, -60.0)
+    interval = query_interval("2000-01-01T00:00:00Z/2000-01-10T00:00:00Z")
+
+    def f():
+        if search == "indexed":
+            return catalog.search(bbox=bbox, interval=interval, limit=10)[0]
+
+        return [
+            item
+            for item, (start, end) in scan_items
+            if item["bbox"][0] <= bbox[2]
+            and bbox[0] <= item["bbox"][2]
+            and item["bbox"][1] <= bbox[3]
+            and bbox[1] <= item["bbox"][3]
+            and start <= interval[1]
+            and interval[0] <= end
+        ][:10]
+
+    benchmark.group = "In-memory search"
+    features = benchmark(f)
+    assert len(features) == 10
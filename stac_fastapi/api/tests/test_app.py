@@ -1,7 +1,9 @@
+import json
 from datetime import datetime
 from typing import List, Optional, Union
 
 import attr
+import fastapi.routing
 import pytest
 from fastapi import Path, Query
 from fastapi.testclient import TestClient
@@ -9,7 +11,7 @@ from pydantic import ValidationError
 from stac_pydantic import api
 from typing_extensions import Annotated
 
-from stac_fastapi.api import app
+from stac_fastapi.api import app, routes
 from stac_fastapi.api.models import (
     APIRequest,
     JSONResponse,
@@ -19,6 +21,7 @@ from stac_fastapi.api.models import (
 from stac_fastapi.extensions.core import FieldsExtension, FilterExtension
 from stac_fastapi.types import stac
 from stac_fastapi.types.config import ApiSettings
+from stac_fastapi.types.conformance import BASE_CONFORMANCE_CLASSES
 from stac_fastapi.types.core import BaseCoreClient, NumType
 from stac_fastapi.types.search import BaseSearchPostRequest
 
@@ -387,3 +390,300 @@ def test_request_model(AsyncTestCoreClient):
             "/collections/test_collection/items/test_item", params={"user": "Chewbacca"}
         )
         assert resp.status_code == 200
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_item_collection_stream(validate, TestCoreClient, AsyncTestCoreClient, item_dict):
+    """Test that ItemCollectionStream results are streamed as a FeatureCollection."""
+
+    class StreamingClient(TestCoreClient):
+        def get_search(self, **kwargs) -> stac.ItemCollectionStream:
+            stream = stac.ItemCollectionStream(features=[])
+
+            def features():
+                for i in range(100):
+                    yield {**item_dict, "id": f"item-{i}"}
+                stream.links.append({"rel": "next", "href": "http://next"})
+
+            stream.features = features()
+            stream.extra["numberReturned"] = 100
+            return stream
+
+    class AsyncStreamingClient(AsyncTestCoreClient):
+        async def item_collection(self, collection_id, **kwargs):
+            async def features():
+                for i in range(10):
+                    yield {**item_dict, "id": f"item-{i}"}
+
+            return stac.ItemCollectionStream(features=features())
+
+    for client, path in [
+        (StreamingClient(), "/search"),
+        (AsyncStreamingClient(), "/collections/test/items"),
+    ]:
+        test_app = app.StacApi(
+            settings=ApiSettings(enable_response_models=validate),
+            client=client,
+        )
+        with TestClient(test_app.app) as test_client:
+            resp = test_client.get(path)
+
+        assert resp.status_code == 200, resp.text
+        assert resp.headers["content-type"] == "application/geo+json"
+        body = resp.json()
+        api.ItemCollection(**body)
+        if path == "/search":
+            assert len(body["features"]) == 100
+            assert body["links"] == [{"rel": "next", "href": "http://next"}]
+            assert body["numberReturned"] == 100
+        else:
+            assert [f["id"] for f in body["features"]] == [f"item-{i}" for i in range(10)]
+            assert body["links"] == []
+
+
+@pytest.mark.parametrize(
+    "params,headers,media_type",
+    [
+        ({}, {}, "application/geo+json"),
+        ({"f": "geojson"}, {"accept": "application/x-ndjson"}, "application/geo+json"),
+        ({"f": "ndjson"}, {}, "application/x-ndjson"),
+        ({}, {"accept": "application/x-ndjson"}, "application/x-ndjson"),
+        ({}, {"accept": "application/geo+json-seq"}, "application/geo+json-seq"),
+        (
+            {},
+            {"accept": "application/geo+json;q=0.5, application/x-ndjson"},
+            "application/x-ndjson",
+        ),
+        (
+            {},
+            {"accept": "application/json, application/x-ndjson;q=0.9"},
+            "application/geo+json",
+        ),
+        ({}, {"accept": "text/html"}, "application/geo+json"),
+    ],
+)
+def test_item_collection_formats(params, headers, media_type, TestCoreClient, item_dict):
+    """Test ItemCollection content negotiation with `f` and `Accept`."""
+
+    class LinksClient(TestCoreClient):
+        def item_collection(self, collection_id, **kwargs):
+            return stac.ItemCollection(
+                type="FeatureCollection",
+                features=[{**item_dict, "id": f"item-{i}"} for i in range(3)],
+                links=[
+                    {"rel": "next", "href": "http://next", "type": "application/json"},
+                    {"rel": "prev", "href": "http://prev", "method": "POST"},
+                ],
+            )
+
+        def get_search(self, **kwargs):
+            return self.item_collection("test")
+
+        def post_search(self, search_request, **kwargs):
+            return self.item_collection("test")
+
+    test_app = app.StacApi(settings=ApiSettings(), client=LinksClient())
+
+    with TestClient(test_app.app) as client:
+        responses = [
+            client.get("/collections/test/items", params=params, headers=headers),
+            client.get("/search", params=params, headers=headers),
+            client.post("/search", params=params, headers=headers, json={}),
+        ]
+
+    for resp in responses:
+        assert resp.status_code == 200, resp.text
+        assert resp.headers["content-type"] == media_type
+        if media_type == "application/geo+json":
+            assert len(resp.json()["features"]) == 3
+            continue
+
+        assert (
+            resp.headers["link"] == '<http://next>; rel="next"; type="application/json"'
+        )
+        records = resp.text.split("\n")
+        assert records.pop() == ""
+        if media_type == "application/geo+json-seq":
+            assert all(record.startswith("\x1e") for record in records)
+        records = [json.loads(record.lstrip("\x1e")) for record in records]
+        assert [record.get("id") for record in records] == [
+            "item-0",
+            "item-1",
+            "item-2",
+            None,
+        ]
+        # all the links are in the last record
+        assert records[-1]["type"] == "FeatureCollection"
+        assert records[-1]["features"] == []
+        assert [link["rel"] for link in records[-1]["links"]] == ["next", "prev"]
+
+
+@pytest.mark.parametrize("f", ["geojsonseq", "ndjson"])
+def test_item_collection_stream_links(f, TestCoreClient, item_dict):
+    """Test the links added while streaming the features are sent."""
+
+    class StreamClient(TestCoreClient):
+        def post_search(self, search_request, **kwargs):
+            links = []
+
+            def features():
+                for i in range(2):
+                    yield {**item_dict, "id": f"item-{i}"}
+
+                links.append(
+                    {
+                        "rel": "next",
+                        "href": "http://testserver/search",
+                        "method": "POST",
+                        "body": {"token": "next"},
+                    }
+                )
+
+            return stac.ItemCollectionStream(
+                features=features(), links=links, extra={"numberReturned": 2}
+            )
+
+    test_app = app.StacApi(settings=ApiSettings(), client=StreamClient())
+
+    with TestClient(test_app.app) as client:
+        resp = client.post("/search", params={"f": f}, json={})
+        assert resp.status_code == 200, resp.text
+
+    assert "link" not in resp.headers
+    *features, last = [
+        json.loads(record.lstrip("\x1e")) for record in resp.text.split("\n")[:-1]
+    ]
+    assert [feature["id"] for feature in features] == ["item-0", "item-1"]
+    assert last == {
+        "type": "FeatureCollection",
+        "features": [],
+        "links": [
+            {
+                "rel": "next",
+                "href": "http://testserver/search",
+                "method": "POST",
+                "body": {"token": "next"},
+            }
+        ],
+        "numberReturned": 2,
+    }
+
+
+def test_item_collection_formats_invalid(TestCoreClient):
+    test_app = app.StacApi(settings=ApiSettings(), client=TestCoreClient())
+
+    with TestClient(test_app.app) as client:
+        resp = client.get("/search", params={"f": "html"})
+        assert resp.status_code == 400
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_landing_page_child_links_limit(validate, TestCoreClient, AsyncTestCoreClient):
+    """Test the number of collection child links of the landing page is limited."""
+
+    class CoreClient(TestCoreClient):
+        def all_collections(self, **kwargs):
+            return {
+                "collections": [{"id": f"collection-{i}"} for i in range(5)],
+                "links": [],
+            }
+
+    class AsyncCoreClient(AsyncTestCoreClient):
+        async def all_collections(self, **kwargs):
+            return {
+                "collections": [{"id": f"collection-{i}"} for i in range(5)],
+                "links": [],
+            }
+
+    for client_class in [CoreClient, AsyncCoreClient]:
+        test_app = app.StacApi(
+            settings=ApiSettings(enable_response_models=validate),
+            client=client_class(child_links_limit=2),
+        )
+
+        with TestClient(test_app.app) as client:
+            landing = client.get("/")
+            assert landing.status_code == 200, landing.text
+            api.LandingPage(**landing.json())
+            children = [
+                link for link in landing.json()["links"] if link["rel"] == "child"
+            ]
+            assert len(children) == 2
+
+
+def test_extension_registry(TestCoreClient, AsyncTestCoreClient):
+    """Test the extension registry is built once and used by the core clients."""
+    for client_class in [TestCoreClient, AsyncTestCoreClient]:
+        base_conformance_classes = list(BASE_CONFORMANCE_CLASSES)
+        core_client = client_class()
+        test_app = app.StacApi(
+            settings=ApiSettings(),
+            client=core_client,
+            extensions=[FilterExtension(), FieldsExtension()],
+        )
+
+        registry = core_client.extension_registry
+        assert registry is not None
+        assert test_app.get_extension(FilterExtension) is registry.extensions[0]
+        assert registry.is_enabled("FieldsExtension")
+        assert registry.is_enabled(FieldsExtension)
+        assert not registry.is_enabled("AggregationExtension")
+        assert registry.conforms_to(FilterExtension().conformance_classes[0])
+        assert len(registry.conformance_classes) == len(set(registry.conformance_classes))
+
+        with TestClient(test_app.app) as client:
+            for _ in range(2):
+                conformance = client.get("/conformance").json()["conformsTo"]
+                assert set(conformance) == set(registry.conformance_classes)
+
+            landing = client.get("/").json()
+            assert any(link["href"].endswith("/queryables") for link in landing["links"])
+
+        # the base conformance classes are not mutated
+        assert BASE_CONFORMANCE_CLASSES == base_conformance_classes
+
+        # re-assigning the extensions resets the registry
+        core_client.extensions = []
+        assert core_client.extension_registry is None
+        assert not core_client.extension_is_enabled("FilterExtension")
+
+
+def test_response_fast_path(monkeypatch, TestCoreClient, item_dict):
+    """Test dict results are serialized directly when response models are disabled."""
+    calls = []
+
+    def jsonable_encoder(obj, *args, **kwargs):
+        calls.append(obj)
+        return encoder(obj, *args, **kwargs)
+
+    encoder = fastapi.routing.jsonable_encoder
+    monkeypatch.setattr(fastapi.routing, "jsonable_encoder", jsonable_encoder)
+    monkeypatch.setattr(routes, "jsonable_encoder", jsonable_encoder)
+
+    item_dict["properties"]["datetime"] = datetime(2020, 1, 1, 12, 30)
+    item_dict["properties"]["updated"] = "2020-01-02T00:00:00Z"
+
+    class CoreClient(TestCoreClient):
+        def get_item(self, item_id: str, collection_id: str, **kwargs):
+            item = dict(item_dict, properties=dict(item_dict["properties"]))
+            if item_id == "set":
+                item["properties"]["tags"] = {"a"}
+            return item
+
+    test_app = app.StacApi(
+        settings=ApiSettings(enable_response_models=False), client=CoreClient()
+    )
+
+    with TestClient(test_app.app) as client:
+        resp = client.get("/collections/test/items/test")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/geo+json"
+        assert resp.headers["last-modified"] == "Thu, 02 Jan 2020 00:00:00 GMT"
+        assert resp.json()["properties"]["datetime"] == "2020-01-01T12:30:00"
+        assert not calls
+
+        # types the encoder does not support go through `jsonable_encoder`
+        resp = client.get("/collections/test/items/set")
+        assert resp.status_code == 200
+        assert resp.json()["properties"]["tags"] == ["a"]
+        assert len(calls) == 1
@@ -0,0 +1,270 @@
+import time
+
+import pytest
+from fastapi import Depends, HTTPException, security, status
+from starlette.responses import Response
+from starlette.testclient import TestClient
+
+from stac_fastapi.api.app import StacApi
+from stac_fastapi.api.cache import ResponseCache
+from stac_fastapi.extensions.core import TransactionExtension
+from stac_fastapi.types import core
+from stac_fastapi.types.config import ApiSettings
+
+
+class TransactionsClient(core.BaseTransactionsClient):
+    def create_item(self, *args, **kwargs):
+        return None
+
+    def update_item(self, *args, **kwargs):
+        return None
+
+    def delete_item(self, *args, **kwargs):
+        return None
+
+    def create_collection(self, *args, **kwargs):
+        return None
+
+    def update_collection(self, *args, **kwargs):
+        return None
+
+    def delete_collection(self, *args, **kwargs):
+        return None
+
+
+def must_be_bob(
+    credentials: security.HTTPBasicCredentials = Depends(security.HTTPBasic()),
+):
+    if credentials.username != "bob":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+def test_search_cache(TestCoreClient, item_dict):
+    calls = []
+
+    class CoreClient(TestCoreClient):
+        def post_search(self, search_request, **kwargs):
+            calls.append("post_search")
+            return {"type": "FeatureCollection", "features": [item_dict], "links": []}
+
+        def get_search(self, **kwargs):
+            calls.append("get_search")
+            return {"type": "FeatureCollection", "features": [item_dict], "links": []}
+
+        def item_collection(self, collection_id, **kwargs):
+            calls.append("item_collection")
+            return {"type": "FeatureCollection", "features": [item_dict], "links": []}
+
+    settings = ApiSettings()
+    cache = ResponseCache(ttl=60)
+    stac_api = StacApi(
+        settings=settings,
+        client=CoreClient(),
+        extensions=[TransactionExtension(client=TransactionsClient(), settings=settings)],
+        search_cache=cache,
+    )
+
+    with TestClient(stac_api.app) as client:
+        resp = client.post("/search", json={"collections": ["test"], "limit": 10})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/geo+json"
+
+        cached = client.post("/search", json={"limit": 10, "collections": ["test"]})
+        assert cached.status_code == 200
+        assert cached.json() == resp.json()
+        assert calls == ["post_search"]
+
+        client.get("/search", params={"collections": "test"})
+        client.get("/search", params={"collections": "test"})
+        client.get("/collections/test/items")
+        client.get("/collections/test/items")
+        client.get("/collections/other/items")
+        assert calls == [
+            "post_search",
+            "get_search",
+            "item_collection",
+            "item_collection",
+        ]
+        assert len(cache) == 4
+
+        # responses are not shared between users
+        calls.clear()
+        client.get("/collections/test/items", headers={"Authorization": "Basic a"})
+        assert calls == ["item_collection"]
+
+        # modifying a collection evicts the responses which depend on it
+        calls.clear()
+        resp = client.delete("/collections/other/items/test")
+        assert resp.status_code == 204
+        client.get("/collections/other/items")
+        client.get("/collections/test/items")
+        client.post("/search", json={"collections": ["test"]})
+        assert calls == ["item_collection"]
+
+        calls.clear()
+        client.delete("/collections/test")
+        client.get("/collections/test/items")
+        client.get("/search", params={"collections": "test"})
+        assert calls == ["item_collection", "get_search"]
+
+
+def test_search_cache_route_dependencies(TestCoreClient):
+    stac_api = StacApi(
+        settings=ApiSettings(search_cache_ttl=60),
+        client=TestCoreClient(),
+        route_dependencies=[
+            ([{"path": "/search", "method": "GET"}], [Depends(must_be_bob)]),
+        ],
+    )
+    assert stac_api.search_cache is not None
+
+    with TestClient(stac_api.app) as client:
+        resp = client.get("/search", auth=("bob", "dobbs"))
+        assert resp.status_code == 200
+        assert len(stac_api.search_cache) == 1
+
+        resp = client.get("/search", auth=("alice", "dobbs"))
+        assert resp.status_code == 401
+
+        resp = client.get("/search")
+        assert resp.status_code == 401
+
+
+def test_response_cache_eviction():
+    cache = ResponseCache(ttl=60, max_entries=2, compress=True)
+    for key in ["a", "b", "c"]:
+        cache.set(key, Response(key.encode() * 100), collections=frozenset([key]))
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+    assert cache.get("b").body == b"b" * 100
+    assert cache.size < 200
+
+    # the least recently used response is evicted
+    cache.set("d", Response(b"d"))
+    assert cache.get("c") is None
+    assert cache.get("b") is not None
+
+    # responses without collections depend on all the collections
+    cache.invalidate("b")
+    assert len(cache) == 0
+
+    cache = ResponseCache(ttl=60, max_bytes=10)
+    cache.set("a", Response(b"a" * 8))
+    cache.set("b", Response(b"b" * 8))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    cache.set("c", Response(b"c" * 11))
+    assert cache.get("c") is None
+
+    # only 200 responses are cached
+    cache.set("d", Response(b"", status_code=204))
+    assert cache.get("d") is None
+
+    cache = ResponseCache(ttl=0.01)
+    cache.set("a", Response(b"a"))
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_search_cache_response_models(TestCoreClient, item_dict):
+    class CoreClient(TestCoreClient):
+        def get_search(self, **kwargs):
+            return {
+                "type": "FeatureCollection",
+                "features": [item_dict],
+                "links": [],
+                "numberMatched": None,
+            }
+
+        def item_collection(self, collection_id, **kwargs):
+            return {"type": "FeatureCollection", "features": [{"id": "invalid"}]}
+
+    stac_api = StacApi(
+        settings=ApiSettings(enable_response_models=True),
+        client=CoreClient(),
+        search_cache=ResponseCache(ttl=60),
+    )
+
+    with TestClient(stac_api.app, raise_server_exceptions=False) as client:
+        # responses are serialized by the response model before being cached
+        for _ in range(2):
+            resp = client.get("/search")
+            assert resp.status_code == 200
+            assert "numberMatched" not in resp.json()
+
+        resp = client.get("/collections/test/items")
+        assert resp.status_code == 500
+        assert len(stac_api.search_cache) == 1
+
+
+def test_search_vary_headers(TestCoreClient):
+    calls = []
+
+    class CoreClient(TestCoreClient):
+        def get_search(self, **kwargs):
+            calls.append(kwargs["request"].headers.get("x-api-key"))
+            return {"type": "FeatureCollection", "features": [], "links": []}
+
+    stac_api = StacApi(
+        settings=ApiSettings(search_cache_ttl=60, search_vary_headers=["X-API-Key"]),
+        client=CoreClient(),
+    )
+    assert stac_api.search_cache.vary_headers == ("x-api-key",)
+
+    with TestClient(stac_api.app) as client:
+        for key in ["a", "b", "a"]:
+            client.get("/search", headers={"x-api-key": key})
+
+    assert calls == ["a", "b"]
+
+
+@pytest.mark.parametrize("validate", [True, False])
+def test_landing_page_cache(validate, TestCoreClient):
+    calls = []
+
+    class CoreClient(TestCoreClient):
+        def all_collections(self, **kwargs):
+            calls.append(kwargs["request"].base_url)
+            return {"collections": [{"id": "test"}], "links": []}
+
+        def landing_page(self, **kwargs):
+            landing_page = super().landing_page(**kwargs)
+            landing_page["links"].append({"rel": "about", "href": "https://example.com"})
+            return landing_page
+
+    settings = ApiSettings(landing_page_cache_ttl=60, enable_response_models=validate)
+    stac_api = StacApi(
+        settings=settings,
+        client=CoreClient(),
+        extensions=[TransactionExtension(client=TransactionsClient(), settings=settings)],
+    )
+    assert stac_api.landing_page_cache is not None
+    assert stac_api.search_cache is None
+
+    with TestClient(stac_api.app) as client:
+        landing = client.get("/")
+        assert landing.status_code == 200, landing.text
+        assert landing.json()["links"][-1]["rel"] == "about"
+        assert client.get("/").json() == landing.json()
+        assert len(calls) == 1
+
+        # responses are keyed by base URL and not shared between users
+        other = client.get("/", headers={"host": "example.com"})
+        assert other.json()["links"][0]["href"] == "http://example.com/"
+        client.get("/", headers={"Authorization": "Basic a"})
+        assert len(calls) == 3
+
+        conformance = client.get("/conformance")
+        assert conformance.status_code == 200
+        assert client.get("/conformance").json() == conformance.json()
+
+        # item updates keep the landing page, collection updates evict it
+        client.delete("/collections/test/items/test")
+        client.get("/")
+        assert len(calls) == 3
+
+        client.delete("/collections/test")
+        assert client.get("/").json() == landing.json()
+        assert len(calls) == 4
@@ -0,0 +1,120 @@
+import asyncio
+
+import httpx
+import pytest
+
+from stac_fastapi.api.app import StacApi
+from stac_fastapi.api.coalescing import RequestCoalescer
+from stac_fastapi.types.config import ApiSettings
+
+
+def test_search_coalescing(AsyncTestCoreClient, item_dict):
+    calls = []
+    release = asyncio.Event()
+
+    class CoreClient(AsyncTestCoreClient):
+        async def post_search(self, search_request, **kwargs):
+            calls.append(search_request.collections)
+            await release.wait()
+            return {"type": "FeatureCollection", "features": [item_dict], "links": []}
+
+    stac_api = StacApi(
+        settings=ApiSettings(enable_search_coalescing=True), client=CoreClient()
+    )
+    coalescer = stac_api.search_coalescer
+    assert coalescer is not None
+
+    async def search(client, body, headers=None):
+        return await client.post("/search", json=body, headers=headers)
+
+    async def main():
+        transport = httpx.ASGITransport(app=stac_api.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            tasks = [
+                asyncio.create_task(search(client, {"collections": ["a"], "limit": 10}))
+                for _ in range(5)
+            ]
+            tasks.append(asyncio.create_task(search(client, {"collections": ["b"]})))
+            tasks.append(
+                asyncio.create_task(
+                    search(client, {"collections": ["a"]}, {"Authorization": "x"})
+                )
+            )
+            while coalescer.in_flight < 3:
+                await asyncio.sleep(0.01)
+
+            await asyncio.sleep(0.05)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+    responses = asyncio.run(main())
+    assert all(resp.status_code == 200 for resp in responses)
+    assert all(resp.json() == responses[0].json() for resp in responses)
+    assert sorted(calls) == [["a"], ["a"], ["b"]]
+    assert coalescer.stats() == {"executions": 3, "coalesced": 4, "in_flight": 0}
+
+
+def test_request_coalescer():
+    coalescer = RequestCoalescer()
+
+    async def main():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def fail():
+            started.set()
+            await release.wait()
+            raise ValueError("backend error")
+
+        async def stream():
+            started.set()
+            await release.wait()
+            return iter([])
+
+        # errors are raised for all the requests
+        tasks = [asyncio.create_task(coalescer.run("key", fail)) for _ in range(3)]
+        await started.wait()
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+        # results which can't be shared are not
+        started.clear()
+        release.clear()
+        tasks = [asyncio.create_task(coalescer.run("key", stream)) for _ in range(3)]
+        await started.wait()
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert coalescer.stats() == {"executions": 2, "coalesced": 0, "in_flight": 0}
+
+
+def test_request_coalescer_cancelled():
+    coalescer = RequestCoalescer()
+
+    async def main():
+        calls = []
+        release = asyncio.Event()
+
+        async def call():
+            calls.append(1)
+            await release.wait()
+            return {"calls": len(calls)}
+
+        leader = asyncio.create_task(coalescer.run("key", call))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(coalescer.run("key", call))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        await asyncio.sleep(0)
+        release.set()
+        assert await follower == {"calls": 2}
+
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from starlette.testclient import TestClient
+
+from stac_fastapi.api.app import StacApi
+from stac_fastapi.api.encoding import ChunkedEncoder
+from stac_fastapi.types.config import ApiSettings
+
+
+def test_chunked_encoding(TestCoreClient, item_dict):
+    class CoreClient(TestCoreClient):
+        def item_collection(self, collection_id, limit=None, **kwargs):
+            return {
+                "type": "FeatureCollection",
+                "features": [dict(item_dict, id=str(n)) for n in range(limit)],
+                "links": [],
+                "numberReturned": limit,
+            }
+
+    settings = ApiSettings(chunked_encoding_min_features=3, chunked_encoding_chunk_size=2)
+    stac_api = StacApi(settings=settings, client=CoreClient())
+    assert stac_api.response_encoder == ChunkedEncoder(min_features=3, chunk_size=2)
+
+    encoded = []
+    encode = stac_api.response_encoder.encode
+
+    async def _encode(content):
+        encoded.append(len(content["features"]))
+        return await encode(content)
+
+    stac_api.response_encoder.encode = _encode
+
+    with TestClient(stac_api.app) as client:
+        resp = client.get("/collections/test/items", params={"limit": 5})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/geo+json"
+        body = resp.json()
+        assert [feature["id"] for feature in body["features"]] == list("01234")
+        assert list(body) == ["type", "features", "links", "numberReturned"]
+
+        # small pages are encoded directly
+        resp = client.get("/collections/test/items", params={"limit": 2})
+        assert len(resp.json()["features"]) == 2
+
+    assert encoded == [5]
+
+
+def test_chunked_encoder_process_pool(item_dict):
+    content = {
+        "type": "FeatureCollection",
+        "features": [dict(item_dict, id=str(n)) for n in range(10)],
+        "links": [],
+    }
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        encoder = ChunkedEncoder(min_features=1, chunk_size=3, executor=executor)
+        assert encoder.applies(content)
+        body = asyncio.run(encoder.encode(content))
+
+    assert json.loads(body) == json.loads(json.dumps(content))
+    assert not encoder.applies({"type": "Feature"})
@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.testclient import TestClient
+
+from stac_fastapi.api.app import StacApi
+from stac_fastapi.api.executor import ClientExecutor, get_client_executor
+from stac_fastapi.types.config import ApiSettings
+
+
+def test_client_executors(TestCoreClient, item_dict):
+    running = []
+    lock = threading.Lock()
+    concurrency = []
+
+    class CoreClient(TestCoreClient):
+        def get_item(self, item_id, collection_id, **kwargs):
+            with lock:
+                running.append(threading.current_thread().name)
+                concurrency.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+            return item_dict
+
+    settings = ApiSettings(
+        client_max_threads=4, client_max_threads_by_name={"get_item": 1}
+    )
+    stac_api = StacApi(settings=settings, client=CoreClient())
+    assert set(stac_api.client_executors) == {"*", "get_item"}
+
+    with TestClient(stac_api.app) as client:
+        threads = [
+            threading.Thread(target=client.get, args=("/collections/a/items/b",))
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert client.get("/collections").status_code == 200
+
+    # get_item calls are serialized by their own executor
+    assert max(concurrency) == 1
+    stats = stac_api.client_executors["get_item"].stats()
+    assert stats["calls"] == 3
+    assert stats["waiting"] == 0
+    assert stats["active"] == 0
+    assert stats["max_wait_time"] > 0.04
+    assert stac_api.client_executors["*"].calls == 1
+
+
+def test_get_client_executor(TestCoreClient):
+    client = TestCoreClient()
+    executor = ClientExecutor(executor=ThreadPoolExecutor(max_workers=1))
+    stac_api = StacApi(
+        settings=ApiSettings(),
+        client=client,
+        client_executors={type(client).__name__: executor},
+    )
+
+    class Request:
+        app = stac_api.app
+
+    assert get_client_executor(Request, client.get_item) is executor
+    assert get_client_executor(Request, len) is None
+    assert get_client_executor(None, client.get_item) is None
+
+    with TestClient(stac_api.app) as test_client:
+        assert test_client.get("/collections").status_code == 200
+
+    assert executor.stats()["calls"] == 1
@@ -0,0 +1,227 @@
+import io
+import struct
+
+import pytest
+from starlette.testclient import TestClient
+
+from stac_fastapi.api.app import StacApi
+from stac_fastapi.types import stac
+from stac_fastapi.types.config import ApiSettings
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from stac_fastapi.api.geoparquet import (  # noqa: E402
+    geometry_to_wkb,
+    item_to_row,
+    iterate_record_batches,
+    row_to_item,
+    wkb_to_geometry,
+)
+
+
+@pytest.mark.parametrize(
+    "geometry,expected",
+    [
+        (
+            {"type": "Point", "coordinates": [1, 2]},
+            struct.pack("<BI2d", 1, 1, 1, 2),
+        ),
+        (
+            {"type": "Point", "coordinates": [1, 2, 3]},
+            struct.pack("<BI3d", 1, 1001, 1, 2, 3),
+        ),
+        (
+            {"type": "LineString", "coordinates": [[0, 0], [1, 1]]},
+            struct.pack("<BII4d", 1, 2, 2, 0, 0, 1, 1),
+        ),
+        (
+            {"type": "MultiPoint", "coordinates": [[0, 0]]},
+            struct.pack("<BII", 1, 4, 1) + struct.pack("<BI2d", 1, 1, 0, 0),
+        ),
+    ],
+)
+def test_geometry_to_wkb(geometry, expected):
+    assert geometry_to_wkb(geometry) == expected
+
+
+@pytest.mark.parametrize(
+    "geometry",
+    [
+        {"type": "Point", "coordinates": [1.0, 2.0]},
+        {"type": "Point", "coordinates": [1.0, 2.0, 3.0]},
+        {"type": "LineString", "coordinates": [[0.0, 0.0], [1.0, 1.0]]},
+        {
+            "type": "MultiPolygon",
+            "coordinates": [[[[0.0, 0.0], [1.0, 0.0], [1.0, 1.0], [0.0, 0.0]]]],
+        },
+        {
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": [1.0, 2.0]},
+                {"type": "MultiPoint", "coordinates": [[0.0, 0.0], [1.0, 1.0]]},
+            ],
+        },
+    ],
+)
+def test_wkb_to_geometry(geometry):
+    assert wkb_to_geometry(geometry_to_wkb(geometry)) == geometry
+
+
+def test_wkb_to_geometry_big_endian():
+    data = struct.pack(">BI2d", 0, 1, 1, 2)
+    assert wkb_to_geometry(data) == {"type": "Point", "coordinates": [1, 2]}
+
+    with pytest.raises(ValueError):
+        wkb_to_geometry(data[:-1])
+
+
+def test_row_to_item(item_dict):
+    other = {
+        **item_dict,
+        "id": "other",
+        "bbox": [0.0, 0.0, 0.0, 1.0, 1.0, 1.0],
+        "properties": {"datetime": None, "start_datetime": "2020-01-01T00:00:00Z"},
+        "assets": {"data": {"href": "http://data", "roles": ["data"]}},
+    }
+    rows = [item_to_row(item_dict), item_to_row(other)]
+    schema = pa.unify_schemas(
+        [pa.Table.from_pylist([row]).schema for row in rows], promote_options="permissive"
+    )
+    table = pa.Table.from_pylist(rows, schema=schema)
+    item, other_item = (row_to_item(row) for row in table.to_pylist())
+
+    assert item["id"] == item_dict["id"]
+    assert item["geometry"] == item_dict["geometry"]
+    assert item["bbox"] == item_dict["bbox"]
+    assert item["properties"] == item_dict["properties"]
+    assert item["links"] == item_dict["links"]
+    assert "data" not in item["assets"]
+    assert other_item["bbox"] == [0, 0, 0, 1, 1, 1]
+    assert other_item["properties"] == {
+        "datetime": None,
+        "start_datetime": "2020-01-01T00:00:00Z",
+    }
+    assert other_item["assets"] == {"data": {"href": "http://data", "roles": ["data"]}}
+
+
+@pytest.mark.parametrize("stream", [True, False])
+@pytest.mark.parametrize(
+    "params,headers,media_type",
+    [
+        ({"f": "parquet"}, {}, "application/vnd.apache.parquet"),
+        (
+            {},
+            {"accept": "application/vnd.apache.parquet"},
+            "application/vnd.apache.parquet",
+        ),
+        ({"f": "arrow"}, {}, "application/vnd.apache.arrow.stream"),
+        (
+            {},
+            {"accept": "application/vnd.apache.arrow.stream"},
+            "application/vnd.apache.arrow.stream",
+        ),
+    ],
+)
+def test_geoparquet_output(
+    stream, params, headers, media_type, TestCoreClient, item_dict
+):
+    class ItemsClient(TestCoreClient):
+        def get_search(self, **kwargs):
+            features = [
+                {
+                    **item_dict,
+                    "id": f"item-{i}",
+                    "properties": {**item_dict["properties"], "eo:cloud_cover": i},
+                }
+                for i in range(2500)
+            ]
+            links = [{"rel": "next", "href": "http://next"}]
+            if stream:
+                return stac.ItemCollectionStream(features=iter(features), links=links)
+
+            return stac.ItemCollection(
+                type="FeatureCollection", features=features, links=links
+            )
+
+    test_app = StacApi(settings=ApiSettings(), client=ItemsClient())
+    with TestClient(test_app.app) as client:
+        resp = client.get("/search", params=params, headers=headers)
+
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"] == media_type
+    assert resp.headers["link"] == '<http://next>; rel="next"'
+
+    if media_type == "application/vnd.apache.parquet":
+        table = pq.read_table(io.BytesIO(resp.content))
+    else:
+        table = pa.ipc.open_stream(resp.content).read_all()
+
+    assert table.num_rows == 2500
+    assert b"geo" in table.schema.metadata
+    assert table.column("id").to_pylist()[-1] == "item-2499"
+    assert table.column("eo:cloud_cover").to_pylist()[:3] == [0, 1, 2]
+    assert table.column("geometry")[0].as_py() == geometry_to_wkb(item_dict["geometry"])
+    assert pa.types.is_timestamp(table.schema.field("datetime").type)
+    assert table.column("bbox")[0].as_py() == {
+        "xmin": -180,
+        "ymin": -90,
+        "xmax": 180,
+        "ymax": 90,
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stream", [True, False])
+async def test_iterate_record_batches_schema(stream, item_dict):
+    def feature(i, **properties):
+        return {**item_dict, "id": f"item-{i}", "properties": properties}
+
+    features = [
+        feature(0, datetime="2020-01-01T00:00:00Z", cloud_cover=None),
+        feature(1, datetime="2020-01-01T00:00:00Z", cloud_cover=None),
+        feature(2, datetime=None, cloud_cover=1.5, platform="a"),
+        feature(3, datetime="2020-01-01T00:00:00Z", cloud_cover=1),
+        feature(4, datetime="2020-01-01T00:00:00Z"),
+    ]
+    content = (
+        stac.ItemCollectionStream(features=iter(features))
+        if stream
+        else stac.ItemCollection(type="FeatureCollection", features=features)
+    )
+
+    batches = [
+        batch
+        async for batch in iterate_record_batches(content, batch_size=2, buffer_size=4)
+    ]
+    assert len({batch.schema for batch in batches}) == 1
+    schema = batches[0].schema
+    assert schema.field("cloud_cover").type == pa.float64()
+    assert schema.field("platform").type == pa.string()
+    assert pa.types.is_timestamp(schema.field("datetime").type)
+    table = pa.Table.from_batches(batches)
+    assert table.column("cloud_cover").to_pylist() == [None, None, 1.5, 1.0, None]
+
+    # properties missing from the schema inferred from the buffered features
+    features.append(feature(5, datetime="2020-01-01T00:00:00Z", gsd=10))
+    content = stac.ItemCollectionStream(features=iter(features))
+    with pytest.raises(ValueError):
+        async for _ in iterate_record_batches(content, batch_size=2, buffer_size=4):
+            pass
+
+
+def test_geoparquet_output_error(TestCoreClient, item_dict):
+    class ItemsClient(TestCoreClient):
+        def get_search(self, **kwargs):
+            features = [
+                {**item_dict, "id": "a", "properties": {"platform": "a"}},
+                {**item_dict, "id": "b", "properties": {"platform": {"name": "b"}}},
+            ]
+            return stac.ItemCollectionStream(features=iter(features))
+
+    test_app = StacApi(settings=ApiSettings(), client=ItemsClient())
+    with TestClient(test_app.app, raise_server_exceptions=False) as client:
+        resp = client.get("/search", params={"f": "parquet"})
+
+    # the error is raised before sending the headers
+    assert resp.status_code == 500
@@ -0,0 +1,182 @@
+import pytest
+from starlette.testclient import TestClient
+
+from stac_fastapi.api.app import StacApi
+from stac_fastapi.api.models import (
+    ItemCollectionUri,
+    create_get_request_model,
+    create_post_request_model,
+    create_request_model,
+)
+from stac_fastapi.extensions.core import (
+    TokenPaginationExtension,
+    TransactionExtension,
+)
+from stac_fastapi.types.config import ApiSettings
+from stac_fastapi.types.inmemory import (
+    AsyncInMemoryCoreClient,
+    InMemoryCatalog,
+    InMemoryCoreClient,
+)
+
+
+def _item(n, x, y):
+    return {
+        "type": "Feature",
+        "id": f"item-{n}",
+        "geometry": {"type": "Point", "coordinates": [x, y]},
+        "bbox": [x, y, x, y],
+        "properties": {"datetime": f"2020-01-{n:02}T00:00:00Z"},
+        "links": [],
+        "assets": {},
+    }
+
+
+@pytest.fixture(params=[InMemoryCoreClient, AsyncInMemoryCoreClient])
+def client(request, collection_dict):
+    settings = ApiSettings()
+    core_client = request.param()
+    extensions = [
+        TransactionExtension(client=core_client, settings=settings),
+        TokenPaginationExtension(),
+    ]
+    api = StacApi(
+        settings=settings,
+        client=core_client,
+        extensions=extensions,
+        search_get_request_model=create_get_request_model(extensions),
+        search_post_request_model=create_post_request_model(extensions),
+        items_get_request_model=create_request_model(
+            "ItemCollectionURI",
+            base_model=ItemCollectionUri,
+            mixins=[TokenPaginationExtension().GET],
+        ),
+    )
+    with TestClient(api.app) as client:
+        assert client.post("/collections", json=collection_dict).status_code == 201
+        for n in range(1, 21):
+            response = client.post(
+                "/collections/test_collection/items", json=_item(n, n, n)
+            )
+            assert response.status_code == 201
+
+        yield client
+
+
+def test_inmemory_search(client):
+    response = client.get(
+        "/search",
+        params={
+            "collections": "test_collection",
+            "bbox": "4.5,4.5,15.5,15.5",
+            "datetime": "../2020-01-12T00:00:00Z",
+            "limit": 3,
+        },
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["id"] for item in body["features"]] == ["item-12", "item-11", "item-10"]
+    assert body["numberMatched"] == 8
+    assert body["features"][0]["links"][0]["href"].endswith(
+        "/collections/test_collection/items/item-12"
+    )
+
+    next_link = next(link for link in body["links"] if link["rel"] == "next")
+    body = client.get(next_link["href"]).json()
+    assert [item["id"] for item in body["features"]] == ["item-9", "item-8", "item-7"]
+
+    response = client.post(
+        "/search",
+        json={
+            "intersects": {
+                "type": "Polygon",
+                "coordinates": [[[0, 0], [3.5, 0], [3.5, 3.5], [0, 0]]],
+            },
+            "limit": 2,
+        },
+    )
+    body = response.json()
+    assert [item["id"] for item in body["features"]] == ["item-3", "item-2"]
+    next_link = next(link for link in body["links"] if link["rel"] == "next")
+    assert next_link["method"] == "POST"
+    body = client.post("/search", json=next_link["body"]).json()
+    assert [item["id"] for item in body["features"]] == ["item-1"]
+    assert not [link for link in body["links"] if link["rel"] == "next"]
+
+    body = client.get("/search", params={"ids": "item-1,item-5"}).json()
+    assert [item["id"] for item in body["features"]] == ["item-5", "item-1"]
+
+    assert client.get("/search", params={"token": "x"}).status_code == 400
+
+
+def test_inmemory_transactions(client):
+    body = client.get("/collections/test_collection/items", params={"limit": 1}).json()
+    assert body["features"][0]["id"] == "item-20"
+    assert {"self", "root", "collection", "parent", "next"} == {
+        link["rel"] for link in body["links"]
+    }
+
+    item = _item(20, 100, 50)
+    item["properties"]["datetime"] = "2019-01-01T00:00:00Z"
+    response = client.put("/collections/test_collection/items/item-20", json=item)
+    assert response.status_code == 200
+    body = client.get("/search", params={"bbox": "99,49,101,51"}).json()
+    assert [item["id"] for item in body["features"]] == ["item-20"]
+    body = client.get("/search", params={"limit": 1}).json()
+    assert body["features"][0]["id"] == "item-19"
+
+    assert client.delete("/collections/test_collection/items/item-20").status_code == 200
+    assert client.get("/collections/test_collection/items/item-20").status_code == 404
+    assert client.get("/search", params={"bbox": "99,49,101,51"}).json()["features"] == []
+
+    assert (
+        client.post("/collections/test_collection/items", json=_item(1, 0, 0)).status_code
+        == 409
+    )
+    assert client.get("/collections/missing/items").status_code == 404
+
+    # item collections are created all at once, or not at all
+    response = client.post(
+        "/collections/test_collection/items",
+        json={
+            "type": "FeatureCollection",
+            "features": [_item(21, 0, 0), _item(2, 0, 0)],
+        },
+    )
+    assert response.status_code == 409
+    assert client.get("/collections/test_collection/items/item-21").status_code == 404
+
+    assert client.delete("/collections/test_collection").status_code == 200
+    assert client.get("/collections").json()["collections"] == []
+    assert client.get("/search").json()["features"] == []
+
+
+def test_inmemory_search_concurrent_delete(collection_dict):
+    class Catalog(InMemoryCatalog):
+        def search_with_keys(self, *args, **kwargs):
+            page, matched = super().search_with_keys(*args, **kwargs)
+            # the items are deleted right after the search
+            for (_, collection_id, item_id), _ in page:
+                self.remove_item(collection_id, item_id)
+
+            return page, matched
+
+    core_client = InMemoryCoreClient(catalog=Catalog())
+    core_client.catalog.add_collection(collection_dict)
+    for n in range(1, 4):
+        core_client.catalog.add_item({**_item(n, n, n), "collection": "test_collection"})
+
+    extensions = [TokenPaginationExtension()]
+    api = StacApi(
+        settings=ApiSettings(),
+        client=core_client,
+        extensions=extensions,
+        search_get_request_model=create_get_request_model(extensions),
+        search_post_request_model=create_post_request_model(extensions),
+    )
+    with TestClient(api.app) as client:
+        response = client.get("/search", params={"limit": 1})
+        assert response.status_code == 200
+        body = response.json()
+        assert [item["id"] for item in body["features"]] == ["item-3"]
+        assert [link for link in body["links"] if link["rel"] == "next"]
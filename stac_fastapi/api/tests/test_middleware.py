@@ -1,15 +1,30 @@
+import gzip
+import json
+import zlib
+from datetime import datetime, timezone
 from unittest import mock
 
+import brotli
 import pytest
-from fastapi import Request
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from starlette.applications import Starlette
+from starlette.middleware import Middleware
 from starlette.testclient import TestClient
 
 from stac_fastapi.api.app import StacApi
-from stac_fastapi.api.middleware import ProxyHeaderMiddleware
+from stac_fastapi.api.middleware import (
+    DECOMPRESSION_CHUNK_SIZE,
+    ConditionalRequestMiddleware,
+    ProxyHeaderMiddleware,
+    RequestDecompressionMiddleware,
+    default_decoders,
+    is_not_modified,
+    parse_forwarded,
+)
 from stac_fastapi.types.config import ApiSettings
 from stac_fastapi.types.core import BaseCoreClient
+from stac_fastapi.types.requests import set_response_validators
 
 
 @pytest.fixture
@@ -25,50 +40,44 @@ def test_client() -> TestClient:
         yield client
 
 
-@pytest.mark.parametrize(
-    "headers,key,expected",
-    [
-        ([(b"host", b"testserver")], "host", "testserver"),
-        ([(b"host", b"testserver")], "user-agent", None),
-        (
-            [(b"host", b"testserver"), (b"accept-encoding", b"gzip, deflate, br")],
-            "accept-encoding",
-            "gzip, deflate, br",
-        ),
-    ],
-)
-def test_get_header_value_by_name(
-    proxy_header_middleware: ProxyHeaderMiddleware, headers, key, expected
-):
-    scope = {"headers": headers}
-    actual = proxy_header_middleware._get_header_value_by_name(scope, key)
-    assert actual == expected
+async def _echo_headers(request: Request) -> JSONResponse:
+    return JSONResponse(request.headers.items())
 
 
 @pytest.mark.parametrize(
-    "headers,key,value",
+    "headers,expected",
     [
-        ([(b"host", b"testserver")], "host", "another-server"),
-        ([(b"host", b"testserver")], "user-agent", "agent"),
+        ({}, {"host": "testserver"}),
         (
-            [(b"host", b"testserver"), (b"accept-encoding", b"gzip, deflate, br")],
-            "accept-encoding",
-            "deflate",
+            {"accept-encoding": "br"},
+            {"host": "testserver", "accept-encoding": "br"},
+        ),
+        (
+            {"x-forwarded-host": "another-server"},
+            {"host": "another-server", "x-forwarded-host": "another-server"},
+        ),
+        (
+            {"x-forwarded-host": "first-server, second-server", "user-agent": "agent"},
+            {
+                "host": "first-server",
+                "x-forwarded-host": "first-server, second-server",
+                "user-agent": "agent",
+            },
         ),
     ],
 )
-def test_replace_header_value_by_name(
-    proxy_header_middleware: ProxyHeaderMiddleware, headers, key, value
-):
-    scope = {"headers": headers}
-    updated_headers = proxy_header_middleware._replace_header_value_by_name(
-        scope, key, value
-    )
+def test_proxy_header_middleware_headers(headers, expected):
+    app = Starlette()
+    app.add_route("/", _echo_headers)
+    app.add_middleware(ProxyHeaderMiddleware)
 
-    header_value = proxy_header_middleware._get_header_value_by_name(
-        {"headers": updated_headers}, key
-    )
-    assert header_value == value
+    with TestClient(app) as client:
+        resp = client.get("/", headers=headers)
+    assert resp.status_code == 200
+    received = resp.json()
+    # the host header is replaced, the other headers are kept
+    assert [name for name, _ in received].count("host") == 1
+    assert {name: value for name, value in received if name in expected} == expected
 
 
 @pytest.mark.parametrize(
@@ -164,6 +173,97 @@ def test_get_forwarded_url_parts(
     assert actual == expected
 
 
+@pytest.mark.parametrize(
+    "value,expected",
+    [
+        ("proto=https;host=test:1234", [{"proto": "https", "host": "test:1234"}]),
+        (
+            "for=192.0.2.43;Proto=https, for=198.51.100.17;host=other",
+            [
+                {"for": "192.0.2.43", "proto": "https"},
+                {"for": "198.51.100.17", "host": "other"},
+            ],
+        ),
+        (
+            'for="[2001:db8:cafe::17]:4711"; host="test;a,b:8080"',
+            [{"for": "[2001:db8:cafe::17]:4711", "host": "test;a,b:8080"}],
+        ),
+        ('host="te\\"st"', [{"host": 'te"st'}]),
+        ("invalid", []),
+    ],
+)
+def test_parse_forwarded(value, expected):
+    assert parse_forwarded(value) == expected
+
+
+@pytest.mark.parametrize(
+    "headers,expected",
+    [
+        # first element of the Forwarded header
+        (
+            [(b"forwarded", b"proto=https;host=a.com, proto=http;host=b.com")],
+            ("https", "a.com", None),
+        ),
+        # multiple Forwarded headers
+        (
+            [(b"forwarded", b"for=1.2.3.4"), (b"forwarded", b"proto=https")],
+            ("http", "testserver", 80),
+        ),
+        ([(b"forwarded", b'host="[::1]:8080"')], ("http", "[::1]", 8080)),
+        ([(b"x-forwarded-host", b"test:8080, other")], ("http", "test", 8080)),
+        ([(b"x-forwarded-proto", b"https, http")], ("https", "testserver", 80)),
+    ],
+)
+def test_get_forwarded_url_parts_rfc7239(
+    proxy_header_middleware: ProxyHeaderMiddleware, headers, expected
+):
+    scope = {"scheme": "http", "server": ["testserver", 80], "headers": headers}
+    assert proxy_header_middleware._get_forwarded_url_parts(scope) == expected
+
+
+def test_proxy_header_middleware_trusted_proxies():
+    middleware = ProxyHeaderMiddleware(Starlette(), trusted_proxies=["10.0.0.0/8"])
+    scope = {
+        "scheme": "http",
+        "server": ["testserver", 80],
+        "headers": [(b"host", b"testserver"), (b"x-forwarded-proto", b"https")],
+    }
+
+    assert middleware._get_forwarded_url_parts(
+        {**scope, "client": ("10.1.2.3", 1234)}
+    ) == ("https", "testserver", None)
+    assert middleware._get_forwarded_url_parts(
+        {**scope, "client": ("192.168.1.1", 1234)}
+    ) == ("http", "testserver", None)
+    assert middleware._get_forwarded_url_parts(scope) == ("http", "testserver", None)
+
+
+@pytest.mark.parametrize(
+    "headers,root_path,expected",
+    [
+        ({}, "", "http://testserver/"),
+        ({"x-forwarded-proto": "https"}, "", "https://testserver/"),
+        ({"forwarded": "proto=https;host=test:8443"}, "/api", "https://test:8443/api/"),
+        ({"x-forwarded-host": "test", "x-forwarded-port": "443"}, "", "http://test:443/"),
+    ],
+)
+def test_proxy_header_middleware_base_url(headers, root_path, expected):
+    stac_api = StacApi(
+        settings=ApiSettings(), client=mock.create_autospec(BaseCoreClient)
+    )
+
+    @stac_api.app.get("/base_url")
+    def base_url(request: Request):
+        return {
+            "state": request.state.base_url,
+            "request": str(request.base_url),
+        }
+
+    with TestClient(stac_api.app, root_path=root_path) as client:
+        resp = client.get("/base_url", headers=headers)
+        assert resp.json() == {"state": expected, "request": expected}
+
+
 def test_cors_middleware(test_client):
     resp = test_client.get("/_mgmt/ping", headers={"Origin": "http://netloc"})
     assert resp.status_code == 200
@@ -196,3 +296,297 @@ def test_middleware_stack():
         resp = client.get("/error")
         assert resp.status_code == 400
         assert resp.json()["customerrordetail"] == "yoo"
+
+
+@pytest.mark.parametrize(
+    "headers,etag,last_modified,expected",
+    [
+        ({}, '"a"', None, False),
+        ({"if-none-match": '"a"'}, '"a"', None, True),
+        ({"if-none-match": '"b", W/"a"'}, '"a"', None, True),
+        ({"if-none-match": "*"}, '"a"', None, True),
+        ({"if-none-match": '"b"'}, '"a"', None, False),
+        ({"if-none-match": '"a"'}, None, None, False),
+        (
+            {"if-modified-since": "Sat, 01 Jan 2000 00:00:00 GMT"},
+            None,
+            datetime(2000, 1, 1, 0, 0, 0, 500, tzinfo=timezone.utc),
+            True,
+        ),
+        (
+            {"if-modified-since": "Sat, 01 Jan 2000 00:00:00 GMT"},
+            None,
+            datetime(2000, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+            False,
+        ),
+        ({"if-modified-since": "invalid"}, None, datetime(2000, 1, 1), False),
+        (
+            # If-None-Match takes precedence
+            {
+                "if-none-match": '"b"',
+                "if-modified-since": "Sat, 01 Jan 2000 00:00:00 GMT",
+            },
+            '"a"',
+            datetime(2000, 1, 1, tzinfo=timezone.utc),
+            False,
+        ),
+    ],
+)
+def test_is_not_modified(headers, etag, last_modified, expected):
+    assert is_not_modified(headers, etag=etag, last_modified=last_modified) == expected
+
+
+def test_conditional_requests(TestCoreClient, item_dict):
+    item_dict["properties"]["updated"] = "2020-01-01T00:00:00.123Z"
+
+    class CoreClient(TestCoreClient):
+        def get_item(self, item_id: str, collection_id: str, **kwargs):
+            return item_dict
+
+        def all_collections(self, **kwargs):
+            set_response_validators(kwargs["request"], etag="v1")
+            return {"collections": [], "links": []}
+
+    settings = ApiSettings(
+        cache_control={
+            "/collections/{collection_id}": "public, max-age=60",
+            "*": "no-cache",
+        }
+    )
+    stac_api = StacApi(
+        settings=settings,
+        client=CoreClient(),
+        middlewares=[Middleware(ConditionalRequestMiddleware)],
+    )
+
+    with TestClient(stac_api.app) as client:
+        # ETag computed from the body
+        resp = client.get("/collections/test")
+        assert resp.status_code == 200
+        etag = resp.headers["etag"]
+        assert etag.startswith('W/"')
+        assert resp.headers["cache-control"] == "public, max-age=60"
+
+        resp = client.get("/collections/test", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+        assert resp.headers["cache-control"] == "public, max-age=60"
+
+        resp = client.head("/collections/test")
+        assert resp.status_code == 200
+        assert resp.content == b""
+        assert resp.headers["etag"] == etag
+        assert int(resp.headers["content-length"]) > 0
+
+        # Last-Modified from the item `updated` property
+        resp = client.get("/collections/test/items/test")
+        assert resp.status_code == 200
+        assert resp.headers["last-modified"] == "Wed, 01 Jan 2020 00:00:00 GMT"
+        assert resp.headers["cache-control"] == "no-cache"
+
+        resp = client.get(
+            "/collections/test/items/test",
+            headers={"If-Modified-Since": "Wed, 01 Jan 2020 00:00:00 GMT"},
+        )
+        assert resp.status_code == 304
+        assert resp.headers["last-modified"] == "Wed, 01 Jan 2020 00:00:00 GMT"
+
+        resp = client.get(
+            "/collections/test/items/test",
+            headers={"If-Modified-Since": "Tue, 31 Dec 2019 00:00:00 GMT"},
+        )
+        assert resp.status_code == 200
+
+        # ETag set by the client
+        resp = client.get("/collections")
+        assert resp.headers["etag"] == '"v1"'
+
+        resp = client.get("/collections", headers={"If-None-Match": '"v1"'})
+        assert resp.status_code == 304
+
+        # POST requests are not conditional
+        resp = client.post("/search", json={}, headers={"If-None-Match": "*"})
+        assert resp.status_code == 200
+        assert "etag" not in resp.headers
+
+
+def _zstd(data: bytes) -> bytes:
+    zstandard = pytest.importorskip("zstandard")
+    return zstandard.ZstdCompressor().compress(data)
+
+
+@pytest.mark.parametrize(
+    "encoding,compress",
+    [
+        ("gzip", gzip.compress),
+        ("deflate", zlib.compress),
+        ("br", brotli.compress),
+        ("zstd", _zstd),
+    ],
+)
+def test_request_decompression(TestCoreClient, encoding, compress):
+    if encoding not in default_decoders():
+        pytest.skip(f"{encoding} decoder not installed")
+
+    class SearchClient(TestCoreClient):
+        def post_search(self, search_request, **kwargs):
+            return {
+                "type": "FeatureCollection",
+                "features": [],
+                "links": [],
+                "context": {"intersects": search_request.intersects.type},
+            }
+
+    body = {
+        "intersects": {
+            "type": "Polygon",
+            "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]] * 5000],
+        }
+    }
+    api = StacApi(
+        settings=ApiSettings(),
+        client=SearchClient(),
+        middlewares=[Middleware(RequestDecompressionMiddleware)],
+    )
+    with TestClient(api.app) as client:
+        resp = client.post(
+            "/search",
+            content=compress(json.dumps(body).encode()),
+            headers={"content-type": "application/json", "content-encoding": encoding},
+        )
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["context"] == {"intersects": "Polygon"}
+
+
+async def _echo_body(request: Request) -> JSONResponse:
+    return JSONResponse(
+        {
+            "size": len(await request.body()),
+            "headers": sorted(request.headers.keys()),
+        }
+    )
+
+
+def _decompressing_client(**kwargs) -> TestClient:
+    app = FastAPI()
+    app.add_route("/", _echo_body, methods=["POST"])
+    app.add_middleware(RequestDecompressionMiddleware, **kwargs)
+    return TestClient(app)
+
+
+def test_request_decompression_streamed():
+    def body():
+        compressor = zlib.compressobj(wbits=31)
+        for _ in range(100):
+            yield compressor.compress(b"x" * 10_000)
+        yield compressor.flush()
+
+    client = _decompressing_client()
+    resp = client.post("/", content=body(), headers={"content-encoding": "gzip"})
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["size"] == 1_000_000
+    assert "content-encoding" not in resp.json()["headers"]
+
+    resp = client.post("/", content=b"plain", headers={"content-encoding": "identity"})
+    assert resp.json()["size"] == 5
+
+
+def test_request_decompression_errors():
+    bomb = gzip.compress(b"\0" * 10_000_000)
+    client = _decompressing_client(max_size=1_000_000, max_compressed_size=20_000)
+
+    resp = client.post("/", content=bomb, headers={"content-encoding": "gzip"})
+    assert resp.status_code == 413
+    assert resp.json()["detail"] == (
+        "Request body exceeds the size limit of 1000000 bytes"
+    )
+
+    resp = client.post("/", content=b"x" * 30_000, headers={"content-encoding": "gzip"})
+    assert resp.status_code == 413
+    assert "compressed size limit" in resp.json()["detail"]
+
+    resp = client.post("/", content=b"not gzip", headers={"content-encoding": "gzip"})
+    assert resp.status_code == 400
+    assert resp.json()["detail"].startswith("Invalid gzip request body")
+
+    resp = client.post(
+        "/", content=gzip.compress(b"data")[:-4], headers={"content-encoding": "gzip"}
+    )
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Incomplete gzip request body"
+
+    resp = client.post("/", content=b"data", headers={"content-encoding": "lzma"})
+    assert resp.status_code == 415
+    assert "gzip" in resp.headers["accept-encoding"]
+
+
+def test_conditional_requests_opt_in(test_client):
+    resp = test_client.get("/_mgmt/ping")
+    assert resp.status_code == 200
+    assert "etag" not in resp.headers
+
+
+def test_request_decompression_opt_in(test_client):
+    resp = test_client.post(
+        "/search", content=b"data", headers={"content-encoding": "lzma"}
+    )
+    assert resp.status_code != 415
+
+
+def test_request_decompression_zstd_bounded():
+    zstandard = pytest.importorskip("zstandard")
+    bomb = zstandard.ZstdCompressor().compress(b"\0" * 10_000_000)
+
+    decoder = RequestDecompressionMiddleware(None).decoders["zstd"]()
+    sizes = [len(chunk) for chunk in decoder.decompress(bomb)]
+    assert sum(sizes) == 10_000_000
+    assert max(sizes) <= DECOMPRESSION_CHUNK_SIZE
+
+    def body():
+        compressor = zstandard.ZstdCompressor().compressobj()
+        for n in range(100):
+            yield compressor.compress(str(n).encode() * 10_000)
+        yield compressor.flush()
+
+    client = _decompressing_client()
+    resp = client.post("/", content=body(), headers={"content-encoding": "zstd"})
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["size"] == sum(len(str(n)) * 10_000 for n in range(100))
+
+    client = _decompressing_client(max_size=1_000_000)
+    resp = client.post("/", content=bomb, headers={"content-encoding": "zstd"})
+    assert resp.status_code == 413
+
+    resp = client.post(
+        "/", content=_zstd(b"data" * 1000)[:-3], headers={"content-encoding": "zstd"}
+    )
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Incomplete zstd request body"
+
+
+@pytest.mark.asyncio
+async def test_request_decompression_messages():
+    messages = [
+        {"type": "http.request", "body": gzip.compress(b"x" * 1_000_000)},
+    ]
+    received = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def app(scope, receive, send):
+        while True:
+            message = await receive()
+            received.append(message)
+            if not message["more_body"]:
+                return
+
+    middleware = RequestDecompressionMiddleware(app)
+    scope = {"type": "http", "headers": [(b"content-encoding", b"gzip")]}
+    await middleware(scope, receive, None)
+
+    # one bounded chunk per message
+    assert all(len(m["body"]) <= DECOMPRESSION_CHUNK_SIZE for m in received)
+    assert sum(len(m["body"]) for m in received) == 1_000_000
+    assert [m["more_body"] for m in received[-2:]] == [True, False]
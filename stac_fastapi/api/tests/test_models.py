@@ -1,13 +1,20 @@
 import json
+import threading
 
 import pytest
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.testclient import TestClient
 from pydantic import ValidationError
 
-from stac_fastapi.api.models import create_get_request_model, create_post_request_model
+from stac_fastapi.api.models import (
+    FEATURES_BATCH_SIZE,
+    create_get_request_model,
+    create_post_request_model,
+    iterate_features,
+)
 from stac_fastapi.extensions.core import FieldsExtension, FilterExtension, SortExtension
 from stac_fastapi.types.search import BaseSearchGetRequest, BaseSearchPostRequest
+from stac_fastapi.types.stac import ItemCollectionStream
 
 
 def test_create_get_request_model():
@@ -129,3 +136,22 @@ def test_create_post_request_model_nested_fields(sortby, passes):
             assert sortby is None
         else:
             assert model.model_dump(mode="json")["sortby"] == sortby
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [0, FEATURES_BATCH_SIZE, 2 * FEATURES_BATCH_SIZE + 1])
+async def test_iterate_features(count):
+    threads = set()
+
+    def features():
+        for n in range(count):
+            threads.add(threading.current_thread())
+            yield {"id": n}
+
+    stream = ItemCollectionStream(features=features())
+    assert [f["id"] async for f in iterate_features(stream)] == list(range(count))
+    # sync generators are consumed in a background thread
+    assert threading.main_thread() not in threads
+
+    stream = ItemCollectionStream(features=[{"id": n} for n in range(count)])
+    assert [f["id"] async for f in iterate_features(stream)] == list(range(count))
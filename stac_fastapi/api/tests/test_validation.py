@@ -0,0 +1,182 @@
+import logging
+
+import pytest
+from fastapi.exceptions import ResponseValidationError
+from fastapi.testclient import TestClient
+from starlette.responses import JSONResponse
+
+from stac_fastapi.api.app import StacApi
+from stac_fastapi.api.validation import ResponseValidator, _get_executor
+from stac_fastapi.types.config import ApiSettings
+from stac_fastapi.types.stac import ItemCollectionStream
+
+
+@pytest.fixture
+def InvalidItemClient(TestCoreClient, item_dict):
+    class CoreClient(TestCoreClient):
+        def get_item(self, item_id: str, collection_id: str, **kwargs):
+            if item_id == "invalid":
+                return {**item_dict, "geometry": {"type": "Point"}}
+            return item_dict
+
+    return CoreClient
+
+
+@pytest.mark.parametrize("mode", ["sample", "shadow"])
+def test_response_validation_modes(mode, caplog, InvalidItemClient):
+    settings = ApiSettings(enable_response_models=True, response_validation_mode=mode)
+    stac_api = StacApi(settings=settings, client=InvalidItemClient())
+
+    validator = stac_api.response_validators[
+        "GET /collections/{collection_id}/items/{item_id}"
+    ]
+    assert validator.shadow == (mode == "shadow")
+
+    with caplog.at_level(logging.WARNING, logger="stac_fastapi.api.validation"):
+        with TestClient(stac_api.app) as client:
+            resp = client.get("/collections/test/items/valid")
+            assert resp.status_code == 200
+
+            # invalid responses are sent, and reported
+            resp = client.get("/collections/test/items/invalid")
+            assert resp.status_code == 200
+            assert resp.json()["geometry"] == {"type": "Point"}
+
+            # the response models are still documented
+            assert client.get("/api").status_code == 200
+
+        # wait for the background worker
+        _get_executor().submit(lambda: None).result()
+
+    assert validator.stats() == {"validated": 2, "violations": 1, "dropped": 0}
+    assert "does not match its response model" in caplog.text
+
+
+def test_response_validation_modes_body(TestCoreClient, item_dict):
+    class CoreClient(TestCoreClient):
+        def get_item(self, item_id: str, collection_id: str, **kwargs):
+            item = {**item_dict, "properties": {**item_dict["properties"], "x": None}}
+            return {**item, "collection": None}
+
+    bodies = []
+    for mode in ["enforce", "sample", "shadow"]:
+        settings = ApiSettings(enable_response_models=True, response_validation_mode=mode)
+        stac_api = StacApi(settings=settings, client=CoreClient())
+        with TestClient(stac_api.app) as client:
+            resp = client.get("/collections/test/items/test")
+            assert resp.status_code == 200
+            bodies.append(resp.json())
+
+    # the `response_model_exclude_none` option applies in every mode
+    assert "collection" not in bodies[0]
+    assert "x" not in bodies[0]["properties"]
+    assert bodies[1] == bodies[0]
+    assert bodies[2] == bodies[0]
+
+
+def test_response_validator_shadow_copy():
+    validated = []
+
+    class Validator(ResponseValidator):
+        def validate(self, content, enforce=None):
+            validated.append(content)
+            return True
+
+    validator = Validator(dict, shadow=True)
+    content = {"features": [{"id": "a"}]}
+    validator(content)
+    content["features"].clear()
+    _get_executor().submit(lambda: None).result()
+    assert validated == [{"features": [{"id": "a"}]}]
+
+
+def test_response_validation_enforce(InvalidItemClient):
+    settings = ApiSettings(enable_response_models=True)
+    stac_api = StacApi(settings=settings, client=InvalidItemClient())
+    assert all(validator.enforce for validator in stac_api.response_validators.values())
+
+    with TestClient(stac_api.app, raise_server_exceptions=False) as client:
+        resp = client.get("/collections/test/items/invalid")
+        assert resp.status_code == 500
+
+
+def test_response_validation_sample_rate(InvalidItemClient):
+    settings = ApiSettings(
+        enable_response_models=True,
+        response_validation_mode="sample",
+        response_validation_sample_rate=0,
+    )
+    stac_api = StacApi(settings=settings, client=InvalidItemClient())
+
+    with TestClient(stac_api.app) as client:
+        for _ in range(5):
+            resp = client.get("/collections/test/items/invalid")
+            assert resp.status_code == 200
+
+    assert all(
+        validator.validated == 0 for validator in stac_api.response_validators.values()
+    )
+
+
+def test_response_validator_max_pending():
+    validator = ResponseValidator(dict, shadow=True, max_pending=0)
+    validator({})
+    assert validator.stats() == {"validated": 0, "violations": 0, "dropped": 1}
+
+
+@pytest.fixture
+def StreamClient(TestCoreClient, item_dict):
+    class CoreClient(TestCoreClient):
+        def item_collection(self, collection_id: str, **kwargs):
+            invalid = {**item_dict, "id": "invalid", "geometry": {"type": "Point"}}
+            features = [item_dict, invalid] if collection_id == "invalid" else [item_dict]
+            return ItemCollectionStream(iter(features))
+
+        def get_item(self, item_id: str, collection_id: str, **kwargs):
+            return JSONResponse({**item_dict, "geometry": {"type": "Point"}})
+
+    return CoreClient
+
+
+@pytest.mark.parametrize("mode", ["sample", "enforce"])
+def test_response_validation_stream(mode, caplog, StreamClient):
+    settings = ApiSettings(enable_response_models=True, response_validation_mode=mode)
+    stac_api = StacApi(settings=settings, client=StreamClient())
+    validator = stac_api.response_validators["GET /collections/{collection_id}/items"]
+
+    with caplog.at_level(logging.WARNING, logger="stac_fastapi.api.validation"):
+        with TestClient(stac_api.app) as client:
+            resp = client.get("/collections/test/items")
+            assert resp.status_code == 200
+            assert len(resp.json()["features"]) == 1
+
+            if mode == "sample":
+                resp = client.get("/collections/invalid/items")
+                assert resp.status_code == 200
+                assert len(resp.json()["features"]) == 2
+            else:
+                # the headers are sent, the stream is interrupted
+                with pytest.raises(Exception) as exc_info:
+                    client.get("/collections/invalid/items")
+
+                assert exc_info.group_contains(ResponseValidationError)
+
+    assert validator.stats() == {"validated": 2, "violations": 1, "dropped": 0}
+
+
+@pytest.mark.parametrize("mode", ["sample", "enforce"])
+def test_response_validation_response(mode, caplog, StreamClient):
+    settings = ApiSettings(enable_response_models=True, response_validation_mode=mode)
+    stac_api = StacApi(settings=settings, client=StreamClient())
+    validator = stac_api.response_validators[
+        "GET /collections/{collection_id}/items/{item_id}"
+    ]
+
+    with caplog.at_level(logging.WARNING, logger="stac_fastapi.api.validation"):
+        with TestClient(stac_api.app) as client:
+            # responses are sent as is, even when enforcing the response models
+            resp = client.get("/collections/test/items/test")
+            assert resp.status_code == 200
+
+    assert validator.stats() == {"validated": 1, "violations": 1, "dropped": 0}
+    assert "does not match its response model" in caplog.text
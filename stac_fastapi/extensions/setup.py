@@ -18,6 +18,9 @@ extra_reqs = {
         "pre-commit",
         "requests",
     ],
+    "geoparquet": [
+        "pyarrow>=14",
+    ],
     "docs": ["mkdocs", "mkdocs-material", "pdocs"],
 }
 
@@ -1,5 +1,6 @@
 """Fields extension module."""
 
 from .fields import FieldsExtension
+from .projection import FieldsProjection
 
-__all__ = ["FieldsExtension"]
+__all__ = ["FieldsExtension", "FieldsProjection"]
@@ -1,12 +1,13 @@
 """Fields extension."""
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 import attr
 from fastapi import FastAPI
 
 from stac_fastapi.types.extension import ApiExtension
 
+from .projection import FieldsProjection
 from .request import FieldsExtensionGetRequest, FieldsExtensionPostRequest
 
 
@@ -23,8 +24,13 @@ class FieldsExtension(ApiExtension):
 
     https://github.com/stac-api-extensions/fields
 
+    The backends can project their items with the `FieldsProjection` returned by
+    `projection`, which applies the default includes.
+
     Attributes:
         default_includes (set): defines the default set of included fields.
+        collection_default_includes (dict): defines the default set of included
+            fields of specific collections.
         conformance_classes (list): Defines the list of conformance classes for
             the extension
     """
@@ -36,6 +42,24 @@ class FieldsExtension(ApiExtension):
         factory=lambda: ["https://api.stacspec.org/v1.0.0/item-search#fields"]
     )
     schema_href: Optional[str] = attr.ib(default=None)
+    default_includes: Optional[Set[str]] = attr.ib(default=None)
+    collection_default_includes: Dict[str, Set[str]] = attr.ib(factory=dict)
+
+    def projection(self, fields: Any) -> FieldsProjection:
+        """Compile the projection of a request.
+
+        Args:
+            fields: the `fields` of a GET (list of fields) or POST
+                (`PostFieldsExtension`) request.
+
+        Returns:
+            FieldsProjection: the projection of the request items.
+        """
+        return FieldsProjection.from_request(
+            fields,
+            default_includes=self.default_includes,
+            collection_default_includes=self.collection_default_includes,
+        )
 
     def register(self, app: FastAPI) -> None:
         """Register the extension with a FastAPI application.
@@ -0,0 +1,300 @@
+"""Compiled projection of items with the fields extension."""
+
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+)
+
+import attr
+
+INCLUDE = "include"
+EXCLUDE = "exclude"
+
+
+@attr.s(slots=True)
+class _Node:
+    """Node of the compiled fields tree (one per path segment)."""
+
+    action: Optional[str] = attr.ib(default=None)
+    children: Dict[str, "_Node"] = attr.ib(factory=dict)
+
+
+def parse_fields(fields: Optional[Iterable[str]]) -> Tuple[Set[str], Set[str]]:
+    """Split the GET `fields` parameter in include and exclude sets.
+
+    Fields prefixed with `-` are excluded, other fields (optionally prefixed with
+    `+`) are included.
+
+    Returns:
+        tuple: the include and exclude sets.
+    """
+    include: Set[str] = set()
+    exclude: Set[str] = set()
+    for field in fields or []:
+        field = field.strip()
+        if field.startswith("-"):
+            exclude.add(field[1:])
+        elif field:
+            include.add(field.lstrip("+"))
+
+    return include, exclude
+
+
+def _compile(include: Iterable[str], exclude: Iterable[str]) -> _Node:
+    root = _Node()
+    for action, fields in ((EXCLUDE, exclude), (INCLUDE, include)):
+        for field in fields:
+            node = root
+            for key in field.split("."):
+                node = node.children.setdefault(key, _Node())
+
+            # a field both included and excluded is included
+            node.action = action
+
+    return root
+
+
+def _project(value: Mapping[str, Any], node: _Node, included: bool) -> Dict[str, Any]:
+    """Apply a compiled fields tree to a (nested) dictionary.
+
+    Args:
+        value: the dictionary to project.
+        node: the compiled node of the dictionary.
+        included: whether the fields which are not in the tree are included.
+    """
+    if included:
+        return _project_excluded(value, node)
+
+    result = {}
+    for key, child in node.children.items():
+        if key not in value:
+            continue
+
+        child_included = child.action == INCLUDE
+        child_value = value[key]
+        if child.children and isinstance(child_value, Mapping):
+            projected = _project(child_value, child, child_included)
+            if projected or child_included:
+                result[key] = projected
+
+        elif child_included:
+            result[key] = child_value
+
+    return result
+
+
+def _project_excluded(value: Mapping[str, Any], node: _Node) -> Dict[str, Any]:
+    """Remove the excluded fields of a dictionary (see `_project`)."""
+    result = dict(value)
+    for key, child in node.children.items():
+        if key not in result:
+            continue
+
+        child_included = child.action != EXCLUDE
+        child_value = result[key]
+        if child.children and isinstance(child_value, Mapping):
+            projected = _project(child_value, child, child_included)
+            if projected or child_included:
+                result[key] = projected
+            else:
+                del result[key]
+
+        elif not child_included:
+            del result[key]
+
+    return result
+
+
+@attr.s(frozen=True)
+class FieldsProjection:
+    """Projection of items, compiled once from the fields extension parameters.
+
+    The include/exclude sets are compiled to a tree of path segments (paths can be
+    of any depth, e.g. `properties.eo:bands` or `assets.thumbnail.href`), which is
+    then applied to each item in a single pass: only the projected branches of an
+    item are copied, the other values are shared with the source item.
+
+    If no field is included, all the fields but the excluded ones are returned. If
+    neither include nor exclude is set, the default includes of the item's
+    collection (or `default_includes`) are used, if any. When a field is both
+    included and excluded, it is included; otherwise the most specific path wins
+    (e.g. `exclude=properties, include=properties.datetime` only keeps
+    `properties.datetime`).
+
+    Attributes:
+        include: fields to include.
+        exclude: fields to exclude.
+        default_includes: fields included when neither include nor exclude is set.
+        collection_default_includes: per collection `default_includes`.
+    """
+
+    include: FrozenSet[str] = attr.ib(converter=frozenset, factory=frozenset)
+    exclude: FrozenSet[str] = attr.ib(converter=frozenset, factory=frozenset)
+    default_includes: Optional[FrozenSet[str]] = attr.ib(
+        default=None,
+        converter=attr.converters.optional(frozenset),
+    )
+    collection_default_includes: Mapping[str, FrozenSet[str]] = attr.ib(
+        factory=dict,
+        converter=lambda defaults: {
+            collection: frozenset(fields) for collection, fields in defaults.items()
+        },
+    )
+    _root: _Node = attr.ib(init=False)
+    _default_roots: Dict[Optional[str], Optional[_Node]] = attr.ib(
+        init=False, factory=dict
+    )
+
+    def __attrs_post_init__(self):
+        """Compile the fields tree."""
+        object.__setattr__(self, "_root", _compile(self.include, self.exclude))
+
+    @classmethod
+    def from_request(
+        cls,
+        fields: Any,
+        default_includes: Optional[Iterable[str]] = None,
+        collection_default_includes: Optional[Mapping[str, Iterable[str]]] = None,
+    ) -> "FieldsProjection":
+        """Create the projection of a request.
+
+        Args:
+            fields: the `fields` of a GET (list of `+/-` prefixed fields) or POST
+                (`PostFieldsExtension`) request.
+            default_includes: fields included when no field is requested.
+            collection_default_includes: per collection `default_includes`.
+        """
+        if fields is None or isinstance(fields, (list, tuple, set, frozenset)):
+            include, exclude = parse_fields(fields)
+        else:
+            include, exclude = set(fields.include or ()), set(fields.exclude or ())
+
+        return cls(
+            include=include,
+            exclude=exclude,
+            default_includes=default_includes,
+            collection_default_includes=collection_default_includes or {},
+        )
+
+    @property
+    def explicit(self) -> bool:
+        """Return True if fields were requested."""
+        return bool(self.include or self.exclude)
+
+    @property
+    def is_identity(self) -> bool:
+        """Return True if the projection always returns the full items."""
+        return not (
+            self.explicit or self.default_includes or self.collection_default_includes
+        )
+
+    def _get_root(self, collection_id: Optional[str]) -> Optional[_Node]:
+        if self.explicit:
+            return self._root
+
+        try:
+            return self._default_roots[collection_id]
+        except KeyError:
+            pass
+
+        defaults = self.collection_default_includes.get(
+            collection_id, self.default_includes
+        )
+        root = _compile(defaults, ()) if defaults else None
+        self._default_roots[collection_id] = root
+        return root
+
+    def _includes_all(self, root: _Node) -> bool:
+        # default includes and explicit includes only keep the listed fields
+        return root is self._root and not self.include
+
+    def __call__(self, item: Mapping[str, Any]) -> Mapping[str, Any]:
+        """Project an item."""
+        root = self._get_root(item.get("collection"))
+        if root is None:
+            return item
+
+        return _project(item, root, self._includes_all(root))
+
+    def project_items(self, items: Iterable[Mapping[str, Any]]) -> List[Any]:
+        """Project a page of items."""
+        if self.is_identity:
+            return list(items)
+
+        return [self(item) for item in items]
+
+    def iter_items(self, items: Iterable[Mapping[str, Any]]) -> Iterator[Any]:
+        """Project a stream of items, lazily."""
+        if self.is_identity:
+            yield from items
+            return
+
+        for item in items:
+            yield self(item)
+
+    def project_item_collection(self, item_collection: Dict[str, Any]) -> Dict[str, Any]:
+        """Project the features of an ItemCollection (in place)."""
+        item_collection["features"] = self.project_items(
+            item_collection.get("features") or []
+        )
+        return item_collection
+
+    def is_included(self, field: str, collection_id: Optional[str] = None) -> bool:
+        """Return True if a field (or part of it) can be in the projected items.
+
+        This is a pushdown hint for the backends, e.g. `is_included("geometry")`
+        tells whether the geometries need to be read (and encoded) at all.
+        """
+        root = self._get_root(collection_id)
+        if root is None:
+            return True
+
+        included = self._includes_all(root)
+        node = root
+        for key in field.split("."):
+            child = node.children.get(key)
+            if child is None:
+                return included
+
+            if child.action is not None:
+                included = child.action == INCLUDE
+
+            if not child.children:
+                return included
+
+            node = child
+
+        # some of the sub-fields may be included
+        return included or _has_include(node)
+
+    def top_level_fields(self, collection_id: Optional[str] = None) -> Optional[Set[str]]:
+        """Return the top-level fields needed to build the projected items.
+
+        This is a pushdown hint for the backends (e.g. to select database columns).
+
+        Returns:
+            The top-level fields, or None if all the fields can be needed.
+        """
+        root = self._get_root(collection_id)
+        if root is None or self._includes_all(root):
+            return None
+
+        return {
+            key
+            for key, child in root.children.items()
+            if child.action == INCLUDE or _has_include(child)
+        }
+
+
+def _has_include(node: _Node) -> bool:
+    return any(
+        child.action == INCLUDE or _has_include(child) for child in node.children.values()
+    )
@@ -29,17 +29,17 @@ class PostFieldsExtension(BaseModel):
         of pydantic fields on model export
         Ref: https://pydantic-docs.helpmanual.io/usage/exporting_models/#advanced-include-and-exclude
         """
-        field_dict = {}
+        field_dict: Dict = {}
         for field in fields or []:
-            if "." in field:
-                parent, key = field.split(".")
-                if parent not in field_dict:
-                    field_dict[parent] = {key}
-                else:
-                    if field_dict[parent] is not ...:
-                        field_dict[parent].add(key)
+            *parents, key = field.split(".")
+            node = field_dict
+            for parent in parents:
+                node = node.setdefault(parent, {})
+                if node is ...:
+                    # the parent is already included/excluded as a whole
+                    break
             else:
-                field_dict[field] = ...  # type:ignore
+                node[key] = ...
 
         return field_dict
 
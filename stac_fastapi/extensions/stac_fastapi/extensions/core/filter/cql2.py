@@ -0,0 +1,814 @@
+"""CQL2 (cql2-text and cql2-json) parser.
+
+Both encodings are parsed to the same AST, made of `Property`, `Operation`,
+`Function`, temporal (`Timestamp`, `Date`, `Interval`), spatial (`Geometry`,
+`BBox`) and `Array` nodes, and of plain Python literals (`str`, `int`, `float`,
+`bool`). The AST can be serialized back to (normalized) cql2-json with `to_json`.
+
+https://docs.ogc.org/is/21-065r2/21-065r2.html
+"""
+
+import contextlib
+import datetime as dt
+import functools
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+import attr
+
+from stac_fastapi.types.errors import InvalidQueryParameter
+from stac_fastapi.types.rfc3339 import datetime_to_str, rfc3339_str_to_datetime
+
+LOGICAL_OPERATORS = {"and", "or", "not"}
+COMPARISON_OPERATORS = {
+    "=",
+    "<>",
+    "<",
+    "<=",
+    ">",
+    ">=",
+    "like",
+    "between",
+    "in",
+    "isNull",
+}
+SPATIAL_OPERATORS = {
+    "s_contains",
+    "s_crosses",
+    "s_disjoint",
+    "s_equals",
+    "s_intersects",
+    "s_overlaps",
+    "s_touches",
+    "s_within",
+}
+TEMPORAL_OPERATORS = {
+    "t_after",
+    "t_before",
+    "t_contains",
+    "t_disjoint",
+    "t_during",
+    "t_equals",
+    "t_finishedBy",
+    "t_finishes",
+    "t_intersects",
+    "t_meets",
+    "t_metBy",
+    "t_overlappedBy",
+    "t_overlaps",
+    "t_startedBy",
+    "t_starts",
+}
+ARRAY_OPERATORS = {"a_containedBy", "a_contains", "a_equals", "a_overlaps"}
+ARITHMETIC_OPERATORS = {"+", "-", "*", "/", "%", "div", "^"}
+CASE_OPERATORS = {"casei", "accenti"}
+
+# Operator names, by lowercase name (the temporal and array operators are camel case)
+OPERATORS = {
+    op.lower(): op
+    for op in LOGICAL_OPERATORS
+    | COMPARISON_OPERATORS
+    | SPATIAL_OPERATORS
+    | TEMPORAL_OPERATORS
+    | ARRAY_OPERATORS
+    | ARITHMETIC_OPERATORS
+    | CASE_OPERATORS
+}
+
+# Number of arguments of the operators (minimum, maximum)
+_ARITY = {
+    "and": (2, None),
+    "or": (2, None),
+    "not": (1, 1),
+    "between": (3, 3),
+    "isNull": (1, 1),
+    "casei": (1, 1),
+    "accenti": (1, 1),
+}
+
+
+# Maximum nesting depth of the expressions: deeper ones are rejected before the
+# recursive parsers exhaust the stack (a level of parentheses takes ~12 frames of
+# the cql2-text parser, for the default recursion limit of 1000)
+MAX_NESTING_DEPTH = 50
+
+
+class CQL2Error(InvalidQueryParameter):
+    """Invalid CQL2 expression."""
+
+    pass
+
+
+def _check_depth(depth: int) -> None:
+    if depth > MAX_NESTING_DEPTH:
+        raise CQL2Error(
+            f"CQL2 expression nested more than {MAX_NESTING_DEPTH} levels deep."
+        )
+
+
+@attr.s(frozen=True, slots=True)
+class Property:
+    """Reference to a queryable."""
+
+    name: str = attr.ib()
+
+
+@attr.s(frozen=True, slots=True)
+class Operation:
+    """Operation (logical, comparison, spatial, temporal, array or arithmetic)."""
+
+    op: str = attr.ib()
+    args: Tuple[Any, ...] = attr.ib(converter=tuple)
+
+    def __attrs_post_init__(self):
+        """Check the number of arguments."""
+        minimum, maximum = _ARITY.get(self.op, (2, 2))
+        if len(self.args) < minimum or (maximum is not None and len(self.args) > maximum):
+            raise CQL2Error(f"Invalid number of arguments for `{self.op}`.")
+
+
+@attr.s(frozen=True, slots=True)
+class Function:
+    """Call of a (backend defined) function."""
+
+    name: str = attr.ib()
+    args: Tuple[Any, ...] = attr.ib(converter=tuple)
+
+
+@attr.s(frozen=True, slots=True)
+class Timestamp:
+    """Timestamp literal."""
+
+    value: dt.datetime = attr.ib()
+
+
+@attr.s(frozen=True, slots=True)
+class Date:
+    """Date literal."""
+
+    value: dt.date = attr.ib()
+
+
+@attr.s(frozen=True, slots=True)
+class Interval:
+    """Interval literal, `..` (`None`) for open ends."""
+
+    start: Any = attr.ib()
+    end: Any = attr.ib()
+
+
+@attr.s(frozen=True, slots=True)
+class Geometry:
+    """GeoJSON geometry literal."""
+
+    value: Dict[str, Any] = attr.ib(hash=False)
+
+
+@attr.s(frozen=True, slots=True)
+class BBox:
+    """Bounding box literal."""
+
+    value: Tuple[float, ...] = attr.ib(converter=tuple)
+
+
+@attr.s(frozen=True, slots=True)
+class Array:
+    """Array literal."""
+
+    items: Tuple[Any, ...] = attr.ib(converter=tuple)
+
+
+def _timestamp(value: Any) -> Timestamp:
+    try:
+        return Timestamp(rfc3339_str_to_datetime(value))
+    except (TypeError, ValueError) as e:
+        raise CQL2Error(f"Invalid timestamp `{value}`.") from e
+
+
+def _date(value: Any) -> Date:
+    try:
+        return Date(dt.date.fromisoformat(value))
+    except (TypeError, ValueError) as e:
+        raise CQL2Error(f"Invalid date `{value}`.") from e
+
+
+def _to_instant(value: Any) -> Any:
+    """Convert an interval bound string to a Timestamp or a Date (`..` to None)."""
+    if not isinstance(value, str):
+        return value
+    elif value == "..":
+        return None
+    elif len(value) == 10:
+        return _date(value)
+
+    return _timestamp(value)
+
+
+#
+# cql2-json
+#
+
+
+def _operation_from_json(value: Dict[str, Any], depth: int) -> Any:
+    args = value.get("args", [])
+    if not isinstance(args, list):
+        raise CQL2Error(f"Invalid arguments for `{value['op']}`.")
+
+    args = [_from_json(arg, depth) for arg in args]
+    op = OPERATORS.get(str(value["op"]).lower())
+    if op is None:
+        return Function(value["op"], args)
+
+    return Operation(op, args)
+
+
+def _interval_from_json(value: Dict[str, Any], depth: int) -> Interval:
+    try:
+        start, end = value["interval"]
+    except (TypeError, ValueError) as e:
+        raise CQL2Error("Invalid interval literal.") from e
+
+    return Interval(
+        _to_instant(_from_json(start, depth)), _to_instant(_from_json(end, depth))
+    )
+
+
+def _function_from_json(value: Dict[str, Any], depth: int) -> Function:
+    function = value["function"]
+    return Function(function["name"], [_from_json(a, depth) for a in function["args"]])
+
+
+# Parsers of the cql2-json objects (and the depth of their children), by distinctive
+# key
+_JSON_OBJECTS = {
+    "op": _operation_from_json,
+    "property": lambda value, depth: Property(value["property"]),
+    "timestamp": lambda value, depth: _timestamp(value["timestamp"]),
+    "date": lambda value, depth: _date(value["date"]),
+    "interval": _interval_from_json,
+    "bbox": lambda value, depth: BBox(value["bbox"]),
+    "coordinates": lambda value, depth: Geometry(value),
+    "geometries": lambda value, depth: Geometry(value),
+    # pre 1.0 notations
+    "function": _function_from_json,
+    "casei": lambda value, depth: Operation("casei", [_from_json(value["casei"], depth)]),
+    "accenti": lambda value, depth: Operation(
+        "accenti", [_from_json(value["accenti"], depth)]
+    ),
+}
+
+
+def _from_json(value: Any, depth: int = 0) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+
+    _check_depth(depth)
+    if isinstance(value, list):
+        return Array(_from_json(item, depth + 1) for item in value)
+
+    if isinstance(value, dict):
+        for key, parse in _JSON_OBJECTS.items():
+            if key in value:
+                return parse(value, depth + 1)
+
+    raise CQL2Error(f"Invalid cql2-json value `{value!r}`.")
+
+
+def _instant_to_json(value: Any) -> Any:
+    if value is None:
+        return ".."
+    elif isinstance(value, Timestamp):
+        return datetime_to_str(value.value)
+    elif isinstance(value, Date):
+        return value.value.isoformat()
+
+    return to_json(value)
+
+
+def to_json(node: Any) -> Any:
+    """Serialize an expression to (normalized) cql2-json."""
+    if isinstance(node, Operation):
+        return {"op": node.op, "args": [to_json(arg) for arg in node.args]}
+    elif isinstance(node, Property):
+        return {"property": node.name}
+    elif isinstance(node, Function):
+        return {"op": node.name, "args": [to_json(arg) for arg in node.args]}
+    elif isinstance(node, Timestamp):
+        return {"timestamp": _instant_to_json(node)}
+    elif isinstance(node, Date):
+        return {"date": _instant_to_json(node)}
+    elif isinstance(node, Interval):
+        return {"interval": [_instant_to_json(node.start), _instant_to_json(node.end)]}
+    elif isinstance(node, Geometry):
+        return node.value
+    elif isinstance(node, BBox):
+        return {"bbox": list(node.value)}
+    elif isinstance(node, Array):
+        return [to_json(item) for item in node.items]
+
+    return node
+
+
+def parse_cql2_json(value: Any) -> Any:
+    """Parse a cql2-json expression (a dictionary or its JSON encoding)."""
+    if isinstance(value, (str, bytes)):
+        try:
+            value = json.loads(value)
+        except (ValueError, RecursionError) as e:
+            raise CQL2Error("Invalid cql2-json expression.") from e
+
+    return _from_json(value)
+
+
+#
+# cql2-text
+#
+
+_TOKENS = re.compile(
+    r"""
+    \s*(?:
+        (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+        |(?P<string>'(?:[^']|'')*')
+        |(?P<quoted>"(?:[^"]|"")*")
+        |(?P<symbol><>|<=|>=|[=<>()\[\],+\-*/%^])
+        |(?P<word>[A-Za-z_][\w:.]*)
+    )
+    """,
+    re.VERBOSE,
+)
+
+_COMPARISONS = {"=", "<>", "<", "<=", ">", ">="}
+_GEOMETRIES = {
+    "POINT",
+    "LINESTRING",
+    "POLYGON",
+    "MULTIPOINT",
+    "MULTILINESTRING",
+    "MULTIPOLYGON",
+    "GEOMETRYCOLLECTION",
+}
+_GEOMETRY_TYPES = {name.upper(): name for name in ["Point", "LineString", "Polygon"]}
+
+
+@attr.s(slots=True)
+class _Token:
+    kind: str = attr.ib()
+    value: str = attr.ib()
+    position: int = attr.ib()
+
+    @property
+    def keyword(self) -> Optional[str]:
+        return self.value.upper() if self.kind == "word" else None
+
+
+def _tokenize(text: str) -> List[_Token]:
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKENS.match(text, position)
+        if match is None or match.lastgroup is None:
+            raise CQL2Error(f"Invalid cql2-text expression at position {position}.")
+
+        tokens.append(
+            _Token(
+                match.lastgroup,
+                match.group(match.lastgroup),
+                match.start(match.lastgroup),
+            )
+        )
+        position = match.end()
+
+    return tokens
+
+
+@attr.s
+class _TextParser:
+    """Recursive descent cql2-text parser.
+
+    The boolean, comparison and arithmetic expressions share the same precedence
+    levels, so that parentheses can group either kind of expression.
+    """
+
+    tokens: List[_Token] = attr.ib()
+    position: int = attr.ib(default=0)
+    depth: int = attr.ib(default=0)
+
+    @contextlib.contextmanager
+    def nested(self) -> Iterator[None]:
+        """Parse a nested expression, checking the nesting depth."""
+        self.depth += 1
+        _check_depth(self.depth)
+        try:
+            yield
+        finally:
+            self.depth -= 1
+
+    def peek(self, offset: int = 0) -> Optional[_Token]:
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def error(self, message: str = "Unexpected token") -> CQL2Error:
+        token = self.peek()
+        if token is None:
+            return CQL2Error(f"{message} at the end of the cql2-text expression.")
+
+        return CQL2Error(f"{message} `{token.value}` at position {token.position}.")
+
+    def next(self) -> _Token:
+        token = self.peek()
+        if token is None:
+            raise self.error("Unexpected end")
+
+        self.position += 1
+        return token
+
+    def accept(self, *values: str) -> Optional[_Token]:
+        token = self.peek()
+        if token is not None and (
+            token.keyword in values or (token.kind == "symbol" and token.value in values)
+        ):
+            self.position += 1
+            return token
+
+        return None
+
+    def expect(self, value: str) -> _Token:
+        token = self.accept(value)
+        if token is None:
+            raise self.error(f"Expected `{value}`, got")
+
+        return token
+
+    def parse(self) -> Any:
+        expression = self.parse_or()
+        if self.peek() is not None:
+            raise self.error()
+
+        return expression
+
+    def parse_or(self) -> Any:
+        with self.nested():
+            args = [self.parse_and()]
+            while self.accept("OR"):
+                args.append(self.parse_and())
+
+        return args[0] if len(args) == 1 else Operation("or", args)
+
+    def parse_and(self) -> Any:
+        args = [self.parse_not()]
+        while self.accept("AND"):
+            args.append(self.parse_not())
+
+        return args[0] if len(args) == 1 else Operation("and", args)
+
+    def parse_not(self) -> Any:
+        if self.accept("NOT"):
+            with self.nested():
+                return Operation("not", [self.parse_not()])
+
+        return self.parse_predicate()
+
+    def parse_predicate(self) -> Any:
+        left = self.parse_additive()
+
+        token = self.peek()
+        if token is None:
+            return left
+
+        if token.kind == "symbol" and token.value in _COMPARISONS:
+            self.position += 1
+            return Operation(token.value, [left, self.parse_additive()])
+
+        if self.accept("IS"):
+            negated = self.accept("NOT") is not None
+            self.expect("NULL")
+            predicate = Operation("isNull", [left])
+            return Operation("not", [predicate]) if negated else predicate
+
+        negated = False
+        following = self.peek(1)
+        if (
+            token.keyword == "NOT"
+            and following is not None
+            and following.keyword in ("LIKE", "BETWEEN", "IN")
+        ):
+            self.position += 1
+            negated = True
+
+        if self.accept("LIKE"):
+            predicate = Operation("like", [left, self.parse_additive()])
+        elif self.accept("BETWEEN"):
+            low = self.parse_additive()
+            self.expect("AND")
+            predicate = Operation("between", [left, low, self.parse_additive()])
+        elif self.accept("IN"):
+            self.expect("(")
+            predicate = Operation("in", [left, Array(self.parse_list(")"))])
+        else:
+            return left
+
+        return Operation("not", [predicate]) if negated else predicate
+
+    def parse_additive(self) -> Any:
+        left = self.parse_multiplicative()
+        while token := self.accept("+", "-"):
+            left = Operation(token.value, [left, self.parse_multiplicative()])
+
+        return left
+
+    def parse_multiplicative(self) -> Any:
+        left = self.parse_power()
+        while token := self.accept("*", "/", "%", "DIV"):
+            op = "div" if token.keyword == "DIV" else token.value
+            left = Operation(op, [left, self.parse_power()])
+
+        return left
+
+    def parse_power(self) -> Any:
+        base = self.parse_unary()
+        if self.accept("^"):
+            with self.nested():
+                return Operation("^", [base, self.parse_power()])
+
+        return base
+
+    def parse_unary(self) -> Any:
+        if self.accept("+"):
+            with self.nested():
+                return self.parse_unary()
+
+        if self.accept("-"):
+            with self.nested():
+                operand = self.parse_unary()
+            if isinstance(operand, (int, float)) and not isinstance(operand, bool):
+                return -operand
+
+            return Operation("*", [-1, operand])
+
+        return self.parse_primary()
+
+    def parse_list(self, end: str) -> List[Any]:
+        """Parse comma separated expressions, until `end`."""
+        items: List[Any] = []
+        if self.accept(end):
+            return items
+
+        items.append(self.parse_or())
+        while self.accept(","):
+            items.append(self.parse_or())
+
+        self.expect(end)
+        return items
+
+    def parse_primary(self) -> Any:
+        token = self.next()
+        if token.kind == "word":
+            return self.parse_word(token)
+
+        if token.kind == "number":
+            if re.search("[.eE]", token.value):
+                return float(token.value)
+
+            return int(token.value)
+
+        if token.kind == "string":
+            return token.value[1:-1].replace("''", "'")
+
+        if token.kind == "quoted":
+            return Property(token.value[1:-1].replace('""', '"'))
+
+        if token.value == "(":
+            items = self.parse_list(")")
+            return items[0] if len(items) == 1 else Array(items)
+
+        if token.value == "[":
+            return Array(self.parse_list("]"))
+
+        self.position -= 1
+        raise self.error()
+
+    def parse_word(self, token: _Token) -> Any:
+        """Parse a literal, a property or a call starting with a word."""
+        keyword = token.keyword
+        if keyword in ("TRUE", "FALSE"):
+            return keyword == "TRUE"
+
+        following = self.peek()
+        if keyword in _GEOMETRIES and following is not None and following.keyword == "Z":
+            return Geometry(self.parse_geometry(keyword))
+
+        if following is None or following.value != "(":
+            return Property(token.value)
+
+        if keyword in _GEOMETRIES:
+            return Geometry(self.parse_geometry(keyword))
+
+        self.position += 1
+        return self.parse_call(token.value, self.parse_list(")"))
+
+    def parse_call(self, name: str, args: List[Any]) -> Any:
+        keyword = name.upper()
+        if keyword in ("TIMESTAMP", "DATE"):
+            value = args[0] if len(args) == 1 else None
+            return _timestamp(value) if keyword == "TIMESTAMP" else _date(value)
+
+        if keyword == "INTERVAL":
+            if len(args) != 2:
+                raise CQL2Error("Invalid interval literal.")
+
+            return Interval(_to_instant(args[0]), _to_instant(args[1]))
+
+        if keyword == "BBOX":
+            return BBox(args)
+
+        if (op := OPERATORS.get(name.lower())) is not None:
+            if op in ARRAY_OPERATORS:
+                # `('a')` is a one element array, not a parenthesized literal
+                args = [
+                    arg if isinstance(arg, (Array, Property, Function)) else Array([arg])
+                    for arg in args
+                ]
+
+            return Operation(op, args)
+
+        return Function(name, args)
+
+    def parse_number(self) -> float:
+        sign = -1 if self.accept("-") else 1
+        token = self.next()
+        if token.kind != "number":
+            self.position -= 1
+            raise self.error("Expected a coordinate, got")
+
+        return sign * float(token.value)
+
+    def parse_coordinates(self) -> List[float]:
+        coordinates = [self.parse_number()]
+        while (token := self.peek()) is not None and (
+            token.kind == "number" or token.value == "-"
+        ):
+            coordinates.append(self.parse_number())
+
+        return coordinates
+
+    def parse_nested(self, depth: int) -> List[Any]:
+        """Parse `(...)` coordinates lists, nested `depth` times."""
+        self.expect("(")
+        if depth == 0:
+            # MULTIPOINT ((1 2), (3 4)) and MULTIPOINT (1 2, 3 4) are both valid
+            items = [self.parse_coordinates()]
+            self.expect(")")
+            return items[0]
+
+        items = []
+        while True:
+            token = self.peek()
+            if depth == 1 and token is not None and token.value != "(":
+                items.append(self.parse_coordinates())
+            else:
+                items.append(self.parse_nested(depth - 1))
+
+            if not self.accept(","):
+                break
+
+        self.expect(")")
+        return items
+
+    def parse_geometry(self, keyword: str) -> Dict[str, Any]:
+        self.accept("Z")
+        if keyword == "GEOMETRYCOLLECTION":
+            self.expect("(")
+            geometries = []
+            while True:
+                token = self.next()
+                if token.keyword not in _GEOMETRIES - {"GEOMETRYCOLLECTION"}:
+                    self.position -= 1
+                    raise self.error("Expected a geometry, got")
+
+                geometries.append(self.parse_geometry(token.keyword))
+                if not self.accept(","):
+                    break
+
+            self.expect(")")
+            return {"type": "GeometryCollection", "geometries": geometries}
+
+        multi = keyword.startswith("MULTI")
+        base = keyword[5:] if multi else keyword
+        depth = {"POINT": 0, "LINESTRING": 1, "POLYGON": 2}[base] + multi
+        if base == "POINT" and multi:
+            coordinates = self.parse_nested(1)
+        elif base == "POINT":
+            self.expect("(")
+            coordinates = self.parse_coordinates()
+            self.expect(")")
+        else:
+            coordinates = self.parse_nested(depth)
+
+        name = ("Multi" if multi else "") + _GEOMETRY_TYPES[base]
+        return {"type": name, "coordinates": coordinates}
+
+
+def parse_cql2_text(text: str) -> Any:
+    """Parse a cql2-text expression."""
+    tokens = _tokenize(text)
+    if not tokens:
+        raise CQL2Error("Empty cql2-text expression.")
+
+    return _TextParser(tokens).parse()
+
+
+#
+# Validation
+#
+
+
+def iter_nodes(node: Any) -> Iterator[Any]:
+    """Iterate over the nodes of an expression (depth first)."""
+    yield node
+    if isinstance(node, (Operation, Function)):
+        children: Iterable[Any] = node.args
+    elif isinstance(node, Array):
+        children = node.items
+    elif isinstance(node, Interval):
+        children = (node.start, node.end)
+    else:
+        return
+
+    for child in children:
+        yield from iter_nodes(child)
+
+
+def get_properties(node: Any) -> Set[str]:
+    """Return the names of the properties used in an expression."""
+    return {child.name for child in iter_nodes(node) if isinstance(child, Property)}
+
+
+def validate_queryables(node: Any, queryables: Any) -> None:
+    """Check that an expression only uses known queryables.
+
+    Args:
+        node: the expression.
+        queryables: the queryables JSON Schema (as returned by the filter
+            extension `get_queryables`) or the names of the queryables. Any
+            property is allowed by a JSON Schema whose `additionalProperties` is
+            not `false`.
+
+    Raises:
+        CQL2Error: if the expression uses unknown queryables.
+    """
+    if isinstance(queryables, Mapping):
+        if queryables.get("additionalProperties", True) is not False:
+            return
+
+        names: Iterable[str] = queryables.get("properties") or {}
+    else:
+        names = queryables
+
+    if unknown := get_properties(node) - set(names):
+        raise CQL2Error(f"Unknown queryables: {', '.join(sorted(unknown))}.")
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_cached(filter_lang: str, value: str) -> Any:
+    if filter_lang == "cql2-text":
+        return parse_cql2_text(value)
+
+    return parse_cql2_json(value)
+
+
+def parse_filter(
+    value: Any,
+    filter_lang: Optional[str] = None,
+    queryables: Any = None,
+) -> Any:
+    """Parse a filter, memoizing the parsed expressions.
+
+    Args:
+        value: the filter, a cql2-text string or a cql2-json expression (dictionary
+            or JSON string).
+        filter_lang: `cql2-text` or `cql2-json`. When None, strings are parsed as
+            cql2-text. Dictionaries are always parsed as cql2-json.
+        queryables: if set, the queryables the expression is validated against (see
+            `validate_queryables`).
+
+    Returns:
+        The parsed expression (None if `value` is None).
+
+    Raises:
+        CQL2Error: if the filter is invalid.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        node = _parse_cached(filter_lang or "cql2-text", value)
+    else:
+        key = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+        node = _parse_cached("cql2-json", key)
+
+    if queryables is not None:
+        validate_queryables(node, queryables)
+
+    return node
@@ -2,10 +2,11 @@
 """Filter Extension."""
 
 from enum import Enum
-from typing import List, Type, Union
+from typing import Any, List, Optional, Type, Union
 
 import attr
 from fastapi import APIRouter, FastAPI
+from pydantic import BaseModel
 from starlette.responses import Response
 
 from stac_fastapi.api.models import CollectionUri, EmptyRequest, JSONSchemaResponse
@@ -13,7 +14,13 @@ from stac_fastapi.api.routes import create_async_endpoint
 from stac_fastapi.types.extension import ApiExtension
 
 from .client import AsyncBaseFiltersClient, BaseFiltersClient
-from .request import FilterExtensionGetRequest, FilterExtensionPostRequest
+from .request import (
+    CQL2FilterExtensionGetRequest,
+    CQL2FilterExtensionPostRequest,
+    FilterExtensionGetRequest,
+    FilterExtensionPostRequest,
+    create_cql2_request_models,
+)
 
 
 class FilterConformanceClasses(str, Enum):
@@ -63,6 +70,13 @@ class FilterExtension(ApiExtension):
     Attributes:
         client: Queryables endpoint logic
         conformance_classes: Conformance classes provided by the extension
+        validate_filter: Parse the cql2-text and cql2-json filters in the search
+            request models, so that invalid filters are rejected (`400`) before
+            the backend is called. The parsed filters are memoized, the backends
+            can get them with `stac_fastapi.extensions.core.filter.cql2.parse_filter`.
+        queryables: The queryables JSON Schema or the names of the queryables. With
+            `validate_filter`, the filters using unknown queryables are rejected
+            (`400`) too.
     """
 
     GET = FilterExtensionGetRequest
@@ -83,6 +97,22 @@ class FilterExtension(ApiExtension):
     )
     router: APIRouter = attr.ib(factory=APIRouter)
     response_class: Type[Response] = attr.ib(default=JSONSchemaResponse)
+    validate_filter: bool = attr.ib(default=False)
+    queryables: Optional[Any] = attr.ib(default=None)
+
+    def get_request_model(self, verb: Optional[str] = "GET") -> Optional[BaseModel]:
+        """Return the request model for the extension.method.
+
+        The model can differ based on HTTP verb
+        """
+        if self.validate_filter:
+            models = (CQL2FilterExtensionGetRequest, CQL2FilterExtensionPostRequest)
+            if self.queryables is not None:
+                models = create_cql2_request_models(self.queryables)
+
+            return dict(zip(("GET", "POST"), models)).get(verb)
+
+        return super().get_request_model(verb)
 
     def register(self, app: FastAPI) -> None:
         """Register the extension with a FastAPI application.
@@ -0,0 +1,483 @@
+"""Compilation of CQL2 expressions to Python predicates over items."""
+
+import datetime as dt
+import functools
+import operator
+import re
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from stac_fastapi.types.geometry import Box, boxes_intersect, geometry_bbox, to_box
+from stac_fastapi.types.rfc3339 import rfc3339_str_to_datetime
+
+from .cql2 import (
+    Array,
+    BBox,
+    CQL2Error,
+    Date,
+    Function,
+    Geometry,
+    Interval,
+    Operation,
+    Property,
+    Timestamp,
+    parse_filter,
+)
+
+Getter = Callable[[Dict[str, Any]], Any]
+Predicate = Callable[[Dict[str, Any]], bool]
+
+# Item fields which are not in `properties`
+TOP_LEVEL_FIELDS = {"id", "collection", "geometry", "bbox", "type", "stac_version"}
+
+_COMPARISONS = {
+    "=": operator.eq,
+    "<>": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_ARITHMETIC = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod,
+    "div": operator.floordiv,
+    "^": operator.pow,
+}
+_ARRAYS = {
+    "a_equals": lambda a, b: a == b,
+    "a_contains": lambda a, b: a >= b,
+    "a_containedBy": lambda a, b: a <= b,
+    "a_overlaps": lambda a, b: not a.isdisjoint(b),
+}
+_TEMPORAL = {
+    "t_intersects": lambda a, b: a[0] <= b[1] and b[0] <= a[1],
+    "t_disjoint": lambda a, b: a[1] < b[0] or b[1] < a[0],
+    "t_before": lambda a, b: a[1] < b[0],
+    "t_after": lambda a, b: a[0] > b[1],
+    "t_equals": lambda a, b: a == b,
+    "t_during": lambda a, b: b[0] < a[0] and a[1] < b[1],
+    "t_contains": lambda a, b: a[0] < b[0] and b[1] < a[1],
+}
+_MIN_DATETIME = dt.datetime.min.replace(tzinfo=dt.timezone.utc)
+_MAX_DATETIME = dt.datetime.max.replace(tzinfo=dt.timezone.utc)
+
+
+def _get_property(name: str) -> Getter:
+    if name in TOP_LEVEL_FIELDS:
+        return lambda item: item.get(name)
+
+    key = name[11:] if name.startswith("properties.") else name
+    return lambda item: (item.get("properties") or {}).get(key)
+
+
+def _to_datetime(value: Any) -> Any:
+    if isinstance(value, str):
+        try:
+            return rfc3339_str_to_datetime(value)
+        except ValueError:
+            return None
+
+    if isinstance(value, dt.date) and not isinstance(value, dt.datetime):
+        return dt.datetime.combine(value, dt.time(), tzinfo=dt.timezone.utc)
+
+    return value
+
+
+def _constant(value: Any) -> Getter:
+    return lambda item: value
+
+
+def _is_temporal(node: Any) -> bool:
+    return isinstance(node, (Timestamp, Date))
+
+
+def _compile_array_value(node: Array) -> Getter:
+    getters = [_compile_value(item) for item in node.items]
+    return lambda item: [getter(item) for getter in getters]
+
+
+def _compile_operation_value(node: Operation) -> Getter:
+    if node.op in ("casei", "accenti"):
+        return _compile_case(node)
+
+    if node.op in _ARITHMETIC:
+        return _compile_arithmetic(node)
+
+    return _compile_predicate(node)
+
+
+def _compile_value(node: Any) -> Getter:
+    """Compile an expression returning a value."""
+    compiler = _VALUE_COMPILERS.get(type(node))
+    if compiler is not None:
+        return compiler(node)
+
+    if isinstance(node, (Function, Interval)):
+        raise CQL2Error(f"`{type(node).__name__}` is not supported in this context.")
+
+    return _constant(node)
+
+
+def _compile_case(node: Operation) -> Getter:
+    getter = _compile_value(node.args[0])
+    if node.op == "casei":
+        return lambda item: _map_str(getter(item), str.casefold)
+
+    return lambda item: _map_str(getter(item), _strip_accents)
+
+
+def _map_str(value: Any, func: Callable[[str], str]) -> Any:
+    return func(value) if isinstance(value, str) else value
+
+
+def _strip_accents(value: str) -> str:
+    return "".join(
+        char
+        for char in unicodedata.normalize("NFD", value)
+        if unicodedata.category(char) != "Mn"
+    )
+
+
+def _compile_arithmetic(node: Operation) -> Getter:
+    func = _ARITHMETIC[node.op]
+    left, right = (_compile_value(arg) for arg in node.args)
+
+    def _arithmetic(item):
+        a, b = left(item), right(item)
+        if a is None or b is None:
+            return None
+
+        try:
+            return func(a, b)
+        except (TypeError, ZeroDivisionError):
+            return None
+
+    return _arithmetic
+
+
+def _compile_operands(args: Iterable[Any]) -> List[Getter]:
+    """Compile the operands of a comparison, as datetimes if one is temporal."""
+    args = list(args)
+    getters = [_compile_value(arg) for arg in args]
+    if any(_is_temporal(arg) for arg in args):
+        getters = [
+            getter if _is_temporal(arg) else _datetime_getter(getter)
+            for arg, getter in zip(args, getters)
+        ]
+
+    return getters
+
+
+def _datetime_getter(getter: Getter) -> Getter:
+    return lambda item: _to_datetime(getter(item))
+
+
+def _compile_comparison(node: Operation) -> Predicate:
+    func = _COMPARISONS[node.op]
+    left, right = _compile_operands(node.args)
+
+    def _comparison(item):
+        a, b = left(item), right(item)
+        if a is None or b is None:
+            return False
+
+        try:
+            return func(a, b)
+        except TypeError:
+            return False
+
+    return _comparison
+
+
+def _compile_between(node: Operation) -> Predicate:
+    value, low, high = _compile_operands(node.args)
+
+    def _between(item):
+        v, lo, hi = value(item), low(item), high(item)
+        if v is None or lo is None or hi is None:
+            return False
+
+        try:
+            return lo <= v <= hi
+        except TypeError:
+            return False
+
+    return _between
+
+
+def like_to_regex(pattern: str) -> "re.Pattern[str]":
+    """Convert a CQL2 `like` pattern (`%`, `_` wildcards, `\\` escape) to a regex."""
+    regex = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            regex.append(re.escape(char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "%":
+            regex.append(".*")
+        elif char == "_":
+            regex.append(".")
+        else:
+            regex.append(re.escape(char))
+
+    return re.compile("".join(regex), re.DOTALL)
+
+
+def _match(regex: "re.Pattern[str]", value: Any) -> bool:
+    return isinstance(value, str) and regex.fullmatch(value) is not None
+
+
+def _compile_like(node: Operation) -> Predicate:
+    value, pattern = (_compile_value(arg) for arg in node.args)
+    if isinstance(node.args[1], str):
+        regex = like_to_regex(node.args[1])
+        return lambda item: _match(regex, value(item))
+
+    def _like(item):
+        p = pattern(item)
+        return isinstance(p, str) and _match(like_to_regex(p), value(item))
+
+    return _like
+
+
+def _compile_in(node: Operation) -> Predicate:
+    value = _compile_value(node.args[0])
+    items = node.args[1].items if isinstance(node.args[1], Array) else None
+    if items is None:
+        raise CQL2Error("The second argument of `in` must be a list.")
+
+    if all(isinstance(v, (str, int, float, bool)) for v in items):
+        constants = frozenset(items)
+
+        def _in_constants(item):
+            v = value(item)
+            return isinstance(v, (str, int, float)) and v in constants
+
+        return _in_constants
+
+    getter = _compile_value(node.args[1])
+    return lambda item: value(item) in getter(item)
+
+
+def _compile_array(node: Operation) -> Predicate:
+    func = _ARRAYS[node.op]
+    left, right = (_compile_value(arg) for arg in node.args)
+
+    def _array(item):
+        a, b = left(item), right(item)
+        if not isinstance(a, (list, tuple)) or not isinstance(b, (list, tuple)):
+            return False
+
+        try:
+            return func(set(a), set(b))
+        except TypeError:
+            return False
+
+    return _array
+
+
+def _get_bbox(node: Any) -> Optional[Box]:
+    if isinstance(node, BBox):
+        return to_box(node.value)
+
+    return geometry_bbox(node.value)
+
+
+def _compile_bbox(node: Any) -> Callable[[Dict[str, Any]], Any]:
+    if isinstance(node, Property) and node.name == "geometry":
+        # the item bbox, if any, is cheaper than walking the geometry
+        return lambda item: to_box(item.get("bbox")) or geometry_bbox(
+            item.get("geometry")
+        )
+
+    if isinstance(node, (BBox, Geometry)):
+        return _constant(_get_bbox(node))
+
+    getter = _compile_value(node)
+    return lambda item: _get_value_bbox(getter(item))
+
+
+def _get_value_bbox(value: Any) -> Optional[Box]:
+    if isinstance(value, dict):
+        return geometry_bbox(value)
+
+    return to_box(value) if isinstance(value, (list, tuple)) else None
+
+
+def _compile_intersects(node: Operation) -> Predicate:
+    """Compile `s_intersects`, tested on the bounding boxes of the geometries.
+
+    Bounding boxes crossing the antimeridian (`minx > maxx`) are supported.
+    """
+    left, right = (_compile_bbox(arg) for arg in node.args)
+
+    def _intersects(item):
+        a, b = left(item), right(item)
+        if a is None or b is None:
+            return False
+
+        return boxes_intersect(a, b)
+
+    return _intersects
+
+
+def _compile_interval(node: Any) -> Callable[[Dict[str, Any]], Any]:
+    if isinstance(node, Interval):
+        start, end = (
+            _datetime_getter(_compile_value(bound))
+            if bound is not None
+            else _constant(default)
+            for bound, default in ((node.start, _MIN_DATETIME), (node.end, _MAX_DATETIME))
+        )
+        return lambda item: (start(item), end(item))
+
+    if isinstance(node, Property) and node.name == "datetime":
+        # items with a range use `start_datetime` and `end_datetime`
+        def _item_interval(item):
+            properties = item.get("properties") or {}
+            start = _to_datetime(
+                properties.get("start_datetime") or properties.get("datetime")
+            )
+            end = _to_datetime(
+                properties.get("end_datetime") or properties.get("datetime")
+            )
+            return (start, end)
+
+        return _item_interval
+
+    getter = _datetime_getter(_compile_value(node))
+
+    def _instant(item):
+        value = getter(item)
+        return (value, value)
+
+    return _instant
+
+
+def _compile_temporal(node: Operation) -> Predicate:
+    func = _TEMPORAL[node.op]
+    left, right = (_compile_interval(arg) for arg in node.args)
+
+    def _temporal(item):
+        a, b = left(item), right(item)
+        if None in a or None in b:
+            return False
+
+        try:
+            return func(a, b)
+        except TypeError:
+            return False
+
+    return _temporal
+
+
+def _compile_logical(node: Operation) -> Predicate:
+    predicates = [_compile_predicate(arg) for arg in node.args]
+    if node.op == "not":
+        (predicate,) = predicates
+        return lambda item: not predicate(item)
+
+    if node.op == "and":
+        if len(predicates) == 2:
+            first, second = predicates
+            return lambda item: first(item) and second(item)
+
+        return lambda item: all(predicate(item) for predicate in predicates)
+
+    if len(predicates) == 2:
+        first, second = predicates
+        return lambda item: first(item) or second(item)
+
+    return lambda item: any(predicate(item) for predicate in predicates)
+
+
+def _compile_is_null(node: Operation) -> Predicate:
+    value = _compile_value(node.args[0])
+    return lambda item: value(item) is None
+
+
+_VALUE_COMPILERS: Dict[type, Callable[[Any], Getter]] = {
+    Property: lambda node: _get_property(node.name),
+    Timestamp: lambda node: _constant(node.value),
+    Date: lambda node: _constant(_to_datetime(node.value)),
+    Array: _compile_array_value,
+    BBox: lambda node: _constant(_get_bbox(node)),
+    Geometry: lambda node: _constant(_get_bbox(node)),
+    Operation: _compile_operation_value,
+}
+
+_COMPILERS: Dict[str, Callable[[Operation], Predicate]] = {
+    "and": _compile_logical,
+    "or": _compile_logical,
+    "not": _compile_logical,
+    "like": _compile_like,
+    "between": _compile_between,
+    "in": _compile_in,
+    "isNull": _compile_is_null,
+    "s_intersects": _compile_intersects,
+    **{op: _compile_comparison for op in _COMPARISONS},
+    **{op: _compile_array for op in _ARRAYS},
+    **{op: _compile_temporal for op in _TEMPORAL},
+}
+
+
+def _compile_predicate(node: Any) -> Predicate:
+    """Compile an expression returning a boolean."""
+    if isinstance(node, bool):
+        return _constant(node)
+
+    if isinstance(node, Operation):
+        compiler = _COMPILERS.get(node.op)
+        if compiler is None:
+            raise CQL2Error(f"`{node.op}` is not supported.")
+
+        return compiler(node)
+
+    if isinstance(node, Property):
+        getter = _get_property(node.name)
+        return lambda item: getter(item) is True
+
+    raise CQL2Error(f"`{node!r}` is not a boolean expression.")
+
+
+@functools.lru_cache(maxsize=256)
+def compile_expression(expression: Any) -> Predicate:
+    """Compile a CQL2 expression (see `stac_fastapi.extensions.core.filter.cql2`).
+
+    The compiled predicates (plans) are cached by expression.
+
+    Args:
+        expression: the CQL2 expression.
+
+    Returns:
+        A function returning True for the items (dictionaries) matching the
+        expression.
+
+    Raises:
+        CQL2Error: if the expression uses unsupported operators or functions.
+    """
+    return _compile_predicate(expression)
+
+
+def compile_filter(value: Any, filter_lang: Optional[str] = None) -> Predicate:
+    """Parse and compile a filter (see `parse_filter` and `compile_expression`)."""
+    if value is None:
+        return _constant(True)
+
+    return compile_expression(parse_filter(value, filter_lang))
+
+
+def filter_items(
+    items: Iterable[Dict[str, Any]],
+    value: Any,
+    filter_lang: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Return the items matching a filter."""
+    predicate = compile_filter(value, filter_lang)
+    return [item for item in items if predicate(item)]
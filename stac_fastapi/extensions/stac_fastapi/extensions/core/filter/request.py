@@ -1,17 +1,45 @@
 """Filter extension request models."""
 
-from typing import Any, Dict, Literal, Optional
+import functools
+from typing import Any, Dict, Literal, Optional, Tuple, Type
 
 import attr
 from fastapi import Query
-from pydantic import BaseModel, Field
+from pydantic import AfterValidator, BaseModel, Field, ValidationInfo
 from typing_extensions import Annotated
 
 from stac_fastapi.types.search import APIRequest
 
+from .cql2 import parse_filter
+
 FilterLang = Literal["cql-json", "cql2-json", "cql2-text"]
 
 
+def _validate_filter(
+    value: Any, filter_lang: Optional[str], queryables: Any = None
+) -> None:
+    """Parse a CQL2 filter, raising a `CQL2Error` if invalid.
+
+    The parsed filters are memoized, so the backends get them for free with
+    `stac_fastapi.extensions.core.filter.cql2.parse_filter`.
+    """
+    if value is not None and filter_lang != "cql-json":
+        parse_filter(value, filter_lang, queryables=queryables)
+
+
+def _validate_get_filter_lang(
+    instance: Any, attribute: Any, value: Any, queryables: Any = None
+) -> None:
+    _validate_filter(instance.filter, value, queryables)
+
+
+def _validate_post_filter_lang(
+    value: Any, info: ValidationInfo, queryables: Any = None
+) -> Any:
+    _validate_filter(info.data.get("filter"), value, queryables)
+    return value
+
+
 @attr.s
 class FilterExtensionGetRequest(APIRequest):
     """Filter extension GET request model."""
@@ -75,3 +103,70 @@ class FilterExtensionPostRequest(BaseModel):
         default="cql2-json",
         description="The CQL filter encoding that the 'filter' value uses.",
     )
+
+
+@attr.s
+class CQL2FilterExtensionGetRequest(FilterExtensionGetRequest):
+    """Filter extension GET request model, rejecting invalid CQL2 filters."""
+
+    filter_lang: Annotated[
+        Optional[FilterLang],
+        Query(
+            alias="filter-lang",
+            description="The CQL filter encoding that the 'filter' value uses.",
+        ),
+    ] = attr.ib(default="cql2-text", validator=_validate_get_filter_lang)
+
+
+class CQL2FilterExtensionPostRequest(FilterExtensionPostRequest):
+    """Filter extension POST request model, rejecting invalid CQL2 filters.
+
+    JSON objects are parsed as cql2-json, whatever the `filter-lang`.
+    """
+
+    filter_lang: Annotated[
+        Optional[FilterLang], AfterValidator(_validate_post_filter_lang)
+    ] = Field(
+        alias="filter-lang",
+        default="cql2-json",
+        validate_default=True,
+        description="The CQL filter encoding that the 'filter' value uses.",
+    )
+
+
+def create_cql2_request_models(
+    queryables: Any,
+) -> Tuple[Type[CQL2FilterExtensionGetRequest], Type[CQL2FilterExtensionPostRequest]]:
+    """Create the CQL2 filter request models, also rejecting unknown queryables.
+
+    Args:
+        queryables: the queryables JSON Schema or the names of the queryables (see
+            `stac_fastapi.extensions.core.filter.cql2.validate_queryables`).
+
+    Returns:
+        The GET and POST request models.
+    """
+    validate_get = functools.partial(_validate_get_filter_lang, queryables=queryables)
+    validate_post = functools.partial(_validate_post_filter_lang, queryables=queryables)
+
+    @attr.s
+    class GetRequest(CQL2FilterExtensionGetRequest):
+        filter_lang: Annotated[
+            Optional[FilterLang],
+            Query(
+                alias="filter-lang",
+                description="The CQL filter encoding that the 'filter' value uses.",
+            ),
+        ] = attr.ib(default="cql2-text", validator=validate_get)
+
+    class PostRequest(CQL2FilterExtensionPostRequest):
+        filter_lang: Annotated[Optional[FilterLang], AfterValidator(validate_post)] = (
+            Field(
+                alias="filter-lang",
+                default="cql2-json",
+                validate_default=True,
+                description="The CQL filter encoding that the 'filter' value uses.",
+            )
+        )
+
+    return GetRequest, PostRequest
@@ -1,19 +1,24 @@
 """Transaction extension."""
 
-from typing import List, Optional, Type, Union
+import functools
+import inspect
+from typing import Any, Callable, List, Optional, Type, Union
 
 import attr
-from fastapi import APIRouter, Body, FastAPI
+from fastapi import APIRouter, Body, FastAPI, Request
 from stac_pydantic import Collection, Item, ItemCollection
 from stac_pydantic.shared import MimeTypes
 from starlette.responses import JSONResponse, Response
 from typing_extensions import Annotated
 
+from stac_fastapi.api.coalescing import ItemWriteCoalescer
 from stac_fastapi.api.models import CollectionUri, ItemUri
-from stac_fastapi.api.routes import create_async_endpoint
+from stac_fastapi.api.routes import create_async_endpoint, sync_to_async
 from stac_fastapi.types.config import ApiSettings
 from stac_fastapi.types.core import AsyncBaseTransactionsClient, BaseTransactionsClient
+from stac_fastapi.types.errors import InvalidItemError
 from stac_fastapi.types.extension import ApiExtension
+from stac_fastapi.types.item_validation import ItemValidator
 
 
 @attr.s
@@ -55,6 +60,12 @@ class TransactionExtension(ApiExtension):
 
     Attributes:
         client: CRUD application logic
+        validator: additional validation of the created and updated items (e.g.
+            bbox consistency and closed rings), the invalid items being rejected
+            with a 400 error listing the errors of each item.
+        write_coalescer: coalescer of the concurrent creations of single items
+            into `create_items` calls of the client (see
+            `stac_fastapi.api.coalescing.ItemWriteCoalescer`).
 
     """
 
@@ -69,6 +80,81 @@ class TransactionExtension(ApiExtension):
     schema_href: Optional[str] = attr.ib(default=None)
     router: APIRouter = attr.ib(factory=APIRouter)
     response_class: Type[Response] = attr.ib(default=JSONResponse)
+    validator: Optional[ItemValidator] = attr.ib(default=None)
+    write_coalescer: Optional[ItemWriteCoalescer] = attr.ib(default=None)
+
+    def _validated(self, func: Callable) -> Callable:
+        """Validate the `item` of the client method calls with `validator`."""
+        if self.validator is None:
+            return func
+
+        validator = self.validator
+        if not inspect.iscoroutinefunction(func):
+            func = sync_to_async(func)
+
+        @functools.wraps(func)
+        async def _func(*args, item: Any, **kwargs):
+            features = item.features if isinstance(item, ItemCollection) else [item]
+            invalid = await validator.validate_async(
+                [
+                    feature.model_dump(mode="json", exclude_unset=True)
+                    for feature in features
+                ]
+            )
+            if invalid:
+                raise InvalidItemError(
+                    "Invalid items: "
+                    + "; ".join(
+                        f"{key}: {', '.join(errors)}" for key, errors in invalid.items()
+                    )
+                )
+
+            return await func(*args, item=item, **kwargs)
+
+        return _func
+
+    def _coalesced(self, func: Callable) -> Callable:
+        """Create the single items of the client method calls with `write_coalescer`."""
+        if self.write_coalescer is None:
+            return func
+
+        coalescer = self.write_coalescer
+        create_items = self.client.create_items
+        if not inspect.iscoroutinefunction(func):
+            func = sync_to_async(func)
+            create_items = sync_to_async(create_items)
+
+        @functools.wraps(func)
+        async def _func(*args, collection_id: str, item: Any, request: Request, **kwargs):
+            create = functools.partial(
+                func,
+                *args,
+                collection_id=collection_id,
+                item=item,
+                request=request,
+                **kwargs,
+            )
+            if isinstance(item, ItemCollection):
+                return await create()
+
+            # the other arguments are part of the key, shared by the batch
+            async def create_batch(
+                items: List[Item], requests: List[Request]
+            ) -> List[Any]:
+                return await create_items(
+                    collection_id=collection_id, items=items, requests=requests, **kwargs
+                )
+
+            return await coalescer.create_item(
+                coalescer.make_key(request, collection_id, kwargs),
+                item.id,
+                item,
+                request,
+                create,
+                create_batch,
+            )
+
+        return _func
 
     def register_create_item(self):
         """Register create item endpoint (POST /collections/{collection_id}/items)."""
@@ -89,7 +175,9 @@ class TransactionExtension(ApiExtension):
             response_model_exclude_unset=True,
             response_model_exclude_none=True,
             methods=["POST"],
-            endpoint=create_async_endpoint(self.client.create_item, PostItem),
+            endpoint=create_async_endpoint(
+                self._validated(self._coalesced(self.client.create_item)), PostItem
+            ),
         )
 
     def register_update_item(self):
@@ -111,7 +199,9 @@ class TransactionExtension(ApiExtension):
             response_model_exclude_unset=True,
             response_model_exclude_none=True,
             methods=["PUT"],
-            endpoint=create_async_endpoint(self.client.update_item, PutItem),
+            endpoint=create_async_endpoint(
+                self._validated(self.client.update_item), PutItem
+            ),
         )
 
     def register_delete_item(self):
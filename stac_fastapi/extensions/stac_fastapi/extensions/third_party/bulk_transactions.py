@@ -1,16 +1,63 @@
 """Bulk transactions extension."""
 
 import abc
+import functools
+import inspect
+import tempfile
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
-
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+import anyio
 import attr
-from fastapi import APIRouter, FastAPI
+from fastapi import APIRouter, FastAPI, Path, Query, Request
+from fastapi.routing import APIRoute
 from pydantic import BaseModel
+from starlette.routing import Match
+from starlette.types import Scope
+from typing_extensions import Annotated
 
-from stac_fastapi.api.models import create_request_model
-from stac_fastapi.api.routes import create_async_endpoint
+from stac_fastapi.api.models import create_request_model, json_loads
+from stac_fastapi.api.routes import create_async_endpoint, sync_to_async
+from stac_fastapi.types.errors import InvalidItemError, PayloadTooLargeError
 from stac_fastapi.types.extension import ApiExtension
+from stac_fastapi.types.item_validation import ItemValidator
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    from stac_fastapi.api.geoparquet import row_to_item
+except ImportError:  # pragma: nocover
+    pa = pq = row_to_item = None
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson")
+PARQUET_MEDIA_TYPES = ("application/vnd.apache.parquet", "application/x-parquet")
+
+# maximum size of the lines (items) of the NDJSON uploads
+NDJSON_MAX_LINE_SIZE = 16 * 1024 * 1024
+# maximum number of items of the chunks of the streamed uploads
+MAX_CHUNK_SIZE = 10_000
+
+# size of the GeoParquet uploads kept in memory (larger ones are written to disk)
+PARQUET_SPOOL_SIZE = 64 * 1024 * 1024
+# maximum size of the GeoParquet uploads
+PARQUET_MAX_SIZE = 1024 * 1024 * 1024
+# size of the blocks of the GeoParquet uploads written to the temporary file
+PARQUET_WRITE_SIZE = 1024 * 1024
 
 
 class BulkTransactionMethod(str, Enum):
@@ -31,6 +78,368 @@ class Items(BaseModel):
         return iter(self.items.values())
 
 
+class BulkChunkReport(BaseModel):
+    """Outcome of the insertion of a chunk of items."""
+
+    chunk: int
+    success: int = 0
+    errors: int = 0
+    retries: int = 0
+    messages: List[str] = []
+    invalid: Dict[str, List[str]] = {}
+
+
+class BulkItemsReport(BaseModel):
+    """Outcome of a streamed bulk insertion, per chunk of items."""
+
+    success: int = 0
+    errors: int = 0
+    chunks: List[BulkChunkReport] = []
+
+    def add(self, chunk: BulkChunkReport) -> None:
+        """Add the report of a chunk."""
+        self.chunks.append(chunk)
+        self.success += chunk.success
+        self.errors += chunk.errors
+
+
+@attr.s
+class ItemsChunk:
+    """A chunk of items parsed from a streamed upload.
+
+    Attributes:
+        index: position of the chunk in the upload.
+        items: the items of the chunk.
+        errors: errors of the lines of the chunk which are not valid items.
+    """
+
+    index: int = attr.ib()
+    items: Items = attr.ib()
+    errors: List[str] = attr.ib(factory=list)
+
+
+async def iter_lines(
+    stream: AsyncIterable[bytes], max_line_size: Optional[int] = None
+) -> AsyncIterator[Optional[bytes]]:
+    """Split a stream of bytes in lines.
+
+    Lines longer than `max_line_size` bytes (if set) are not buffered: they are
+    skipped up to the next newline and yielded as None.
+    """
+    limit = max_line_size if max_line_size is not None else float("inf")
+    # None once the pending line is longer than the limit
+    pending: Optional[List[bytes]] = []
+    size = 0
+    async for data in stream:
+        lines = data.split(b"\n")
+        for line in lines[:-1]:
+            if pending is None or size + len(line) > limit:
+                yield None
+            else:
+                yield b"".join(pending + [line])
+
+            pending = []
+            size = 0
+
+        size += len(lines[-1])
+        if pending is not None and size > limit:
+            pending = None
+        elif pending is not None:
+            pending.append(lines[-1])
+
+    if pending is None:
+        yield None
+    elif pending:
+        yield b"".join(pending)
+
+
+def _parse_item(line: bytes) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    try:
+        item = json_loads(line)
+    except ValueError as e:
+        return None, f"invalid JSON ({e})"
+
+    if not isinstance(item, dict) or not isinstance(item.get("id"), str):
+        return None, "not an item with an id"
+
+    return item, None
+
+
+async def iter_item_chunks(
+    stream: AsyncIterable[bytes],
+    chunk_size: int,
+    method: Optional[BulkTransactionMethod] = None,
+    max_line_size: Optional[int] = NDJSON_MAX_LINE_SIZE,
+) -> AsyncIterator[ItemsChunk]:
+    """Parse a stream of newline delimited items in chunks of `chunk_size` lines.
+
+    Like `BaseBulkTransactionsClient._chunks`, all the chunks have `chunk_size`
+    lines but the last one (blank lines are ignored). Only one chunk is in memory
+    at a time. Lines longer than `max_line_size` bytes (if set) are reported as
+    errors.
+    """
+    method = method or BulkTransactionMethod.INSERT
+    index = 0
+    lines = 0
+    items: Dict[str, Any] = {}
+    errors: List[str] = []
+    line_number = 0
+    async for line in iter_lines(stream, max_line_size):
+        line_number += 1
+        if line is None:
+            item, error = None, f"line longer than {max_line_size} bytes"
+        elif not line.strip():
+            continue
+        else:
+            item, error = _parse_item(line)
+
+        if item is not None and item["id"] in items:
+            error = f"duplicate item {item['id']}"
+
+        if error is not None:
+            errors.append(f"line {line_number}: {error}")
+        else:
+            items[item["id"]] = item
+
+        lines += 1
+        if lines == chunk_size:
+            yield ItemsChunk(index, Items(items=items, method=method), errors)
+            index += 1
+            lines = 0
+            items = {}
+            errors = []
+
+    if lines:
+        yield ItemsChunk(index, Items(items=items, method=method), errors)
+
+
+def _parquet_chunks(
+    file: Any, chunk_size: int, method: BulkTransactionMethod
+) -> Iterator[ItemsChunk]:
+    try:
+        parquet = pq.ParquetFile(file)
+    except (pa.ArrowInvalid, OSError) as e:
+        raise InvalidItemError(f"Invalid GeoParquet upload: {e}") from e
+
+    row_number = 0
+    for index, batch in enumerate(parquet.iter_batches(batch_size=chunk_size)):
+        items: Dict[str, Any] = {}
+        errors: List[str] = []
+        for row in batch.to_pylist():
+            row_number += 1
+            try:
+                item = row_to_item(row)
+            except (TypeError, ValueError) as e:
+                errors.append(f"row {row_number}: {e}")
+                continue
+
+            if not isinstance(item.get("id"), str):
+                errors.append(f"row {row_number}: not an item with an id")
+            elif item["id"] in items:
+                errors.append(f"row {row_number}: duplicate item {item['id']}")
+            else:
+                items[item["id"]] = item
+
+        yield ItemsChunk(index, Items(items=items, method=method), errors)
+
+
+async def _spool(
+    stream: AsyncIterable[bytes], file: Any, max_size: Optional[int]
+) -> None:
+    size = 0
+    buffer = bytearray()
+    async for data in stream:
+        size += len(data)
+        if max_size is not None and size > max_size:
+            raise PayloadTooLargeError(
+                f"GeoParquet uploads are limited to {max_size} bytes"
+            )
+
+        buffer += data
+        if len(buffer) >= PARQUET_WRITE_SIZE:
+            await anyio.to_thread.run_sync(file.write, bytes(buffer))
+            buffer.clear()
+
+    if buffer:
+        await anyio.to_thread.run_sync(file.write, bytes(buffer))
+
+
+async def iter_parquet_item_chunks(
+    stream: AsyncIterable[bytes],
+    chunk_size: int,
+    method: Optional[BulkTransactionMethod] = None,
+    spool_size: int = PARQUET_SPOOL_SIZE,
+    max_size: Optional[int] = PARQUET_MAX_SIZE,
+) -> AsyncIterator[ItemsChunk]:
+    """Read a stac-geoparquet upload in chunks of up to `chunk_size` rows.
+
+    Parquet files can only be read once complete (the metadata is at the end), so
+    the upload is first written to a temporary file (in memory up to `spool_size`
+    bytes) in blocks, from a worker thread, then read one record batch at a time
+    in a worker thread. Uploads larger than `max_size` bytes (if set) are rejected
+    with a `PayloadTooLargeError`.
+
+    Requires the `geoparquet` extra.
+    """
+    method = method or BulkTransactionMethod.INSERT
+    with tempfile.SpooledTemporaryFile(max_size=spool_size) as file:
+        await _spool(stream, file, max_size)
+        file.seek(0)
+        chunks = _parquet_chunks(file, chunk_size, method)
+        while True:
+            chunk = await anyio.to_thread.run_sync(next, chunks, None)
+            if chunk is None:
+                break
+
+            yield chunk
+
+
+def _chunks(lst, n):
+    for i in range(0, len(lst), n):
+        yield lst[i : i + n]
+
+
+def split_items(items: Items, chunk_size: int) -> Iterator[ItemsChunk]:
+    """Split items in chunks of `chunk_size` items (see `_chunks`)."""
+    for index, ids in enumerate(_chunks(list(items.items), chunk_size)):
+        chunk = {id: items.items[id] for id in ids}
+        yield ItemsChunk(index, Items(items=chunk, method=items.method))
+
+
+async def _aiter(iterable: Iterable[ItemsChunk]) -> AsyncIterator[ItemsChunk]:
+    for chunk in iterable:
+        yield chunk
+
+
+@attr.s
+class BulkInsertPipeline:
+    """Insert chunks of items concurrently, reporting the outcome of each chunk.
+
+    Up to `concurrency` chunks are inserted at the same time. The next chunk is
+    only pulled from the source (e.g. parsed from a streamed upload) once an
+    insertion slot is free, so at most `concurrency` chunks are held in memory.
+    A chunk whose insertion fails with one of the `retry_on` (transient) errors
+    is retried up to `retries` times (waiting `retry_delay` seconds, doubled after
+    each attempt), then counted as errors; other errors fail the chunk at once.
+    The other chunks are still inserted.
+
+    With a `validator`, the items of each chunk are validated before being
+    inserted: the invalid items are reported (by id) and left out of the chunk.
+
+    Attributes:
+        concurrency: maximum number of concurrent insertions.
+        retries: maximum number of retries of a failed chunk.
+        retry_delay: delay (in seconds) before the first retry.
+        retry_on: the errors worth retrying a chunk for.
+        validator: validator of the items.
+    """
+
+    concurrency: int = attr.ib(default=1, validator=attr.validators.ge(1))
+    retries: int = attr.ib(default=0, validator=attr.validators.ge(0))
+    retry_delay: float = attr.ib(default=0.5)
+    retry_on: Tuple[Type[Exception], ...] = attr.ib(
+        default=(ConnectionError, TimeoutError)
+    )
+    validator: Optional[ItemValidator] = attr.ib(default=None)
+
+    async def _validate(self, chunk: ItemsChunk, report: BulkChunkReport) -> ItemsChunk:
+        invalid = await self.validator.validate_async(list(chunk.items.items.values()))
+        if not invalid:
+            return chunk
+
+        report.invalid = invalid
+        report.errors += len(invalid)
+        items = {id: item for id, item in chunk.items.items.items() if id not in invalid}
+        return ItemsChunk(
+            chunk.index, Items(items=items, method=chunk.items.method), chunk.errors
+        )
+
+    async def _insert(
+        self,
+        insert: Callable[[Items], Awaitable[Any]],
+        chunk: ItemsChunk,
+        report: BulkChunkReport,
+    ) -> None:
+        count = len(chunk.items.items)
+        for attempt in range(self.retries + 1):
+            try:
+                await insert(chunk.items)
+            except Exception as e:
+                if attempt == self.retries or not isinstance(e, self.retry_on):
+                    report.errors += count
+                    report.messages.append(f"{type(e).__name__}: {e}")
+                    return
+
+                report.retries += 1
+                await anyio.sleep(self.retry_delay * 2**attempt)
+            else:
+                report.success = count
+                return
+
+    async def _run_chunk(
+        self,
+        insert: Callable[[Items], Awaitable[Any]],
+        chunk: ItemsChunk,
+        report: BulkChunkReport,
+        semaphore: anyio.Semaphore,
+    ) -> None:
+        try:
+            if self.validator is not None:
+                chunk = await self._validate(chunk, report)
+
+            if chunk.items.items:
+                await self._insert(insert, chunk, report)
+        finally:
+            semaphore.release()
+
+    async def run(
+        self,
+        insert: Callable[[Items], Awaitable[Any]],
+        chunks: Union[Iterable[ItemsChunk], AsyncIterable[ItemsChunk]],
+    ) -> BulkItemsReport:
+        """Insert chunks of items.
+
+        Args:
+            insert: coroutine function inserting the items of a chunk.
+            chunks: chunks of items.
+
+        Returns:
+            The outcome of the insertion of each chunk, in the chunks order.
+        """
+        if not isinstance(chunks, AsyncIterable):
+            chunks = _aiter(chunks)
+
+        reports = []
+        semaphore = anyio.Semaphore(self.concurrency)
+        error = None
+        async with anyio.create_task_group() as tg:
+            try:
+                async for chunk in chunks:
+                    chunk_report = BulkChunkReport(
+                        chunk=chunk.index, errors=len(chunk.errors), messages=chunk.errors
+                    )
+                    reports.append(chunk_report)
+                    if not chunk.items.items:
+                        continue
+
+                    await semaphore.acquire()
+                    tg.start_soon(self._run_chunk, insert, chunk, chunk_report, semaphore)
+            except Exception as e:
+                # errors of the source (e.g. an unreadable upload) are raised as is,
+                # rather than in an exception group
+                error = e
+                tg.cancel_scope.cancel()
+
+        if error is not None:
+            raise error
+
+        report = BulkItemsReport()
+        for chunk_report in sorted(reports, key=lambda r: r.chunk):
+            report.add(chunk_report)
+
+        return report
+
+
 @attr.s  # type: ignore
 class BaseBulkTransactionsClient(abc.ABC):
     """BulkTransactionsClient."""
@@ -41,8 +450,7 @@ class BaseBulkTransactionsClient(abc.ABC):
 
         https://stackoverflow.com/questions/312443/how-do-you-split-a-list-into-evenly-sized-chunks
         """
-        for i in range(0, len(lst), n):
-            yield lst[i : i + n]
+        yield from _chunks(lst, n)
 
     @abc.abstractmethod
     def bulk_item_insert(
@@ -62,11 +470,62 @@ class BaseBulkTransactionsClient(abc.ABC):
         """
         raise NotImplementedError
 
+    async def bulk_item_insert_stream(
+        self,
+        chunks: Union[Iterable[ItemsChunk], AsyncIterable[ItemsChunk]],
+        pipeline: Optional[BulkInsertPipeline] = None,
+        **kwargs,
+    ) -> BulkItemsReport:
+        """Bulk creation of items in chunks (e.g. streamed NDJSON or GeoParquet uploads).
+
+        By default, `bulk_item_insert` is called for each chunk in a thread,
+        through `pipeline`.
+
+        Args:
+            chunks: chunks of items.
+            pipeline: insertion concurrency and retries (one chunk at a time, no
+                retry by default).
+
+        Returns:
+            The outcome of the insertion of each chunk.
+        """
+        insert = sync_to_async(self.bulk_item_insert)
+        return await (pipeline or BulkInsertPipeline()).run(
+            lambda items: insert(items, chunk_size=len(items.items), **kwargs),
+            chunks,
+        )
+
+    async def bulk_item_insert_chunked(
+        self,
+        items: Items,
+        chunk_size: int = 500,
+        pipeline: Optional[BulkInsertPipeline] = None,
+        **kwargs,
+    ) -> BulkItemsReport:
+        """Bulk creation of items in chunks of `chunk_size` items.
+
+        Args:
+            items: list of items.
+            chunk_size: number of items of the chunks.
+            pipeline: insertion concurrency and retries.
+
+        Returns:
+            The outcome of the insertion of each chunk.
+        """
+        return await self.bulk_item_insert_stream(
+            split_items(items, chunk_size), pipeline=pipeline, **kwargs
+        )
+
 
 @attr.s  # type: ignore
 class AsyncBaseBulkTransactionsClient(abc.ABC):
     """BulkTransactionsClient."""
 
+    @staticmethod
+    def _chunks(lst, n):
+        """Yield successive n-sized chunks from list."""
+        yield from _chunks(lst, n)
+
     @abc.abstractmethod
     async def bulk_item_insert(
         self,
@@ -83,6 +542,88 @@ class AsyncBaseBulkTransactionsClient(abc.ABC):
         """
         raise NotImplementedError
 
+    async def bulk_item_insert_stream(
+        self,
+        chunks: Union[Iterable[ItemsChunk], AsyncIterable[ItemsChunk]],
+        pipeline: Optional[BulkInsertPipeline] = None,
+        **kwargs,
+    ) -> BulkItemsReport:
+        """Bulk creation of items in chunks (e.g. streamed NDJSON or GeoParquet uploads).
+
+        By default, `bulk_item_insert` is called for each chunk, through
+        `pipeline`.
+
+        Args:
+            chunks: chunks of items.
+            pipeline: insertion concurrency and retries (one chunk at a time, no
+                retry by default).
+
+        Returns:
+            The outcome of the insertion of each chunk.
+        """
+        return await (pipeline or BulkInsertPipeline()).run(
+            lambda items: self.bulk_item_insert(items, **kwargs), chunks
+        )
+
+    async def bulk_item_insert_chunked(
+        self,
+        items: Items,
+        chunk_size: int = 500,
+        pipeline: Optional[BulkInsertPipeline] = None,
+        **kwargs,
+    ) -> BulkItemsReport:
+        """Bulk creation of items in chunks of `chunk_size` items.
+
+        The chunks are inserted concurrently (and retried) according to
+        `pipeline`.
+
+        Args:
+            items: list of items.
+            chunk_size: number of items of the chunks.
+            pipeline: insertion concurrency and retries.
+
+        Returns:
+            The outcome of the insertion of each chunk.
+        """
+        return await self.bulk_item_insert_stream(
+            split_items(items, chunk_size), pipeline=pipeline, **kwargs
+        )
+
+
+class MediaTypeRoute(APIRoute):
+    """Route which only matches requests with a body of one of `media_types`.
+
+    Registered before a JSON route with the same path, it lets both accept
+    different request bodies.
+    """
+
+    media_types: Tuple[str, ...] = ()
+
+    def matches(self, scope: Scope) -> Tuple[Match, Scope]:
+        """Match the path and method, then the Content-Type header."""
+        match, child_scope = super().matches(scope)
+        if match != Match.FULL or "headers" not in scope:
+            return match, child_scope
+
+        content_type = dict(scope["headers"]).get(b"content-type", b"")
+        media_type = content_type.split(b";")[0].strip().decode("latin-1").lower()
+        if media_type not in self.media_types:
+            return Match.NONE, {}
+
+        return match, child_scope
+
+
+class NDJSONRoute(MediaTypeRoute):
+    """Route which only matches requests with a newline delimited JSON body."""
+
+    media_types = NDJSON_MEDIA_TYPES
+
+
+class GeoParquetRoute(MediaTypeRoute):
+    """Route which only matches requests with a GeoParquet body."""
+
+    media_types = PARQUET_MEDIA_TYPES
+
 
 @attr.s
 class BulkTransactionExtension(ApiExtension):
@@ -108,11 +649,61 @@ class BulkTransactionExtension(ApiExtension):
             },
             "method": "insert"
         }
+
+    Large uploads can be streamed as newline delimited JSON (one item per line,
+    with the `application/x-ndjson` content type). The items are parsed
+    incrementally and handed to the client's `bulk_item_insert_stream` in chunks
+    of `chunk_size` items (`chunk_size` and `method` query parameters), and the
+    response reports the number of inserted and failed items of each chunk.
+    When the `geoparquet` extra is installed, stac-geoparquet files (with the
+    `application/vnd.apache.parquet` content type) are accepted as well, and read
+    in chunks of `chunk_size` rows.
+
+    When a `pipeline` is set, the chunks are inserted concurrently (and retried)
+    according to it, and JSON uploads are also inserted in chunks of `chunk_size`
+    items (with the client's `bulk_item_insert_chunked`), the response being a
+    `BulkItemsReport` instead of the client message.
+
+    Attributes:
+        chunk_size: default number of items of the chunks.
+        pipeline: concurrency and retries of the chunks insertion.
+        max_upload_size: maximum size (in bytes) of the GeoParquet uploads, larger
+            ones are rejected with a 413 error (no limit if None).
+        max_line_size: maximum size (in bytes) of the lines of the NDJSON uploads,
+            longer ones are reported as errors (no limit if None).
     """
 
     client: Union[AsyncBaseBulkTransactionsClient, BaseBulkTransactionsClient] = attr.ib()
     conformance_classes: List[str] = attr.ib(default=list())
     schema_href: Optional[str] = attr.ib(default=None)
+    chunk_size: int = attr.ib(default=500)
+    pipeline: Optional[BulkInsertPipeline] = attr.ib(default=None)
+    max_upload_size: Optional[int] = attr.ib(default=PARQUET_MAX_SIZE)
+    max_line_size: Optional[int] = attr.ib(default=NDJSON_MAX_LINE_SIZE)
+
+    def _stream_endpoint(self, iter_chunks: Callable) -> Callable:
+        async def _endpoint(
+            request: Request,
+            collection_id: Annotated[str, Path(description="Collection ID")],
+            method: Annotated[
+                BulkTransactionMethod, Query()
+            ] = BulkTransactionMethod.INSERT,
+            chunk_size: Annotated[Optional[int], Query(ge=1, le=MAX_CHUNK_SIZE)] = None,
+        ) -> BulkItemsReport:
+            """Endpoint."""
+            chunks = iter_chunks(request.stream(), chunk_size or self.chunk_size, method)
+            report = self.client.bulk_item_insert_stream(
+                chunks,
+                pipeline=self.pipeline,
+                collection_id=collection_id,
+                request=request,
+            )
+            if inspect.isawaitable(report):
+                report = await report
+
+            return report
+
+        return _endpoint
 
     def register(self, app: FastAPI) -> None:
         """Register the extension with a FastAPI application.
@@ -124,17 +715,77 @@ class BulkTransactionExtension(ApiExtension):
             None
         """
         items_request_model = create_request_model("Items", base_model=Items)
+        if self.pipeline is not None:
+            response_options: Dict[str, Any] = {"response_model": BulkItemsReport}
+            bulk_item_insert = functools.partial(
+                self.client.bulk_item_insert_chunked,
+                chunk_size=self.chunk_size,
+                pipeline=self.pipeline,
+            )
+        else:
+            response_options = {
+                "response_model": str,
+                "response_model_exclude_unset": True,
+                "response_model_exclude_none": True,
+            }
+            bulk_item_insert = self.client.bulk_item_insert
 
         router = APIRouter(prefix=app.state.router_prefix)
         router.add_api_route(
-            name="Bulk Create Item",
+            name="Bulk Create Item (NDJSON)",
             path="/collections/{collection_id}/bulk_items",
-            response_model=str,
-            response_model_exclude_unset=True,
-            response_model_exclude_none=True,
+            response_model=BulkItemsReport,
             methods=["POST"],
-            endpoint=create_async_endpoint(
-                self.client.bulk_item_insert, items_request_model
+            endpoint=self._stream_endpoint(
+                functools.partial(iter_item_chunks, max_line_size=self.max_line_size)
             ),
+            route_class_override=NDJSONRoute,
+            # documented in the JSON route
+            include_in_schema=False,
+        )
+        content = {
+            media_type: {
+                "schema": {
+                    "type": "string",
+                    "description": "One item per line, the response "
+                    "is a `BulkItemsReport`.",
+                }
+            }
+            for media_type in NDJSON_MEDIA_TYPES
+        }
+        if row_to_item is not None:
+            router.add_api_route(
+                name="Bulk Create Item (GeoParquet)",
+                path="/collections/{collection_id}/bulk_items",
+                response_model=BulkItemsReport,
+                methods=["POST"],
+                endpoint=self._stream_endpoint(
+                    functools.partial(
+                        iter_parquet_item_chunks, max_size=self.max_upload_size
+                    )
+                ),
+                route_class_override=GeoParquetRoute,
+                include_in_schema=False,
+            )
+            content.update(
+                {
+                    media_type: {
+                        "schema": {
+                            "type": "string",
+                            "format": "binary",
+                            "description": "stac-geoparquet file, the response "
+                            "is a `BulkItemsReport`.",
+                        }
+                    }
+                    for media_type in PARQUET_MEDIA_TYPES
+                }
+            )
+        router.add_api_route(
+            name="Bulk Create Item",
+            path="/collections/{collection_id}/bulk_items",
+            methods=["POST"],
+            endpoint=create_async_endpoint(bulk_item_insert, items_request_model),
+            **response_options,
+            openapi_extra={"requestBody": {"content": content}},
         )
         app.include_router(router, tags=["Bulk Transaction Extension"])
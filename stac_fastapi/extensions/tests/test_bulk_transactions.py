@@ -0,0 +1,405 @@
+import io
+import json
+from typing import Iterator, List
+
+import anyio
+import pytest
+from starlette.testclient import TestClient
+
+from stac_fastapi.api.app import StacApi
+from stac_fastapi.extensions.third_party import BulkTransactionExtension
+from stac_fastapi.extensions.third_party.bulk_transactions import (
+    AsyncBaseBulkTransactionsClient,
+    BaseBulkTransactionsClient,
+    BulkInsertPipeline,
+    Items,
+    iter_item_chunks,
+    split_items,
+)
+from stac_fastapi.types.config import ApiSettings
+from stac_fastapi.types.core import BaseCoreClient
+from stac_fastapi.types.item_validation import ItemValidator
+
+
+class DummyCoreClient(BaseCoreClient):
+    def all_collections(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def get_collection(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def get_item(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def get_search(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def post_search(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def item_collection(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+class BulkTransactionsClient(BaseBulkTransactionsClient):
+    """Record the inserted chunks, failing on items with a `fail` property."""
+
+    def __init__(self):
+        self.inserted: List[List[str]] = []
+        self.kwargs: List[dict] = []
+
+    def bulk_item_insert(self, items: Items, chunk_size=None, **kwargs):
+        if any(item["properties"].get("fail") for item in items):
+            raise ValueError("failed")
+
+        self.inserted.append([item["id"] for item in items])
+        self.kwargs.append({"chunk_size": chunk_size, **kwargs})
+        return f"Inserted {len(items.items)} items."
+
+
+class AsyncBulkTransactionsClient(AsyncBaseBulkTransactionsClient):
+    def __init__(self):
+        self.inserted: List[List[str]] = []
+        self.kwargs: List[dict] = []
+
+    async def bulk_item_insert(self, items: Items, **kwargs):
+        if any(item["properties"].get("fail") for item in items):
+            raise ValueError("failed")
+
+        self.inserted.append([item["id"] for item in items])
+        self.kwargs.append(kwargs)
+        return f"Inserted {len(items.items)} items."
+
+
+def _item(n, **properties):
+    return {"type": "Feature", "id": f"item-{n}", "properties": properties}
+
+
+def _ndjson(lines) -> Iterator[bytes]:
+    body = "\n".join(
+        line if isinstance(line, str) else json.dumps(line) for line in lines
+    ).encode()
+    # split lines across the body chunks
+    for start in range(0, len(body), 7):
+        yield body[start : start + 7]
+
+
+@pytest.fixture(params=[BulkTransactionsClient, AsyncBulkTransactionsClient])
+def bulk_client(request):
+    return request.param()
+
+
+@pytest.fixture
+def client(bulk_client):
+    settings = ApiSettings()
+    api = StacApi(
+        settings=settings,
+        client=DummyCoreClient(),
+        extensions=[BulkTransactionExtension(client=bulk_client, chunk_size=3)],
+    )
+    with TestClient(api.app) as client:
+        yield client
+
+
+def test_bulk_items_ndjson(client, bulk_client):
+    lines = [_item(n) for n in range(7)]
+    response = client.post(
+        "/collections/test/bulk_items",
+        content=_ndjson(lines),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["success"] == 7
+    assert report["errors"] == 0
+    assert [chunk["success"] for chunk in report["chunks"]] == [3, 3, 1]
+    assert bulk_client.inserted == [
+        ["item-0", "item-1", "item-2"],
+        ["item-3", "item-4", "item-5"],
+        ["item-6"],
+    ]
+    assert bulk_client.kwargs[0]["collection_id"] == "test"
+
+
+def test_bulk_items_ndjson_errors(client, bulk_client):
+    lines = [
+        _item(0),
+        "{not json",
+        "",
+        _item(1),
+        _item(2, fail=True),
+        _item(3),
+        _item(3),
+        ["not an item"],
+    ]
+    response = client.post(
+        "/collections/test/bulk_items?chunk_size=2&method=upsert",
+        content=_ndjson(lines),
+        headers={"content-type": "application/x-ndjson; charset=utf-8"},
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["success"] == 2
+    assert report["errors"] == 5
+    assert [(chunk["success"], chunk["errors"]) for chunk in report["chunks"]] == [
+        (1, 1),
+        (0, 2),
+        (1, 1),
+        (0, 1),
+    ]
+    assert report["chunks"][0]["messages"][0].startswith("line 2: invalid JSON")
+    assert report["chunks"][1]["messages"] == ["ValueError: failed"]
+    assert report["chunks"][2]["messages"] == ["line 7: duplicate item item-3"]
+    assert bulk_client.inserted == [["item-0"], ["item-3"]]
+
+
+def test_bulk_items_json(client, bulk_client):
+    response = client.post(
+        "/collections/test/bulk_items",
+        json={"items": {"item-0": _item(0)}},
+    )
+    assert response.status_code == 200, response.text
+    assert response.json() == "Inserted 1 items."
+    assert bulk_client.inserted == [["item-0"]]
+
+    content = client.get("/api").json()["paths"][
+        "/collections/{collection_id}/bulk_items"
+    ]
+    assert "application/x-ndjson" in content["post"]["requestBody"]["content"]
+    assert "application/json" in content["post"]["requestBody"]["content"]
+
+
+@pytest.mark.asyncio
+async def test_iter_item_chunks():
+    async def stream():
+        for data in _ndjson([_item(n) for n in range(5)]):
+            yield data
+
+    chunks = [chunk async for chunk in iter_item_chunks(stream(), 2)]
+    assert [list(chunk.items.items) for chunk in chunks] == [
+        ["item-0", "item-1"],
+        ["item-2", "item-3"],
+        ["item-4"],
+    ]
+    assert [chunk.index for chunk in chunks] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_concurrency_and_retries():
+    running = 0
+    max_running = 0
+    attempts = {}
+
+    class Client(AsyncBaseBulkTransactionsClient):
+        async def bulk_item_insert(self, items: Items, **kwargs):
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            try:
+                ids = list(items.items)
+                attempts[ids[0]] = attempts.get(ids[0], 0) + 1
+                # chunks finish out of order
+                await anyio.sleep(0.01 * (len(attempts) % 3))
+                if ids[0] == "item-2" and attempts["item-2"] < 3:
+                    raise ConnectionError("transient")
+                if ids[0] == "item-6":
+                    raise TimeoutError("timeout")
+                if ids[0] == "item-8":
+                    raise RuntimeError("permanent")
+            finally:
+                running -= 1
+
+    items = Items(items={f"item-{n}": _item(n) for n in range(10)})
+    pipeline = BulkInsertPipeline(concurrency=3, retries=2, retry_delay=0)
+    report = await Client().bulk_item_insert_chunked(
+        items, chunk_size=2, pipeline=pipeline
+    )
+
+    assert max_running == 3
+    assert [chunk.chunk for chunk in report.chunks] == [0, 1, 2, 3, 4]
+    assert report.success == 6
+    assert report.errors == 4
+    assert report.chunks[1].retries == 2
+    assert report.chunks[1].success == 2
+    assert report.chunks[3].retries == 2
+    assert report.chunks[3].messages == ["TimeoutError: timeout"]
+    assert attempts["item-6"] == 3
+    # errors other than the `retry_on` ones are not retried
+    assert report.chunks[4].retries == 0
+    assert report.chunks[4].messages == ["RuntimeError: permanent"]
+    assert attempts["item-8"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pipeline_backpressure():
+    pulled = 0
+    release = anyio.Event()
+
+    async def chunks():
+        nonlocal pulled
+        for chunk in iter_chunks:
+            pulled += 1
+            yield chunk
+
+    async def insert(items):
+        await release.wait()
+
+    iter_chunks = list(
+        split_items(Items(items={f"item-{n}": _item(n) for n in range(10)}), 1)
+    )
+    pipeline = BulkInsertPipeline(concurrency=2)
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(pipeline.run, insert, chunks())
+        await anyio.sleep(0.05)
+        # two chunks are being inserted, the third one waits for a slot
+        assert pulled == 3
+        release.set()
+
+
+def test_bulk_items_json_pipeline(bulk_client):
+    api = StacApi(
+        settings=ApiSettings(),
+        client=DummyCoreClient(),
+        extensions=[
+            BulkTransactionExtension(
+                client=bulk_client,
+                chunk_size=2,
+                pipeline=BulkInsertPipeline(concurrency=2),
+            )
+        ],
+    )
+    with TestClient(api.app) as client:
+        response = client.post(
+            "/collections/test/bulk_items",
+            json={"items": {f"item-{n}": _item(n, fail=n == 4) for n in range(5)}},
+        )
+        assert response.status_code == 200, response.text
+        report = response.json()
+        assert report["success"] == 4
+        assert report["errors"] == 1
+        assert [chunk["success"] for chunk in report["chunks"]] == [2, 2, 0]
+        assert sorted(bulk_client.inserted) == [
+            ["item-0", "item-1"],
+            ["item-2", "item-3"],
+        ]
+
+
+def _full_item(n, **changes):
+    return {
+        "type": "Feature",
+        "id": f"item-{n}",
+        "geometry": {"type": "Point", "coordinates": [n, n]},
+        "bbox": [n, n, n, n],
+        "properties": {"datetime": "2020-06-13T13:00:00Z"},
+        "links": [],
+        "assets": {},
+        **changes,
+    }
+
+
+def test_bulk_items_ndjson_validation(bulk_client):
+    api = StacApi(
+        settings=ApiSettings(),
+        client=DummyCoreClient(),
+        extensions=[
+            BulkTransactionExtension(
+                client=bulk_client,
+                chunk_size=2,
+                pipeline=BulkInsertPipeline(validator=ItemValidator()),
+            )
+        ],
+    )
+    lines = [
+        _full_item(0),
+        _full_item(1, bbox=[5, 5, 6, 6]),
+        _full_item(2, properties={"datetime": "yesterday"}),
+        _full_item(3),
+    ]
+    with TestClient(api.app) as client:
+        response = client.post(
+            "/collections/test/bulk_items",
+            content=_ndjson(lines),
+            headers={"content-type": "application/x-ndjson"},
+        )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["success"] == 2
+    assert report["errors"] == 2
+    assert report["chunks"][0]["invalid"] == {
+        "item-1": ["bbox does not contain the geometry"]
+    }
+    assert report["chunks"][1]["invalid"] == {
+        "item-2": ["datetime is not a RFC 3339 datetime"]
+    }
+    assert bulk_client.inserted == [["item-0"], ["item-3"]]
+
+
+def test_bulk_items_geoparquet(client, bulk_client):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    from stac_fastapi.api.geoparquet import item_to_row
+
+    rows = [item_to_row(_full_item(n)) for n in range(5)]
+    rows[2]["geometry"] = b"\x01"
+    rows[1]["id"] = "item-0"
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pylist(rows), buffer)
+
+    response = client.post(
+        "/collections/test/bulk_items?chunk_size=2",
+        content=buffer.getvalue(),
+        headers={"content-type": "application/vnd.apache.parquet"},
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["success"] == 3
+    assert report["errors"] == 2
+    assert report["chunks"][0]["messages"] == ["row 2: duplicate item item-0"]
+    assert report["chunks"][1]["messages"][0].startswith("row 3: Invalid WKB")
+    assert bulk_client.inserted == [["item-0"], ["item-3"], ["item-4"]]
+
+    response = client.post(
+        "/collections/test/bulk_items",
+        content=b"not parquet",
+        headers={"content-type": "application/vnd.apache.parquet"},
+    )
+    assert response.status_code == 400, response.text
+    assert response.json()["code"] == "InvalidItemError"
+
+
+def test_bulk_items_geoparquet_max_upload_size(bulk_client):
+    pytest.importorskip("pyarrow")
+    api = StacApi(
+        settings=ApiSettings(),
+        client=DummyCoreClient(),
+        extensions=[BulkTransactionExtension(client=bulk_client, max_upload_size=10)],
+    )
+    with TestClient(api.app) as client:
+        response = client.post(
+            "/collections/test/bulk_items",
+            content=b"x" * 11,
+            headers={"content-type": "application/vnd.apache.parquet"},
+        )
+    assert response.status_code == 413, response.text
+    assert response.json()["code"] == "PayloadTooLargeError"
+    assert bulk_client.inserted == []
+
+
+@pytest.mark.asyncio
+async def test_iter_item_chunks_max_line_size():
+    async def stream():
+        for data in _ndjson([_item(0), _item(1, name="x" * 100), _item(2)]):
+            yield data
+
+    chunks = [chunk async for chunk in iter_item_chunks(stream(), 10, max_line_size=80)]
+    assert list(chunks[0].items.items) == ["item-0", "item-2"]
+    assert chunks[0].errors == ["line 2: line longer than 80 bytes"]
+
+
+def test_bulk_items_chunk_size_limit(client):
+    response = client.post(
+        "/collections/test/bulk_items?chunk_size=10001",
+        content=_ndjson([_item(0)]),
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 400, response.text
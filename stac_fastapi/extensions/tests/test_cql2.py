@@ -0,0 +1,245 @@
+import datetime as dt
+
+import pytest
+
+from stac_fastapi.extensions.core.filter.cql2 import (
+    Array,
+    CQL2Error,
+    Date,
+    Function,
+    Interval,
+    Operation,
+    Property,
+    Timestamp,
+    get_properties,
+    parse_cql2_json,
+    parse_cql2_text,
+    parse_filter,
+    to_json,
+    validate_queryables,
+)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        (
+            "id='a''b' AND eo:cloud_cover <= 10",
+            {
+                "op": "and",
+                "args": [
+                    {"op": "=", "args": [{"property": "id"}, "a'b"]},
+                    {"op": "<=", "args": [{"property": "eo:cloud_cover"}, 10]},
+                ],
+            },
+        ),
+        (
+            "NOT (a + 2) * 3 > -4.5 OR b IS NOT NULL",
+            {
+                "op": "or",
+                "args": [
+                    {
+                        "op": "not",
+                        "args": [
+                            {
+                                "op": ">",
+                                "args": [
+                                    {
+                                        "op": "*",
+                                        "args": [
+                                            {"op": "+", "args": [{"property": "a"}, 2]},
+                                            3,
+                                        ],
+                                    },
+                                    -4.5,
+                                ],
+                            }
+                        ],
+                    },
+                    {
+                        "op": "not",
+                        "args": [{"op": "isNull", "args": [{"property": "b"}]}],
+                    },
+                ],
+            },
+        ),
+        (
+            "S_INTERSECTS(geometry, POLYGON((0 0, 1 0, 1 1, 0 0)))",
+            {
+                "op": "s_intersects",
+                "args": [
+                    {"property": "geometry"},
+                    {
+                        "type": "Polygon",
+                        "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 0]]],
+                    },
+                ],
+            },
+        ),
+        (
+            "t_intersects(datetime, INTERVAL('2020-01-01', '..'))",
+            {
+                "op": "t_intersects",
+                "args": [{"property": "datetime"}, {"interval": ["2020-01-01", ".."]}],
+            },
+        ),
+        (
+            "datetime BETWEEN TIMESTAMP('2020-01-01T00:00:00Z') AND DATE('2021-01-01')",
+            {
+                "op": "between",
+                "args": [
+                    {"property": "datetime"},
+                    {"timestamp": "2020-01-01T00:00:00Z"},
+                    {"date": "2021-01-01"},
+                ],
+            },
+        ),
+        (
+            "CASEI(\"my name\") NOT LIKE 'x%' AND tag IN ('a', 'b')",
+            {
+                "op": "and",
+                "args": [
+                    {
+                        "op": "not",
+                        "args": [
+                            {
+                                "op": "like",
+                                "args": [
+                                    {"op": "casei", "args": [{"property": "my name"}]},
+                                    "x%",
+                                ],
+                            }
+                        ],
+                    },
+                    {"op": "in", "args": [{"property": "tag"}, ["a", "b"]]},
+                ],
+            },
+        ),
+        (
+            "A_CONTAINS(tags, ('a', 'b')) AND S_WITHIN(geometry, BBOX(0, 0, 1, 1))",
+            {
+                "op": "and",
+                "args": [
+                    {"op": "a_contains", "args": [{"property": "tags"}, ["a", "b"]]},
+                    {
+                        "op": "s_within",
+                        "args": [{"property": "geometry"}, {"bbox": [0, 0, 1, 1]}],
+                    },
+                ],
+            },
+        ),
+        (
+            "my_func(a, MULTIPOINT((1 2), (3 -4)))",
+            {
+                "op": "my_func",
+                "args": [
+                    {"property": "a"},
+                    {"type": "MultiPoint", "coordinates": [[1, 2], [3, -4]]},
+                ],
+            },
+        ),
+    ],
+)
+def test_parse_cql2_text(text, expected):
+    expression = parse_cql2_text(text)
+    assert to_json(expression) == expected
+    assert parse_cql2_json(expected) == expression
+
+
+def test_parse_cql2_json():
+    expression = parse_cql2_json(
+        {
+            "op": "T_DURING",
+            "args": [
+                {"property": "datetime"},
+                {"interval": ["2020-01-01T00:00:00Z", {"property": "end"}]},
+            ],
+        }
+    )
+    assert expression == Operation(
+        "t_during",
+        [
+            Property("datetime"),
+            Interval(
+                Timestamp(dt.datetime(2020, 1, 1, tzinfo=dt.timezone.utc)),
+                Property("end"),
+            ),
+        ],
+    )
+    assert get_properties(expression) == {"datetime", "end"}
+
+    # pre 1.0 notations
+    assert parse_cql2_json(
+        {"function": {"name": "f", "args": [{"casei": "A"}, [1, {"date": "2020-01-01"}]]}}
+    ) == Function("f", [Operation("casei", ["A"]), Array([1, Date(dt.date(2020, 1, 1))])])
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "a =",
+        "a = = 1",
+        "(a = 1",
+        "a BETWEEN 1",
+        "TIMESTAMP('2020')",
+        "a = 'unterminated",
+        "S_INTERSECTS(geometry)",
+        "a = 1 b",
+        "POINT(1 x)",
+    ],
+)
+def test_parse_cql2_text_errors(text):
+    with pytest.raises(CQL2Error):
+        parse_cql2_text(text)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "{'op': '='}",
+        {},
+        {"op": "not", "args": []},
+        {"op": "=", "args": {"property": "a"}},
+        {"timestamp": "yesterday"},
+        {"interval": ["2020-01-01"]},
+    ],
+)
+def test_parse_cql2_json_errors(value):
+    with pytest.raises(CQL2Error):
+        parse_cql2_json(value)
+
+
+def test_parse_nesting_depth():
+    assert parse_cql2_text("(" * 49 + "a = 1" + ")" * 49)
+    for text in [
+        "(" * 5000,
+        "(" * 51 + "a = 1" + ")" * 51,
+        "NOT " * 200 + "a = 1",
+        "a = " + "-" * 300 + "1",
+        "a = " + "2 ^ " * 300 + "1",
+    ]:
+        with pytest.raises(CQL2Error, match="nested"):
+            parse_cql2_text(text)
+
+    value = {"op": "=", "args": [{"property": "a"}, 1]}
+    for _ in range(5000):
+        value = {"op": "not", "args": [value]}
+    with pytest.raises(CQL2Error, match="nested"):
+        parse_cql2_json(value)
+    with pytest.raises(CQL2Error):
+        parse_cql2_json("[" * 100000)
+
+
+def test_parse_filter():
+    text = "collection = 'a' AND eo:cloud_cover < 10"
+    assert parse_filter(text) is parse_filter(text, "cql2-text")
+    assert parse_filter(to_json(parse_filter(text))) == parse_filter(text)
+    assert parse_filter(None) is None
+
+    queryables = {"properties": {"collection": {}}, "additionalProperties": False}
+    with pytest.raises(CQL2Error, match="eo:cloud_cover"):
+        parse_filter(text, queryables=queryables)
+
+    validate_queryables(parse_filter(text), {"properties": {}})
+    validate_queryables(parse_filter(text), ["collection", "eo:cloud_cover"])
@@ -0,0 +1,102 @@
+from stac_fastapi.extensions.core import FieldsExtension
+from stac_fastapi.extensions.core.fields import FieldsProjection
+from stac_fastapi.extensions.core.fields.request import PostFieldsExtension
+
+item = {
+    "type": "Feature",
+    "id": "item",
+    "collection": "a",
+    "geometry": {"type": "Point", "coordinates": [0, 0]},
+    "properties": {
+        "datetime": "2020-01-01T00:00:00Z",
+        "eo:cloud_cover": 10,
+        "proj:centroid": {"lat": 0, "lon": 0},
+    },
+    "assets": {"data": {"href": "data.tif", "roles": ["data"]}},
+    "links": [],
+}
+
+
+def test_get_field_dict():
+    fields = {"id", "properties.datetime", "properties.proj:centroid.lat", "assets"}
+    assert PostFieldsExtension._get_field_dict(fields) == {
+        "id": ...,
+        "assets": ...,
+        "properties": {"datetime": ..., "proj:centroid": {"lat": ...}},
+    }
+    assert PostFieldsExtension._get_field_dict({"properties", "properties.a.b"}) == {
+        "properties": ...
+    }
+
+
+def test_fields_projection():
+    projection = FieldsProjection.from_request(
+        PostFieldsExtension(
+            include={"id", "properties.proj:centroid.lat", "assets"},
+            exclude={"assets.data.roles"},
+        )
+    )
+    assert projection(item) == {
+        "id": "item",
+        "properties": {"proj:centroid": {"lat": 0}},
+        "assets": {"data": {"href": "data.tif"}},
+    }
+    assert projection.top_level_fields() == {"id", "properties", "assets"}
+    assert not projection.is_included("geometry")
+    assert projection.is_included("properties")
+    assert not projection.is_included("assets.data.roles")
+
+    # GET notation, excluded fields only
+    projection = FieldsProjection.from_request(
+        ["-geometry", "-properties.eo:cloud_cover"]
+    )
+    projected = projection.project_items([item])[0]
+    assert "geometry" not in projected
+    assert projected["properties"] == {
+        "datetime": "2020-01-01T00:00:00Z",
+        "proj:centroid": {"lat": 0, "lon": 0},
+    }
+    assert projected["assets"] is item["assets"]
+    assert projection.top_level_fields() is None
+    assert not projection.is_included("geometry")
+
+    # the most specific path wins, include wins on conflicts
+    projection = FieldsProjection(
+        include={"id", "properties.datetime"}, exclude={"properties", "id"}
+    )
+    assert projection(item) == {
+        "id": "item",
+        "properties": {"datetime": "2020-01-01T00:00:00Z"},
+    }
+
+    # the source item is not modified
+    assert item["properties"]["eo:cloud_cover"] == 10
+
+
+def test_fields_projection_default_includes():
+    extension = FieldsExtension(
+        default_includes={"id", "collection", "properties.datetime"},
+        collection_default_includes={"b": {"id", "collection", "assets"}},
+    )
+
+    projection = extension.projection(None)
+    assert not projection.is_identity
+    other = dict(item, collection="b")
+    assert projection.project_items([item, other]) == [
+        {
+            "id": "item",
+            "collection": "a",
+            "properties": {"datetime": "2020-01-01T00:00:00Z"},
+        },
+        {"id": "item", "collection": "b", "assets": item["assets"]},
+    ]
+    assert not projection.is_included("assets")
+    assert projection.is_included("assets", collection_id="b")
+
+    # requested fields replace the default includes
+    projection = extension.projection(["-geometry"])
+    assert projection(item)["assets"] == item["assets"]
+
+    projection = FieldsExtension().projection([])
+    assert projection.is_identity
+    assert projection(item) is item
@@ -117,3 +117,70 @@ def test_search_filter_get(client: TestClient):
     assert response.is_success, response.json()
     response_dict = response.json()
     assert response_dict["collections"] == ["collection1", "collection2"]
+
+
+def test_search_filter_queryables_validation():
+    extensions = [FilterExtension(validate_filter=True, queryables=["id", "collection"])]
+    api = StacApi(
+        settings=ApiSettings(),
+        client=DummyCoreClient(),
+        extensions=extensions,
+        search_get_request_model=create_get_request_model(extensions),
+        search_post_request_model=create_post_request_model(extensions),
+    )
+    with TestClient(api.app) as client:
+        response = client.get("/search", params={"filter": "id='item_id'"})
+        assert response.is_success, response.json()
+
+        response = client.get("/search", params={"filter": "eo:cloud_cover < 10"})
+        assert response.status_code == 400
+        assert "eo:cloud_cover" in response.json()["description"]
+
+        response = client.post(
+            "/search",
+            json={"filter": {"op": "=", "args": [{"property": "id"}, "item_id"]}},
+        )
+        assert response.is_success, response.json()
+
+        response = client.post(
+            "/search",
+            json={"filter": {"op": "=", "args": [{"property": "platform"}, "x"]}},
+        )
+        assert response.status_code == 400
+        assert response.json()["code"] == "CQL2Error"
+
+
+def test_search_filter_validation():
+    extensions = [FilterExtension(validate_filter=True)]
+    api = StacApi(
+        settings=ApiSettings(),
+        client=DummyCoreClient(),
+        extensions=extensions,
+        search_get_request_model=create_get_request_model(extensions),
+        search_post_request_model=create_post_request_model(extensions),
+    )
+    with TestClient(api.app) as client:
+        response = client.get("/search", params={"filter": "id='item_id'"})
+        assert response.is_success, response.json()
+
+        response = client.get("/search", params={"filter": "id=="})
+        assert response.status_code == 400
+        assert response.json()["code"] == "CQL2Error"
+
+        response = client.get(
+            "/search", params={"filter": "id=", "filter-lang": "cql-json"}
+        )
+        assert response.is_success, response.json()
+
+        response = client.post(
+            "/search",
+            json={"filter": {"op": "=", "args": [{"property": "id"}, "item_id"]}},
+        )
+        assert response.is_success, response.json()
+
+        response = client.post("/search", json={"filter": {"op": "="}})
+        assert response.status_code == 400
+
+        response = client.get("/search", params={"filter": "(" * 5000})
+        assert response.status_code == 400
+        assert response.json()["code"] == "CQL2Error"
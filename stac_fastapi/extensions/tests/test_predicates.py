@@ -0,0 +1,83 @@
+import pytest
+
+from stac_fastapi.extensions.core.filter.cql2 import CQL2Error, parse_filter
+from stac_fastapi.extensions.core.filter.predicates import (
+    compile_expression,
+    compile_filter,
+    filter_items,
+    like_to_regex,
+)
+
+
+def make_item(n, **properties):
+    return {
+        "type": "Feature",
+        "id": f"item-{n}",
+        "collection": "a" if n % 2 else "b",
+        "geometry": {"type": "Point", "coordinates": [n, n]},
+        "properties": {
+            "datetime": f"2020-01-{n + 1:02d}T00:00:00Z",
+            "eo:cloud_cover": n * 10,
+            "platform": "Sentinel-2" if n < 3 else "landsat-8",
+            "tags": ["a", "b"] if n < 2 else ["c"],
+            **properties,
+        },
+    }
+
+
+items = [make_item(n) for n in range(5)]
+items.append(
+    make_item(
+        5,
+        datetime=None,
+        start_datetime="2021-01-01T00:00:00Z",
+        end_datetime="2021-12-31T00:00:00Z",
+    )
+)
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("collection = 'a' AND eo:cloud_cover > 10", [3, 5]),
+        ("eo:cloud_cover BETWEEN 10 AND 30 OR id = 'item-0'", [0, 1, 2, 3]),
+        ("NOT platform LIKE 'Sentinel%'", [3, 4, 5]),
+        ("CASEI(platform) LIKE CASEI('SENTINEL-_')", [0, 1, 2]),
+        ("id IN ('item-1', 'item-4', 'other')", [1, 4]),
+        ("S_INTERSECTS(geometry, BBOX(1.5, 1.5, 3, 3))", [2, 3]),
+        ("S_INTERSECTS(geometry, POLYGON((0 0, 1 0, 1 1, 0 0)))", [0, 1]),
+        # bbox crossing the antimeridian
+        ("S_INTERSECTS(geometry, BBOX(170, -1, 1.5, 1.5))", [0, 1]),
+        ("T_INTERSECTS(datetime, INTERVAL('2020-01-02', '2020-01-03'))", [1, 2]),
+        ("T_INTERSECTS(datetime, TIMESTAMP('2021-06-01T00:00:00Z'))", [5]),
+        ("datetime < TIMESTAMP('2020-01-02T12:00:00Z')", [0, 1]),
+        ("datetime >= DATE('2020-01-05')", [4]),
+        ("A_CONTAINS(tags, ('a'))", [0, 1]),
+        ("eo:cloud_cover * 2 = 40", [2]),
+        ("datetime IS NULL", [5]),
+        ("missing = 1 OR missing IS NOT NULL", []),
+    ],
+)
+def test_compile_filter(text, expected):
+    matches = filter_items(items, text)
+    assert [int(item["id"][5:]) for item in matches] == expected
+
+
+def test_compile_filter_cache():
+    text = "collection = 'a'"
+    assert compile_filter(text) is compile_filter(
+        {"op": "=", "args": [{"property": "collection"}, "a"]}
+    )
+    assert compile_filter(None)(items[0])
+
+    with pytest.raises(CQL2Error):
+        compile_expression(parse_filter("my_function(a) = 1"))
+
+    with pytest.raises(CQL2Error):
+        compile_expression(parse_filter("S_CROSSES(geometry, POINT(1 1))"))
+
+
+def test_like_to_regex():
+    assert like_to_regex("a%b_c").fullmatch("a...bxc")
+    assert like_to_regex("100\\%").fullmatch("100%")
+    assert not like_to_regex("100\\%").fullmatch("1000")
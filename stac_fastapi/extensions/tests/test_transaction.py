@@ -1,6 +1,8 @@
+import asyncio
 import json
 from typing import Iterator, Union
 
+import httpx
 import pytest
 from stac_pydantic import Collection
 from stac_pydantic.item import Item
@@ -8,9 +10,12 @@ from stac_pydantic.item_collection import ItemCollection
 from starlette.testclient import TestClient
 
 from stac_fastapi.api.app import StacApi
+from stac_fastapi.api.coalescing import ItemWriteCoalescer
 from stac_fastapi.extensions.core import TransactionExtension
 from stac_fastapi.types.config import ApiSettings
 from stac_fastapi.types.core import BaseCoreClient, BaseTransactionsClient
+from stac_fastapi.types.inmemory import AsyncInMemoryCoreClient
+from stac_fastapi.types.item_validation import ItemValidator
 
 
 class DummyCoreClient(BaseCoreClient):
@@ -114,6 +119,107 @@ def test_delete_collection(client: TestClient, collection: Collection) -> None:
     assert response.json()["path_collection_id"] == "a-collection"
 
 
+def test_validated_items(core_client, transactions_client, item, item_collection):
+    settings = ApiSettings()
+    api = StacApi(
+        settings=settings,
+        client=core_client,
+        extensions=[
+            TransactionExtension(
+                client=transactions_client,
+                settings=settings,
+                validator=ItemValidator(),
+            ),
+        ],
+    )
+    with TestClient(api.app) as client:
+        response = client.post("/collections/a-collection/items", json=item)
+        assert response.is_success, response.text
+
+        item["bbox"] = [0, 0, 1, 1]
+        response = client.put("/collections/a-collection/items/test_item", json=item)
+        assert response.status_code == 400, response.text
+        assert response.json()["description"] == (
+            "Invalid items: test_item: bbox does not contain the geometry"
+        )
+
+        response = client.post("/collections/a-collection/items", json=item_collection)
+        assert response.status_code == 400, response.text
+
+
+def test_write_coalescing(item):
+    batches = []
+    writing = set()
+
+    class TransactionsClient(AsyncInMemoryCoreClient):
+        async def create_item(self, collection_id, item, request, **kwargs):
+            assert request.headers["x-item"] == item.id
+            # the writes of a collection run one at a time
+            assert collection_id not in writing
+            writing.add(collection_id)
+            await asyncio.sleep(0.1)
+            writing.discard(collection_id)
+            return await super().create_item(collection_id, item, **kwargs)
+
+        async def create_items(self, collection_id, items, requests, **kwargs):
+            assert "request" not in kwargs
+            # each item comes with its own request
+            assert [r.headers["x-item"] for r in requests] == [i.id for i in items]
+            assert collection_id not in writing
+            batches.append((collection_id, sorted(item.id for item in items)))
+            return await super().create_items(collection_id, items, **kwargs)
+
+    transactions_client = TransactionsClient()
+    for collection_id in ["a", "b"]:
+        transactions_client.catalog.add_collection({"id": collection_id})
+
+    settings = ApiSettings()
+    coalescer = ItemWriteCoalescer(max_items=4)
+    api = StacApi(
+        settings=settings,
+        client=transactions_client,
+        extensions=[
+            TransactionExtension(
+                client=transactions_client,
+                settings=settings,
+                write_coalescer=coalescer,
+            ),
+        ],
+    )
+
+    async def create(client, collection_id, item_id):
+        return await client.post(
+            f"/collections/{collection_id}/items",
+            json={**item, "id": item_id},
+            headers={"x-item": item_id},
+        )
+
+    async def main(requests):
+        transport = httpx.ASGITransport(app=api.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://testserver"
+        ) as client:
+            return await asyncio.gather(*[create(client, *args) for args in requests])
+
+    requests = [("a", f"item-{n}") for n in range(6)] + [("b", "item-0")]
+    responses = asyncio.run(main(requests))
+    assert [response.status_code for response in responses] == [201] * 7
+    # each request gets the stored item
+    assert [
+        (response.json()["collection"], response.json()["id"]) for response in responses
+    ] == requests
+    # the first items are created on their own, the others wait for them
+    # (up to `max_items`, the remaining one being created on its own)
+    assert [(collection_id, len(ids)) for collection_id, ids in batches] == [("a", 4)]
+    assert coalescer.stats() == {"flushes": 1, "coalesced": 4, "pending": 0}
+
+    # each item gets its own result
+    responses = asyncio.run(main([("a", "item-6"), ("a", "item-1"), ("a", "item-7")]))
+    assert [response.status_code for response in responses] == [201, 409, 201]
+    assert batches[-1] == ("a", ["item-1", "item-7"])
+    assert transactions_client.catalog.get_item("a", "item-7")
+
+
 @pytest.fixture
 def client(
     core_client: DummyCoreClient, transactions_client: DummyTransactionsClient
@@ -21,6 +21,7 @@ extra_reqs = {
         "pre-commit",
         "requests",
     ],
+    "rtree": ["numpy>=1.21"],
     "docs": ["mkdocs", "mkdocs-material", "pdocs"],
 }
 
@@ -1,6 +1,6 @@
 """stac_fastapi.types.config module."""
 
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -17,6 +17,42 @@ class ApiSettings(BaseSettings):
         indexed_fields:
             set of fields which are usually in `item.properties` but are indexed
             as distinct columns in the database.
+        response_validation_mode: how responses are validated when
+            `enable_response_models` is set: `enforce` (every response is validated
+            and serialized by its response model, invalid responses are errors),
+            `sample` (a fraction of the responses is validated, violations are
+            logged) or `shadow` (same as `sample`, in a background worker).
+        response_validation_sample_rate: fraction of the responses validated in
+            the `sample` and `shadow` modes.
+        landing_page_cache_ttl: number of seconds the landing page and conformance
+            responses are cached for (keyed like the search responses, see
+            `search_vary_headers`). Disabled when `None`.
+        landing_page_child_links_limit: maximum number of collection `child` links
+            in the landing page.
+        cache_control: `Cache-Control` header values of the `GET` routes, by route
+            path (e.g. `/collections/{collection_id}`) or `*` for any other route
+            (set by the `ConditionalRequestMiddleware`).
+        search_cache_ttl: number of seconds the search and item collection
+            responses are cached for. Disabled when `None`.
+        search_cache_max_entries: maximum number of cached search responses.
+        search_cache_max_bytes: maximum size of the cached search responses.
+        search_cache_compress: compress the cached search responses.
+        search_vary_headers: request headers the search responses depend on (e.g.
+            the headers carrying credentials, like `x-api-key`): responses are
+            only shared, by the search cache and coalescing, between requests with
+            the same values.
+        enable_search_coalescing: share a single client call between identical
+            concurrent search and item collection requests.
+        client_max_threads: maximum number of concurrent calls of the synchronous
+            clients, with a capacity dedicated to them. When `None`, the calls
+            share Starlette's threadpool.
+        client_max_threads_by_name: dedicated capacity of specific client methods
+            (e.g. `post_search`) or clients (by class name, e.g.
+            `TransactionsClient`).
+        chunked_encoding_min_features: minimum number of features of the
+            FeatureCollection responses encoded in chunks in a worker thread,
+            instead of in the event loop. Disabled when `None`.
+        chunked_encoding_chunk_size: number of features encoded at once.
     """
 
     stac_fastapi_title: str = "stac-fastapi"
@@ -28,6 +64,21 @@ class ApiSettings(BaseSettings):
     app_port: int = 8000
     reload: bool = True
     enable_response_models: bool = False
+    response_validation_mode: Literal["enforce", "sample", "shadow"] = "enforce"
+    response_validation_sample_rate: float = 1.0
+    landing_page_cache_ttl: Optional[float] = None
+    landing_page_child_links_limit: Optional[int] = None
+    cache_control: Dict[str, str] = {}
+    search_cache_ttl: Optional[float] = None
+    search_cache_max_entries: int = 1000
+    search_cache_max_bytes: int = 64 * 1024 * 1024
+    search_cache_compress: bool = False
+    search_vary_headers: List[str] = ["authorization", "cookie"]
+    enable_search_coalescing: bool = False
+    client_max_threads: Optional[int] = None
+    client_max_threads_by_name: Dict[str, int] = {}
+    chunked_encoding_min_features: Optional[int] = None
+    chunked_encoding_chunk_size: int = 500
 
     openapi_url: str = "/api"
     docs_url: str = "/api.html"
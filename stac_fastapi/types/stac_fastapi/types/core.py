@@ -16,7 +16,7 @@ from starlette.responses import Response
 from stac_fastapi.types import stac
 from stac_fastapi.types.config import ApiSettings
 from stac_fastapi.types.conformance import BASE_CONFORMANCE_CLASSES
-from stac_fastapi.types.extension import ApiExtension
+from stac_fastapi.types.extension import ApiExtension, ExtensionRegistry
 from stac_fastapi.types.requests import get_base_url
 from stac_fastapi.types.rfc3339 import DateTimeType
 from stac_fastapi.types.search import BaseSearchPostRequest
@@ -36,6 +36,38 @@ StacType = Dict[str, Any]
 
 api_settings = ApiSettings()
 
+# Landing page links (relative to the base URL) of the registered extensions
+EXTENSION_LANDING_PAGE_LINKS = {
+    "FilterExtension": [
+        {
+            "rel": Relations.queryables.value,
+            "type": MimeTypes.jsonschema.value,
+            "title": "Queryables",
+            "href": "queryables",
+        },
+    ],
+    "AggregationExtension": [
+        {
+            "rel": "aggregate",
+            "type": "application/json",
+            "title": "Aggregate",
+            "href": "aggregate",
+        },
+        {
+            "rel": "aggregations",
+            "type": "application/json",
+            "title": "Aggregations",
+            "href": "aggregations",
+        },
+    ],
+}
+
+
+def _reset_extension_registry(instance: Any, attribute: Any, value: Any) -> Any:
+    """Drop the extension registry when the attributes it is built from change."""
+    instance.extension_registry = None
+    return value
+
 
 @attr.s  # type:ignore
 class BaseTransactionsClient(abc.ABC):
@@ -61,6 +93,42 @@ class BaseTransactionsClient(abc.ABC):
         """
         ...
 
+    def create_items(
+        self,
+        collection_id: str,
+        items: List[Item],
+        requests: Optional[List[Request]] = None,
+        **kwargs,
+    ) -> List[Union[stac.Item, Response, None, Exception]]:
+        """Create several items of a collection, with a result for each item.
+
+        Used to coalesce concurrent item creations (see
+        `stac_fastapi.api.coalescing.ItemWriteCoalescer`). Calls `create_item` for
+        each item by default; a backend may override it with a bulk write, which
+        must apply the checks of `create_item` to each item (with its request).
+
+        Args:
+            collection_id: the id of the collection from the resource path
+            items: the items
+            requests: the request of each item, when the items come from
+                different requests (instead of a `request` keyword argument)
+
+        Returns:
+            For each item, the item that was created or the error it raised.
+        """
+        results: List[Union[stac.Item, Response, None, Exception]] = []
+        for n, item in enumerate(items):
+            if requests is not None:
+                kwargs["request"] = requests[n]
+            try:
+                results.append(
+                    self.create_item(collection_id=collection_id, item=item, **kwargs)
+                )
+            except Exception as e:
+                results.append(e)
+
+        return results
+
     @abc.abstractmethod
     def update_item(
         self, collection_id: str, item_id: str, item: Item, **kwargs
@@ -175,6 +243,44 @@ class AsyncBaseTransactionsClient(abc.ABC):
         """
         ...
 
+    async def create_items(
+        self,
+        collection_id: str,
+        items: List[Item],
+        requests: Optional[List[Request]] = None,
+        **kwargs,
+    ) -> List[Union[stac.Item, Response, None, Exception]]:
+        """Create several items of a collection, with a result for each item.
+
+        Used to coalesce concurrent item creations (see
+        `stac_fastapi.api.coalescing.ItemWriteCoalescer`). Calls `create_item` for
+        each item by default; a backend may override it with a bulk write, which
+        must apply the checks of `create_item` to each item (with its request).
+
+        Args:
+            collection_id: the id of the collection from the resource path
+            items: the items
+            requests: the request of each item, when the items come from
+                different requests (instead of a `request` keyword argument)
+
+        Returns:
+            For each item, the item that was created or the error it raised.
+        """
+        results: List[Union[stac.Item, Response, None, Exception]] = []
+        for n, item in enumerate(items):
+            if requests is not None:
+                kwargs["request"] = requests[n]
+            try:
+                results.append(
+                    await self.create_item(
+                        collection_id=collection_id, item=item, **kwargs
+                    )
+                )
+            except Exception as e:
+                results.append(e)
+
+        return results
+
     @abc.abstractmethod
     async def update_item(
         self, collection_id: str, item_id: str, item: Item, **kwargs
@@ -266,12 +372,36 @@ class AsyncBaseTransactionsClient(abc.ABC):
 
 @attr.s
 class LandingPageMixin(abc.ABC):
-    """Create a STAC landing page (GET /)."""
+    """Create a STAC landing page (GET /).
+
+    Attributes:
+        child_links_limit: maximum number of collection `child` links added to the
+            landing page (all collections are still available with the `data` link).
+    """
 
     stac_version: str = attr.ib(default=STAC_API_VERSION)
     landing_page_id: str = attr.ib(default=api_settings.stac_fastapi_landing_id)
     title: str = attr.ib(default=api_settings.stac_fastapi_title)
     description: str = attr.ib(default=api_settings.stac_fastapi_description)
+    child_links_limit: Optional[int] = attr.ib(
+        default=api_settings.landing_page_child_links_limit
+    )
+
+    def _child_links(
+        self, base_url: str, collections: List[stac.Collection]
+    ) -> List[Dict[str, Any]]:
+        if self.child_links_limit is not None:
+            collections = collections[: self.child_links_limit]
+
+        return [
+            {
+                "rel": Relations.child.value,
+                "type": MimeTypes.json.value,
+                "title": collection.get("title") or collection.get("id"),
+                "href": urljoin(base_url, f"collections/{collection['id']}"),
+            }
+            for collection in collections
+        ]
 
     def _landing_page(
         self,
@@ -335,38 +465,44 @@ class BaseCoreClient(LandingPageMixin, abc.ABC):
 
     Attributes:
         extensions: list of registered api extensions.
+        extension_registry: index of the registered extensions, created on first
+            use (or by `StacApi`) and reset when `extensions` or
+            `base_conformance_classes` are re-assigned.
     """
 
     base_conformance_classes: List[str] = attr.ib(
-        factory=lambda: BASE_CONFORMANCE_CLASSES
+        factory=lambda: list(BASE_CONFORMANCE_CLASSES),
+        on_setattr=_reset_extension_registry,
+    )
+    extensions: List[ApiExtension] = attr.ib(
+        default=attr.Factory(list), on_setattr=_reset_extension_registry
     )
-    extensions: List[ApiExtension] = attr.ib(default=attr.Factory(list))
     post_request_model = attr.ib(default=BaseSearchPostRequest)
+    extension_registry: Optional[ExtensionRegistry] = attr.ib(default=None)
+
+    def get_extension_registry(self) -> ExtensionRegistry:
+        """Return the extension registry, creating it if needed."""
+        if self.extension_registry is None:
+            self.extension_registry = ExtensionRegistry.from_extensions(
+                self.extensions,
+                base_conformance_classes=self.base_conformance_classes,
+                landing_page_links=EXTENSION_LANDING_PAGE_LINKS,
+            )
+
+        return self.extension_registry
 
     def conformance_classes(self) -> List[str]:
         """Generate conformance classes by adding extension conformance to base
         conformance classes."""
-        base_conformance_classes = self.base_conformance_classes.copy()
-
-        for extension in self.extensions:
-            extension_classes = getattr(extension, "conformance_classes", [])
-            base_conformance_classes.extend(extension_classes)
-
-        return list(set(base_conformance_classes))
+        return list(self.get_extension_registry().conformance_classes)
 
     def extension_is_enabled(self, extension: str) -> bool:
         """Check if an api extension is enabled."""
-        return any([type(ext).__name__ == extension for ext in self.extensions])
+        return self.get_extension_registry().is_enabled(extension)
 
     def list_conformance_classes(self):
         """Return a list of conformance classes, including implemented extensions."""
-        base_conformance = BASE_CONFORMANCE_CLASSES
-
-        for extension in self.extensions:
-            extension_classes = getattr(extension, "conformance_classes", [])
-            base_conformance.extend(extension_classes)
-
-        return base_conformance
+        return self.conformance_classes()
 
     def landing_page(self, **kwargs) -> stac.LandingPage:
         """Landing page.
@@ -385,48 +521,17 @@ class BaseCoreClient(LandingPageMixin, abc.ABC):
             extension_schemas=[],
         )
 
-        # Add Queryables link
-        if self.extension_is_enabled("FilterExtension"):
+        # Add Extensions links (e.g. Queryables, Aggregation)
+        for link in self.get_extension_registry().landing_page_links:
             landing_page["links"].append(
-                {
-                    "rel": Relations.queryables.value,
-                    "type": MimeTypes.jsonschema.value,
-                    "title": "Queryables",
-                    "href": urljoin(base_url, "queryables"),
-                }
-            )
-
-        # Add Aggregation links
-        if self.extension_is_enabled("AggregationExtension"):
-            landing_page["links"].extend(
-                [
-                    {
-                        "rel": "aggregate",
-                        "type": "application/json",
-                        "title": "Aggregate",
-                        "href": urljoin(base_url, "aggregate"),
-                    },
-                    {
-                        "rel": "aggregations",
-                        "type": "application/json",
-                        "title": "Aggregations",
-                        "href": urljoin(base_url, "aggregations"),
-                    },
-                ]
+                {**link, "href": urljoin(base_url, link["href"])}
             )
 
         # Add Collections links
         collections = self.all_collections(request=kwargs["request"])
-
-        for collection in collections["collections"]:
-            landing_page["links"].append(
-                {
-                    "rel": Relations.child.value,
-                    "type": MimeTypes.json.value,
-                    "title": collection.get("title") or collection.get("id"),
-                    "href": urljoin(base_url, f"collections/{collection['id']}"),
-                }
-            )
+        landing_page["links"].extend(
+            self._child_links(base_url, collections["collections"])
+        )
 
         # Add OpenAPI URL
         landing_page["links"].append(
@@ -567,28 +672,40 @@ class AsyncBaseCoreClient(LandingPageMixin, abc.ABC):
 
     Attributes:
         extensions: list of registered api extensions.
+        extension_registry: index of the registered extensions, created on first
+            use (or by `StacApi`) and reset when `extensions` or
+            `base_conformance_classes` are re-assigned.
     """
 
     base_conformance_classes: List[str] = attr.ib(
-        factory=lambda: BASE_CONFORMANCE_CLASSES
+        factory=lambda: list(BASE_CONFORMANCE_CLASSES),
+        on_setattr=_reset_extension_registry,
+    )
+    extensions: List[ApiExtension] = attr.ib(
+        default=attr.Factory(list), on_setattr=_reset_extension_registry
     )
-    extensions: List[ApiExtension] = attr.ib(default=attr.Factory(list))
     post_request_model = attr.ib(default=BaseSearchPostRequest)
+    extension_registry: Optional[ExtensionRegistry] = attr.ib(default=None)
+
+    def get_extension_registry(self) -> ExtensionRegistry:
+        """Return the extension registry, creating it if needed."""
+        if self.extension_registry is None:
+            self.extension_registry = ExtensionRegistry.from_extensions(
+                self.extensions,
+                base_conformance_classes=self.base_conformance_classes,
+                landing_page_links=EXTENSION_LANDING_PAGE_LINKS,
+            )
+
+        return self.extension_registry
 
     def conformance_classes(self) -> List[str]:
         """Generate conformance classes by adding extension conformance to base
         conformance classes."""
-        conformance_classes = self.base_conformance_classes.copy()
-
-        for extension in self.extensions:
-            extension_classes = getattr(extension, "conformance_classes", [])
-            conformance_classes.extend(extension_classes)
-
-        return list(set(conformance_classes))
+        return list(self.get_extension_registry().conformance_classes)
 
     def extension_is_enabled(self, extension: str) -> bool:
         """Check if an api extension is enabled."""
-        return any([type(ext).__name__ == extension for ext in self.extensions])
+        return self.get_extension_registry().is_enabled(extension)
 
     async def landing_page(self, **kwargs) -> stac.LandingPage:
         """Landing page.
@@ -607,49 +724,17 @@ class AsyncBaseCoreClient(LandingPageMixin, abc.ABC):
             extension_schemas=[],
         )
 
-        # Add Queryables link
-        if self.extension_is_enabled("FilterExtension"):
+        # Add Extensions links (e.g. Queryables, Aggregation)
+        for link in self.get_extension_registry().landing_page_links:
             landing_page["links"].append(
-                {
-                    "rel": Relations.queryables.value,
-                    "type": MimeTypes.jsonschema.value,
-                    "title": "Queryables",
-                    "href": urljoin(base_url, "queryables"),
-                    "method": "GET",
-                }
-            )
-
-        # Add Aggregation links
-        if self.extension_is_enabled("AggregationExtension"):
-            landing_page["links"].extend(
-                [
-                    {
-                        "rel": "aggregate",
-                        "type": "application/json",
-                        "title": "Aggregate",
-                        "href": urljoin(base_url, "aggregate"),
-                    },
-                    {
-                        "rel": "aggregations",
-                        "type": "application/json",
-                        "title": "Aggregations",
-                        "href": urljoin(base_url, "aggregations"),
-                    },
-                ]
+                {**link, "href": urljoin(base_url, link["href"])}
             )
 
         # Add Collections links
         collections = await self.all_collections(request=kwargs["request"])
-
-        for collection in collections["collections"]:
-            landing_page["links"].append(
-                {
-                    "rel": Relations.child.value,
-                    "type": MimeTypes.json.value,
-                    "title": collection.get("title") or collection.get("id"),
-                    "href": urljoin(base_url, f"collections/{collection['id']}"),
-                }
-            )
+        landing_page["links"].extend(
+            self._child_links(base_url, collections["collections"])
+        )
 
         # Add OpenAPI URL
         landing_page["links"].append(
@@ -31,6 +31,12 @@ class DatabaseError(StacApiError):
     pass
 
 
+class InvalidItemError(StacApiError):
+    """Error for items which are not valid (e.g. in transactions)."""
+
+    pass
+
+
 class InvalidQueryParameter(StacApiError):
     """Error for unknown or invalid query parameters.
 
@@ -39,3 +45,9 @@ class InvalidQueryParameter(StacApiError):
     """
 
     pass
+
+
+class PayloadTooLargeError(StacApiError):
+    """Error for request bodies exceeding the size accepted by the server."""
+
+    pass
@@ -1,7 +1,19 @@
 """Base api extension."""
 
 import abc
-from typing import List, Optional
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 import attr
 from fastapi import FastAPI
@@ -36,3 +48,94 @@ class ApiExtension(abc.ABC):
             None
         """
         pass
+
+
+ExtensionType = TypeVar("ExtensionType", bound=ApiExtension)
+
+
+@attr.s(frozen=True)
+class ExtensionRegistry:
+    """Immutable index of the API extensions.
+
+    Built once (e.g. when the `StacApi` is created) so that the per-request helpers
+    (conformance classes, enabled extensions, landing page links) are simple
+    lookups.
+
+    Attributes:
+        extensions: registered extensions.
+        conformance_classes: deduplicated base and extension conformance classes.
+        landing_page_links: links (with `href` relative to the base URL) added to
+            the landing page for the registered extensions.
+    """
+
+    extensions: Tuple[ApiExtension, ...] = attr.ib(converter=tuple)
+    conformance_classes: Tuple[str, ...] = attr.ib(converter=tuple)
+    landing_page_links: Tuple[Dict[str, Any], ...] = attr.ib(default=(), converter=tuple)
+    _by_type: Mapping[type, ApiExtension] = attr.ib(init=False, repr=False, eq=False)
+    _names: FrozenSet[str] = attr.ib(init=False, repr=False, eq=False)
+    _conformance: FrozenSet[str] = attr.ib(init=False, repr=False, eq=False)
+
+    def __attrs_post_init__(self):
+        """Build the lookup tables."""
+        by_type = {}
+        for ext in self.extensions:
+            for cls in type(ext).__mro__:
+                by_type.setdefault(cls, ext)
+
+        object.__setattr__(self, "_by_type", by_type)
+        object.__setattr__(
+            self, "_names", frozenset(type(ext).__name__ for ext in self.extensions)
+        )
+        object.__setattr__(self, "_conformance", frozenset(self.conformance_classes))
+
+    @classmethod
+    def from_extensions(
+        cls,
+        extensions: Iterable[ApiExtension],
+        base_conformance_classes: Iterable[str] = (),
+        landing_page_links: Optional[Mapping[str, List[Dict[str, Any]]]] = None,
+    ) -> "ExtensionRegistry":
+        """Create the registry.
+
+        Args:
+            extensions: registered extensions.
+            base_conformance_classes: conformance classes of the core API.
+            landing_page_links: mapping of extension class names to the links to
+                add to the landing page when the extension is enabled.
+
+        Returns:
+            The extension registry.
+        """
+        extensions = tuple(extensions)
+        conformance_classes = list(base_conformance_classes)
+        for ext in extensions:
+            conformance_classes.extend(getattr(ext, "conformance_classes", []))
+
+        names = {type(ext).__name__ for ext in extensions}
+        links = [
+            link
+            for name, ext_links in (landing_page_links or {}).items()
+            if name in names
+            for link in ext_links
+        ]
+
+        return cls(
+            extensions=extensions,
+            conformance_classes=dict.fromkeys(conformance_classes),
+            landing_page_links=links,
+        )
+
+    def get(self, extension: Type[ExtensionType]) -> Optional[ExtensionType]:
+        """Get the first extension which is an instance of `extension`."""
+        return self._by_type.get(extension)
+
+    def is_enabled(self, extension: Union[str, Type[ApiExtension]]) -> bool:
+        """Check if an extension is enabled, by class or class name."""
+        if isinstance(extension, str):
+            return extension in self._names
+
+        return extension in self._by_type
+
+    def conforms_to(self, conformance_class: str) -> bool:
+        """Check if a conformance class is implemented."""
+        return conformance_class in self._conformance
@@ -0,0 +1,84 @@
+"""Bounding box helpers for GeoJSON geometries.
+
+Boxes are 2D `(minx, miny, maxx, maxy)` tuples; a box with `minx > maxx` crosses
+the antimeridian.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+Box = Tuple[float, float, float, float]
+
+
+def iter_positions(coordinates: Any) -> Iterator[List[float]]:
+    """Iterate over the positions of (nested) GeoJSON coordinates."""
+    if coordinates and isinstance(coordinates[0], (int, float)):
+        yield coordinates
+    else:
+        for child in coordinates or []:
+            yield from iter_positions(child)
+
+
+def first_position(coordinates: Any) -> Optional[List[float]]:
+    """Return the first position of (nested) GeoJSON coordinates, if any."""
+    return next(iter_positions(coordinates), None)
+
+
+def geometry_bbox(geometry: Optional[Dict[str, Any]]) -> Optional[Box]:
+    """Return the 2D bounding box of a GeoJSON geometry."""
+    if not geometry:
+        return None
+
+    if geometry.get("type") == "GeometryCollection":
+        boxes = [geometry_bbox(child) for child in geometry.get("geometries") or []]
+        boxes = [box for box in boxes if box is not None]
+        if not boxes:
+            return None
+
+        return (
+            min(box[0] for box in boxes),
+            min(box[1] for box in boxes),
+            max(box[2] for box in boxes),
+            max(box[3] for box in boxes),
+        )
+
+    positions = list(iter_positions(geometry.get("coordinates")))
+    if not positions:
+        return None
+
+    xs = [position[0] for position in positions]
+    ys = [position[1] for position in positions]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def to_box(bbox: Any) -> Optional[Box]:
+    """Return the 2D part of a 2D or 3D bbox (None if empty)."""
+    if not bbox:
+        return None
+
+    if len(bbox) == 6:
+        return bbox[0], bbox[1], bbox[3], bbox[4]
+
+    return tuple(bbox)
+
+
+def split_box(box: Box) -> List[Box]:
+    """Split a box crossing the antimeridian (`minx > maxx`) in two."""
+    minx, miny, maxx, maxy = box
+    if minx > maxx:
+        return [(minx, miny, 180.0, maxy), (-180.0, miny, maxx, maxy)]
+
+    return [box]
+
+
+def parts_intersect(parts: List[Box], other: List[Box]) -> bool:
+    """Return True if boxes split with `split_box` intersect."""
+    return any(
+        a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+        for a in parts
+        for b in other
+    )
+
+
+def boxes_intersect(box: Box, other: Box) -> bool:
+    """Return True if two boxes (possibly crossing the antimeridian) intersect."""
+    return parts_intersect(split_box(box), split_box(other))
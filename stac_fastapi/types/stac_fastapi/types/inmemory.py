@@ -0,0 +1,1053 @@
+"""Indexed in-memory backend."""
+
+import base64
+import heapq
+import itertools
+import json
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime as dt
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+import attr
+from stac_pydantic.shared import MimeTypes
+from starlette.requests import Request
+
+from stac_fastapi.types import stac
+from stac_fastapi.types.core import (
+    AsyncBaseCoreClient,
+    AsyncBaseTransactionsClient,
+    BaseCoreClient,
+    BaseTransactionsClient,
+)
+from stac_fastapi.types.errors import ConflictError, InvalidQueryParameter, NotFoundError
+from stac_fastapi.types.geometry import (
+    Box,
+    geometry_bbox,
+    parts_intersect,
+    split_box,
+    to_box,
+)
+from stac_fastapi.types.links import PageLinks
+from stac_fastapi.types.requests import get_base_url
+from stac_fastapi.types.rfc3339 import (
+    DateTimeType,
+    rfc3339_str_to_datetime,
+    str_to_interval,
+)
+from stac_fastapi.types.search import BaseSearchPostRequest
+
+__all__ = [
+    "DatetimeIndex",
+    "GridIndex",
+    "InMemoryCatalog",
+    "InMemoryCoreClient",
+    "AsyncInMemoryCoreClient",
+]
+
+Interval = Tuple[float, float]
+# (start timestamp, collection id, item id), items are returned in descending order
+SortKey = Tuple[float, str, str]
+
+
+def _timestamp(value: Union[str, dt, None]) -> Optional[float]:
+    if value is None:
+        return None
+
+    if isinstance(value, str):
+        value = rfc3339_str_to_datetime(value)
+
+    return value.timestamp()
+
+
+def item_interval(item: stac.Item) -> Optional[Interval]:
+    """Return the (start, end) timestamps of an item, if it has a datetime."""
+    properties = item.get("properties") or {}
+    start = _timestamp(properties.get("start_datetime") or properties.get("datetime"))
+    end = _timestamp(properties.get("end_datetime") or properties.get("datetime"))
+    if start is None and end is None:
+        return None
+
+    return (
+        start if start is not None else end,
+        end if end is not None else start,
+    )
+
+
+def query_interval(datetime: Union[DateTimeType, str, None]) -> Optional[Interval]:
+    """Return the (start, end) timestamps of a `datetime` search parameter.
+
+    Open ends are returned as infinite timestamps.
+    """
+    if isinstance(datetime, str):
+        datetime = str_to_interval(datetime)
+
+    if datetime is None:
+        return None
+
+    if isinstance(datetime, dt):
+        start = end = datetime.timestamp()
+        return start, end
+
+    start, end = datetime
+    return (
+        start.timestamp() if start is not None else -math.inf,
+        end.timestamp() if end is not None else math.inf,
+    )
+
+
+def item_bbox(item: stac.Item) -> Optional[Box]:
+    """Return the 2D bounding box of an item (`bbox`, or computed from `geometry`)."""
+    if item.get("bbox"):
+        return to_box(item["bbox"])
+
+    return geometry_bbox(item.get("geometry"))
+
+
+@attr.s
+class DatetimeIndex:
+    """Index of the item (start, end) intervals, sorted by start time.
+
+    The entries are kept sorted in two parallel lists (start timestamps and ids)
+    so that intervals are looked up by bisection: the items intersecting
+    `[start, end]` start between `start - max_duration` and `end`, the longest
+    item duration being maintained on insertion. Items without datetime are kept
+    at the start of the index (they are only returned when no datetime is
+    searched).
+    """
+
+    _starts: List[float] = attr.ib(init=False, factory=list)
+    _ids: List[str] = attr.ib(init=False, factory=list)
+    _intervals: Dict[str, Optional[Interval]] = attr.ib(init=False, factory=dict)
+    _max_duration: float = attr.ib(init=False, default=0.0)
+
+    def __len__(self) -> int:
+        """Return the number of indexed items."""
+        return len(self._ids)
+
+    def __contains__(self, item_id: str) -> bool:
+        """Return True if the item is indexed."""
+        return item_id in self._intervals
+
+    def _position(self, start: float, item_id: Optional[str] = None) -> int:
+        lo = bisect_left(self._starts, start)
+        hi = bisect_right(self._starts, start, lo)
+        if item_id is None:
+            # after all the items starting at `start`
+            return hi
+
+        # ties are sorted by id
+        return bisect_left(self._ids, item_id, lo, hi)
+
+    def start(self, item_id: str) -> float:
+        """Return the start timestamp of an item (`-inf` without datetime)."""
+        interval = self._intervals[item_id]
+        return interval[0] if interval is not None else -math.inf
+
+    def add(self, item_id: str, interval: Optional[Interval]) -> None:
+        """Index an item (replacing its previous interval, if any)."""
+        if item_id in self._intervals:
+            self.remove(item_id)
+
+        start = interval[0] if interval is not None else -math.inf
+        position = self._position(start, item_id)
+        self._starts.insert(position, start)
+        self._ids.insert(position, item_id)
+        self._intervals[item_id] = interval
+        if interval is not None:
+            self._max_duration = max(self._max_duration, interval[1] - interval[0])
+
+    def remove(self, item_id: str) -> None:
+        """Remove an item from the index."""
+        start = self.start(item_id)
+        interval = self._intervals.pop(item_id)
+        position = self._position(start, item_id)
+        del self._starts[position]
+        del self._ids[position]
+        if interval is not None and interval[1] - interval[0] >= self._max_duration:
+            self._max_duration = max(
+                (i[1] - i[0] for i in self._intervals.values() if i is not None),
+                default=0.0,
+            )
+
+    def intersects(self, item_id: str, interval: Interval) -> bool:
+        """Return True if the interval of an item intersects `interval`."""
+        item_interval = self._intervals[item_id]
+        return (
+            item_interval is not None
+            and item_interval[0] <= interval[1]
+            and interval[0] <= item_interval[1]
+        )
+
+    def count(self, interval: Optional[Interval] = None) -> int:
+        """Return the number of items intersecting `interval`."""
+        if interval is None:
+            return len(self._ids)
+
+        start, end = interval
+        undated = bisect_right(self._starts, -math.inf)
+        lo = max(bisect_left(self._starts, start - self._max_duration), undated)
+        mid = max(bisect_left(self._starts, start), undated)
+        hi = bisect_right(self._starts, end)
+        # the items starting within the interval intersect it, the ones starting
+        # up to `max_duration` before it have to be checked
+        return max(hi - mid, 0) + sum(
+            1
+            for position in range(lo, min(mid, hi))
+            if self.intersects(self._ids[position], interval)
+        )
+
+    def search(
+        self,
+        interval: Optional[Interval] = None,
+        before: Optional[Tuple[float, Optional[str]]] = None,
+    ) -> Iterator[str]:
+        """Return the ids of the items intersecting `interval`, latest first.
+
+        With `before`, a (start timestamp, id) key, only the items sorted before it
+        are returned (an id of None being sorted after all the ids).
+        """
+        lo, hi = 0, len(self._ids)
+        if before is not None:
+            hi = self._position(*before)
+
+        if interval is not None:
+            start, end = interval
+            lo = bisect_left(self._starts, start - self._max_duration)
+            hi = min(hi, bisect_right(self._starts, end))
+
+        for position in range(hi - 1, lo - 1, -1):
+            item_id = self._ids[position]
+            if interval is None or self.intersects(item_id, interval):
+                yield item_id
+
+
+@attr.s
+class GridIndex:
+    """Spatial index of the item bounding boxes on a regular grid.
+
+    Each item is registered in the grid cells its bounding box overlaps (boxes
+    crossing the antimeridian being split in two), so a bbox search only checks
+    the items of the overlapped cells. Items overlapping more than `max_cells`
+    cells (e.g. global items) are kept apart and always checked.
+
+    Attributes:
+        cell_size: size of the grid cells, in degrees.
+        max_cells: maximum number of cells an item is registered in.
+    """
+
+    cell_size: float = attr.ib(default=1.0)
+    max_cells: int = attr.ib(default=1024)
+    _cells: Dict[Tuple[int, int], Set[str]] = attr.ib(init=False, factory=dict)
+    _large: Set[str] = attr.ib(init=False, factory=set)
+    _boxes: Dict[str, List[Box]] = attr.ib(init=False, factory=dict)
+
+    def __contains__(self, item_id: str) -> bool:
+        """Return True if the item is indexed."""
+        return item_id in self._boxes
+
+    def _cell_range(self, box: Box) -> Tuple[int, int, int, int]:
+        return (
+            math.floor(box[0] / self.cell_size),
+            math.floor(box[1] / self.cell_size),
+            math.floor(box[2] / self.cell_size),
+            math.floor(box[3] / self.cell_size),
+        )
+
+    def _cells_of(self, parts: List[Box]) -> Optional[List[Tuple[int, int]]]:
+        cells = []
+        for part in parts:
+            x0, y0, x1, y1 = self._cell_range(part)
+            if len(cells) + (x1 - x0 + 1) * (y1 - y0 + 1) > self.max_cells:
+                return None
+
+            cells.extend(itertools.product(range(x0, x1 + 1), range(y0, y1 + 1)))
+
+        return cells
+
+    def add(self, item_id: str, box: Optional[Box]) -> None:
+        """Index an item (replacing its previous box, if any)."""
+        if item_id in self._boxes:
+            self.remove(item_id)
+
+        if box is None:
+            return
+
+        parts = split_box(box)
+        self._boxes[item_id] = parts
+        cells = self._cells_of(parts)
+        if cells is None:
+            self._large.add(item_id)
+            return
+
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(item_id)
+
+    def remove(self, item_id: str) -> None:
+        """Remove an item from the index."""
+        parts = self._boxes.pop(item_id, None)
+        if parts is None:
+            return
+
+        cells = self._cells_of(parts)
+        if cells is None:
+            self._large.discard(item_id)
+            return
+
+        for cell in cells:
+            ids = self._cells[cell]
+            ids.discard(item_id)
+            if not ids:
+                del self._cells[cell]
+
+    def intersects(self, item_id: str, box: Box) -> bool:
+        """Return True if the box of an item intersects `box`."""
+        parts = self._boxes.get(item_id)
+        return parts is not None and parts_intersect(parts, split_box(box))
+
+    def search(self, box: Box) -> Set[str]:
+        """Return the ids of the items intersecting `box`."""
+        parts = split_box(box)
+        candidates = set(self._large)
+        for part in parts:
+            x0, y0, x1, y1 = self._cell_range(part)
+            if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+                # cheaper to go through the occupied cells
+                for (x, y), ids in self._cells.items():
+                    if x0 <= x <= x1 and y0 <= y <= y1:
+                        candidates.update(ids)
+            else:
+                for cell in itertools.product(range(x0, x1 + 1), range(y0, y1 + 1)):
+                    candidates.update(self._cells.get(cell, ()))
+
+        return {
+            item_id
+            for item_id in candidates
+            if parts_intersect(self._boxes[item_id], parts)
+        }
+
+
+@attr.s
+class _CollectionIndex:
+    """Items of a collection, with their datetime and spatial indexes."""
+
+    collection_id: str = attr.ib()
+    cell_size: float = attr.ib(default=1.0)
+    items: Dict[str, stac.Item] = attr.ib(factory=dict)
+    datetime_index: DatetimeIndex = attr.ib(factory=DatetimeIndex)
+    spatial_index: GridIndex = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        """Create the spatial index."""
+        self.spatial_index = GridIndex(cell_size=self.cell_size)
+
+    def add(self, item: stac.Item) -> None:
+        self.items[item["id"]] = item
+        self.datetime_index.add(item["id"], item_interval(item))
+        self.spatial_index.add(item["id"], item_bbox(item))
+
+    def remove(self, item_id: str) -> stac.Item:
+        item = self.items.pop(item_id)
+        self.datetime_index.remove(item_id)
+        self.spatial_index.remove(item_id)
+        return item
+
+    def sort_key(self, item_id: str) -> SortKey:
+        return self.datetime_index.start(item_id), self.collection_id, item_id
+
+    def _before(self, after: SortKey) -> Tuple[float, Optional[str]]:
+        # the (start, id) key of the datetime index matching `after`
+        start, collection_id, item_id = after
+        if collection_id == self.collection_id:
+            return start, item_id
+
+        return start, None if self.collection_id < collection_id else ""
+
+    def search(
+        self,
+        ids: Optional[List[str]] = None,
+        box: Optional[Box] = None,
+        interval: Optional[Interval] = None,
+        after: Optional[SortKey] = None,
+    ) -> Tuple[Iterator[SortKey], int]:
+        """Search the items.
+
+        Returns:
+            tuple: the sort keys of the matching items sorted after `after`, in
+                descending order, and the number of matching items.
+        """
+        if ids is None and box is None:
+            # already sorted
+            keys = (
+                self.sort_key(item_id)
+                for item_id in self.datetime_index.search(
+                    interval, self._before(after) if after is not None else None
+                )
+            )
+            return keys, self.datetime_index.count(interval)
+
+        keys = self._sorted_keys(ids, box, interval)
+        if after is not None:
+            return itertools.dropwhile(lambda key: key >= after, keys), len(keys)
+
+        return iter(keys), len(keys)
+
+    def _sorted_keys(
+        self,
+        ids: Optional[List[str]] = None,
+        box: Optional[Box] = None,
+        interval: Optional[Interval] = None,
+    ) -> List[SortKey]:
+        if ids is not None:
+            candidates = {item_id for item_id in ids if item_id in self.items}
+            if box is not None:
+                candidates = {
+                    item_id
+                    for item_id in candidates
+                    if self.spatial_index.intersects(item_id, box)
+                }
+        else:
+            candidates = self.spatial_index.search(box)
+
+        if interval is not None:
+            candidates = {
+                item_id
+                for item_id in candidates
+                if self.datetime_index.intersects(item_id, interval)
+            }
+
+        return sorted((self.sort_key(item_id) for item_id in candidates), reverse=True)
+
+
+@attr.s
+class InMemoryCatalog:
+    """Indexed in-memory store of collections and items.
+
+    The items are kept in a hash map per collection, along with a datetime index
+    (`DatetimeIndex`) and a spatial index (`GridIndex`) which are updated on each
+    insertion/deletion. A search only goes through the items of the searched
+    collections selected by the most selective parameter (`ids`, then `bbox`,
+    then `datetime`), and the per-collection results are merged in order (latest
+    items first).
+
+    Attributes:
+        cell_size: size of the spatial index cells, in degrees.
+    """
+
+    cell_size: float = attr.ib(default=1.0)
+    _collections: Dict[str, stac.Collection] = attr.ib(init=False, factory=dict)
+    _indexes: Dict[str, _CollectionIndex] = attr.ib(init=False, factory=dict)
+    _lock: threading.RLock = attr.ib(init=False, factory=threading.RLock)
+
+    def collections(self) -> List[stac.Collection]:
+        """Return all the collections."""
+        with self._lock:
+            return list(self._collections.values())
+
+    def get_collection(self, collection_id: str) -> stac.Collection:
+        """Return a collection."""
+        try:
+            return self._collections[collection_id]
+        except KeyError as e:
+            raise NotFoundError(f"Collection {collection_id} does not exist.") from e
+
+    def add_collection(self, collection: stac.Collection) -> None:
+        """Add a new collection."""
+        with self._lock:
+            if collection["id"] in self._collections:
+                raise ConflictError(f"Collection {collection['id']} already exists.")
+
+            self._collections[collection["id"]] = collection
+            self._indexes[collection["id"]] = _CollectionIndex(
+                collection["id"], cell_size=self.cell_size
+            )
+
+    def update_collection(self, collection_id: str, collection: stac.Collection) -> None:
+        """Replace a collection, moving its items if its id changes."""
+        with self._lock:
+            self.get_collection(collection_id)
+            if collection["id"] != collection_id:
+                self.add_collection(collection)
+                for item in self.remove_collection(collection_id).items.values():
+                    self._indexes[collection["id"]].add(
+                        {**item, "collection": collection["id"]}
+                    )
+            else:
+                self._collections[collection_id] = collection
+
+    def remove_collection(self, collection_id: str) -> "_CollectionIndex":
+        """Remove a collection and its items."""
+        with self._lock:
+            self.get_collection(collection_id)
+            del self._collections[collection_id]
+            return self._indexes.pop(collection_id)
+
+    def get_item(self, collection_id: str, item_id: str) -> stac.Item:
+        """Return an item."""
+        self.get_collection(collection_id)
+        try:
+            return self._indexes[collection_id].items[item_id]
+        except KeyError as e:
+            raise NotFoundError(
+                f"Item {item_id} does not exist in collection {collection_id}."
+            ) from e
+
+    def add_item(self, item: stac.Item, replace: bool = False) -> None:
+        """Add (or replace, with `replace=True`) an item of an existing collection."""
+        with self._lock:
+            self.get_collection(item["collection"])
+            index = self._indexes[item["collection"]]
+            exists = item["id"] in index.items
+            if exists and not replace:
+                raise ConflictError(
+                    f"Item {item['id']} already exists in collection "
+                    f"{item['collection']}."
+                )
+            if replace and not exists:
+                self.get_item(item["collection"], item["id"])
+
+            index.add(item)
+
+    def add_items(self, items: List[stac.Item]) -> List[Optional[Exception]]:
+        """Add new items, returning the error of each item (None once added)."""
+        errors: List[Optional[Exception]] = []
+        with self._lock:
+            for item in items:
+                try:
+                    self.add_item(item)
+                except (ConflictError, NotFoundError) as e:
+                    errors.append(e)
+                else:
+                    errors.append(None)
+
+        return errors
+
+    def add_all_items(self, items: List[stac.Item]) -> None:
+        """Add new items, all or none of them.
+
+        All the items are checked (existing collection, new id, readable datetime
+        and geometry) before the first one is added.
+        """
+        with self._lock:
+            ids: Set[Tuple[str, str]] = set()
+            for item in items:
+                self.get_collection(item["collection"])
+                key = (item["collection"], item["id"])
+                if key in ids or item["id"] in self._indexes[item["collection"]].items:
+                    raise ConflictError(
+                        f"Item {item['id']} already exists in collection "
+                        f"{item['collection']}."
+                    )
+
+                ids.add(key)
+                item_interval(item)
+                item_bbox(item)
+
+            for item in items:
+                self._indexes[item["collection"]].add(item)
+
+    def remove_item(self, collection_id: str, item_id: str) -> stac.Item:
+        """Remove an item."""
+        with self._lock:
+            self.get_item(collection_id, item_id)
+            return self._indexes[collection_id].remove(item_id)
+
+    def search(
+        self,
+        collections: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None,
+        bbox: Optional[Box] = None,
+        interval: Optional[Interval] = None,
+        limit: int = 10,
+        after: Optional[SortKey] = None,
+    ) -> Tuple[List[stac.Item], int]:
+        """Search items.
+
+        Items are sorted by their `sort_key`, in descending order. Pages are
+        retrieved by bisection of the indexes from the key of the last item of the
+        previous page (`after`).
+
+        Args:
+            collections: ids of the searched collections (all by default).
+            ids: ids of the searched items.
+            bbox: 2D bounding box (possibly crossing the antimeridian).
+            interval: (start, end) timestamps.
+            limit: maximum number of items returned.
+            after: only return the items sorted after this key.
+
+        Returns:
+            tuple: the page of items and the number of matching items.
+        """
+        page, matched = self.search_with_keys(
+            collections, ids, bbox, interval, limit=limit, after=after
+        )
+        return [item for _, item in page], matched
+
+    def search_with_keys(
+        self,
+        collections: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None,
+        bbox: Optional[Box] = None,
+        interval: Optional[Interval] = None,
+        limit: int = 10,
+        after: Optional[SortKey] = None,
+    ) -> Tuple[List[Tuple[SortKey, stac.Item]], int]:
+        """Search items, like `search`, returning the sort key of each item.
+
+        Returns:
+            tuple: the page of (sort key, item) and the number of matching items.
+        """
+        with self._lock:
+            indexes = [
+                self._indexes[collection_id]
+                for collection_id in (
+                    self._indexes if collections is None else dict.fromkeys(collections)
+                )
+                if collection_id in self._indexes
+            ]
+            results = [index.search(ids, bbox, interval, after) for index in indexes]
+            keys = heapq.merge(*(keys for keys, _ in results), reverse=True)
+            page = [
+                (key, self._indexes[key[1]].items[key[2]])
+                for key in itertools.islice(keys, limit)
+            ]
+            return page, sum(matched for _, matched in results)
+
+    def sort_key(self, item: stac.Item) -> SortKey:
+        """Return the (start timestamp, collection id, item id) key of an item."""
+        with self._lock:
+            return self._indexes[item["collection"]].sort_key(item["id"])
+
+
+def _to_dict(value: Any) -> Dict[str, Any]:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", by_alias=True, exclude_none=True)
+
+    return dict(value)
+
+
+def _spatial_filter(bbox: Any, intersects: Any) -> Optional[Box]:
+    if bbox:
+        return to_box(bbox)
+
+    if intersects:
+        if isinstance(intersects, str):
+            intersects = json.loads(intersects)
+
+        # `intersects` is evaluated on the geometry bounding boxes
+        return geometry_bbox(_to_dict(intersects))
+
+    return None
+
+
+def _encode_token(key: SortKey) -> str:
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def _decode_token(token: Optional[str]) -> Optional[SortKey]:
+    if not token:
+        return None
+
+    try:
+        start, collection_id, item_id = json.loads(base64.urlsafe_b64decode(token))
+        if not isinstance(collection_id, str) or not isinstance(item_id, str):
+            raise ValueError("invalid key")
+
+        return float(start), collection_id, item_id
+
+    except (ValueError, TypeError) as e:
+        raise InvalidQueryParameter(f"Invalid pagination token: {token}") from e
+
+
+@attr.s
+class _InMemoryClientMixin:
+    """Client logic shared by the sync and async in-memory clients."""
+
+    catalog: InMemoryCatalog = attr.ib(factory=InMemoryCatalog)
+
+    def _page(
+        self,
+        request: Request,
+        links: List[Dict[str, Any]],
+        search: Dict[str, Any],
+        token: Optional[str] = None,
+        body: Optional[Dict[str, Any]] = None,
+    ) -> stac.ItemCollection:
+        after = _decode_token(token)
+        limit = search.pop("limit", None) or 10
+        # the keys are gathered with the items, as they may be removed meanwhile
+        page, matched = self.catalog.search_with_keys(
+            limit=limit + 1, after=after, **search
+        )
+        items = [item for _, item in page[:limit]]
+        page_links = PageLinks(get_base_url(request))
+        if len(page) > limit:
+            next_token = _encode_token(page[limit - 1][0])
+            if body is None:
+                links.append(
+                    {
+                        "rel": "next",
+                        "type": MimeTypes.geojson.value,
+                        "href": str(request.url.include_query_params(token=next_token)),
+                    }
+                )
+            else:
+                links.append(
+                    {
+                        "rel": "next",
+                        "type": MimeTypes.geojson.value,
+                        "method": "POST",
+                        "href": str(request.url),
+                        "body": {**body, "token": next_token},
+                    }
+                )
+
+        return stac.ItemCollection(
+            type="FeatureCollection",
+            features=page_links.add_item_links({**item} for item in items),
+            links=[page_links.root(), *links],
+            numberMatched=matched,
+            numberReturned=len(items),
+        )
+
+    def _search(
+        self,
+        request: Request,
+        collections: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None,
+        bbox: Optional[Any] = None,
+        intersects: Optional[Any] = None,
+        datetime: Optional[Union[DateTimeType, str]] = None,
+        limit: Optional[int] = 10,
+        token: Optional[str] = None,
+        body: Optional[Dict[str, Any]] = None,
+    ) -> stac.ItemCollection:
+        search = {
+            "collections": collections,
+            "ids": ids,
+            "bbox": _spatial_filter(bbox, intersects),
+            "interval": query_interval(datetime),
+            "limit": limit,
+        }
+        links = [
+            {
+                "rel": "self",
+                "type": MimeTypes.geojson.value,
+                "href": str(request.url),
+            }
+        ]
+        return self._page(request, links, search, token=token, body=body)
+
+    def _post_search(
+        self, search_request: BaseSearchPostRequest, request: Request
+    ) -> stac.ItemCollection:
+        return self._search(
+            request,
+            collections=search_request.collections,
+            ids=search_request.ids,
+            bbox=search_request.bbox,
+            intersects=search_request.intersects,
+            datetime=search_request.datetime,
+            limit=search_request.limit,
+            token=getattr(search_request, "token", None),
+            body=search_request.model_dump(mode="json", exclude_none=True),
+        )
+
+    def _item_collection(
+        self,
+        request: Request,
+        collection_id: str,
+        bbox: Optional[Any] = None,
+        datetime: Optional[DateTimeType] = None,
+        limit: Optional[int] = 10,
+        token: Optional[str] = None,
+    ) -> stac.ItemCollection:
+        self.catalog.get_collection(collection_id)
+        page_links = PageLinks(get_base_url(request))
+        links = [
+            link
+            for link in page_links.collection_links(collection_id)
+            if link["rel"] not in ("root", "items")
+        ]
+        links[0] = {**links[0], "rel": "collection"}
+        links.append(
+            {"rel": "self", "type": MimeTypes.geojson.value, "href": str(request.url)}
+        )
+        search = {
+            "collections": [collection_id],
+            "bbox": _spatial_filter(bbox, None),
+            "interval": query_interval(datetime),
+            "limit": limit,
+        }
+        return self._page(request, links, search, token=token)
+
+    def _get_item(self, request: Request, item_id: str, collection_id: str) -> stac.Item:
+        item = self.catalog.get_item(collection_id, item_id)
+        return PageLinks(get_base_url(request)).add_item_links([{**item}])[0]
+
+    def _all_collections(self, request: Request) -> stac.Collections:
+        page_links = PageLinks(get_base_url(request))
+        return stac.Collections(
+            collections=page_links.add_collection_links(
+                {**collection} for collection in self.catalog.collections()
+            ),
+            links=[
+                page_links.root(),
+                {
+                    "rel": "self",
+                    "type": MimeTypes.json.value,
+                    "href": page_links.href("collections"),
+                },
+            ],
+        )
+
+    def _get_collection(self, request: Request, collection_id: str) -> stac.Collection:
+        collection = self.catalog.get_collection(collection_id)
+        return PageLinks(get_base_url(request)).add_collection_links([{**collection}])[0]
+
+    def _create_item(self, collection_id: str, item: Any) -> Optional[stac.Item]:
+        item = _to_dict(item)
+        if item.get("type") == "FeatureCollection":
+            self.catalog.add_all_items(
+                [
+                    {**feature, "collection": collection_id}
+                    for feature in item.get("features") or []
+                ]
+            )
+            return None
+
+        item["collection"] = collection_id
+        self.catalog.add_item(item)
+        return item
+
+    def _create_items(
+        self, collection_id: str, items: List[Any]
+    ) -> List[Union[stac.Item, Exception]]:
+        items = [{**_to_dict(item), "collection": collection_id} for item in items]
+        errors = self.catalog.add_items(items)
+        return [error or item for item, error in zip(items, errors)]
+
+    def _update_item(self, collection_id: str, item_id: str, item: Any) -> stac.Item:
+        item = {**_to_dict(item), "id": item_id, "collection": collection_id}
+        self.catalog.add_item(item, replace=True)
+        return item
+
+    def _create_collection(self, collection: Any) -> stac.Collection:
+        collection = _to_dict(collection)
+        self.catalog.add_collection(collection)
+        return collection
+
+    def _update_collection(self, collection_id: str, collection: Any) -> stac.Collection:
+        collection = _to_dict(collection)
+        self.catalog.update_collection(collection_id, collection)
+        return collection
+
+    def _delete_collection(self, collection_id: str) -> stac.Collection:
+        collection = self.catalog.get_collection(collection_id)
+        self.catalog.remove_collection(collection_id)
+        return collection
+
+
+@attr.s
+class InMemoryCoreClient(_InMemoryClientMixin, BaseCoreClient, BaseTransactionsClient):
+    """Core and transactions client storing the catalog in memory.
+
+    A reference backend for small catalogs, tests and benchmarks (see
+    `InMemoryCatalog`). Search results are sorted by datetime (latest first) and
+    paginated with tokens holding the sort key of the last item of the page (the
+    pagination extension is needed for paginating `POST /search`). `intersects` is
+    evaluated on the bounding box of the geometries.
+
+    Attributes:
+        catalog: the collections and items.
+    """
+
+    def post_search(
+        self, search_request: BaseSearchPostRequest, **kwargs
+    ) -> stac.ItemCollection:
+        """Cross catalog search (POST)."""
+        return self._post_search(search_request, kwargs["request"])
+
+    def get_search(
+        self,
+        collections: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None,
+        bbox: Optional[Any] = None,
+        intersects: Optional[Any] = None,
+        datetime: Optional[DateTimeType] = None,
+        limit: Optional[int] = 10,
+        **kwargs,
+    ) -> stac.ItemCollection:
+        """Cross catalog search (GET)."""
+        return self._search(
+            kwargs["request"],
+            collections=collections,
+            ids=ids,
+            bbox=bbox,
+            intersects=intersects,
+            datetime=datetime,
+            limit=limit,
+            token=kwargs.get("token"),
+        )
+
+    def get_item(self, item_id: str, collection_id: str, **kwargs) -> stac.Item:
+        """Get item by id."""
+        return self._get_item(kwargs["request"], item_id, collection_id)
+
+    def all_collections(self, **kwargs) -> stac.Collections:
+        """Get all available collections."""
+        return self._all_collections(kwargs["request"])
+
+    def get_collection(self, collection_id: str, **kwargs) -> stac.Collection:
+        """Get collection by id."""
+        return self._get_collection(kwargs["request"], collection_id)
+
+    def item_collection(
+        self,
+        collection_id: str,
+        bbox: Optional[Any] = None,
+        datetime: Optional[DateTimeType] = None,
+        limit: int = 10,
+        token: str = None,
+        **kwargs,
+    ) -> stac.ItemCollection:
+        """Get all items from a specific collection."""
+        return self._item_collection(
+            kwargs["request"], collection_id, bbox, datetime, limit, token
+        )
+
+    def create_item(self, collection_id: str, item: Any, **kwargs) -> Optional[stac.Item]:
+        """Create a new item (or items, from an ItemCollection)."""
+        return self._create_item(collection_id, item)
+
+    def create_items(
+        self, collection_id: str, items: List[Any], **kwargs
+    ) -> List[Union[stac.Item, Exception]]:
+        """Create several items, with a result for each item."""
+        return self._create_items(collection_id, items)
+
+    def update_item(
+        self, collection_id: str, item_id: str, item: Any, **kwargs
+    ) -> stac.Item:
+        """Replace an existing item."""
+        return self._update_item(collection_id, item_id, item)
+
+    def delete_item(self, item_id: str, collection_id: str, **kwargs) -> stac.Item:
+        """Delete an item from a collection."""
+        return self.catalog.remove_item(collection_id, item_id)
+
+    def create_collection(self, collection: Any, **kwargs) -> stac.Collection:
+        """Create a new collection."""
+        return self._create_collection(collection)
+
+    def update_collection(
+        self, collection_id: str, collection: Any, **kwargs
+    ) -> stac.Collection:
+        """Replace an existing collection."""
+        return self._update_collection(collection_id, collection)
+
+    def delete_collection(self, collection_id: str, **kwargs) -> stac.Collection:
+        """Delete a collection and its items."""
+        return self._delete_collection(collection_id)
+
+
+@attr.s
+class AsyncInMemoryCoreClient(
+    _InMemoryClientMixin, AsyncBaseCoreClient, AsyncBaseTransactionsClient
+):
+    """Async version of `InMemoryCoreClient`.
+
+    Attributes:
+        catalog: the collections and items.
+    """
+
+    async def post_search(
+        self, search_request: BaseSearchPostRequest, **kwargs
+    ) -> stac.ItemCollection:
+        """Cross catalog search (POST)."""
+        return self._post_search(search_request, kwargs["request"])
+
+    async def get_search(
+        self,
+        collections: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None,
+        bbox: Optional[Any] = None,
+        intersects: Optional[Any] = None,
+        datetime: Optional[DateTimeType] = None,
+        limit: Optional[int] = 10,
+        **kwargs,
+    ) -> stac.ItemCollection:
+        """Cross catalog search (GET)."""
+        return self._search(
+            kwargs["request"],
+            collections=collections,
+            ids=ids,
+            bbox=bbox,
+            intersects=intersects,
+            datetime=datetime,
+            limit=limit,
+            token=kwargs.get("token"),
+        )
+
+    async def get_item(self, item_id: str, collection_id: str, **kwargs) -> stac.Item:
+        """Get item by id."""
+        return self._get_item(kwargs["request"], item_id, collection_id)
+
+    async def all_collections(self, **kwargs) -> stac.Collections:
+        """Get all available collections."""
+        return self._all_collections(kwargs["request"])
+
+    async def get_collection(self, collection_id: str, **kwargs) -> stac.Collection:
+        """Get collection by id."""
+        return self._get_collection(kwargs["request"], collection_id)
+
+    async def item_collection(
+        self,
+        collection_id: str,
+        bbox: Optional[Any] = None,
+        datetime: Optional[DateTimeType] = None,
+        limit: int = 10,
+        token: str = None,
+        **kwargs,
+    ) -> stac.ItemCollection:
+        """Get all items from a specific collection."""
+        return self._item_collection(
+            kwargs["request"], collection_id, bbox, datetime, limit, token
+        )
+
+    async def create_item(
+        self, collection_id: str, item: Any, **kwargs
+    ) -> Optional[stac.Item]:
+        """Create a new item (or items, from an ItemCollection)."""
+        return self._create_item(collection_id, item)
+
+    async def create_items(
+        self, collection_id: str, items: List[Any], **kwargs
+    ) -> List[Union[stac.Item, Exception]]:
+        """Create several items, with a result for each item."""
+        return self._create_items(collection_id, items)
+
+    async def update_item(
+        self, collection_id: str, item_id: str, item: Any, **kwargs
+    ) -> stac.Item:
+        """Replace an existing item."""
+        return self._update_item(collection_id, item_id, item)
+
+    async def delete_item(self, item_id: str, collection_id: str, **kwargs) -> stac.Item:
+        """Delete an item from a collection."""
+        return self.catalog.remove_item(collection_id, item_id)
+
+    async def create_collection(self, collection: Any, **kwargs) -> stac.Collection:
+        """Create a new collection."""
+        return self._create_collection(collection)
+
+    async def update_collection(
+        self, collection_id: str, collection: Any, **kwargs
+    ) -> stac.Collection:
+        """Replace an existing collection."""
+        return self._update_collection(collection_id, collection)
+
+    async def delete_collection(self, collection_id: str, **kwargs) -> stac.Collection:
+        """Delete a collection and its items."""
+        return self._delete_collection(collection_id)
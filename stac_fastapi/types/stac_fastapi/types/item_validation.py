@@ -0,0 +1,340 @@
+"""Fast structural validation of items."""
+
+import asyncio
+import math
+import random
+from concurrent.futures import Executor
+from numbers import Real
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Type
+
+import anyio.to_thread
+import attr
+import iso8601
+from pydantic import BaseModel, ValidationError
+
+from stac_fastapi.types.geometry import geometry_bbox
+from stac_fastapi.types.rfc3339 import rfc3339_str_to_datetime
+
+__all__ = ["check_item", "item_key", "validate_items", "ItemValidator"]
+
+REQUIRED_KEYS = ("type", "id", "geometry", "properties", "links", "assets")
+
+# nesting depth of the positions of each geometry type
+GEOMETRY_DEPTHS = {
+    "Point": 0,
+    "MultiPoint": 1,
+    "LineString": 1,
+    "MultiLineString": 2,
+    "Polygon": 2,
+    "MultiPolygon": 3,
+}
+
+# tolerance of the bbox consistency check (in degrees)
+BBOX_TOLERANCE = 1e-7
+
+
+def _is_number(value: Any) -> bool:
+    return (
+        isinstance(value, Real) and not isinstance(value, bool) and math.isfinite(value)
+    )
+
+
+def _is_position(value: Any) -> bool:
+    return (
+        isinstance(value, (list, tuple))
+        and 2 <= len(value) <= 3
+        and all(_is_number(v) for v in value)
+    )
+
+
+def _check_coordinates(coordinates: Any, depth: int) -> bool:
+    if depth == 0:
+        return _is_position(coordinates)
+
+    return isinstance(coordinates, (list, tuple)) and all(
+        _check_coordinates(child, depth - 1) for child in coordinates
+    )
+
+
+def _line_errors(geometry_type: str, coordinates: Any) -> List[str]:
+    if geometry_type == "LineString":
+        lines, rings = [coordinates], []
+    elif geometry_type == "MultiLineString":
+        lines, rings = coordinates, []
+    elif geometry_type == "Polygon":
+        lines, rings = [], coordinates
+    elif geometry_type == "MultiPolygon":
+        lines, rings = [], [ring for polygon in coordinates for ring in polygon]
+    else:
+        return []
+
+    errors = []
+    if any(len(line) < 2 for line in lines):
+        errors.append("geometry has a line with less than 2 positions")
+    if any(len(ring) < 4 for ring in rings):
+        errors.append("geometry has a ring with less than 4 positions")
+    elif any(list(ring[0]) != list(ring[-1]) for ring in rings):
+        errors.append("geometry has a ring which is not closed")
+
+    return errors
+
+
+def geometry_errors(geometry: Any) -> List[str]:
+    """Check the structure of a GeoJSON geometry."""
+    if not isinstance(geometry, Mapping):
+        return ["geometry is not an object"]
+
+    geometry_type = geometry.get("type")
+    if geometry_type == "GeometryCollection":
+        geometries = geometry.get("geometries")
+        if not isinstance(geometries, list):
+            return ["geometry collection has no geometries"]
+
+        return [error for child in geometries for error in geometry_errors(child)]
+
+    depth = GEOMETRY_DEPTHS.get(geometry_type)
+    if depth is None:
+        return [f"unknown geometry type {geometry_type!r}"]
+
+    coordinates = geometry.get("coordinates")
+    if not _check_coordinates(coordinates, depth):
+        return [f"invalid {geometry_type} coordinates"]
+
+    return _line_errors(geometry_type, coordinates)
+
+
+def bbox_errors(bbox: Any, geometry: Any) -> List[str]:
+    """Check a bbox and that it contains the geometry."""
+    if not isinstance(bbox, (list, tuple)) or len(bbox) not in (4, 6):
+        return ["bbox must have 4 or 6 numbers"]
+
+    if not all(_is_number(value) for value in bbox):
+        return ["bbox must have 4 or 6 numbers"]
+
+    half = len(bbox) // 2
+    minx, miny, maxx, maxy = bbox[0], bbox[1], bbox[half], bbox[half + 1]
+    if miny > maxy or (len(bbox) == 6 and bbox[2] > bbox[5]):
+        return ["bbox minimum is greater than its maximum"]
+
+    box = geometry_bbox(geometry) if isinstance(geometry, Mapping) else None
+    if box is None:
+        return []
+
+    # boxes crossing the antimeridian (minx > maxx) are only checked in latitude
+    contains_x = minx > maxx or (
+        minx - BBOX_TOLERANCE <= box[0] and box[2] <= maxx + BBOX_TOLERANCE
+    )
+    contains_y = miny - BBOX_TOLERANCE <= box[1] and box[3] <= maxy + BBOX_TOLERANCE
+    if not (contains_x and contains_y):
+        return ["bbox does not contain the geometry"]
+
+    return []
+
+
+def _parse_datetime(properties: Mapping[str, Any], key: str, errors: List[str]) -> Any:
+    value = properties.get(key)
+    if value is None:
+        return None
+
+    try:
+        return rfc3339_str_to_datetime(value)
+    except (TypeError, ValueError, iso8601.ParseError):
+        errors.append(f"{key} is not a RFC 3339 datetime")
+        return None
+
+
+def datetime_errors(properties: Mapping[str, Any]) -> List[str]:
+    """Check the `datetime`, `start_datetime` and `end_datetime` properties."""
+    errors: List[str] = []
+    datetime = _parse_datetime(properties, "datetime", errors)
+    start = _parse_datetime(properties, "start_datetime", errors)
+    end = _parse_datetime(properties, "end_datetime", errors)
+    if errors:
+        return errors
+
+    if datetime is None and (start is None or end is None):
+        return ["start_datetime and end_datetime are required when datetime is null"]
+
+    if start is not None and end is not None and start > end:
+        return ["start_datetime is after end_datetime"]
+
+    return []
+
+
+def check_item(item: Any) -> List[str]:
+    """Check the structure of an item.
+
+    The checks cover the common causes of invalid items, much faster than a full
+    `stac_pydantic.Item` validation: required keys, geometry type and coordinates
+    (including closed rings), bbox consistency with the geometry and datetimes.
+
+    Returns:
+        The errors of the item (empty if the item is valid).
+    """
+    if not isinstance(item, Mapping):
+        return ["item is not an object"]
+
+    missing = [key for key in REQUIRED_KEYS if key not in item]
+    if missing:
+        return [f"missing {', '.join(missing)}"]
+
+    errors = _member_errors(item)
+    geometry = item["geometry"]
+    if geometry is not None:
+        invalid_geometry = geometry_errors(geometry)
+        errors.extend(invalid_geometry)
+        if invalid_geometry:
+            # the bbox can only be compared with a valid geometry
+            geometry = None
+        if item.get("bbox") is None:
+            errors.append("bbox is required when geometry is not null")
+
+    if item.get("bbox") is not None:
+        errors.extend(bbox_errors(item["bbox"], geometry))
+
+    if isinstance(item["properties"], Mapping):
+        errors.extend(datetime_errors(item["properties"]))
+    else:
+        errors.append("properties must be an object")
+
+    return errors
+
+
+def _member_errors(item: Mapping[str, Any]) -> List[str]:
+    errors = []
+    if item["type"] != "Feature":
+        errors.append("type must be 'Feature'")
+    if not isinstance(item["id"], str) or not item["id"]:
+        errors.append("id must be a non-empty string")
+    if not isinstance(item["links"], list):
+        errors.append("links must be an array")
+    if not isinstance(item["assets"], Mapping):
+        errors.append("assets must be an object")
+
+    return errors
+
+
+def _model_errors(item: Any, model: Type[BaseModel]) -> List[str]:
+    try:
+        model.model_validate(item)
+    except ValidationError as e:
+        return [
+            f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        ]
+
+    return []
+
+
+def validate_items(
+    items: Sequence[Any],
+    model: Optional[Type[BaseModel]] = None,
+    model_sample_rate: float = 1.0,
+) -> List[Tuple[int, List[str]]]:
+    """Validate items (see `check_item`), optionally with a model as well.
+
+    The model (e.g. `stac_pydantic.Item`) only validates the items which pass the
+    structural checks, and only a random `model_sample_rate` fraction of them.
+
+    Returns:
+        The position and errors of the invalid items.
+    """
+    invalid = []
+    for position, item in enumerate(items):
+        errors = check_item(item)
+        if (
+            not errors
+            and model is not None
+            and (model_sample_rate >= 1 or random.random() < model_sample_rate)
+        ):
+            errors = _model_errors(item, model)
+
+        if errors:
+            invalid.append((position, errors))
+
+    return invalid
+
+
+def item_key(item: Any, position: int) -> str:
+    """Return the key of an item in the validation reports (id or `#position`)."""
+    item_id = item.get("id") if isinstance(item, Mapping) else None
+    return item_id if isinstance(item_id, str) and item_id else f"#{position}"
+
+
+@attr.s
+class ItemValidator:
+    """Validate batches of items, in parallel for large batches.
+
+    Items are checked with `check_item` and, if `model` is set, the items which
+    pass these checks are validated with the model. The model validation costs
+    much more than the checks (about 10 times for `stac_pydantic.Item`): with
+    `model_sample_rate` below 1, only this fraction of the items is validated with
+    the model, the other invalid items being accepted unless the checks catch
+    them. Batches of at least
+    `min_parallel_size` items are split in batches of `batch_size` items which
+    are validated concurrently in `executor` (e.g. a `ProcessPoolExecutor`, the
+    validation being CPU bound), or in a worker thread without executor.
+
+    Attributes:
+        model: pydantic model of the full validation (e.g. `stac_pydantic.Item`).
+        model_sample_rate: fraction of the items validated with `model`.
+        executor: executor the large batches are validated in.
+        min_parallel_size: minimum number of items validated outside of the
+            event loop.
+        batch_size: number of items of the batches submitted to `executor`.
+    """
+
+    model: Optional[Type[BaseModel]] = attr.ib(default=None)
+    model_sample_rate: float = attr.ib(default=1.0)
+    executor: Optional[Executor] = attr.ib(default=None)
+    min_parallel_size: int = attr.ib(default=100)
+    batch_size: int = attr.ib(default=500)
+
+    def _report(
+        self, items: Sequence[Any], invalid: List[Tuple[int, List[str]]]
+    ) -> Dict[str, List[str]]:
+        report: Dict[str, List[str]] = {}
+        for position, errors in invalid:
+            report.setdefault(item_key(items[position], position), []).extend(errors)
+
+        return report
+
+    def validate(self, items: Sequence[Any]) -> Dict[str, List[str]]:
+        """Validate items.
+
+        Returns:
+            The errors of the invalid items, by item id (or `#position` for items
+            without a valid id).
+        """
+        return self._report(
+            items, validate_items(items, self.model, self.model_sample_rate)
+        )
+
+    async def validate_async(self, items: Sequence[Any]) -> Dict[str, List[str]]:
+        """Validate items, outside of the event loop for large batches."""
+        if len(items) < self.min_parallel_size:
+            return self.validate(items)
+
+        if self.executor is None:
+            return await anyio.to_thread.run_sync(self.validate, items)
+
+        loop = asyncio.get_running_loop()
+        starts = range(0, len(items), self.batch_size)
+        results = await asyncio.gather(
+            *[
+                loop.run_in_executor(
+                    self.executor,
+                    validate_items,
+                    items[start : start + self.batch_size],
+                    self.model,
+                    self.model_sample_rate,
+                )
+                for start in starts
+            ]
+        )
+        invalid = [
+            (start + position, errors)
+            for start, result in zip(starts, results)
+            for position, errors in result
+        ]
+        return self._report(items, invalid)
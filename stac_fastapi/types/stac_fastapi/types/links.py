@@ -1,12 +1,14 @@
 """Link helpers."""
 
-from typing import Any, Dict, List
-from urllib.parse import urljoin
+from typing import Any, Dict, Iterable, List
+from urllib.parse import urljoin, urlsplit
 
 import attr
 from stac_pydantic.links import Relations
 from stac_pydantic.shared import MimeTypes
 
+from stac_fastapi.types.stac import Collection, Item
+
 # These can be inferred from the item/collection so they aren't included in the database
 # Instead they are dynamically generated when querying the database using the
 # classes defined below
@@ -109,3 +111,124 @@ class ItemLinks(BaseLinks):
             self.root(),
         ]
         return links
+
+
+@attr.s
+class PageLinks:
+    """Create the inferred links of a page of items and/or collections.
+
+    The URL prefixes (base URL, collections path) are computed once, the links of
+    each item/collection are then created by string concatenation instead of
+    `urljoin` calls.
+
+    Attributes:
+        base_url: base URL of the API (e.g. `get_base_url(request)`).
+        root_relative: create path-absolute links (e.g. `/collections/test`)
+            instead of absolute URLs, to shrink the payloads.
+    """
+
+    base_url: str = attr.ib()
+    root_relative: bool = attr.ib(default=False)
+    _root: str = attr.ib(init=False)
+    _prefix: str = attr.ib(init=False)
+    _origin: str = attr.ib(init=False)
+    _collections: str = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        """Precompute the URL prefixes."""
+        prefix = (
+            self.base_url if self.base_url.endswith("/") else urljoin(self.base_url, ".")
+        )
+        root = self.base_url
+        url = urlsplit(self.base_url)
+        self._origin = f"{url.scheme}://{url.netloc}"
+        if self.root_relative:
+            prefix = urlsplit(prefix).path or "/"
+            root = url.path or "/"
+
+        self._root = root
+        self._prefix = prefix
+        self._collections = f"{prefix}collections/"
+
+    def root(self) -> Dict[str, Any]:
+        """Return the catalog root."""
+        return dict(rel=Relations.root, type=MimeTypes.json, href=self._root)
+
+    def href(self, path: str) -> str:
+        """Resolve a link href (relative to the base URL)."""
+        if path.startswith(("https://", "http://")):
+            return path
+
+        if (
+            path
+            and path[0] not in "/.?#"
+            and "/." not in path
+            # e.g. `mailto:...`
+            and ":" not in path.partition("/")[0]
+        ):
+            return self._prefix + path
+
+        href = urljoin(self.base_url, path)
+        if self.root_relative and href.startswith(f"{self._origin}/"):
+            href = href[len(self._origin) :]
+
+        return href
+
+    def resolve_links(self, links: Iterable[Dict]) -> List[Dict]:
+        """Remove the inferred links and make the other links absolute.
+
+        Same as `resolve_links`, for links relative to the base URL.
+        """
+        return [
+            {**link, "href": self.href(link["href"])}
+            for link in links
+            if link["rel"] not in INFERRED_LINK_RELS
+        ]
+
+    def collection_links(self, collection_id: str) -> List[Dict[str, Any]]:
+        """Return the inferred links of a collection (see `CollectionLinks`)."""
+        href = f"{self._collections}{collection_id}"
+        return [
+            dict(rel=Relations.self, type=MimeTypes.json, href=href),
+            dict(rel=Relations.parent, type=MimeTypes.json, href=self._root),
+            dict(rel="items", type=MimeTypes.geojson, href=f"{href}/items"),
+            self.root(),
+        ]
+
+    def item_links(self, collection_id: str, item_id: str) -> List[Dict[str, Any]]:
+        """Return the inferred links of an item (see `ItemLinks`)."""
+        collection = f"{self._collections}{collection_id}"
+        return [
+            dict(
+                rel=Relations.self,
+                type=MimeTypes.geojson,
+                href=f"{collection}/items/{item_id}",
+            ),
+            dict(rel=Relations.parent, type=MimeTypes.json, href=collection),
+            dict(rel=Relations.collection, type=MimeTypes.json, href=collection),
+            self.root(),
+        ]
+
+    def add_item_links(self, items: Iterable[Item]) -> List[Item]:
+        """Set the links of a list of items.
+
+        The inferred links replace the ones stored with each item, the other links
+        are resolved against the base URL.
+        """
+        items = list(items)
+        for item in items:
+            item["links"] = self.item_links(
+                item["collection"], item["id"]
+            ) + self.resolve_links(item.get("links") or [])
+
+        return items
+
+    def add_collection_links(self, collections: Iterable[Collection]) -> List[Collection]:
+        """Set the links of a list of collections (see `add_item_links`)."""
+        collections = list(collections)
+        for collection in collections:
+            collection["links"] = self.collection_links(
+                collection["id"]
+            ) + self.resolve_links(collection.get("links") or [])
+
+        return collections
@@ -1,12 +1,43 @@
 """Requests helpers."""
 
+from datetime import datetime
+from typing import Optional
+
 from starlette.requests import Request
 
 
 def get_base_url(request: Request) -> str:
-    """Get base URL with respect of APIRouter prefix."""
+    """Get base URL with respect of APIRouter prefix.
+
+    The base URL resolved by the `ProxyHeaderMiddleware` (stored in the request
+    state) is used when available.
+    """
+    base_url = request.scope.get("state", {}).get("base_url") or str(request.base_url)
     app = request.app
     if not app.state.router_prefix:
-        return str(request.base_url)
+        return base_url
     else:
-        return "{}{}/".format(str(request.base_url), app.state.router_prefix.lstrip("/"))
+        return "{}{}/".format(base_url, app.state.router_prefix.lstrip("/"))
+
+
+def set_response_validators(
+    request: Request,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+) -> None:
+    """Set the `ETag` and/or `Last-Modified` validators of the response.
+
+    Clients can call this from an endpoint (e.g. with a database row version or
+    modification time) so that conditional requests (`If-None-Match`,
+    `If-Modified-Since`) are answered with `304 Not Modified` before the response
+    is serialized.
+
+    Args:
+        request: the current request.
+        etag: entity tag, quoted (`"v1"`, `W/"v1"`) or not (`v1`).
+        last_modified: last modification time (timezone aware).
+    """
+    if etag is not None:
+        request.state.etag = etag
+    if last_modified is not None:
+        request.state.last_modified = last_modified
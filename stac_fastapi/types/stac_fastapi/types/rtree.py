@@ -0,0 +1,281 @@
+"""Packed static R-tree of bounding boxes.
+
+Requires the `rtree` extra (`pip install stac-fastapi.types[rtree]`).
+"""
+
+import math
+import os
+import struct
+from typing import Any, Iterable, List, Sequence, Tuple, Union
+
+import attr
+import numpy as np
+
+__all__ = ["PackedRTree"]
+
+PathType = Union[str, "os.PathLike[str]"]
+
+MAGIC = b"STACRTR1"
+# magic, node size, number of items, number of levels
+HEADER = struct.Struct("<8sQQQ")
+# the arrays start on a 64 bytes boundary
+HEADER_SIZE = 64
+
+
+def as_boxes(boxes: Union[np.ndarray, Iterable[Sequence[float]]]) -> np.ndarray:
+    """Convert 2D (or 3D) bounding boxes to a `(n, 4)` float64 array."""
+    boxes = np.asarray(boxes, dtype=np.float64)
+    if boxes.size == 0:
+        return np.empty((0, 4), dtype=np.float64)
+
+    if boxes.ndim == 1:
+        boxes = boxes[np.newaxis]
+
+    if boxes.shape[1] == 6:
+        boxes = boxes[:, [0, 1, 3, 4]]
+    elif boxes.shape[1] != 4:
+        raise ValueError(f"Invalid bounding boxes shape: {boxes.shape}")
+
+    return boxes
+
+
+def split_antimeridian(boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Split the boxes crossing the antimeridian (`minx > maxx`) in two.
+
+    Returns:
+        tuple: the boxes and the index of the original box of each of them.
+    """
+    ids = np.arange(len(boxes), dtype=np.int64)
+    crossing = boxes[:, 0] > boxes[:, 2]
+    if not crossing.any():
+        return boxes, ids
+
+    east = boxes[crossing].copy()
+    east[:, 2] = 180.0
+    west = boxes[crossing].copy()
+    west[:, 0] = -180.0
+    return (
+        np.concatenate([boxes[~crossing], east, west]),
+        np.concatenate([ids[~crossing], ids[crossing], ids[crossing]]),
+    )
+
+
+def _str_order(boxes: np.ndarray, node_size: int) -> np.ndarray:
+    """Sort-Tile-Recursive order of boxes: vertical slices of nodes sorted by y."""
+    count = len(boxes)
+    slices = math.ceil(math.sqrt(math.ceil(count / node_size)))
+    slice_size = slices * node_size
+    slice_ids = np.empty(count, dtype=np.int64)
+    slice_ids[np.argsort(boxes[:, 0] + boxes[:, 2], kind="stable")] = (
+        np.arange(count) // slice_size
+    )
+    return np.lexsort((boxes[:, 1] + boxes[:, 3], slice_ids))
+
+
+def _intersects(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (
+        (a[:, 0] <= b[:, 2])
+        & (b[:, 0] <= a[:, 2])
+        & (a[:, 1] <= b[:, 3])
+        & (b[:, 1] <= a[:, 3])
+    )
+
+
+@attr.s(frozen=True)
+class PackedRTree:
+    """Static R-tree of 2D bounding boxes, bulk loaded with Sort-Tile-Recursive.
+
+    All the nodes are stored in two contiguous arrays, level by level from the
+    leaves to the root: `boxes` (float64, `(n, 4)`) and `indices` (int64), which
+    holds the index of the original box for the leaves, and the position of the
+    first child for the other nodes (the children of a node being contiguous).
+    Queries go down the tree one level at a time, testing all the candidate nodes
+    of a level (for all the query boxes) with vectorized NumPy operations.
+
+    Boxes crossing the antimeridian (`minx > maxx`), either indexed or queried,
+    are split in two.
+
+    Attributes:
+        node_size: maximum number of children of a node.
+        num_items: number of indexed boxes.
+        boxes: boxes of the nodes.
+        indices: box index (leaves) or first child position (other nodes).
+        level_bounds: end position of each level.
+    """
+
+    node_size: int = attr.ib()
+    num_items: int = attr.ib()
+    boxes: np.ndarray = attr.ib(repr=False)
+    indices: np.ndarray = attr.ib(repr=False)
+    level_bounds: np.ndarray = attr.ib(repr=False)
+
+    @classmethod
+    def from_boxes(
+        cls,
+        boxes: Union[np.ndarray, Iterable[Sequence[float]]],
+        node_size: int = 16,
+    ) -> "PackedRTree":
+        """Bulk load a tree.
+
+        Args:
+            boxes: `(minx, miny, maxx, maxy)` (or 3D) boxes, e.g. a `(n, 4)` array
+                or a list of `stac_pydantic.shared.BBox`. The query results are
+                positions in this sequence.
+            node_size: maximum number of children of a node.
+        """
+        if node_size < 2:
+            raise ValueError("node_size must be at least 2")
+
+        boxes = as_boxes(boxes)
+        num_items = len(boxes)
+        if not num_items:
+            return cls(
+                node_size=node_size,
+                num_items=0,
+                boxes=boxes,
+                indices=np.empty(0, dtype=np.int64),
+                level_bounds=np.zeros(1, dtype=np.int64),
+            )
+
+        level_boxes, level_indices = split_antimeridian(boxes)
+        order = _str_order(level_boxes, node_size)
+        level_boxes, level_indices = level_boxes[order], level_indices[order]
+
+        all_boxes: List[np.ndarray] = [level_boxes]
+        all_indices: List[np.ndarray] = [level_indices]
+        level_bounds = [len(level_boxes)]
+        while len(level_boxes) > 1:
+            starts = np.arange(0, len(level_boxes), node_size)
+            parent_boxes = np.column_stack(
+                [
+                    np.minimum.reduceat(level_boxes[:, 0], starts),
+                    np.minimum.reduceat(level_boxes[:, 1], starts),
+                    np.maximum.reduceat(level_boxes[:, 2], starts),
+                    np.maximum.reduceat(level_boxes[:, 3], starts),
+                ]
+            )
+            # position of the first child (in the whole tree)
+            parent_indices = starts + (level_bounds[-1] - len(level_boxes))
+            order = _str_order(parent_boxes, node_size)
+            level_boxes, level_indices = parent_boxes[order], parent_indices[order]
+            all_boxes.append(level_boxes)
+            all_indices.append(level_indices)
+            level_bounds.append(level_bounds[-1] + len(level_boxes))
+
+        return cls(
+            node_size=node_size,
+            num_items=num_items,
+            boxes=np.ascontiguousarray(np.concatenate(all_boxes)),
+            indices=np.concatenate(all_indices).astype(np.int64),
+            level_bounds=np.asarray(level_bounds, dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        """Return the number of indexed boxes."""
+        return self.num_items
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        """Return the bounding box of all the indexed boxes."""
+        if not self.num_items:
+            return (math.nan,) * 4
+
+        return tuple(float(value) for value in self.boxes[-1])
+
+    def query_many(
+        self, boxes: Union[np.ndarray, Iterable[Sequence[float]]]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Find the indexed boxes intersecting each of the query boxes.
+
+        Returns:
+            tuple: `(query, item)` arrays of the intersecting pairs, sorted by
+                query then item position.
+        """
+        queries, query_ids = split_antimeridian(as_boxes(boxes))
+        if not self.num_items or not len(queries):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        # start from the root, for each query
+        level = len(self.level_bounds) - 1
+        pairs_query = np.arange(len(queries), dtype=np.int64)
+        pairs_node = np.full(len(queries), self.level_bounds[-1] - 1, dtype=np.int64)
+        mask = _intersects(self.boxes[pairs_node], queries[pairs_query])
+        pairs_query, pairs_node = pairs_query[mask], pairs_node[mask]
+        while level > 0 and len(pairs_node):
+            level -= 1
+            first = self.indices[pairs_node]
+            counts = np.minimum(first + self.node_size, self.level_bounds[level]) - first
+            ends = np.cumsum(counts)
+            pairs_node = np.repeat(first, counts) + (
+                np.arange(ends[-1]) - np.repeat(ends - counts, counts)
+            )
+            pairs_query = np.repeat(pairs_query, counts)
+            mask = _intersects(self.boxes[pairs_node], queries[pairs_query])
+            pairs_query, pairs_node = pairs_query[mask], pairs_node[mask]
+
+        # boxes crossing the antimeridian may match twice
+        pairs = np.unique(
+            np.column_stack([query_ids[pairs_query], self.indices[pairs_node]]), axis=0
+        )
+        return pairs[:, 0], pairs[:, 1]
+
+    def query(self, box: Sequence[float]) -> np.ndarray:
+        """Return the (sorted) positions of the boxes intersecting `box`."""
+        return self.query_many([box])[1]
+
+    def save(self, path: PathType) -> None:
+        """Write the tree to a file which can be memory-mapped by `load`."""
+        header = HEADER.pack(
+            MAGIC, self.node_size, self.num_items, len(self.level_bounds)
+        )
+        with open(path, "wb") as f:
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            for array in (self.level_bounds, self.boxes, self.indices):
+                f.write(np.ascontiguousarray(array, dtype=array.dtype.newbyteorder("<")))
+
+    @classmethod
+    def load(cls, path: PathType, mmap: bool = True) -> "PackedRTree":
+        """Read a tree written by `save`.
+
+        Args:
+            path: path of the file.
+            mmap: memory-map the arrays (read-only) instead of reading them, so
+                that the tree is available immediately and its pages are shared
+                between processes.
+        """
+        with open(path, "rb") as f:
+            magic, node_size, num_items, num_levels = HEADER.unpack(
+                f.read(HEADER_SIZE)[: HEADER.size]
+            )
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a packed R-tree file")
+
+            if not mmap:
+                data = f.read()
+
+        def _array(offset: int, dtype: Any, shape: Tuple[int, ...]) -> np.ndarray:
+            if not all(shape):
+                return np.empty(shape, dtype=dtype)
+
+            if mmap:
+                return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+            count = int(np.prod(shape))
+            return np.frombuffer(
+                data, dtype=dtype, count=count, offset=offset - HEADER_SIZE
+            ).reshape(shape)
+
+        offset = HEADER_SIZE
+        level_bounds = _array(offset, "<i8", (num_levels,))
+        num_nodes = int(level_bounds[-1]) if num_levels else 0
+        offset += num_levels * 8
+        boxes = _array(offset, "<f8", (num_nodes, 4))
+        offset += num_nodes * 32
+        indices = _array(offset, "<i8", (num_nodes,))
+        return cls(
+            node_size=node_size,
+            num_items=num_items,
+            boxes=boxes,
+            indices=indices,
+            level_bounds=level_bounds,
+        )
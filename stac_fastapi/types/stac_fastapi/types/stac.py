@@ -1,8 +1,9 @@
 """STAC types."""
 
 import sys
-from typing import Any, Dict, List, Literal, Optional, Union
+from typing import Any, AsyncIterable, Dict, Iterable, List, Literal, Optional, Union
 
+import attr
 from stac_pydantic.shared import BBox
 
 # Avoids a Pydantic error:
@@ -76,6 +77,29 @@ class ItemCollection(TypedDict, total=False):
     context: Optional[Dict[str, int]]
 
 
+@attr.s
+class ItemCollectionStream:
+    """STAC Item Collection, produced lazily.
+
+    Core clients may return this object instead of an `ItemCollection` from
+    `post_search`, `get_search` and `item_collection` to have the API stream the
+    FeatureCollection to the client feature by feature.
+
+    `links` and `extra` (e.g. `context`, `numberMatched`) are serialized after the
+    last feature, so the client can fill them in while the features are produced
+    (e.g. add the `next` link once it knows there are more results).
+
+    Attributes:
+        features: sync or async iterable of STAC Items.
+        links: FeatureCollection links.
+        extra: additional FeatureCollection members.
+    """
+
+    features: Union[Iterable[Item], AsyncIterable[Item]] = attr.ib()
+    links: List[Dict[str, Any]] = attr.ib(factory=list)
+    extra: Dict[str, Any] = attr.ib(factory=dict)
+
+
 class Collections(TypedDict, total=False):
     """All collections endpoint.
     https://github.com/radiantearth/stac-api-spec/tree/master/collections
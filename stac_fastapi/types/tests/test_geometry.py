@@ -0,0 +1,43 @@
+from stac_fastapi.types.geometry import (
+    boxes_intersect,
+    first_position,
+    geometry_bbox,
+    to_box,
+)
+
+
+def test_geometry_bbox():
+    assert geometry_bbox(
+        {"type": "Polygon", "coordinates": [[[0, 0], [2, 0], [2, 3], [0, 0]]]}
+    ) == (0, 0, 2, 3)
+    assert geometry_bbox(
+        {
+            "type": "GeometryCollection",
+            "geometries": [
+                {"type": "Point", "coordinates": [-1, 1]},
+                {"type": "Point", "coordinates": [1, -1, 5]},
+            ],
+        }
+    ) == (-1, -1, 1, 1)
+    assert geometry_bbox({"type": "MultiPoint", "coordinates": []}) is None
+    assert geometry_bbox(None) is None
+
+
+def test_first_position():
+    assert first_position([[[1, 2, 3], [4, 5, 6]]]) == [1, 2, 3]
+    assert first_position([]) is None
+
+
+def test_to_box():
+    assert to_box([0, 1, 2, 3, 4, 5]) == (0, 1, 3, 4)
+    assert to_box([0, 1, 2, 3]) == (0, 1, 2, 3)
+    assert to_box([]) is None
+
+
+def test_boxes_intersect():
+    assert boxes_intersect((0, 0, 2, 2), (1, 1, 3, 3))
+    assert not boxes_intersect((0, 0, 2, 2), (3, 3, 4, 4))
+    # boxes crossing the antimeridian
+    assert boxes_intersect((170, 0, -170, 10), (-175, 1, -172, 2))
+    assert boxes_intersect((175, 5, -175, 6), (170, 0, -170, 10))
+    assert not boxes_intersect((170, 0, -170, 10), (0, 0, 10, 10))
@@ -0,0 +1,205 @@
+import math
+import random
+
+import pytest
+
+from stac_fastapi.types.errors import ConflictError, NotFoundError
+from stac_fastapi.types.inmemory import (
+    DatetimeIndex,
+    GridIndex,
+    InMemoryCatalog,
+    query_interval,
+)
+
+
+def _item(item_id, collection="test", x=0.0, y=0.0, datetime=None, **properties):
+    return {
+        "type": "Feature",
+        "id": item_id,
+        "collection": collection,
+        "geometry": {"type": "Point", "coordinates": [x, y]},
+        "properties": {"datetime": datetime, **properties},
+        "links": [],
+        "assets": {},
+    }
+
+
+def test_datetime_index():
+    index = DatetimeIndex()
+    index.add("a", (0.0, 0.0))
+    index.add("b", (10.0, 10.0))
+    index.add("long", (-100.0, 5.0))
+    index.add("undated", None)
+
+    assert list(index.search()) == ["b", "a", "long", "undated"]
+    assert list(index.search((4.0, 20.0))) == ["b", "long"]
+    assert list(index.search((-math.inf, 0.0))) == ["a", "long"]
+    assert list(index.search((11.0, math.inf))) == []
+
+    index.remove("long")
+    assert list(index.search((4.0, 20.0))) == ["b"]
+    assert len(index) == 3
+
+    index.add("b", (1.0, 1.0))
+    assert list(index.search((1.0, 1.0))) == ["b"]
+
+
+def test_datetime_index_count_and_before():
+    index = DatetimeIndex()
+    index.add("a", (0.0, 0.0))
+    index.add("b", (10.0, 10.0))
+    index.add("c", (10.0, 10.0))
+    index.add("long", (-100.0, 5.0))
+    index.add("undated", None)
+
+    for interval in [None, (4.0, 20.0), (-math.inf, 0.0), (0.0, 10.0), (11.0, 20.0)]:
+        assert index.count(interval) == len(list(index.search(interval)))
+
+    assert list(index.search(before=(10.0, "c"))) == ["b", "a", "long", "undated"]
+    assert list(index.search(before=(10.0, None))) == ["c", "b", "a", "long", "undated"]
+    assert list(index.search(before=(10.0, ""))) == ["a", "long", "undated"]
+    assert list(index.search((-math.inf, 20.0), before=(0.0, "a"))) == ["long"]
+
+
+def test_grid_index():
+    index = GridIndex(cell_size=10, max_cells=16)
+    index.add("point", (1.0, 1.0, 1.0, 1.0))
+    index.add("global", (-180.0, -90.0, 180.0, 90.0))
+    index.add("antimeridian", (170.0, 0.0, -170.0, 10.0))
+    index.add("none", None)
+
+    assert index.search((0.0, 0.0, 2.0, 2.0)) == {"point", "global"}
+    assert index.search((-175.0, 1.0, -172.0, 2.0)) == {"antimeridian", "global"}
+    assert index.search((175.0, 5.0, -175.0, 6.0)) == {"antimeridian", "global"}
+    assert index.search((2.0, 2.0, 3.0, 3.0)) == {"global"}
+
+    index.remove("point")
+    index.remove("global")
+    assert index.search((0.0, 0.0, 2.0, 2.0)) == set()
+    assert "antimeridian" in index
+
+
+def test_catalog_transactions():
+    catalog = InMemoryCatalog()
+    catalog.add_collection({"id": "test"})
+    with pytest.raises(ConflictError):
+        catalog.add_collection({"id": "test"})
+
+    catalog.add_item(_item("a", datetime="2020-01-01T00:00:00Z"))
+    with pytest.raises(ConflictError):
+        catalog.add_item(_item("a", datetime="2020-01-01T00:00:00Z"))
+    with pytest.raises(NotFoundError):
+        catalog.add_item(_item("a", collection="missing"))
+    with pytest.raises(NotFoundError):
+        catalog.add_item(_item("b"), replace=True)
+
+    catalog.add_item(_item("a", x=50, datetime="2021-01-01T00:00:00Z"), replace=True)
+    interval = query_interval("2021-01-01T00:00:00Z")
+    assert catalog.search(interval=interval)[1] == 1
+    assert catalog.search(bbox=(49, -1, 51, 1))[1] == 1
+    assert catalog.search(bbox=(-1, -1, 1, 1))[1] == 0
+
+    with pytest.raises(ConflictError):
+        catalog.add_all_items([_item("b"), _item("b")])
+    with pytest.raises(NotFoundError):
+        catalog.add_all_items([_item("b"), _item("c", collection="missing")])
+    assert catalog.search()[1] == 1
+    catalog.add_all_items([_item("b"), _item("c")])
+    assert catalog.search()[1] == 3
+    catalog.remove_item("test", "b")
+    catalog.remove_item("test", "c")
+
+    catalog.update_collection("test", {"id": "renamed"})
+    assert catalog.get_item("renamed", "a")["collection"] == "renamed"
+    with pytest.raises(NotFoundError):
+        catalog.get_collection("test")
+
+    catalog.remove_item("renamed", "a")
+    assert catalog.search() == ([], 0)
+
+
+def test_catalog_search_matches_full_scan():
+    rng = random.Random(0)
+    catalog = InMemoryCatalog(cell_size=5)
+    items = []
+    for collection in ("c1", "c2"):
+        catalog.add_collection({"id": collection})
+        for n in range(300):
+            day = rng.randint(1, 28)
+            properties = (
+                {
+                    "start_datetime": f"2020-01-{day:02}T00:00:00Z",
+                    "end_datetime": f"2020-02-{day:02}T00:00:00Z",
+                }
+                if n % 7 == 0
+                else {}
+            )
+            item = _item(
+                f"item-{n}",
+                collection=collection,
+                x=rng.uniform(-180, 180),
+                y=rng.uniform(-90, 90),
+                datetime=None if properties else f"2020-01-{day:02}T00:00:00Z",
+                **properties,
+            )
+            catalog.add_item(item)
+            items.append(item)
+
+    def scan(collections, bbox, interval):
+        matches = []
+        for item in items:
+            x, y = item["geometry"]["coordinates"]
+            properties = item["properties"]
+            start = query_interval(
+                properties.get("start_datetime") or properties["datetime"]
+            )[0]
+            end = query_interval(
+                properties.get("end_datetime") or properties["datetime"]
+            )[0]
+            if (
+                (collections is None or item["collection"] in collections)
+                and (
+                    bbox is None or (bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3])
+                )
+                and (interval is None or (start <= interval[1] and interval[0] <= end))
+            ):
+                matches.append((start, item["collection"], item["id"]))
+
+        return [(c, i) for _, c, i in sorted(matches, reverse=True)]
+
+    for collections, bbox, datetime in [
+        (None, None, None),
+        (["c2"], None, "2020-01-10T00:00:00Z/2020-01-12T00:00:00Z"),
+        (None, (-50, -20, 60, 45), None),
+        (["c1", "c2"], (0, 0, 90, 90), "2020-01-20T00:00:00Z/.."),
+        (None, None, "../2020-01-03T00:00:00Z"),
+    ]:
+        interval = query_interval(datetime)
+        expected = scan(collections, bbox, interval)
+        page, matched = catalog.search(
+            collections=collections, bbox=bbox, interval=interval, limit=1000
+        )
+        assert matched == len(expected)
+        assert [(item["collection"], item["id"]) for item in page] == expected
+
+        # paginate from the key of the last item of the previous page
+        pages, after = [], None
+        while True:
+            page, _ = catalog.search(
+                collections=collections,
+                bbox=bbox,
+                interval=interval,
+                limit=7,
+                after=after,
+            )
+            if not page:
+                break
+
+            pages.extend((item["collection"], item["id"]) for item in page)
+            after = catalog.sort_key(page[-1])
+
+        assert pages == expected
+
+    page, matched = catalog.search(ids=["item-1", "item-2", "missing"])
+    assert matched == 4
+    assert {item["id"] for item in page} == {"item-1", "item-2"}
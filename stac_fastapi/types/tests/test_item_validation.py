@@ -0,0 +1,136 @@
+import copy
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from stac_pydantic import Item
+
+from stac_fastapi.types.item_validation import ItemValidator, check_item
+
+ITEM = {
+    "type": "Feature",
+    "stac_version": "1.0.0",
+    "id": "test_item",
+    "geometry": {
+        "type": "Polygon",
+        "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 1], [0, 0]]],
+    },
+    "bbox": [0, 0, 1, 1],
+    "properties": {"datetime": "2020-06-13T13:00:00Z"},
+    "links": [],
+    "assets": {},
+}
+
+
+def _item(**changes):
+    item = copy.deepcopy(ITEM)
+    for key, value in changes.items():
+        if value is None and key != "geometry":
+            item.pop(key)
+        else:
+            item[key] = value
+    return item
+
+
+@pytest.mark.parametrize(
+    "item,errors",
+    [
+        (_item(), []),
+        (_item(geometry=None, bbox=None), []),
+        (_item(id=None, links=None), ["missing id, links"]),
+        (_item(type="Collection"), ["type must be 'Feature'"]),
+        (
+            _item(
+                geometry={"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [1, 1]]]}
+            ),
+            ["geometry has a ring with less than 4 positions"],
+        ),
+        (
+            _item(
+                geometry={
+                    "type": "Polygon",
+                    "coordinates": [[[0, 0], [1, 0], [1, 1], [0, 1]]],
+                }
+            ),
+            ["geometry has a ring which is not closed"],
+        ),
+        (
+            _item(geometry={"type": "Point", "coordinates": [0, "a"]}),
+            ["invalid Point coordinates"],
+        ),
+        (
+            _item(geometry={"type": "Circle", "coordinates": [0, 0]}),
+            ["unknown geometry type 'Circle'"],
+        ),
+        (_item(bbox=[0, 0, 0.5, 1]), ["bbox does not contain the geometry"]),
+        (_item(bbox=[0, 0, 0, 1, 1, 10]), []),
+        (_item(bbox=[0, 0, 1]), ["bbox must have 4 or 6 numbers"]),
+        (_item(bbox=None), ["bbox is required when geometry is not null"]),
+        (
+            _item(
+                geometry={"type": "Point", "coordinates": [179.5, 0]},
+                bbox=[179, -1, -179, 1],
+            ),
+            [],
+        ),
+        (
+            _item(properties={"datetime": "2020-13-01"}),
+            ["datetime is not a RFC 3339 datetime"],
+        ),
+        (
+            _item(properties={"datetime": None}),
+            ["start_datetime and end_datetime are required when datetime is null"],
+        ),
+        (
+            _item(
+                properties={
+                    "datetime": None,
+                    "start_datetime": "2020-02-01T00:00:00Z",
+                    "end_datetime": "2020-01-01T00:00:00Z",
+                }
+            ),
+            ["start_datetime is after end_datetime"],
+        ),
+        ("item", ["item is not an object"]),
+    ],
+)
+def test_check_item(item, errors):
+    assert check_item(item) == errors
+
+
+def test_validator_model():
+    # structurally valid, but not a valid stac_pydantic Item
+    item = _item(stac_extensions="not a list")
+    assert check_item(item) == []
+    assert ItemValidator().validate([item]) == {}
+    invalid = ItemValidator(model=Item).validate([item, _item(id=""), {}])
+    assert list(invalid) == ["test_item", "#1", "#2"]
+    assert invalid["test_item"][0].startswith("stac_extensions:")
+
+
+def test_validator_model_sample_rate(monkeypatch):
+    items = [_item(id=f"item-{n}", stac_extensions="not a list") for n in range(4)]
+    assert ItemValidator(model=Item, model_sample_rate=0).validate(items) == {}
+
+    draws = iter([0.1, 0.9, 0.3, 0.7])
+    monkeypatch.setattr(random, "random", lambda: next(draws))
+    invalid = ItemValidator(model=Item, model_sample_rate=0.5).validate(items)
+    assert list(invalid) == ["item-0", "item-2"]
+
+
+@pytest.mark.asyncio
+async def test_validator_process_pool():
+    items = [_item(id=f"item-{n}") for n in range(10)]
+    items[3]["bbox"] = [5, 5, 6, 6]
+    items[8]["properties"] = {}
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        validator = ItemValidator(
+            model=Item, executor=executor, min_parallel_size=4, batch_size=3
+        )
+        invalid = await validator.validate_async(items)
+
+    assert invalid == {
+        "item-3": ["bbox does not contain the geometry"],
+        "item-8": ["start_datetime and end_datetime are required when datetime is null"],
+    }
+    assert await ItemValidator(min_parallel_size=4).validate_async(items) == invalid
@@ -0,0 +1,96 @@
+from urllib.parse import urljoin
+
+import pytest
+
+from stac_fastapi.types.links import (
+    CollectionLinks,
+    ItemLinks,
+    PageLinks,
+    resolve_links,
+)
+
+
+@pytest.mark.parametrize(
+    "base_url", ["http://test/", "http://test/api/", "http://test/api"]
+)
+def test_page_links(base_url):
+    links = PageLinks(base_url)
+
+    assert (
+        links.item_links("collection", "item")
+        == ItemLinks(
+            collection_id="collection", item_id="item", base_url=base_url
+        ).create_links()
+    )
+    assert (
+        links.collection_links("collection")
+        == CollectionLinks(collection_id="collection", base_url=base_url).create_links()
+    )
+
+    for href in [
+        "license",
+        "collections/a:b",
+        "/license",
+        "../license",
+        "./license",
+        "?f=json",
+        "#section",
+        "https://example.com/license",
+        "mailto:test@example.com",
+    ]:
+        assert links.href(href) == urljoin(base_url, href)
+
+    stored = [
+        {"rel": "self", "href": "collections/a/items/b"},
+        {"rel": "license", "href": "license"},
+    ]
+    assert links.resolve_links(stored) == resolve_links(
+        [dict(link) for link in stored], base_url
+    )
+
+
+def test_page_links_root_relative():
+    links = PageLinks("http://test/api/", root_relative=True)
+
+    assert [link["href"] for link in links.item_links("a", "b")] == [
+        "/api/collections/a/items/b",
+        "/api/collections/a",
+        "/api/collections/a",
+        "/api/",
+    ]
+    assert links.href("../license") == "/license"
+    assert links.href("https://example.com/license") == "https://example.com/license"
+    assert links.href("http://test.com/license") == "http://test.com/license"
+
+
+def test_page_links_add_links():
+    links = PageLinks("http://test/")
+    items = links.add_item_links(
+        {
+            "id": f"item-{i}",
+            "collection": "collection",
+            "links": [
+                {"rel": "self", "href": "wrong"},
+                {"rel": "license", "href": "license"},
+            ],
+        }
+        for i in range(3)
+    )
+
+    assert len(items) == 3
+    assert (
+        items[1]["links"][0]["href"] == "http://test/collections/collection/items/item-1"
+    )
+    assert [link["rel"] for link in items[1]["links"]] == [
+        "self",
+        "parent",
+        "collection",
+        "root",
+        "license",
+    ]
+    assert items[1]["links"][-1]["href"] == "http://test/license"
+
+    collections = links.add_collection_links([{"id": "collection"}])
+    assert (
+        collections[0]["links"][2]["href"] == "http://test/collections/collection/items"
+    )
@@ -0,0 +1,92 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from stac_fastapi.types.rtree import PackedRTree  # noqa: E402
+
+
+def _random_boxes(rng, count, size=5.0):
+    x = rng.uniform(-180, 180 - size, count)
+    y = rng.uniform(-90, 90 - size, count)
+    w = rng.uniform(0, size, count)
+    h = rng.uniform(0, size, count)
+    return np.column_stack([x, y, x + w, y + h])
+
+
+def _scan(boxes, query):
+    minx, miny, maxx, maxy = query
+    parts = (
+        [(minx, miny, 180, maxy), (-180, miny, maxx, maxy)] if minx > maxx else [query]
+    )
+    matches = set()
+    for n, (bminx, bminy, bmaxx, bmaxy) in enumerate(boxes):
+        bparts = (
+            [(bminx, bminy, 180, bmaxy), (-180, bminy, bmaxx, bmaxy)]
+            if bminx > bmaxx
+            else [(bminx, bminy, bmaxx, bmaxy)]
+        )
+        if any(
+            a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+            for a in parts
+            for b in bparts
+        ):
+            matches.add(n)
+
+    return sorted(matches)
+
+
+@pytest.mark.parametrize("count,node_size", [(1, 4), (7, 4), (2000, 16), (5000, 9)])
+def test_query_matches_scan(count, node_size):
+    rng = np.random.default_rng(count)
+    boxes = _random_boxes(rng, count)
+    boxes[::50, 0] = 175.0
+    boxes[::50, 2] = -175.0
+    tree = PackedRTree.from_boxes(boxes, node_size=node_size)
+    assert len(tree) == count
+
+    queries = [
+        (-10, -10, 10, 10),
+        (170, -90, -170, 90),
+        (-180, -90, 180, 90),
+        (100, 80, 101, 81),
+    ] + [tuple(box) for box in _random_boxes(rng, 10, size=30)]
+    for query in queries:
+        assert tree.query(query).tolist() == _scan(boxes, query)
+
+    query_ids, item_ids = tree.query_many(queries)
+    for n, query in enumerate(queries):
+        assert item_ids[query_ids == n].tolist() == _scan(boxes, query)
+
+
+def test_bbox_inputs():
+    tree = PackedRTree.from_boxes([(0, 0, 0, 1, 1, 10), (5, 5, 0, 6, 6, 10)])
+    assert tree.query((0.5, 0.5, 0.6, 0.6)).tolist() == [0]
+    assert tree.bounds == (0, 0, 6, 6)
+
+    empty = PackedRTree.from_boxes([])
+    assert empty.query((0, 0, 1, 1)).tolist() == []
+
+    with pytest.raises(ValueError):
+        PackedRTree.from_boxes([(0, 0, 1)])
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_load(tmp_path, mmap):
+    rng = np.random.default_rng(0)
+    boxes = _random_boxes(rng, 1000)
+    tree = PackedRTree.from_boxes(boxes)
+    path = tmp_path / "tree.bin"
+    tree.save(path)
+
+    loaded = PackedRTree.load(path, mmap=mmap)
+    assert len(loaded) == 1000
+    assert isinstance(loaded.boxes, np.memmap) is mmap
+    np.testing.assert_array_equal(loaded.boxes, tree.boxes)
+    assert loaded.query((-20, -20, 20, 20)).tolist() == _scan(boxes, (-20, -20, 20, 20))
+
+    PackedRTree.from_boxes([]).save(path)
+    assert len(PackedRTree.load(path, mmap=mmap)) == 0
+
+    path.write_bytes(b"not a tree" * 10)
+    with pytest.raises(ValueError):
+        PackedRTree.load(path)